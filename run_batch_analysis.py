@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+"""
+Batch Pipeline Analysis - Executa o pipeline completo para vários exports em paralelo
+Cada export (ex: um por AM ou território) roda em seu próprio processo e grava em
+results/YYYY-MM-DD/batch_HHhMMmSSs/<export>/. No final é gerado um dashboard consolidado.
+
+Uso:
+    python3 run_batch_analysis.py <diretório|glob|arquivo> [...] [--workers N] [--profile]
+
+Arquivos sem parceiro são pareados pelo nome:
+    ricarger-partner.xls  +  ricarger-nopartner.xls
+"""
+
+import argparse
+import glob
+import html
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from run_pipeline_analysis import PIPELINE_STAGES
+from run_history import EXPORT_KEY_ENV_VAR, stable_export_key
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+PIPELINE_SCRIPT = os.path.join(ROOT_DIR, 'run_pipeline_analysis.py')
+ACTION_LIST_SCRIPT = os.path.join(ROOT_DIR, 'scripts', 'action list exporter', 'action_list_exporter.py')
+
+EXPORT_EXTENSIONS = ('.xls', '.xlsx', '.html', '.htm')
+
+# Identifica arquivos de oportunidades sem parceiro pelo nome
+# (o lookbehind evita casar "no-partner" dentro de nomes como "bruno-partner")
+NO_PARTNER_PATTERN = re.compile(r'(?<![a-z0-9])(no[-_ ]?partners?|sem[-_ ]?parceiros?)', re.IGNORECASE)
+
+# Tokens removidos do nome para parear "<x>-partner" com "<x>-nopartner"
+PAIRING_TOKENS = re.compile(
+    r'[-_ ]?((?<![a-z0-9])no[-_ ]?partners?|(?<![a-z0-9])sem[-_ ]?parceiros?|com[-_ ]?parceiros?|partners?)',
+    re.IGNORECASE
+)
+
+# Número de módulos executados pelo run_pipeline_analysis.py
+TOTAL_STAGES = len(PIPELINE_STAGES)
+
+
+def get_batch_results_dir() -> str:
+    """Cria diretório do lote: results/YYYY-MM-DD/batch_HHhMMmSSs"""
+    now = datetime.now()
+    batch_dir = os.path.join(ROOT_DIR, 'results', now.strftime('%Y-%m-%d'), f"batch_{now.strftime('%Hh%Mm%Ss')}")
+    os.makedirs(batch_dir, exist_ok=True)
+    return batch_dir
+
+
+def collect_export_files(inputs: List[str]) -> List[str]:
+    """Expande diretórios e globs em uma lista ordenada de arquivos de export"""
+    files = []
+    for item in inputs:
+        if os.path.isdir(item):
+            candidates = [os.path.join(item, name) for name in os.listdir(item)]
+        else:
+            candidates = glob.glob(item) or [item]
+        for candidate in candidates:
+            if os.path.isfile(candidate) and candidate.lower().endswith(EXPORT_EXTENSIONS):
+                files.append(os.path.abspath(candidate))
+    return sorted(set(files))
+
+
+def pairing_key(file_path: str) -> str:
+    """Nome do export sem os tokens de parceiro (igual para o principal e o sem parceiro)"""
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    return PAIRING_TOKENS.sub('', stem).lower()
+
+
+def pair_exports(files: List[str]) -> List[Tuple[str, Optional[str]]]:
+    """Pareia cada export principal com seu arquivo sem parceiro (se existir)"""
+    no_partner_files = {}
+    main_files = []
+    for file_path in files:
+        if NO_PARTNER_PATTERN.search(os.path.basename(file_path)):
+            no_partner_files[pairing_key(file_path)] = file_path
+        else:
+            main_files.append(file_path)
+
+    pairs = [(main_file, no_partner_files.pop(pairing_key(main_file), None)) for main_file in main_files]
+
+    for orphan in no_partner_files.values():
+        print(f"⚠️  Arquivo sem parceiro sem export principal correspondente: {os.path.basename(orphan)}")
+
+    return pairs
+
+
+def export_namespace(file_path: str, used: set) -> str:
+    """Nome do subdiretório do export (único dentro do lote)"""
+    base = re.sub(r'[^\w.-]+', '_', os.path.splitext(os.path.basename(file_path))[0]).strip('_') or 'export'
+    name, index = base, 2
+    while name in used:
+        name = f"{base}_{index}"
+        index += 1
+    used.add(name)
+    return name
+
+
+def export_env(main_file: str, results_dir: str) -> Dict[str, str]:
+    """Ambiente do pipeline de um export (diretório de resultados e escopo no histórico)"""
+    env = os.environ.copy()
+    env['PYTHONIOENCODING'] = 'utf-8'
+    env['PIPELINE_RESULTS_DIR'] = results_dir
+    # Escopo no histórico: nome do export sem os tokens de parceiro ("ana-partner.xls" -> "ana")
+    env[EXPORT_KEY_ENV_VAR] = stable_export_key(pairing_key(main_file))
+    return env
+
+
+def run_export(main_file: str, no_partner_file: Optional[str], results_dir: str) -> Dict:
+    """Executa o pipeline completo para um export em processo próprio"""
+    cmd_args = [sys.executable, PIPELINE_SCRIPT, main_file]
+    if no_partner_file:
+        cmd_args.append(no_partner_file)
+
+    env = export_env(main_file, results_dir)
+
+    start = time.perf_counter()
+    result = subprocess.run(cmd_args, cwd=ROOT_DIR, capture_output=True, text=True,
+                            encoding='utf-8', errors='replace', env=env)
+    return collect_export_run(main_file, no_partner_file, results_dir, result, time.perf_counter() - start)
+
+
+def collect_export_run(main_file: str, no_partner_file: Optional[str], results_dir: str,
+                       result: subprocess.CompletedProcess, elapsed: float) -> Dict:
+    """Grava o log do export e resume a execução a partir do run_metrics.json"""
+    # Log completo de cada export fica no próprio subdiretório
+    with open(os.path.join(results_dir, 'pipeline_log.txt'), 'w', encoding='utf-8') as f:
+        f.write(result.stdout)
+        if result.stderr:
+            f.write("\n" + "="*80 + "\nSTDERR\n" + "="*80 + "\n")
+            f.write(result.stderr)
+
+    metrics = {}
+    metrics_file = os.path.join(results_dir, 'run_metrics.json')
+    if os.path.exists(metrics_file):
+        try:
+            with open(metrics_file, 'r', encoding='utf-8') as f:
+                metrics = json.load(f).get('stages', {})
+        except (OSError, ValueError):
+            metrics = {}
+
+    successful_stages = sum(1 for stage in metrics.values() if stage.get('status') == 'success')
+
+    return {
+        'export': os.path.basename(main_file),
+        'no_partner_file': os.path.basename(no_partner_file) if no_partner_file else None,
+        'results_dir': results_dir,
+        'success': result.returncode == 0 and successful_stages >= TOTAL_STAGES,
+        'stages_ok': successful_stages,
+        'wall_time_s': round(elapsed, 2),
+        'stages': metrics,
+    }
+
+
+def export_batch_action_list(runs: List[Dict], batch_dir: str) -> List[str]:
+    """
+    Lista de ações consolidada do lote (action_list.csv/.xlsx no batch_dir)
+
+    O exportador lê as listas de cada export em blocos, então o lote inteiro
+    não precisa caber em memória.
+
+    Returns:
+        Nomes dos arquivos gerados
+    """
+    cmd_args = [sys.executable, ACTION_LIST_SCRIPT] + [run['results_dir'] for run in runs]
+
+    env = os.environ.copy()
+    env['PYTHONIOENCODING'] = 'utf-8'
+    env['PIPELINE_RESULTS_DIR'] = batch_dir
+
+    result = subprocess.run(cmd_args, cwd=ROOT_DIR, capture_output=True, text=True,
+                            encoding='utf-8', errors='replace', env=env)
+    if result.returncode != 0:
+        print(f"   ⚠️  Falha ao exportar lista de ações consolidada: {result.stderr.strip()[-500:]}")
+        return []
+
+    return [name for name in ('action_list.xlsx', 'action_list.csv')
+            if os.path.exists(os.path.join(batch_dir, name))]
+
+
+def _stage_value(run: Dict, stage: str, key: str, sub_key: Optional[str] = None):
+    value = run['stages'].get(stage, {}).get(key)
+    if sub_key is not None:
+        value = (value or {}).get(sub_key)
+    return value
+
+
+def build_rollup(runs: List[Dict], batch_dir: str) -> Dict:
+    """Consolida métricas de todos os exports"""
+    rule_totals: Dict[str, int] = {}
+    for run in runs:
+        for stage in run['stages'].values():
+            for rule, count in stage.get('issues', {}).items():
+                rule_totals[rule] = rule_totals.get(rule, 0) + count
+
+    return {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'batch_dir': batch_dir,
+        'total_exports': len(runs),
+        'successful_exports': sum(1 for run in runs if run['success']),
+        'total_rows': sum(_stage_value(run, 'Delivery Model Checker', 'input_rows') or 0 for run in runs),
+        'total_issues': sum(rule_totals.values()),
+        'rule_totals': dict(sorted(rule_totals.items(), key=lambda item: -item[1])),
+        'runs': runs,
+    }
+
+
+def generate_rollup_html(rollup: Dict) -> str:
+    """Gera dashboard HTML consolidado do lote"""
+    rows_html = []
+    for run in rollup['runs']:
+        relative_dir = os.path.basename(run['results_dir'])
+        status = "✅" if run['success'] else f"❌ {run['stages_ok']}/{TOTAL_STAGES}"
+        dashboard_link = f"{relative_dir}/dashboard.html"
+        rows_html.append(f"""
+            <tr>
+                <td><a href="{html.escape(dashboard_link)}" target="_blank">{html.escape(run['export'])}</a></td>
+                <td>{html.escape(run['no_partner_file'] or '-')}</td>
+                <td class="center">{status}</td>
+                <td class="number">{_stage_value(run, 'Delivery Model Checker', 'input_rows') or 0:,}</td>
+                <td class="number">{_stage_value(run, 'Delivery Model Checker', 'total_issues') or 0:,}</td>
+                <td class="number">{_stage_value(run, 'Pipeline Hygiene Checker', 'total_issues') or 0:,}</td>
+                <td class="number">{_stage_value(run, 'Slack Message Generator', 'total_issues') or 0:,}</td>
+                <td class="number">{_stage_value(run, 'Slack Message Generator', 'outputs', 'slack_messages') or 0:,}</td>
+                <td class="number">{_stage_value(run, 'Follow-up Generator', 'outputs', 'followup_emails') or 0:,}</td>
+                <td class="number">{run['wall_time_s']:.1f}s</td>
+                <td><a href="{html.escape(relative_dir)}/pipeline_log.txt" target="_blank">log</a></td>
+            </tr>""")
+
+    action_list_html = ''
+    if rollup.get('action_list_files'):
+        links = ' · '.join(
+            f'<a href="{html.escape(name)}">{html.escape(name.rsplit(".", 1)[1].upper())}</a>'
+            for name in rollup['action_list_files']
+        )
+        action_list_html = f"<p class=\"downloads\">📋 Lista de ações consolidada: {links}</p>"
+
+    rules_html = ''.join(
+        f"<tr><td>{html.escape(rule)}</td><td class=\"number\">{count:,}</td></tr>"
+        for rule, count in rollup['rule_totals'].items()
+    )
+
+    return f"""<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>AWS Partner Pipeline Analysis - Batch</title>
+    <style>
+        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
+        body {{
+            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            min-height: 100vh;
+            padding: 20px;
+        }}
+        .container {{
+            max-width: 1400px;
+            margin: 0 auto;
+            background: white;
+            border-radius: 20px;
+            box-shadow: 0 25px 50px rgba(0,0,0,0.2);
+            overflow: hidden;
+        }}
+        .header {{
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            color: white;
+            padding: 40px;
+            text-align: center;
+        }}
+        .header h1 {{ font-size: 2.5em; margin-bottom: 10px; font-weight: 300; }}
+        .header p {{ font-size: 1.1em; opacity: 0.9; }}
+        .stats-bar {{
+            background: #f8f9fa;
+            padding: 20px 40px;
+            border-bottom: 1px solid #e9ecef;
+            display: grid;
+            grid-template-columns: repeat(auto-fit, minmax(180px, 1fr));
+            gap: 20px;
+        }}
+        .stat-item {{
+            text-align: center;
+            padding: 15px;
+            background: white;
+            border-radius: 10px;
+            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
+        }}
+        .stat-number {{ font-size: 2em; font-weight: bold; color: #667eea; }}
+        .stat-label {{ color: #6c757d; font-size: 0.9em; margin-top: 5px; }}
+        .section {{ padding: 30px 40px; }}
+        .section h2 {{ color: #333; margin-bottom: 15px; font-weight: 400; }}
+        table {{ width: 100%; border-collapse: collapse; font-size: 0.95em; }}
+        th {{ background: #667eea; color: white; padding: 10px; text-align: left; }}
+        td {{ padding: 8px 10px; border-bottom: 1px solid #e9ecef; }}
+        tr:hover td {{ background: #f8f9fa; }}
+        td.number {{ text-align: right; font-variant-numeric: tabular-nums; }}
+        td.center {{ text-align: center; }}
+        a {{ color: #667eea; }}
+        .downloads {{ margin-top: 15px; color: #333; }}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>📦 Análise em Lote</h1>
+            <p>Gerado em {datetime.now().strftime('%d/%m/%Y às %H:%M')}</p>
+        </div>
+
+        <div class="stats-bar">
+            <div class="stat-item">
+                <div class="stat-number">{rollup['successful_exports']}/{rollup['total_exports']}</div>
+                <div class="stat-label">Exports processados</div>
+            </div>
+            <div class="stat-item">
+                <div class="stat-number">{rollup['total_rows']:,}</div>
+                <div class="stat-label">Oportunidades</div>
+            </div>
+            <div class="stat-item">
+                <div class="stat-number">{rollup['total_issues']:,}</div>
+                <div class="stat-label">Issues encontradas</div>
+            </div>
+            <div class="stat-item">
+                <div class="stat-number">{sum(run['wall_time_s'] for run in rollup['runs']):.0f}s</div>
+                <div class="stat-label">Tempo somado</div>
+            </div>
+        </div>
+
+        <div class="section">
+            <h2>Exports</h2>
+            <table>
+                <tr>
+                    <th>Export</th><th>Sem parceiro</th><th>Status</th><th>Linhas</th>
+                    <th>Delivery Model</th><th>Hygiene</th><th>Slack</th><th>Msgs Slack</th>
+                    <th>Follow-ups</th><th>Tempo</th><th></th>
+                </tr>{''.join(rows_html)}
+            </table>
+            {action_list_html}
+        </div>
+
+        <div class="section">
+            <h2>Issues por regra (todos os exports)</h2>
+            <table>
+                <tr><th>Regra</th><th>Total</th></tr>
+                {rules_html}
+            </table>
+        </div>
+    </div>
+</body>
+</html>"""
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description='Executa o pipeline para vários exports em paralelo')
+    parser.add_argument('inputs', nargs='+', help='Diretórios, globs ou arquivos de export')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Número de exports processados em paralelo (padrão: núcleos da máquina)')
+    parser.add_argument('--profile', nargs='?', const='sample', default=None,
+                        help='Ativa profiling por módulo em cada export (sample|cprofile|all)')
+    args = parser.parse_args()
+
+    print("="*80)
+    print("📦 AWS PARTNER PIPELINE ANALYSIS - BATCH")
+    print("="*80)
+    print(f"Executado em: {datetime.now().strftime('%d/%m/%Y às %H:%M')}")
+    print()
+
+    pairs = pair_exports(collect_export_files(args.inputs))
+    if not pairs:
+        print("❌ ERRO: Nenhum export encontrado")
+        sys.exit(1)
+
+    if args.profile:
+        os.environ['PIPELINE_PROFILE'] = args.profile
+
+    batch_dir = get_batch_results_dir()
+    workers = max(1, min(args.workers, len(pairs)))
+    print(f"📊 Exports: {len(pairs)}  |  Processos em paralelo: {workers}")
+    print(f"📁 Resultados: {batch_dir}")
+    print()
+
+    used_names = set()
+    jobs = []
+    for main_file, no_partner_file in pairs:
+        results_dir = os.path.join(batch_dir, export_namespace(main_file, used_names))
+        os.makedirs(results_dir, exist_ok=True)
+        jobs.append((main_file, no_partner_file, results_dir))
+
+    # Cada export já roda em processos próprios (run_pipeline_analysis + módulos),
+    # então o pool só precisa disparar e aguardar os subprocessos
+    runs = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(run_export, *job): job for job in jobs}
+        for future in as_completed(futures):
+            run = future.result()
+            icon = "✅" if run['success'] else "❌"
+            print(f"   {icon} {run['export']:<40} {run['wall_time_s']:>8.1f}s  ({run['stages_ok']}/{TOTAL_STAGES} módulos)")
+            runs.append(run)
+
+    # Ordem determinística no resumo (mesma ordem dos arquivos de entrada)
+    order = {job[2]: index for index, job in enumerate(jobs)}
+    runs.sort(key=lambda run: order[run['results_dir']])
+
+    rollup = build_rollup(runs, batch_dir)
+    rollup['action_list_files'] = export_batch_action_list(runs, batch_dir)
+    with open(os.path.join(batch_dir, 'batch_summary.json'), 'w', encoding='utf-8') as f:
+        json.dump(rollup, f, indent=2, ensure_ascii=False)
+    dashboard_file = os.path.join(batch_dir, 'batch_dashboard.html')
+    with open(dashboard_file, 'w', encoding='utf-8') as f:
+        f.write(generate_rollup_html(rollup))
+
+    print()
+    print("🎯 RESUMO DO LOTE:")
+    print(f"   ✅ Exports processados com sucesso: {rollup['successful_exports']}/{rollup['total_exports']}")
+    print(f"   📊 Oportunidades analisadas: {rollup['total_rows']:,}")
+    print(f"   ⚠️  Issues encontradas: {rollup['total_issues']:,}")
+    print(f"   📊 Dashboard consolidado: {dashboard_file}")
+    if rollup['action_list_files']:
+        print(f"   📋 Lista de ações consolidada: {os.path.join(batch_dir, rollup['action_list_files'][0])}")
+    print()
+    print("="*80)
+
+    if rollup['successful_exports'] < rollup['total_exports']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,28 @@
 #!/usr/bin/env python3
 """
 Pipeline Analysis Runner - Executa todos os checkers de pipeline
-Uso: python3 run_pipeline_analysis.py <arquivo_dados.xls>
+Uso: python3 run_pipeline_analysis.py <arquivo_dados.xls> [arquivo_sem_parceiros.xls] [--profile[=sample|cprofile|all]]
 """
 
 import sys
 import os
 import subprocess
+import json
+import sqlite3
 from datetime import datetime
 
+# Histórico das execuções compartilhado com os módulos (scripts/utils)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts', 'utils'))
+from run_history import EXPORT_KEY_ENV_VAR, export_key, update_run_stages
+
 def get_dated_results_dir():
-    """Cria e retorna diretório results com data atual"""
+    """Cria e retorna diretório results com data atual (ou PIPELINE_RESULTS_DIR, se definido)"""
+    # Diretório específico da execução (Streamlit / modo batch)
+    pipeline_results_dir = os.environ.get('PIPELINE_RESULTS_DIR')
+    if pipeline_results_dir:
+        os.makedirs(pipeline_results_dir, exist_ok=True)
+        return pipeline_results_dir
+    
     date_str = datetime.now().strftime('%Y-%m-%d')
     results_dir = os.path.join("results", date_str)
     
@@ -19,6 +31,70 @@ def get_dated_results_dir():
     
     return results_dir
 
+# Módulos na ordem de execução, com o script (relativo à raiz) e a entrada:
+# 'data', 'data+no_partner', arquivo gerado no diretório de resultados ou None.
+# O benchmark (scripts/pipeline benchmark) mede exatamente esta lista.
+PIPELINE_STAGES = [
+    {
+        'name': 'Delivery Model Checker',
+        'script': os.path.join('scripts', 'delivery model checker', 'delivery_model_checker.py'),
+        'input': 'data',
+    },
+    {
+        'name': 'Pipeline Hygiene Checker',
+        'script': os.path.join('scripts', 'launch date checker', 'pipeline_hygiene_checker.py'),
+        'input': 'data',
+    },
+    {
+        'name': 'HTML Email Generator',
+        'script': os.path.join('scripts', 'html email generator', 'html_email_generator.py'),
+        'input': 'pipeline_hygiene_emails.txt',
+    },
+    {
+        'name': 'Slack Message Generator',
+        'script': os.path.join('scripts', 'slack message generator', 'slack_message_generator.py'),
+        'input': 'data+no_partner',
+    },
+    {
+        'name': 'Slack Interface Generator',
+        'script': os.path.join('scripts', 'slack interface generator', 'slack_interface_generator.py'),
+        'input': 'slack_messages.txt',
+    },
+    {
+        'name': 'Follow-up Generator',
+        'script': os.path.join('scripts', 'follow-up generator', 'followup_generator.py'),
+        'input': 'data',
+    },
+    {
+        'name': 'Action List Exporter',
+        'script': os.path.join('scripts', 'action list exporter', 'action_list_exporter.py'),
+        'input': None,
+    },
+    {
+        'name': 'Dashboard Generator',
+        'script': os.path.join('scripts', 'dashboard generator', 'dashboard_generator.py'),
+        'input': None,
+    },
+]
+
+def stage_script(name):
+    """Caminho do script de um módulo de PIPELINE_STAGES"""
+    return next(stage['script'] for stage in PIPELINE_STAGES if stage['name'] == name)
+
+# Executor dos módulos (None = subprocess); o modo watch usa o worker pré-aquecido
+_stage_runner = None
+
+def set_stage_runner(runner):
+    """Define como os módulos são executados: runner(script_path, args) -> CompletedProcess"""
+    global _stage_runner
+    _stage_runner = runner
+
+def run_stage(script_path, *args):
+    """Executa um módulo do pipeline com a saída capturada"""
+    if _stage_runner is not None:
+        return _stage_runner(script_path, list(args))
+    return subprocess.run([sys.executable, script_path, *args], capture_output=True, text=True, cwd=".")
+
 def print_header():
     """Imprime cabeçalho do script"""
     print("="*80)
@@ -38,14 +114,10 @@ def run_delivery_model_checker(data_file):
     print()
     
     try:
-        # Muda para o diretório do script
-        script_dir = "scripts/delivery model checker"
-        script_path = os.path.join(script_dir, "delivery_model_checker.py")
+        script_path = stage_script('Delivery Model Checker')
         
         # Executa o script
-        result = subprocess.run([
-            sys.executable, script_path, data_file
-        ], capture_output=True, text=True, cwd=".")
+        result = run_stage(script_path, data_file)
         
         if result.returncode == 0:
             print("✅ Delivery Model Checker executado com sucesso!")
@@ -68,14 +140,10 @@ def run_pipeline_hygiene_checker(data_file):
     print()
     
     try:
-        # Muda para o diretório do script
-        script_dir = "scripts/launch date checker"
-        script_path = os.path.join(script_dir, "pipeline_hygiene_checker.py")
+        script_path = stage_script('Pipeline Hygiene Checker')
         
         # Executa o script
-        result = subprocess.run([
-            sys.executable, script_path, data_file
-        ], capture_output=True, text=True, cwd=".")
+        result = run_stage(script_path, data_file)
         
         if result.returncode == 0:
             print("✅ Pipeline Hygiene Checker executado com sucesso!")
@@ -99,17 +167,14 @@ def run_html_generator(data_file):
     
     try:
         # Verifica se o arquivo de emails existe
-        date_str = datetime.now().strftime('%Y-%m-%d')
-        emails_file = f"results/{date_str}/pipeline_hygiene_emails.txt"
+        emails_file = os.path.join(get_dated_results_dir(), "pipeline_hygiene_emails.txt")
         if not os.path.exists(emails_file):
             print("⚠️  Arquivo de emails não encontrado, pulando geração HTML")
             return False
         
         # Executa o gerador HTML
-        script_path = os.path.join("scripts", "html email generator", "html_email_generator.py")
-        result = subprocess.run([
-            sys.executable, script_path, emails_file
-        ], capture_output=True, text=True, cwd=".")
+        script_path = stage_script('HTML Email Generator')
+        result = run_stage(script_path, emails_file)
         
         if result.returncode == 0:
             print("✅ HTML Email Generator executado com sucesso!")
@@ -133,15 +198,15 @@ def run_slack_generator(data_file, no_partner_file=None):
     
     try:
         # Executa o gerador de mensagens Slack
-        script_path = os.path.join("scripts", "slack message generator", "slack_message_generator.py")
+        script_path = stage_script('Slack Message Generator')
         
         # Adiciona arquivo sem parceiro se fornecido
-        cmd_args = [sys.executable, script_path, data_file]
+        script_args = [data_file]
         if no_partner_file and os.path.exists(no_partner_file):
-            cmd_args.append(no_partner_file)
+            script_args.append(no_partner_file)
             print(f"📋 Incluindo arquivo de oportunidades sem parceiro: {no_partner_file}")
         
-        result = subprocess.run(cmd_args, capture_output=True, text=True, cwd=".")
+        result = run_stage(script_path, *script_args)
         
         if result.returncode == 0:
             print("✅ Slack Message Generator executado com sucesso!")
@@ -165,17 +230,14 @@ def run_slack_interface_generator():
     
     try:
         # Verifica se o arquivo de mensagens Slack existe
-        date_str = datetime.now().strftime('%Y-%m-%d')
-        slack_messages_file = f"results/{date_str}/slack_messages.txt"
+        slack_messages_file = os.path.join(get_dated_results_dir(), "slack_messages.txt")
         if not os.path.exists(slack_messages_file):
             print("⚠️  Arquivo de mensagens Slack não encontrado, pulando geração de interface")
             return False
         
         # Executa o gerador de interface Slack
-        script_path = os.path.join("scripts", "slack interface generator", "slack_interface_generator.py")
-        result = subprocess.run([
-            sys.executable, script_path, slack_messages_file
-        ], capture_output=True, text=True, cwd=".")
+        script_path = stage_script('Slack Interface Generator')
+        result = run_stage(script_path, slack_messages_file)
         
         if result.returncode == 0:
             print("✅ Slack Interface Generator executado com sucesso!")
@@ -199,10 +261,8 @@ def run_followup_generator(data_file):
     
     try:
         # Executa o gerador de follow-up
-        script_path = os.path.join("scripts", "follow-up generator", "followup_generator.py")
-        result = subprocess.run([
-            sys.executable, script_path, data_file
-        ], capture_output=True, text=True, cwd=".")
+        script_path = stage_script('Follow-up Generator')
+        result = run_stage(script_path, data_file)
         
         if result.returncode == 0:
             print("✅ Follow-up Generator executado com sucesso!")
@@ -218,6 +278,31 @@ def run_followup_generator(data_file):
     
     return True
 
+def run_action_list_exporter():
+    """Executa o Action List Exporter"""
+    print("📋 EXECUTANDO: Action List Exporter")
+    print("Exportando lista de ações (CSV/XLSX)...")
+    print()
+    
+    try:
+        # Executa o exportador da lista de ações
+        script_path = stage_script('Action List Exporter')
+        result = run_stage(script_path)
+        
+        if result.returncode == 0:
+            print("✅ Action List Exporter executado com sucesso!")
+            print(result.stdout)
+        else:
+            print("❌ Erro no Action List Exporter:")
+            print(result.stderr)
+            return False
+            
+    except Exception as e:
+        print(f"❌ Erro ao executar Action List Exporter: {e}")
+        return False
+    
+    return True
+
 def run_dashboard_generator():
     """Executa o Dashboard Generator"""
     print("📊 EXECUTANDO: Dashboard Generator")
@@ -226,10 +311,8 @@ def run_dashboard_generator():
     
     try:
         # Executa o gerador de dashboard
-        script_path = os.path.join("scripts", "dashboard generator", "dashboard_generator.py")
-        result = subprocess.run([
-            sys.executable, script_path
-        ], capture_output=True, text=True, cwd=".")
+        script_path = stage_script('Dashboard Generator')
+        result = run_stage(script_path)
         
         if result.returncode == 0:
             print("✅ Dashboard Generator executado com sucesso!")
@@ -250,7 +333,7 @@ def show_results():
     print("📁 ARQUIVOS GERADOS:")
     print()
     
-    results_dir = "results"
+    results_dir = get_dated_results_dir()
     if os.path.exists(results_dir):
         files = os.listdir(results_dir)
         if files:
@@ -273,24 +356,72 @@ def show_results():
     
     print()
 
+def update_history_metrics():
+    """Completa as métricas da execução no histórico com os módulos que rodaram depois do Action List Exporter"""
+    try:
+        update_run_stages(get_dated_results_dir())
+    except sqlite3.Error as e:
+        # Histórico nunca deve derrubar o pipeline
+        print(f"⚠️  Não foi possível atualizar as métricas no histórico: {e}")
+
+def show_run_metrics():
+    """Mostra tempos e volumes por módulo a partir do run_metrics.json"""
+    metrics_file = os.path.join(get_dated_results_dir(), "run_metrics.json")
+    if not os.path.exists(metrics_file):
+        return
+    
+    try:
+        with open(metrics_file, 'r', encoding='utf-8') as f:
+            stages = json.load(f).get('stages', {})
+    except (OSError, ValueError):
+        return
+    
+    print("⏱️  MÉTRICAS POR MÓDULO:")
+    print()
+    print(f"   {'Módulo':<28} {'Wall':>8} {'CPU':>8} {'Memória':>9} {'Linhas':>9} {'Issues':>7}")
+    for name, stage in stages.items():
+        memory = f"{stage['peak_memory_mb']:.0f} MB" if stage.get('peak_memory_mb') is not None else "n/a"
+        rows = stage.get('input_rows')
+        print(f"   {name:<28} {stage['wall_time_s']:>7.2f}s {stage['cpu_time_s']:>7.2f}s {memory:>9} "
+              f"{rows if rows is not None else '-':>9} {stage.get('total_issues', 0):>7}")
+    print()
+
 def main():
     """Função principal"""
     print_header()
     
+    # Separa opções (--profile[=cprofile|sample|all], --shard-workers[=N|auto]) dos arquivos
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    for option in sys.argv[1:]:
+        if option == '--profile' or option.startswith('--profile='):
+            mode = option.split('=', 1)[1] if '=' in option else 'sample'
+            # Herdado pelos subprocessos de cada módulo
+            os.environ['PIPELINE_PROFILE'] = mode
+            print(f"🔬 Profiling ativado (modo: {mode}) - arquivos em results/<data>/profiles/")
+            print()
+        elif option == '--shard-workers' or option.startswith('--shard-workers='):
+            workers = option.split('=', 1)[1] if '=' in option else 'auto'
+            # Slack e Follow-up particionam exports grandes por AM/parceiro
+            os.environ['PIPELINE_SHARD_WORKERS'] = workers
+            print(f"⚡ Execução particionada ativada (processos: {workers})")
+            print()
+    
     # Verifica argumentos
-    if len(sys.argv) < 2:
+    if len(args) < 1:
         print("❌ ERRO: Arquivo de dados não especificado")
         print()
         print("Uso:")
-        print(f"   python3 {sys.argv[0]} <arquivo_com_parceiros.xls> [arquivo_sem_parceiros.xls]")
+        print(f"   python3 {sys.argv[0]} <arquivo_com_parceiros.xls> [arquivo_sem_parceiros.xls] [--profile[=sample|cprofile|all]] [--shard-workers[=N|auto]]")
         print()
         print("Exemplos:")
         print(f"   python3 {sys.argv[0]} ricarger-partner.xls")
         print(f"   python3 {sys.argv[0]} ricarger-partner.xls ricarger-nopartner.xls")
+        print(f"   python3 {sys.argv[0]} ricarger-partner.xls --profile")
+        print(f"   python3 {sys.argv[0]} org-wide-partner.xls --shard-workers=8")
         sys.exit(1)
     
-    data_file = sys.argv[1]
-    no_partner_file = sys.argv[2] if len(sys.argv) > 2 else None
+    data_file = args[0]
+    no_partner_file = args[1] if len(args) > 1 else None
     
     # Verifica se o arquivo principal existe
     if not os.path.exists(data_file):
@@ -302,6 +433,9 @@ def main():
         print(f"❌ ERRO: Arquivo sem parceiro '{no_partner_file}' não encontrado")
         sys.exit(1)
     
+    # Escopo do export no histórico, herdado pelos módulos (padrão: nome do arquivo principal)
+    os.environ.setdefault(EXPORT_KEY_ENV_VAR, export_key(data_file))
+    
     print(f"📊 Arquivo de dados: {data_file}")
     print(f"📊 Tamanho: {os.path.getsize(data_file):,} bytes")
     
@@ -318,7 +452,7 @@ def main():
         print()
     
     success_count = 0
-    total_checkers = 7  # Agora são 7 checkers (incluindo follow-up generator)
+    total_checkers = len(PIPELINE_STAGES)
     
     # Executa Delivery Model Checker
     print_separator()
@@ -357,14 +491,24 @@ def main():
     
     print_separator()
     
+    # Executa Action List Exporter
+    if run_action_list_exporter():
+        success_count += 1
+    
+    print_separator()
+    
     # Executa Dashboard Generator
     if run_dashboard_generator():
         success_count += 1
     
     print_separator()
     
+    # Métricas do exportador e do dashboard no histórico
+    update_history_metrics()
+    
     # Mostra resultados
     show_results()
+    show_run_metrics()
     
     # Resumo final
     print("🎯 RESUMO DA EXECUÇÃO:")
@@ -372,14 +516,15 @@ def main():
     
     if success_count == total_checkers:
         print("   🎉 Todos os checkers foram executados com sucesso!")
-        date_str = datetime.now().strftime('%Y-%m-%d')
-        print(f"   📧 Emails e relatórios estão prontos na pasta 'results/{date_str}'")
-        print(f"   🌐 Interface HTML disponível em: results/{date_str}/pipeline_hygiene_emails.html")
-        print(f"   📱 Mensagens Slack disponíveis em: results/{date_str}/slack_messages.txt")
-        print(f"   🌐 Interface Slack disponível em: results/{date_str}/slack_interface.html")
-        print(f"   📧 Follow-up emails disponíveis em: results/{date_str}/followup_emails.txt")
-        print(f"   🌐 Interface Follow-up disponível em: results/{date_str}/followup_emails.html")
-        print(f"   📊 Dashboard Unificado disponível em: results/{date_str}/dashboard.html")
+        results_dir = get_dated_results_dir()
+        print(f"   📧 Emails e relatórios estão prontos na pasta '{results_dir}'")
+        print(f"   🌐 Interface HTML disponível em: {results_dir}/pipeline_hygiene_emails.html")
+        print(f"   📱 Mensagens Slack disponíveis em: {results_dir}/slack_messages.txt")
+        print(f"   🌐 Interface Slack disponível em: {results_dir}/slack_interface.html")
+        print(f"   📧 Follow-up emails disponíveis em: {results_dir}/followup_emails.txt")
+        print(f"   🌐 Interface Follow-up disponível em: {results_dir}/followup_emails.html")
+        print(f"   📋 Lista de ações disponível em: {results_dir}/action_list.xlsx")
+        print(f"   📊 Dashboard Unificado disponível em: {results_dir}/dashboard.html")
     else:
         print("   ⚠️  Alguns checkers falharam. Verifique os erros acima.")
     
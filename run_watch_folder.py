@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+Watch Folder - Executa o pipeline automaticamente para exports novos ou atualizados
+Monitora uma pasta (ex: compartilhada com o time) e roda o pipeline completo
+para cada export .xls/.xlsx/.html que aparecer ou mudar. Substitui rodar
+run_pipeline_analysis.py manualmente a cada novo export.
+
+- Eventos via inotify no Linux; nos demais sistemas (ou com --poll, necessário
+  em compartilhamentos de rede, onde escritas remotas não geram eventos) a
+  pasta é varrida a cada --interval segundos
+- Escritas parciais: um arquivo só é processado depois de ficar --settle
+  segundos sem mudar de tamanho/data de modificação
+- Arquivos sem parceiro são pareados pelo nome, como no modo batch
+  (ricarger-partner.xls + ricarger-nopartner.xls); o par só roda quando os
+  dois estão estáveis, e a chegada/atualização de um deles roda o par de novo
+- Os módulos rodam em um worker pré-aquecido (scripts/utils/warm_worker.py):
+  pandas e os utilitários são importados uma vez, e cada módulo roda em um
+  fork do processo do watcher
+- Cada execução grava em results/YYYY-MM-DD/watch/<export>_HHhMMmSSs/ e, se
+  todos os módulos tiverem sucesso, é publicada em results/latest/<export>
+  (link simbólico para a execução) e em results/latest/index.json
+
+Uso:
+    python3 run_watch_folder.py <pasta> [--poll] [--settle SEGUNDOS] [--interval SEGUNDOS] [--once]
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import json
+import os
+import select
+import signal
+import struct
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(ROOT_DIR, 'scripts', 'utils'))
+
+import run_pipeline_analysis
+from run_batch_analysis import (PIPELINE_SCRIPT, EXPORT_EXTENSIONS, NO_PARTNER_PATTERN, collect_export_files,
+                                collect_export_run, export_env, export_namespace, pair_exports, pairing_key,
+                                run_export)
+from warm_worker import fork_available, run_in_fork, run_script, warm_up
+
+LATEST_DIR = os.path.join(ROOT_DIR, 'results', 'latest')
+LATEST_INDEX = os.path.join(LATEST_DIR, 'index.json')
+
+DEFAULT_SETTLE_S = 5.0
+DEFAULT_INTERVAL_S = 2.0
+
+# Arquivos de lock do Office (~$) e ocultos/temporários não são exports
+IGNORED_PREFIXES = ('~$', '.')
+
+Signature = Tuple[int, int]
+
+
+def _signature(path: str) -> Optional[Signature]:
+    """(tamanho, mtime em ns) do arquivo (None se não existir)"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _is_export(path: str) -> bool:
+    name = os.path.basename(path)
+    return name.lower().endswith(EXPORT_EXTENSIONS) and not name.startswith(IGNORED_PREFIXES)
+
+
+class InotifyWatcher:
+    """Eventos de criação/escrita/renomeação na pasta via inotify (Linux, sem dependências)"""
+
+    IN_MODIFY = 0x2
+    IN_ATTRIB = 0x4
+    IN_CLOSE_WRITE = 0x8
+    IN_MOVED_TO = 0x80
+    IN_CREATE = 0x100
+    IN_Q_OVERFLOW = 0x4000
+    MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+    # struct inotify_event: wd, mask, cookie, len (+ nome com len bytes)
+    _EVENT = struct.Struct('iIII')
+
+    def __init__(self, folder: str):
+        self.folder = folder
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1')
+        if libc.inotify_add_watch(self.fd, os.fsencode(folder), self.MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, 'inotify_add_watch')
+
+    def wait(self, timeout: float) -> Optional[Set[str]]:
+        """Arquivos alterados até `timeout` segundos (None = varrer a pasta inteira)"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        paths = set()
+        offset = 0
+        while offset + self._EVENT.size <= len(data):
+            _, mask, _, length = self._EVENT.unpack_from(data, offset)
+            offset += self._EVENT.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if mask & self.IN_Q_OVERFLOW:
+                return None
+            if name:
+                paths.add(os.path.join(self.folder, os.fsdecode(name)))
+        return paths
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Varredura periódica (sem inotify ou em compartilhamentos de rede)"""
+
+    def wait(self, timeout: float) -> Optional[Set[str]]:
+        time.sleep(timeout)
+        return None
+
+    def close(self):
+        pass
+
+
+def create_watcher(folder: str, poll: bool = False):
+    """inotify quando disponível; caso contrário varredura periódica"""
+    if not poll and sys.platform.startswith('linux'):
+        try:
+            watcher = InotifyWatcher(folder)
+            print("👀 Monitorando com inotify")
+            return watcher
+        except (OSError, AttributeError) as e:
+            print(f"⚠️  inotify indisponível ({e}), usando varredura periódica")
+    print("👀 Monitorando com varredura periódica")
+    return PollingWatcher()
+
+
+class ExportTracker:
+    """
+    Acompanha os exports da pasta até ficarem estáveis e decide o que executar
+
+    Um arquivo fica pendente enquanto muda; depois de `settle` segundos com a
+    mesma assinatura (tamanho, mtime) ele é considerado completo. Os pares
+    prontos são comparados com as assinaturas já processadas.
+    """
+
+    def __init__(self, folder: str, settle: float, processed: Dict[str, Dict[str, Signature]]):
+        self.folder = folder
+        self.settle = settle
+        self.processed = processed
+        self.pending: Dict[str, Tuple[Signature, float]] = {}
+        self.stable: Dict[str, Signature] = {}
+
+    def observe(self, paths):
+        """Registra arquivos novos ou alterados"""
+        now = time.monotonic()
+        for path in paths:
+            path = os.path.abspath(path)
+            if not _is_export(path):
+                continue
+            signature = _signature(path)
+            if signature is None:
+                self.pending.pop(path, None)
+                self.stable.pop(path, None)
+            elif self.stable.get(path) != signature and self.pending.get(path, (None,))[0] != signature:
+                self.pending[path] = (signature, now)
+
+    def _settled(self) -> List[str]:
+        now = time.monotonic()
+        settled = []
+        for path, (signature, since) in list(self.pending.items()):
+            if now - since < self.settle:
+                continue
+            current = _signature(path)
+            if current is None:
+                del self.pending[path]
+            elif current != signature or current[0] == 0:
+                # Ainda sendo gravado (ou vazio): recomeça a espera
+                self.pending[path] = (current, now)
+            else:
+                settled.append(path)
+        return settled
+
+    def ready(self) -> List[Tuple[str, Optional[str], Dict[str, Signature]]]:
+        """Pares (principal, sem parceiro, assinaturas) completos e ainda não processados"""
+        settled = self._settled()
+        waiting_keys = {pairing_key(path) for path in self.pending if path not in settled}
+
+        runs = []
+        for key in sorted({pairing_key(path) for path in settled}):
+            if key in waiting_keys:
+                # Outro arquivo do par ainda está sendo gravado
+                continue
+
+            files = [path for path in collect_export_files([self.folder])
+                     if _is_export(path) and pairing_key(path) == key]
+            for path in settled:
+                if pairing_key(path) == key:
+                    self.stable[path] = self.pending.pop(path)[0]
+
+            if all(NO_PARTNER_PATTERN.search(os.path.basename(path)) for path in files):
+                print(f"⏳ Aguardando export principal para: {', '.join(os.path.basename(path) for path in files)}")
+                continue
+
+            for main_file, no_partner_file in pair_exports(files):
+                inputs = {os.path.basename(path): _signature(path)
+                          for path in (main_file, no_partner_file) if path}
+                if self.processed.get(main_file) != inputs:
+                    runs.append((main_file, no_partner_file, inputs))
+        return runs
+
+
+def load_latest_index() -> Dict[str, Dict]:
+    """Execuções publicadas (results/latest/index.json)"""
+    if not os.path.exists(LATEST_INDEX):
+        return {}
+    try:
+        with open(LATEST_INDEX, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def processed_inputs(index: Dict[str, Dict]) -> Dict[str, Dict[str, Signature]]:
+    """Assinaturas dos exports já publicados (evita reprocessar ao reiniciar o watcher)"""
+    return {entry['export_path']: {name: tuple(signature) for name, signature in entry.get('inputs', {}).items()}
+            for entry in index.values() if entry.get('export_path')}
+
+
+def publish_latest(run: Dict, namespace: str, main_file: str, inputs: Dict[str, Signature]) -> str:
+    """
+    Aponta results/latest/<export> para a execução e atualiza o index.json
+
+    O link é trocado atomicamente (os.replace), então quem abre
+    results/latest/<export>/dashboard.html nunca vê uma execução pela metade.
+    """
+    os.makedirs(LATEST_DIR, exist_ok=True)
+    link = os.path.join(LATEST_DIR, namespace)
+    temp_link = f"{link}.{os.getpid()}.tmp"
+    try:
+        if os.path.lexists(temp_link):
+            os.unlink(temp_link)
+        os.symlink(os.path.relpath(run['results_dir'], LATEST_DIR), temp_link, target_is_directory=True)
+        os.replace(temp_link, link)
+    except (OSError, NotImplementedError) as e:
+        print(f"   ⚠️  Link results/latest/{namespace} não atualizado ({e}); veja results/latest/index.json")
+
+    index = load_latest_index()
+    index[namespace] = {
+        'export': run['export'],
+        'export_path': main_file,
+        'no_partner_file': run['no_partner_file'],
+        'results_dir': run['results_dir'],
+        'published_at': datetime.now().isoformat(timespec='seconds'),
+        'wall_time_s': run['wall_time_s'],
+        'inputs': inputs,
+    }
+    temp_index = f"{LATEST_INDEX}.{os.getpid()}.tmp"
+    with open(temp_index, 'w', encoding='utf-8') as f:
+        json.dump(index, f, indent=2, ensure_ascii=False)
+    os.replace(temp_index, LATEST_INDEX)
+
+    return link
+
+
+def run_export_warm(main_file: str, no_partner_file: Optional[str], results_dir: str) -> Dict:
+    """Executa o pipeline do export em um fork do worker pré-aquecido (subprocess sem fork)"""
+    if not fork_available():
+        return run_export(main_file, no_partner_file, results_dir)
+
+    argv = [PIPELINE_SCRIPT, main_file]
+    if no_partner_file:
+        argv.append(no_partner_file)
+
+    env = export_env(main_file, results_dir)
+
+    def target():
+        # Cada módulo roda em um fork deste processo, que já tem os imports
+        run_pipeline_analysis.set_stage_runner(run_script)
+        run_pipeline_analysis.main()
+
+    start = time.perf_counter()
+    result = run_in_fork(target, argv, cwd=ROOT_DIR, env=env)
+    return collect_export_run(main_file, no_partner_file, results_dir, result, time.perf_counter() - start)
+
+
+def process_export(main_file: str, no_partner_file: Optional[str], inputs: Dict[str, Signature]) -> Dict:
+    """Roda o pipeline para o par e publica em results/latest se todos os módulos tiverem sucesso"""
+    now = datetime.now()
+    namespace = export_namespace(main_file, set())
+    results_dir = os.path.join(ROOT_DIR, 'results', now.strftime('%Y-%m-%d'), 'watch',
+                               f"{namespace}_{now.strftime('%Hh%Mm%Ss')}")
+    os.makedirs(results_dir, exist_ok=True)
+
+    print(f"🚀 [{now.strftime('%H:%M:%S')}] {os.path.basename(main_file)}"
+          + (f" + {os.path.basename(no_partner_file)}" if no_partner_file else ""))
+    run = run_export_warm(main_file, no_partner_file, results_dir)
+
+    if run['success']:
+        link = publish_latest(run, namespace, main_file, inputs)
+        print(f"   ✅ {run['stages_ok']} módulos em {run['wall_time_s']:.1f}s → {os.path.relpath(link, ROOT_DIR)}")
+    else:
+        print(f"   ❌ {run['stages_ok']} módulos com sucesso em {run['wall_time_s']:.1f}s - "
+              f"log: {os.path.join(results_dir, 'pipeline_log.txt')}")
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Executa o pipeline automaticamente para exports novos ou atualizados em uma pasta')
+    parser.add_argument('folder', help='Pasta monitorada')
+    parser.add_argument('--poll', action='store_true',
+                        help='Varredura periódica em vez de inotify (necessário em compartilhamentos de rede)')
+    parser.add_argument('--settle', type=float, default=DEFAULT_SETTLE_S,
+                        help=f'Segundos sem alteração para considerar o arquivo completo (padrão: {DEFAULT_SETTLE_S:g})')
+    parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL_S,
+                        help=f'Intervalo entre verificações em segundos (padrão: {DEFAULT_INTERVAL_S:g})')
+    parser.add_argument('--once', action='store_true',
+                        help='Processa os exports atuais e encerra')
+    args = parser.parse_args()
+
+    folder = os.path.abspath(args.folder)
+    if not os.path.isdir(folder):
+        print(f"❌ ERRO: Pasta '{args.folder}' não encontrada")
+        sys.exit(1)
+
+    print("="*80)
+    print("👀 AWS PARTNER PIPELINE ANALYSIS - WATCH FOLDER")
+    print("="*80)
+    print(f"📁 Pasta: {folder}")
+    print(f"⏱️  Arquivo completo após {args.settle:g}s sem alterações")
+    print(f"📌 Última execução de cada export: {os.path.relpath(LATEST_DIR, ROOT_DIR)}/<export>")
+    print()
+
+    warm_up()
+    watcher = create_watcher(folder, args.poll)
+    tracker = ExportTracker(folder, args.settle, processed_inputs(load_latest_index()))
+    tracker.observe(collect_export_files([folder]))
+
+    stopping = []
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopping.append(signum))
+
+    try:
+        while not stopping:
+            for main_file, no_partner_file, inputs in tracker.ready():
+                process_export(main_file, no_partner_file, inputs)
+                # Falhas também ficam registradas até o arquivo mudar de novo
+                tracker.processed[main_file] = inputs
+                if stopping:
+                    break
+
+            if args.once and not tracker.pending:
+                break
+
+            changed = watcher.wait(args.interval)
+            tracker.observe(collect_export_files([folder]) if changed is None else changed)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+
+    print()
+    print("👋 Watch folder encerrado")
+
+
+if __name__ == "__main__":
+    main()
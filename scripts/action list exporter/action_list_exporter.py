@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Action List Exporter - Exporta as oportunidades sinalizadas como planilha
+Junta as listas gravadas pelos checkers (action_items/*.csv) em
+action_list.csv e action_list.xlsx, uma linha por oportunidade e regra, para atualização em massa no Salesforce.
+
+A execução atual também é gravada no histórico (results/history.sqlite3,
+scripts/utils/run_history.py).
+
+Uso: python3 action_list_exporter.py [diretório_de_resultados ...]
+Sem argumentos usa o diretório de resultados da execução atual. Com vários
+diretórios (modo batch) grava a lista consolidada no diretório de resultados,
+sem gravar de novo no histórico (cada export já gravou a sua execução).
+"""
+
+import os
+import sqlite3
+import sys
+
+# Importa função utilitária para diretório de resultados
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'utils'))
+from results_dir import get_dated_results_dir
+from run_metrics import stage_metrics, record_input_rows, record_output
+from action_list import find_action_items, export_action_list
+from run_history import record_run
+
+
+def main():
+    """Função principal"""
+    print("="*60)
+    print("ACTION LIST EXPORTER")
+    print("="*60)
+    print()
+
+    output_dir = get_dated_results_dir()
+    source_dirs = sys.argv[1:] or [output_dir]
+
+    sources = []
+    for source_dir in source_dirs:
+        sources.extend(find_action_items(source_dir))
+
+    if not sources:
+        print("⚠️  Nenhuma lista de ações encontrada (action_items/), pulando exportação")
+        return
+
+    record_input_rows(len(sources))
+    print(f"📋 Listas de ações: {len(sources)} arquivos")
+
+    rows, paths = export_action_list(sources, output_dir)
+
+    record_output('action_list_rows', rows)
+    print(f"✅ {rows} ações exportadas")
+    for path in paths.values():
+        print(f"   📄 {path} ({os.path.getsize(path):,} bytes)")
+
+    if not sys.argv[1:]:
+        try:
+            history = record_run(output_dir, sources)
+        except sqlite3.Error as e:
+            # Histórico nunca deve derrubar o módulo
+            print(f"⚠️  Não foi possível gravar o histórico: {e}")
+        else:
+            if history is not None:
+                record_output('history_findings', history['findings'])
+                print(f"🗄️  Histórico atualizado: execução {history['run_id']} ({history['findings']} sinalizações)")
+
+
+if __name__ == "__main__":
+    with stage_metrics('Action List Exporter'):
+        main()
@@ -2,17 +2,47 @@
 """
 Dashboard Generator - Cria dashboard unificado com todos os relatórios HTML
 Integra Delivery Model, Pipeline Hygiene e Slack Interface em uma única página
+
+Cada relatório abre como aba do próprio dashboard: os dados estruturados
+gravados pelos geradores (data/<relatorio>.js) são carregados na primeira
+abertura e renderizados por um único script. Relatórios sem módulo de dados
+(execuções anteriores) abrem a página completa em iframe.
+
+A aba de tendências (data/history_trends.js) lê os rollups do histórico de
+execuções (scripts/utils/run_history.py): sinalizações por regra, AM e
+parceiro ao longo do tempo e tempo até a resolução. O banco é compartilhado
+entre sessões, mas o arquivo vai para o ZIP da execução: só entram o export
+da própria execução e, nas listas e séries por AM, os AMs que ela sinalizou.
 """
 
 import os
+import re
+import sqlite3
 import sys
+from contextlib import closing
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 # Importa função utilitária para diretório de resultados
 import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'utils'))
 from results_dir import get_dated_results_dir
+from text_decoding import open_mapped_text
+from report_assets import asset_tags
+from html_data import DATA_DIR_NAME, data_module_path, write_data_module
+from precompressed import GZIP_SUFFIX, precompress_file
+from run_metrics import stage_metrics, record_output
+from run_history import (get_history_path, connect as connect_history, recorded_run, trend_dates, trend_series,
+                         top_values, aging_summary, open_findings, resolved_findings, AGED_DAYS)
+
+# Módulo de dados da aba de tendências
+TREND_DATA_NAME = 'history_trends'
+
+# Linhas das listas de sinalizações abertas/resolvidas na aba
+TREND_LIST_LIMIT = 200
+
+# Séries por dimensão (regras são poucas: todas entram)
+TREND_LIMITS = {'rule': 100, 'owner': 15, 'partner': 15}
 
 class DashboardGenerator:
     def __init__(self):
@@ -49,32 +79,29 @@ class DashboardGenerator:
             return slack_stats
         
         try:
-            with open(slack_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Conta mensagens
-            slack_stats['total_messages'] = len([line for line in content.split('\n') if line.startswith('MENSAGEM ')])
-            
-            # Extrai estatísticas usando regex
-            import re
-            
-            # Total de ações
-            actions_matches = re.findall(r'Total de ações: (\d+)', content)
-            slack_stats['total_actions'] = sum(int(match) for match in actions_matches)
-            
-            # Partners envolvidos
-            partners_matches = re.findall(r'Partners envolvidos: (\d+)', content)
-            slack_stats['total_partners'] = sum(int(match) for match in partners_matches)
-            
-            # Regras específicas
-            slack_stats['co_sell_missing'] = len(re.findall(r'CO-SELL MISSING \((\d+)\)', content))
-            slack_stats['stage_ahead'] = len(re.findall(r'PARTNER STAGE À FRENTE \((\d+)\)', content))
-            slack_stats['partner_finalized'] = len(re.findall(r'PARTNER FINALIZOU \((\d+)\)', content))
-            slack_stats['eligible_share'] = len(re.findall(r'COMPARTILHAR COM PARTNER \((\d+)\)', content))
-            slack_stats['close_date_soon'] = len(re.findall(r'CLOSE DATE NOS PRÓXIMOS 30 DIAS \((\d+)\)', content))
-            slack_stats['no_partner_opportunities'] = len(re.findall(r'OPORTUNIDADES SEM PARCEIRO.*?\((\d+)\)', content))
-            slack_stats['zero_amount_opportunities'] = len(re.findall(r'OPORTUNIDADES COM VALOR ZERO.*?\((\d+)\)', content))
-            slack_stats['shared_not_accepted'] = len(re.findall(r'OPORTUNIDADES REJEITADAS PARA RE-COMPARTILHAMENTO.*?\((\d+)\)', content))
+            # Regex de bytes sobre o arquivo mapeado (sem carregar o dump inteiro em memória)
+            with open_mapped_text(slack_file, "arquivo de mensagens Slack") as text:
+                def find_numbers(pattern: str) -> List[int]:
+                    return [int(match) for match in text.compile(pattern).findall(text.buffer)]
+                
+                # Conta mensagens
+                slack_stats['total_messages'] = sum(1 for _ in text.compile(r'^MENSAGEM ', re.MULTILINE).finditer(text.buffer))
+                
+                # Total de ações
+                slack_stats['total_actions'] = sum(find_numbers(r'Total de ações: (\d+)'))
+                
+                # Partners envolvidos
+                slack_stats['total_partners'] = sum(find_numbers(r'Partners envolvidos: (\d+)'))
+                
+                # Regras específicas
+                slack_stats['co_sell_missing'] = len(find_numbers(r'CO-SELL MISSING \((\d+)\)'))
+                slack_stats['stage_ahead'] = len(find_numbers(r'PARTNER STAGE À FRENTE \((\d+)\)'))
+                slack_stats['partner_finalized'] = len(find_numbers(r'PARTNER FINALIZOU \((\d+)\)'))
+                slack_stats['eligible_share'] = len(find_numbers(r'COMPARTILHAR COM PARTNER \((\d+)\)'))
+                slack_stats['close_date_soon'] = len(find_numbers(r'CLOSE DATE NOS PRÓXIMOS 30 DIAS \((\d+)\)'))
+                slack_stats['no_partner_opportunities'] = len(find_numbers(r'OPORTUNIDADES SEM PARCEIRO.*?\((\d+)\)'))
+                slack_stats['zero_amount_opportunities'] = len(find_numbers(r'OPORTUNIDADES COM VALOR ZERO.*?\((\d+)\)'))
+                slack_stats['shared_not_accepted'] = len(find_numbers(r'OPORTUNIDADES REJEITADAS PARA RE-COMPARTILHAMENTO.*?\((\d+)\)'))
             
         except Exception as e:
             print(f"Erro ao extrair estatísticas do Slack: {e}")
@@ -88,21 +115,25 @@ class DashboardGenerator:
         files_info = {
             'delivery_model': {
                 'path': 'delivery_model_report.html',
+                'data': 'delivery_model_report',
                 'title': 'Delivery Model Report',
                 'description': 'Oportunidades que precisam ajustar Delivery Model'
             },
             'pipeline_hygiene': {
                 'path': 'pipeline_hygiene_emails.html',
+                'data': 'pipeline_hygiene_emails',
                 'title': 'Pipeline Hygiene Emails to Partners',
                 'description': 'Interface para envio de emails de correção'
             },
             'slack_interface': {
                 'path': 'slack_interface.html',
+                'data': 'slack_interface',
                 'title': 'Pipeline Hygiene Emails to Account Managers',
                 'description': 'Mensagens consolidadas por Account Manager'
             },
             'followup_emails': {
                 'path': 'followup_emails.html',
+                'data': 'followup_emails',
                 'title': 'Follow-up Emails',
                 'description': 'Emails de follow-up organizados por AWS Account Manager'
             }
@@ -114,10 +145,15 @@ class DashboardGenerator:
                 size = os.path.getsize(file_path)
                 modified = datetime.fromtimestamp(os.path.getmtime(file_path))
                 
+                # Módulo de dados para a aba (ausente em execuções anteriores)
+                has_data = os.path.exists(data_module_path(self.results_dir, info['data']))
+                
                 stats[key] = {
                     'title': info['title'],
                     'description': info['description'],
                     'path': info['path'],
+                    'data': info['data'],
+                    'data_path': f"{DATA_DIR_NAME}/{info['data']}.js" if has_data else '',
                     'size': size,
                     'modified': modified,
                     'exists': True
@@ -132,252 +168,77 @@ class DashboardGenerator:
         
         return stats
     
-    def generate_dashboard_html(self) -> str:
-        """Gera HTML do dashboard unificado"""
+    def get_trend_data(self) -> Optional[Dict]:
+        """Tendências e aging do export da execução a partir dos rollups do histórico (None se não gravada)"""
+        history_path = get_history_path()
+        if history_path is None or not os.path.exists(history_path):
+            return None
+        
+        try:
+            with closing(connect_history(history_path)) as conn:
+                run = recorded_run(conn, self.results_dir)
+                if run is None:
+                    return None
+                scope, owners = run['scope'], run['owners']
+                
+                dates = trend_dates(conn, scope=scope)
+                if not dates:
+                    return None
+                
+                dimensions = {}
+                for dimension, limit in TREND_LIMITS.items():
+                    values = top_values(conn, dimension, limit, scope, owners if dimension == 'owner' else None)
+                    series = trend_series(conn, dimension, values, scope=scope)['series']
+                    dimensions[dimension] = [dict(row, findings=series[row['value']]['findings'])
+                                             for row in aging_summary(conn, dimension, values, scope=scope)]
+                
+                return {
+                    'dates': dates,
+                    'aged_days': AGED_DAYS,
+                    'total': trend_series(conn, 'total', scope=scope)['series'][''],
+                    'dimensions': dimensions,
+                    'open': open_findings(conn, TREND_LIST_LIMIT, scope, owners),
+                    'resolved': resolved_findings(conn, TREND_LIST_LIMIT, scope, owners)
+                }
+        except sqlite3.Error as e:
+            print(f"⚠️  Não foi possível ler o histórico: {e}")
+            return None
+    
+    def save_trend_data(self) -> bool:
+        """
+        Grava data/history_trends.js para a aba de tendências
+        
+        Sem tendências desta execução, remove o módulo de uma execução anterior
+        (results/AAAA-MM-DD é compartilhado pelas execuções do dia na linha de comando).
+        """
+        data = self.get_trend_data()
+        if data is None:
+            module_path = data_module_path(self.results_dir, TREND_DATA_NAME)
+            for path in (module_path, module_path + GZIP_SUFFIX):
+                if os.path.exists(path):
+                    os.remove(path)
+            return False
+        write_data_module(self.results_dir, TREND_DATA_NAME, data)
+        return True
+    
+    def generate_dashboard_html(self, has_trends: bool = False) -> str:
+        """Gera HTML do dashboard unificado (has_trends: aba de tendências do histórico)"""
         
         stats = self.get_file_stats()
         available_reports = [k for k, v in stats.items() if v['exists']]
         slack_stats = self.get_slack_stats()
         
+        # CSS/JS compartilhados em <resultados>/assets
+        stylesheets = asset_tags(self.results_dir, 'dashboard.css')
+        scripts = asset_tags(self.results_dir, 'reports.js', 'dashboard.js')
+        
         html_content = f"""<!DOCTYPE html>
 <html lang="pt-BR">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>AWS Partner Pipeline Analysis - Dashboard</title>
-    <style>
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-        
-        body {{
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            min-height: 100vh;
-            padding: 20px;
-        }}
-        
-        .container {{
-            max-width: 1400px;
-            margin: 0 auto;
-            background: white;
-            border-radius: 20px;
-            box-shadow: 0 25px 50px rgba(0,0,0,0.2);
-            overflow: hidden;
-        }}
-        
-        .header {{
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 40px;
-            text-align: center;
-        }}
-        
-        .header h1 {{
-            font-size: 3em;
-            margin-bottom: 10px;
-            font-weight: 300;
-        }}
-        
-        .header p {{
-            font-size: 1.2em;
-            opacity: 0.9;
-        }}
-        
-        .stats-bar {{
-            background: #f8f9fa;
-            padding: 20px 40px;
-            border-bottom: 1px solid #e9ecef;
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 20px;
-        }}
-        
-        .stat-item {{
-            text-align: center;
-            padding: 15px;
-            background: white;
-            border-radius: 10px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }}
-        
-        .stat-number {{
-            font-size: 2em;
-            font-weight: bold;
-            color: #667eea;
-        }}
-        
-        .stat-label {{
-            color: #6c757d;
-            font-size: 0.9em;
-            margin-top: 5px;
-        }}
-        
-        .content {{
-            padding: 40px;
-        }}
-        
-        .navigation {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
-            gap: 30px;
-            margin-bottom: 40px;
-        }}
-        
-        .nav-card {{
-            background: white;
-            border-radius: 15px;
-            padding: 30px;
-            box-shadow: 0 10px 30px rgba(0,0,0,0.1);
-            transition: transform 0.3s, box-shadow 0.3s;
-            border-left: 5px solid #667eea;
-            cursor: pointer;
-        }}
-        
-        .nav-card:hover {{
-            transform: translateY(-5px);
-            box-shadow: 0 20px 40px rgba(0,0,0,0.15);
-        }}
-        
-        .nav-card.unavailable {{
-            opacity: 0.5;
-            cursor: not-allowed;
-            border-left-color: #dc3545;
-        }}
-        
-        .nav-card.unavailable:hover {{
-            transform: none;
-            box-shadow: 0 10px 30px rgba(0,0,0,0.1);
-        }}
-        
-        .nav-title {{
-            font-size: 1.4em;
-            font-weight: bold;
-            color: #2c3e50;
-            margin-bottom: 10px;
-        }}
-        
-        .nav-description {{
-            color: #6c757d;
-            margin-bottom: 15px;
-            line-height: 1.5;
-        }}
-        
-        .nav-meta {{
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            font-size: 0.9em;
-            color: #6c757d;
-        }}
-        
-        .nav-button {{
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 10px 20px;
-            border-radius: 25px;
-            text-decoration: none;
-            font-weight: bold;
-            transition: all 0.3s;
-        }}
-        
-        .nav-button:hover {{
-            background: linear-gradient(135deg, #764ba2 0%, #667eea 100%);
-            transform: scale(1.05);
-        }}
-        
-        .nav-button.unavailable {{
-            background: #dc3545;
-            cursor: not-allowed;
-        }}
-        
-        .iframe-container {{
-            display: none;
-            margin-top: 30px;
-            border-radius: 15px;
-            overflow: hidden;
-            box-shadow: 0 10px 30px rgba(0,0,0,0.1);
-        }}
-        
-        .iframe-container.active {{
-            display: block;
-        }}
-        
-        .iframe-header {{
-            background: #667eea;
-            color: white;
-            padding: 15px 20px;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-        }}
-        
-        .iframe-title {{
-            font-weight: bold;
-            font-size: 1.1em;
-        }}
-        
-        .close-btn {{
-            background: rgba(255,255,255,0.2);
-            border: none;
-            color: white;
-            padding: 5px 10px;
-            border-radius: 5px;
-            cursor: pointer;
-            transition: background 0.3s;
-        }}
-        
-        .close-btn:hover {{
-            background: rgba(255,255,255,0.3);
-        }}
-        
-        .iframe-content {{
-            width: 100%;
-            height: 80vh;
-            border: none;
-            background: white;
-        }}
-        
-        .footer {{
-            background: #2c3e50;
-            color: white;
-            text-align: center;
-            padding: 30px;
-            font-size: 0.9em;
-        }}
-        
-        .status-indicator {{
-            display: inline-block;
-            width: 12px;
-            height: 12px;
-            border-radius: 50%;
-            margin-right: 8px;
-        }}
-        
-        .status-available {{
-            background: #28a745;
-        }}
-        
-        .status-unavailable {{
-            background: #dc3545;
-        }}
-        
-        @media (max-width: 768px) {{
-            .header h1 {{
-                font-size: 2em;
-            }}
-            
-            .navigation {{
-                grid-template-columns: 1fr;
-            }}
-            
-            .stats-bar {{
-                grid-template-columns: repeat(2, 1fr);
-            }}
-        }}
-    </style>
+    {stylesheets}
 </head>
 <body>
     <div class="container">
@@ -427,10 +288,10 @@ class DashboardGenerator:
             size_text = f"{info['size']:,} bytes" if info['exists'] else "N/A"
             modified_text = info['modified'].strftime('%d/%m/%Y %H:%M') if info['exists'] else "N/A"
             
-            onclick = f"openReport('{key}', '{info['path']}', '{info['title']}')" if info['exists'] else ""
+            report_attribute = f'data-report="{key}"' if info['exists'] else ''
             
             html_content += f"""
-                <div class="nav-card {status_class}" {f'onclick="{onclick}"' if info['exists'] else ''}>
+                <div class="nav-card {status_class}" {report_attribute}>
                     <div class="nav-title">
                         <span class="status-indicator {status_indicator}"></span>
                         {info['title']}
@@ -443,29 +304,66 @@ class DashboardGenerator:
                             <strong>Tamanho:</strong> {size_text}<br>
                             <strong>Modificado:</strong> {modified_text}
                         </div>
-                        <a href="#" class="nav-button {button_class}" {f'onclick="{onclick}; return false;"' if info['exists'] else ''}>
+                        <a href="#" class="nav-button {button_class}">
                             {button_text}
                         </a>
                     </div>
                 </div>
 """
         
+        if has_trends:
+            html_content += """
+                <div class="nav-card" data-report="history_trends">
+                    <div class="nav-title">
+                        <span class="status-indicator status-available"></span>
+                        Tendências e Aging
+                    </div>
+                    <div class="nav-description">
+                        Sinalizações por regra, AM e parceiro ao longo das execuções e tempo até a resolução
+                    </div>
+                    <div class="nav-meta">
+                        <div>
+                            <strong>Fonte:</strong> histórico de execuções
+                        </div>
+                        <a href="#" class="nav-button">
+                            Abrir Tendências
+                        </a>
+                    </div>
+                </div>
+"""
+        
         html_content += """
             </div>
             
-            <!-- Containers para iframes -->
+            <!-- Abas dos relatórios (conteúdo renderizado na primeira abertura) -->
 """
         
-        # Gera containers para cada iframe
+        # Gera uma aba para cada relatório disponível
         for key, info in stats.items():
             if info['exists']:
                 html_content += f"""
-            <div id="iframe-{key}" class="iframe-container">
+            <div id="view-{key}" class="iframe-container report-view" data-report="{key}" data-name="{info['data']}" data-module="{info['data_path']}" data-page="{info['path']}">
                 <div class="iframe-header">
                     <div class="iframe-title">{info['title']}</div>
-                    <button class="close-btn" onclick="closeReport('{key}')">✕ Fechar</button>
+                    <div>
+                        <a class="close-btn" href="{info['path']}" target="_blank">↗ Página completa</a>
+                        <button class="close-btn" data-close="{key}">✕ Fechar</button>
+                    </div>
                 </div>
-                <iframe id="frame-{key}" class="iframe-content" src=""></iframe>
+                <div class="report-body"></div>
+            </div>
+"""
+        
+        if has_trends:
+            html_content += f"""
+            <div id="view-history_trends" class="iframe-container report-view" data-report="history_trends" data-name="{TREND_DATA_NAME}" data-module="{DATA_DIR_NAME}/{TREND_DATA_NAME}.js" data-page="">
+                <div class="iframe-header">
+                    <div class="iframe-title">Tendências e Aging</div>
+                    <div>
+                        <button class="close-btn" data-close="history_trends">✕ Fechar</button>
+                    </div>
+                </div>
+                <div class="report-body"></div>
             </div>
 """
         
@@ -478,45 +376,7 @@ class DashboardGenerator:
         </div>
     </div>
     
-    <script>
-        function openReport(reportId, filePath, title) {{
-            // Fecha todos os outros relatórios
-            const containers = document.querySelectorAll('.iframe-container');
-            containers.forEach(container => {{
-                container.classList.remove('active');
-            }});
-            
-            // Abre o relatório selecionado
-            const container = document.getElementById(`iframe-${{reportId}}`);
-            const iframe = document.getElementById(`frame-${{reportId}}`);
-            
-            if (container && iframe) {{
-                iframe.src = filePath;
-                container.classList.add('active');
-                
-                // Scroll para o iframe
-                container.scrollIntoView({{ behavior: 'smooth' }});
-            }}
-        }}
-        
-        function closeReport(reportId) {{
-            const container = document.getElementById(`iframe-${{reportId}}`);
-            const iframe = document.getElementById(`frame-${{reportId}}`);
-            
-            if (container && iframe) {{
-                container.classList.remove('active');
-                iframe.src = '';
-                
-                // Scroll de volta para o topo
-                document.querySelector('.navigation').scrollIntoView({{ behavior: 'smooth' }});
-            }}
-        }}
-        
-        // Inicialização
-        document.addEventListener('DOMContentLoaded', function() {{
-            console.log('Dashboard carregado com {len(available_reports)} relatórios disponíveis');
-        }});
-    </script>
+    {scripts}
 </body>
 </html>"""
         
@@ -524,11 +384,15 @@ class DashboardGenerator:
     
     def save_dashboard(self, filename: str = "dashboard.html") -> str:
         """Salva o dashboard HTML"""
-        html_content = self.generate_dashboard_html()
+        has_trends = self.save_trend_data()
+        if has_trends:
+            print(f"📈 Tendências do histórico: {DATA_DIR_NAME}/{TREND_DATA_NAME}.js")
+        html_content = self.generate_dashboard_html(has_trends)
         
         filepath = os.path.join(self.results_dir, filename)
         with open(filepath, 'w', encoding='utf-8') as f:
             f.write(html_content)
+        precompress_file(filepath)
         
         print(f"Dashboard salvo em: {filepath}")
         return filepath
@@ -547,6 +411,7 @@ def main():
     available_files = generator.check_html_files()
     available_count = sum(available_files.values())
     
+    record_output('html_reports', available_count)
     print(f"Arquivos HTML encontrados: {available_count}/4")
     for name, exists in available_files.items():
         status = "✅" if exists else "❌"
@@ -577,4 +442,5 @@ def main():
     print("💡 DICA: O dashboard detecta automaticamente quais relatórios estão disponíveis")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    with stage_metrics('Dashboard Generator'):
+        main()
\ No newline at end of file
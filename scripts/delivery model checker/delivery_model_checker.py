@@ -14,11 +14,55 @@ import os
 import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'utils'))
 from results_dir import get_dated_results_dir
+from report_assets import asset_tags
+from html_data import data_module_tag
+from search_index import SearchIndexBuilder
+from precompressed import precompress_file
+from action_list import build_action_rows, save_action_items
+from run_metrics import stage_metrics, record_input_rows, record_filter, record_issues
 
 class DeliveryModelChecker:
+    # Colunas exibidas no relatório (as demais ficam só no DataFrame base)
+    REPORT_COLUMNS = [
+        'APN Opportunity Identifier',
+        'Opportunity: 18 Character Oppty ID',
+        'Opportunity: Opportunity Name',
+        'Opportunity: Account Name',
+        'Opportunity: Stage',
+        'Partner Account',
+        'Delivery Model',
+        'APN Partner Sales Contact Name',
+        'APN Opportunity Owner Email',
+    ]
+    
+    # Colunas da tabela HTML: (coluna do export, cabeçalho)
+    TABLE_COLUMNS = [
+        ('APN Opportunity Identifier', 'ID Oportunidade'),
+        ('Opportunity: Opportunity Name', 'Nome da Oportunidade'),
+        ('Opportunity: Account Name', 'Cliente'),
+        ('Partner Account', 'Parceiro'),
+        ('Opportunity: Stage', 'Stage'),
+        ('Delivery Model', 'Delivery Model Atual'),
+        ('APN Partner Sales Contact Name', 'Contato'),
+        ('APN Opportunity Owner Email', 'Email'),
+    ]
+    
+    # Filtros da página: id do <select> -> coluna do export
+    FILTER_COLUMNS = {
+        'partner': 'Partner Account',
+        'stage': 'Opportunity: Stage',
+        'delivery_model': 'Delivery Model',
+    }
+    
+    # Linhas por página da tabela
+    PAGE_SIZE = 100
+    
+    SALESFORCE_URL = "https://aws-crm.lightning.force.com/lightning/r/Opportunity/"
+    
     def __init__(self, file_path: str):
         self.file_path = file_path
         self.df = None
+        self._issues = None
         self.load_data()
         
     def load_data(self):
@@ -26,6 +70,7 @@ class DeliveryModelChecker:
         try:
             # Lê o arquivo HTML/Excel
             self.df = pd.read_html(self.file_path)[0]
+            record_input_rows(len(self.df))
             print(f"✅ Dados carregados: {len(self.df)} oportunidades")
         except Exception as e:
             print(f"❌ Erro ao carregar dados: {e}")
@@ -40,6 +85,10 @@ class DeliveryModelChecker:
         """
         if self.df is None:
             return pd.DataFrame()
+        
+        # Relatório e resumo usam o mesmo resultado: filtra uma vez só
+        if self._issues is not None:
+            return self._issues
             
         # Primeiro, cria uma máscara para valores que NÃO contêm "SaaS or PaaS"
         delivery_model_mask = (
@@ -47,7 +96,7 @@ class DeliveryModelChecker:
             (~self.df['Delivery Model'].str.contains('SaaS or PaaS', case=False, na=True))  # Não contém "SaaS or PaaS"
         )
         
-        issues = self.df[
+        issues_index = self.df.index[
             (
                 (self.df['ACE Opportunity Type'] == 'Partner Sourced Opportunity') |
                 (self.df['ACE Opportunity Type'] == 'Partner Sourced For Visibility Only') |
@@ -57,17 +106,104 @@ class DeliveryModelChecker:
             (self.df['Partner Type From Account'] == 'Technology Partner') &
             delivery_model_mask &
             (~self.df['Opportunity: Stage'].isin(['Launched', 'Closed Lost']))
-        ].copy()
+        ]
         
+        # Materializa só as linhas selecionadas e as colunas do relatório
+        columns = [column for column in self.REPORT_COLUMNS if column in self.df.columns]
+        issues = self.df.loc[issues_index, columns]
+        self._issues = issues
+        
+        record_filter('delivery_model_mismatch', len(issues))
+        record_issues('delivery_model', len(issues))
         print(f"🔍 Encontradas {len(issues)} oportunidades que precisam ajustar Delivery Model")
         
         return issues
         
-    def generate_html_report(self) -> str:
+    def get_search_index(self, issues: pd.DataFrame) -> Dict:
+        """Índice de busca com um documento por linha (todas as colunas do relatório)"""
+        search_index = SearchIndexBuilder()
+        for row in issues.astype(object).where(issues.notna(), None).values.tolist():
+            search_index.add(str(value) for value in row if value is not None)
+        return search_index.build()
+    
+    def _text_column(self, issues: pd.DataFrame, column: str) -> pd.Series:
+        """Coluna como texto escapado para HTML ('N/A' quando vazia ou ausente)"""
+        if column not in issues.columns:
+            return pd.Series('N/A', index=issues.index, dtype=object)
+        values = issues[column].astype(object)
+        return (values.where(values.notna(), 'N/A').astype(str)
+                .str.replace('&', '&amp;', regex=False)
+                .str.replace('<', '&lt;', regex=False)
+                .str.replace('>', '&gt;', regex=False)
+                .str.replace('"', '&quot;', regex=False))
+    
+    def render_table_rows(self, issues: pd.DataFrame) -> List[str]:
         """
-        Gera relatório HTML simples das oportunidades que precisam correção
+        HTML de cada linha da tabela, montado coluna a coluna
+        
+        Formatação e links são operações de string sobre as colunas inteiras
+        (em vez de iterrows + concatenação linha a linha).
+        """
+        cells = {column: self._text_column(issues, column) for column, _ in self.TABLE_COLUMNS}
+        
+        # Nome com link para o Salesforce quando há ID de 18 caracteres
+        name = cells['Opportunity: Opportunity Name']
+        if 'Opportunity: 18 Character Oppty ID' in issues.columns:
+            has_id = issues['Opportunity: 18 Character Oppty ID'].notna()
+            link = ('<a href="' + self.SALESFORCE_URL + self._text_column(issues, 'Opportunity: 18 Character Oppty ID')
+                    + '/view" target="_blank">' + name + '</a>')
+            cells['Opportunity: Opportunity Name'] = link.where(has_id, name)
+        
+        rows = ('<tr><td class="opp-id">' + cells['APN Opportunity Identifier']
+                + '</td><td>' + cells['Opportunity: Opportunity Name']
+                + '</td><td>' + cells['Opportunity: Account Name']
+                + '</td><td>' + cells['Partner Account']
+                + '</td><td>' + cells['Opportunity: Stage']
+                + '</td><td><span class="delivery-model">' + cells['Delivery Model']
+                + '</span></td><td>' + cells['APN Partner Sales Contact Name']
+                + '</td><td>' + cells['APN Opportunity Owner Email']
+                + '</td><td><span class="action">Alterar para "SaaS or PaaS"</span></td></tr>')
+        return rows.tolist()
+    
+    def get_table_data(self, issues: pd.DataFrame) -> Dict:
+        """
+        Dados da tabela paginada: linhas já renderizadas, filtros e ordenações
+        
+        Filtros são códigos de categoria por linha (rótulos em 'labels');
+        cada ordenação é a lista de linhas em ordem crescente da coluna.
+        """
+        filters = {}
+        for key, column in self.FILTER_COLUMNS.items():
+            values = issues[column] if column in issues.columns else pd.Series(index=issues.index, dtype=object)
+            categorical = pd.Categorical(values.astype(object).where(values.notna(), 'N/A').astype(str))
+            filters[key] = {'labels': list(categorical.categories), 'codes': categorical.codes.tolist()}
+        
+        sort = []
+        for column, _ in self.TABLE_COLUMNS:
+            if column in issues.columns:
+                keys = issues[column].astype(object).where(issues[column].notna(), '').astype(str).str.casefold()
+                sort.append(keys.reset_index(drop=True).argsort(kind='stable').tolist())
+            else:
+                sort.append(list(range(len(issues))))
+        
+        return {
+            'rows': self.render_table_rows(issues),
+            'filters': filters,
+            'sort': sort,
+            'search': self.get_search_index(issues),
+            'page_size': self.PAGE_SIZE
+        }
+    
+    def generate_html_report(self, results_dir: str = None) -> str:
+        """
+        Gera relatório HTML das oportunidades que precisam correção
+        (tabela paginada no navegador, com ordenação, busca e filtros)
         """
         issues = self.find_delivery_model_issues()
+        results_dir = results_dir or get_dated_results_dir()
+        
+        # Mesmo arquivo para a página e a aba do dashboard
+        data_tag = data_module_tag(results_dir, 'delivery_model_report', self.get_table_data(issues))
         
         if issues.empty:
             return """
@@ -86,76 +222,19 @@ class DeliveryModelChecker:
 </html>
 """
             
+        # CSS/JS compartilhados em <resultados>/assets
+        stylesheets = asset_tags(results_dir, 'delivery_model_report.css')
+        scripts = asset_tags(results_dir, 'reports.js', 'delivery_model_report.js')
+        
+        header_cells = ''.join(f'<th data-sort="{position}">{label}</th>' for position, (_, label) in enumerate(self.TABLE_COLUMNS))
+        
         html_content = f"""
 <!DOCTYPE html>
 <html>
 <head>
     <title>Relatório - Delivery Model para Correção</title>
     <meta charset="utf-8">
-    <style>
-        body {{
-            font-family: Arial, sans-serif;
-            margin: 40px;
-            line-height: 1.6;
-        }}
-        h1 {{
-            color: #333;
-            border-bottom: 2px solid #ddd;
-            padding-bottom: 10px;
-        }}
-        .summary {{
-            background-color: #f0f0f0;
-            padding: 15px;
-            margin: 20px 0;
-            border-left: 4px solid #007cba;
-        }}
-        table {{
-            width: 100%;
-            border-collapse: collapse;
-            margin: 20px 0;
-        }}
-        th, td {{
-            border: 1px solid #ddd;
-            padding: 12px;
-            text-align: left;
-        }}
-        th {{
-            background-color: #f5f5f5;
-            font-weight: bold;
-        }}
-        .opp-id {{
-            font-weight: bold;
-            color: #007cba;
-        }}
-        .delivery-model {{
-            background-color: #fff3cd;
-            padding: 4px 8px;
-            border-radius: 3px;
-            font-weight: bold;
-        }}
-        .action {{
-            background-color: #d4edda;
-            padding: 4px 8px;
-            border-radius: 3px;
-            font-weight: bold;
-            color: #155724;
-        }}
-        .footer {{
-            margin-top: 30px;
-            padding-top: 20px;
-            border-top: 1px solid #ddd;
-            color: #666;
-            font-size: 12px;
-            text-align: center;
-        }}
-        a {{
-            color: #007cba;
-            text-decoration: none;
-        }}
-        a:hover {{
-            text-decoration: underline;
-        }}
-    </style>
+    {stylesheets}
 </head>
 <body>
     <h1>Relatório - Delivery Model para Correção</h1>
@@ -165,59 +244,35 @@ class DeliveryModelChecker:
         <strong>Critério:</strong> Technology Partner + Delivery Model ≠ "SaaS or PaaS" + Stage ativo
     </div>
     
+    <div class="controls">
+        <input type="text" id="filter-search" placeholder="🔍 Buscar por ID, oportunidade, cliente, parceiro ou contato...">
+        <select id="filter-partner"><option value="">Todos os parceiros</option></select>
+        <select id="filter-stage"><option value="">Todos os stages</option></select>
+        <select id="filter-delivery_model"><option value="">Todos os Delivery Models</option></select>
+    </div>
+    
     <table>
         <thead>
             <tr>
-                <th>ID Oportunidade</th>
-                <th>Nome da Oportunidade</th>
-                <th>Cliente</th>
-                <th>Parceiro</th>
-                <th>Stage</th>
-                <th>Delivery Model Atual</th>
-                <th>Contato</th>
-                <th>Email</th>
+                {header_cells}
                 <th>Ação</th>
             </tr>
         </thead>
-        <tbody>
-"""
-        
-        for _, opp in issues.iterrows():
-            contact_name = opp.get('APN Partner Sales Contact Name', 'N/A')
-            if pd.isna(contact_name):
-                contact_name = 'N/A'
-            
-            # Cria o link para o Salesforce
-            opp_id_18char = opp.get('Opportunity: 18 Character Oppty ID', 'N/A')
-            opp_name = opp.get('Opportunity: Opportunity Name', 'N/A')
-            
-            if opp_id_18char != 'N/A' and pd.notna(opp_id_18char):
-                salesforce_url = f"https://aws-crm.lightning.force.com/lightning/r/Opportunity/{opp_id_18char}/view"
-                opp_name_link = f'<a href="{salesforce_url}" target="_blank">{opp_name}</a>'
-            else:
-                opp_name_link = opp_name
-                
-            html_content += f"""
-            <tr>
-                <td class="opp-id">{opp.get('APN Opportunity Identifier', 'N/A')}</td>
-                <td>{opp_name_link}</td>
-                <td>{opp.get('Opportunity: Account Name', 'N/A')}</td>
-                <td>{opp.get('Partner Account', 'N/A')}</td>
-                <td>{opp.get('Opportunity: Stage', 'N/A')}</td>
-                <td><span class="delivery-model">{opp.get('Delivery Model', 'N/A')}</span></td>
-                <td>{contact_name}</td>
-                <td>{opp.get('APN Opportunity Owner Email', 'N/A')}</td>
-                <td><span class="action">Alterar para "SaaS or PaaS"</span></td>
-            </tr>
-"""
-        
-        html_content += f"""
-        </tbody>
+        <tbody id="report-rows"></tbody>
     </table>
     
+    <div class="pager">
+        <button id="page-prev">← Anterior</button>
+        <span id="page-info"></span>
+        <button id="page-next">Próxima →</button>
+    </div>
+    
     <div class="footer">
         Relatório gerado automaticamente em {datetime.now().strftime('%d/%m/%Y às %H:%M')}
     </div>
+    
+    {scripts}
+    {data_tag}
 </body>
 </html>
 """
@@ -231,12 +286,22 @@ class DeliveryModelChecker:
         if filename is None:
             filename = os.path.join(get_dated_results_dir(), "delivery_model_report.html")
         
-        html_report = self.generate_html_report()
+        html_report = self.generate_html_report(os.path.dirname(filename) or '.')
         
         with open(filename, 'w', encoding='utf-8') as f:
             f.write(html_report)
+        precompress_file(filename)
                 
         print(f"✅ Relatório HTML salvo em {filename}")
+    
+    def save_action_items_to_file(self):
+        """Grava as oportunidades sinalizadas na lista de ações (action_items/)"""
+        issues = self.find_delivery_model_issues()
+        frames = [] if issues.empty else [
+            build_action_rows(self.df, issues.index, 'Delivery Model Checker', 'delivery_model')
+        ]
+        rows = save_action_items(get_dated_results_dir(), 'delivery_model_checker', frames)
+        print(f"✅ Lista de ações: {rows} linhas")
 
 if __name__ == "__main__":
     import sys
@@ -247,16 +312,18 @@ if __name__ == "__main__":
     else:
         data_file = "report1755695670497.xls"
     
-    # Executa o checker
-    checker = DeliveryModelChecker(data_file)
-    checker.save_html_report_to_file()
+    with stage_metrics('Delivery Model Checker'):
+        # Executa o checker
+        checker = DeliveryModelChecker(data_file)
+        checker.save_html_report_to_file()
+        checker.save_action_items_to_file()
     
-    # Mostra preview do relatório
-    issues = checker.find_delivery_model_issues()
-    if not issues.empty:
-        print(f"\n📋 RESUMO:")
-        print(f"Total de oportunidades para correção: {len(issues)}")
-        date_str = datetime.now().strftime('%Y-%m-%d')
-        print(f"Relatório HTML salvo em: results/{date_str}/delivery_model_report.html")
-    else:
-        print("✅ Nenhuma ação necessária - todas as oportunidades estão corretas!")
\ No newline at end of file
+        # Mostra preview do relatório
+        issues = checker.find_delivery_model_issues()
+        if not issues.empty:
+            print(f"\n📋 RESUMO:")
+            print(f"Total de oportunidades para correção: {len(issues)}")
+            date_str = datetime.now().strftime('%Y-%m-%d')
+            print(f"Relatório HTML salvo em: results/{date_str}/delivery_model_report.html")
+        else:
+            print("✅ Nenhuma ação necessária - todas as oportunidades estão corretas!")
\ No newline at end of file
@@ -5,8 +5,10 @@ Analisa oportunidades ativas e cria emails consolidados solicitando atualizaçõ
 """
 
 import pandas as pd
+import numpy as np
 import sys
 import os
+from io import StringIO
 from datetime import datetime, timedelta
 from collections import defaultdict
 from typing import Dict, List, Tuple
@@ -17,12 +19,38 @@ script_dir = os.path.dirname(os.path.abspath(__file__))
 utils_dir = os.path.join(os.path.dirname(script_dir), 'utils')
 sys.path.append(utils_dir)
 from results_dir import get_dated_results_dir
+from precompressed import precompress_file
+from run_metrics import stage_metrics, record_input_rows, record_filter, record_output
+from text_decoding import read_text_file
+from amounts import normalize_amounts, AMOUNT_VALUE_COLUMN, AMOUNT_VALID_COLUMN
+from sharding import get_shard_workers, build_shard_map, shard_positions, run_sharded, get_shared_state
 
 class FollowUpGenerator:
+    # Colunas lidas no agrupamento/geração dos emails (o restante do export
+    # fica apenas no DataFrame base, que nunca é copiado)
+    EMAIL_COLUMNS = [
+        'Opportunity: 18 Character Oppty ID',
+        'Opportunity: Opportunity Name',
+        'Opportunity: Account Name',
+        'Opportunity: Stage',
+        'Opportunity: Close Date',
+        'Opportunity Owner Name',
+        'Partner Account',
+        'APN Opportunity ID',
+        'APN Opportunity Owner Email',
+        'APN Partner Reported Stage',
+        'APN Partner Last Modified Date',
+        'Total Opportunity Amount',
+        'Next Step',
+        AMOUNT_VALUE_COLUMN,
+        AMOUNT_VALID_COLUMN,
+    ]
+    
     def __init__(self, excel_file: str):
         self.excel_file = excel_file
         self.df = None
         self.today = datetime.now().date()
+        self.summary_stats = None
         self.load_data()
         
     def load_data(self):
@@ -35,15 +63,11 @@ class FollowUpGenerator:
                 try:
                     self.df = pd.read_excel(self.excel_file, engine='xlrd')
                 except:
-                    try:
-                        # Se for um arquivo HTML disfarçado de Excel
-                        with open(self.excel_file, 'r', encoding='utf-8') as f:
-                            self.df = pd.read_html(f)[0]
-                    except:
-                        # Última tentativa com encoding diferente
-                        with open(self.excel_file, 'r', encoding='iso-8859-1') as f:
-                            self.df = pd.read_html(f)[0]
+                    # Se for um arquivo HTML disfarçado de Excel (uma leitura, encoding detectado em memória)
+                    self.df = pd.read_html(StringIO(read_text_file(self.excel_file, "export")))[0]
             
+            self.df = normalize_amounts(self.df)
+            record_input_rows(len(self.df))
             print(f"Dados carregados: {len(self.df)} oportunidades")
             print(f"Colunas disponíveis: {len(self.df.columns)}")
             
@@ -54,14 +78,19 @@ class FollowUpGenerator:
     def filter_active_opportunities(self) -> pd.DataFrame:
         """Filtra oportunidades ativas para follow-up"""
         # Filtra oportunidades que não estão finalizadas
-        active_df = self.df[
+        active_index = self.df.index[
             (~self.df['Opportunity: Stage'].isin(['Launched', 'Closed Lost'])) &
             (~self.df['APN Partner Reported Stage'].isin(['Launched', 'Closed Lost'])) &
             (self.df['APN Opportunity Owner Email'].notna()) &
             (self.df['APN Opportunity Owner Email'] != '') &
             (self.df['APN Opportunity Owner Email'] != 'nan')
-        ].copy()
+        ]
         
+        # Materializa só as linhas ativas e as colunas usadas nos emails
+        columns = [column for column in self.EMAIL_COLUMNS if column in self.df.columns]
+        active_df = self.df.loc[active_index, columns]
+        
+        record_filter('active_opportunities', len(active_df))
         print(f"Oportunidades ativas para follow-up: {len(active_df)} de {len(self.df)} total")
         return active_df
     
@@ -89,6 +118,33 @@ class FollowUpGenerator:
         except (ValueError, TypeError):
             return None
     
+    def parse_close_dates(self, values: pd.Series) -> pd.Series:
+        """Versão vetorizada de parse_close_date (NaT quando vazio ou inválido)"""
+        if pd.api.types.is_datetime64_any_dtype(values):
+            return values.dt.normalize()
+        
+        is_text = values.map(lambda value: isinstance(value, str)).astype(bool)
+        is_date = values.map(lambda value: hasattr(value, 'date') and not isinstance(value, str)).astype(bool)
+        
+        # Formato americano mm/dd/yyyy e, se falhar, yyyy-mm-dd
+        dates = pd.to_datetime(values.where(is_text).astype(object), format='%m/%d/%Y', errors='coerce')
+        retry = is_text & dates.isna()
+        if retry.any():
+            dates = dates.fillna(pd.to_datetime(values.where(retry).astype(object), format='%Y-%m-%d', errors='coerce'))
+        
+        # Objetos date/datetime já convertidos pelo leitor
+        if is_date.any():
+            dates = dates.where(~is_date, pd.to_datetime(values.where(is_date).astype(object), errors='coerce'))
+        
+        return dates.dt.normalize()
+    
+    def _first_seen_rank(self, df: pd.DataFrame, columns: List[str]) -> np.ndarray:
+        """Número de cada grupo na ordem de primeira aparição (0 se as colunas não existirem)"""
+        present = [column for column in columns if column in df.columns]
+        if not present:
+            return np.zeros(len(df), dtype=int)
+        return df.groupby(present, sort=False, dropna=False, observed=True).ngroup().to_numpy()
+    
     def calculate_days_remaining(self, close_date):
         """Calcula dias restantes até o close date"""
         if close_date is None:
@@ -143,14 +199,33 @@ class FollowUpGenerator:
         """Agrupa oportunidades por parceiro (empresa) e por owner dentro do parceiro"""
         partners = defaultdict(lambda: {'emails': set(), 'partner_name': '', 'owners': defaultdict(lambda: {'email': '', 'opportunities': []})})
         
-        for _, row in active_df.iterrows():
+        # Campos brutos de ordenação calculados de uma vez (vetorizado)
+        close_dates = self.parse_close_dates(active_df['Opportunity: Close Date'])
+        days_remaining_values = (close_dates - pd.Timestamp(self.today)).dt.days.to_numpy(dtype=float)
+        amount_keys = -active_df[AMOUNT_VALUE_COLUMN].where(active_df[AMOUNT_VALID_COLUMN], 0).to_numpy(dtype=float)
+        partner_ranks = self._first_seen_rank(active_df, ['Partner Account'])
+        owner_ranks = self._first_seen_rank(active_df, ['Partner Account', 'Opportunity Owner Name'])
+        
+        # Parceiros e owners na ordem em que aparecem; dentro do owner, Close Date
+        # mais próximo primeiro e maior valor primeiro (sort estável)
+        order = pd.DataFrame({
+            'partner': partner_ranks,
+            'owner': owner_ranks,
+            'days_remaining': np.nan_to_num(days_remaining_values, nan=np.inf),
+            'amount': amount_keys,
+        }).sort_values(['partner', 'owner', 'days_remaining', 'amount'], kind='stable').index.to_numpy()
+        
+        # O email do owner é o da última linha dele no export
+        is_last_of_owner = ~pd.Series(owner_ranks).duplicated(keep='last').to_numpy()
+        
+        for position, (_, row) in zip(order, active_df.iloc[order].iterrows()):
             partner_email = row['APN Opportunity Owner Email']
             partner_name = row.get('Partner Account', 'Parceiro')
             owner_name = row.get('Opportunity Owner Name', 'Responsável não informado')
             
-            # Parse da data de fechamento
-            close_date = self.parse_close_date(row.get('Opportunity: Close Date'))
-            days_remaining = self.calculate_days_remaining(close_date)
+            # Data de fechamento já convertida
+            close_date = close_dates.iat[position].date() if pd.notna(close_dates.iat[position]) else None
+            days_remaining = int(days_remaining_values[position]) if close_date is not None else float('inf')
             
             # Dados da oportunidade
             opportunity_data = {
@@ -165,6 +240,7 @@ class FollowUpGenerator:
                 'sales_stage': row.get('APN Partner Reported Stage', 'N/A'),
                 'aws_stage': row.get('Opportunity: Stage', 'N/A'),
                 'total_amount': self.format_currency(row.get('Total Opportunity Amount')),
+                'amount_value': row[AMOUNT_VALUE_COLUMN] if row[AMOUNT_VALID_COLUMN] else None,
                 'last_modified': self.format_date(row.get('APN Partner Last Modified Date')),
                 'next_steps': str(row.get('Next Step', 'Não informado')) if pd.notna(row.get('Next Step')) else 'Não informado',
                 'partner_name': partner_name,
@@ -175,15 +251,11 @@ class FollowUpGenerator:
             # Agrupa por nome do parceiro (empresa) e depois por owner
             partners[partner_name]['emails'].add(partner_email)
             partners[partner_name]['partner_name'] = partner_name
-            partners[partner_name]['owners'][owner_name]['email'] = partner_email
+            if is_last_of_owner[position]:
+                partners[partner_name]['owners'][owner_name]['email'] = partner_email
             partners[partner_name]['owners'][owner_name]['opportunities'].append(opportunity_data)
         
-        # Ordena oportunidades por owner (Close Date mais próximo primeiro)
         for partner_name in partners:
-            for owner_name in partners[partner_name]['owners']:
-                partners[partner_name]['owners'][owner_name]['opportunities'].sort(
-                    key=lambda x: (x['days_remaining'], -float(x['total_amount'].replace('$', '').replace(',', '')) if x['total_amount'] != 'Não informado' else 0)
-                )
             # Converte set de emails para lista ordenada
             partners[partner_name]['emails'] = sorted(list(partners[partner_name]['emails']))
         
@@ -209,12 +281,8 @@ class FollowUpGenerator:
         for owner_data in owners_data.values():
             for opp in owner_data['opportunities']:
                 # Valor total
-                if opp['total_amount'] != 'Não informado':
-                    try:
-                        value = float(opp['total_amount'].replace('$', '').replace(',', ''))
-                        total_value += value
-                    except:
-                        pass
+                if opp['amount_value'] is not None:
+                    total_value += opp['amount_value']
                 
                 # Contadores de urgência
                 if opp['days_remaining'] <= 7:
@@ -300,27 +368,24 @@ Portal: Partner Central - https://partnercentral.awspartner.com
         
         return email_body
     
-    def generate_all_followup_emails(self) -> Dict[str, str]:
-        """Gera todos os emails de follow-up por parceiro"""
-        print("Analisando oportunidades para follow-up...")
+    def collect_summary_stats(self, partners_data: Dict[str, Dict]) -> Dict[str, int]:
+        """Estatísticas do resumo (total, urgentes, alto valor) a partir do agrupamento"""
+        stats = {'opportunities': 0, 'urgent': 0, 'high_value': 0}
         
-        # Filtra oportunidades ativas
-        active_df = self.filter_active_opportunities()
-        
-        if active_df.empty:
-            print("Nenhuma oportunidade ativa encontrada para follow-up")
-            return {}
-        
-        # Agrupa por parceiro (empresa)
-        partners_data = self.group_opportunities_by_partner(active_df)
-        
-        if not partners_data:
-            print("Nenhum parceiro com oportunidades válidas encontrado")
-            return {}
-        
-        print(f"Gerando emails para {len(partners_data)} parceiros...")
+        for partner_data in partners_data.values():
+            for owner_data in partner_data['owners'].values():
+                opportunities = owner_data['opportunities']
+                stats['opportunities'] += len(opportunities)
+                for opp in opportunities:
+                    if opp['days_remaining'] <= 7:
+                        stats['urgent'] += 1
+                    if opp['amount_value'] is not None and opp['amount_value'] >= 50000:
+                        stats['high_value'] += 1
         
-        # Gera emails
+        return stats
+    
+    def build_partner_emails(self, partners_data: Dict[str, Dict]) -> Tuple[Dict[str, Dict], int, Dict[str, int]]:
+        """Gera os emails dos parceiros agrupados, conta as oportunidades incluídas e coleta as estatísticas do resumo"""
         emails = {}
         total_opportunities = 0
         
@@ -337,6 +402,68 @@ Portal: Partner Central - https://partnercentral.awspartner.com
                 for owner_data in partner_data['owners'].values():
                     total_opportunities += len(owner_data['opportunities'])
         
+        return emails, total_opportunities, self.collect_summary_stats(partners_data)
+    
+    def build_partner_emails_sharded(self, active_df: pd.DataFrame, workers: int) -> Tuple[Dict[str, Dict], int, Dict[str, int]]:
+        """
+        Agrupa e gera os emails em paralelo, um shard de parceiros por processo
+        
+        Os emails são mesclados na ordem da execução sequencial (primeira
+        aparição do parceiro no export).
+        """
+        print(f"Execução particionada por parceiro: {workers} processos")
+        
+        active_df = active_df.reset_index(drop=True)
+        partners = active_df['Partner Account']
+        row_shards = shard_positions(partners, build_shard_map(partners, workers), workers)
+        results = run_sharded(_build_partner_shard, (self, active_df), [rows for rows in row_shards if len(rows)], workers)
+        
+        partner_order = {name: position for position, name in enumerate(partners.unique())}
+        merged = {}
+        total_opportunities = 0
+        stats = {'opportunities': 0, 'urgent': 0, 'high_value': 0}
+        for shard_emails, shard_total, shard_stats in results:
+            merged.update(shard_emails)
+            total_opportunities += shard_total
+            for key, value in shard_stats.items():
+                stats[key] += value
+        
+        emails = {
+            name: merged[name]
+            for name in sorted(merged, key=lambda name: partner_order.get(name, len(partner_order)))
+        }
+        return emails, total_opportunities, stats
+    
+    def generate_all_followup_emails(self) -> Dict[str, str]:
+        """Gera todos os emails de follow-up por parceiro"""
+        print("Analisando oportunidades para follow-up...")
+        
+        # Filtra oportunidades ativas
+        active_df = self.filter_active_opportunities()
+        
+        if active_df.empty:
+            print("Nenhuma oportunidade ativa encontrada para follow-up")
+            return {}
+        
+        # Exports grandes: agrupamento e emails particionados por parceiro
+        workers = get_shard_workers(len(active_df))
+        if workers:
+            emails, total_opportunities, self.summary_stats = self.build_partner_emails_sharded(active_df, workers)
+        else:
+            # Agrupa por parceiro (empresa)
+            partners_data = self.group_opportunities_by_partner(active_df)
+            
+            if not partners_data:
+                print("Nenhum parceiro com oportunidades válidas encontrado")
+                return {}
+            
+            print(f"Gerando emails para {len(partners_data)} parceiros...")
+            
+            # Gera emails
+            emails, total_opportunities, self.summary_stats = self.build_partner_emails(partners_data)
+        
+        record_filter('opportunities_in_emails', total_opportunities)
+        record_output('followup_emails', len(emails))
         print(f"Emails gerados: {len(emails)}")
         print(f"Total de oportunidades: {total_opportunities}")
         
@@ -368,6 +495,7 @@ Portal: Partner Central - https://partnercentral.awspartner.com
                 f.write(f"Assunto: AWS <> {partner_name} - Follow-up Pipeline - {current_date}\n\n")
                 f.write(email_data['content'])
                 f.write("\n" + "="*60 + "\n\n")
+        precompress_file(output_file)
         
         print(f"Emails salvos em: {output_file}")
     
@@ -378,30 +506,16 @@ Portal: Partner Central - https://partnercentral.awspartner.com
         
         summary_file = os.path.join(get_dated_results_dir(), "followup_summary.txt")
         
-        # Coleta estatísticas
+        # Coleta estatísticas (reaproveita o agrupamento feito ao gerar os emails)
         total_partners = len(emails)
-        total_opportunities = 0
-        urgent_opportunities = 0
-        high_value_opportunities = 0
-        
-        # Reprocessa dados para estatísticas
-        active_df = self.filter_active_opportunities()
-        partners_data = self.group_opportunities_by_partner(active_df)
+        stats = self.summary_stats
+        if stats is None:
+            active_df = self.filter_active_opportunities()
+            stats = self.collect_summary_stats(self.group_opportunities_by_partner(active_df))
         
-        for partner_data in partners_data.values():
-            for owner_data in partner_data['owners'].values():
-                opportunities = owner_data['opportunities']
-                total_opportunities += len(opportunities)
-                for opp in opportunities:
-                    if opp['days_remaining'] <= 7:
-                        urgent_opportunities += 1
-                    if opp['total_amount'] != 'Não informado':
-                        try:
-                            value = float(opp['total_amount'].replace('$', '').replace(',', ''))
-                            if value >= 50000:
-                                high_value_opportunities += 1
-                        except:
-                            pass
+        total_opportunities = stats['opportunities']
+        urgent_opportunities = stats['urgent']
+        high_value_opportunities = stats['high_value']
         
         summary_content = f"""RELATÓRIO RESUMO - FOLLOW-UP PIPELINE
 Gerado em: {datetime.now().strftime('%d/%m/%Y às %H:%M')}
@@ -458,6 +572,12 @@ ARQUIVOS GERADOS:
         except Exception as e:
             print(f"❌ Erro ao executar gerador HTML: {e}")
 
+def _build_partner_shard(rows):
+    """Worker da execução particionada: agrupa e gera os emails dos parceiros de um shard"""
+    generator, active_df = get_shared_state()
+    partners_data = generator.group_opportunities_by_partner(active_df.iloc[rows])
+    return generator.build_partner_emails(partners_data)
+
 def main():
     """Função principal"""
     print("="*60)
@@ -510,4 +630,5 @@ def main():
         print("❌ Nenhum email foi gerado")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    with stage_metrics('Follow-up Generator'):
+        main()
\ No newline at end of file
@@ -15,6 +15,12 @@ from typing import Dict, List
 import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'utils'))
 from results_dir import get_dated_results_dir
+from text_decoding import open_mapped_text
+from html_data import data_module_tag
+from search_index import SearchIndexBuilder, extract_opportunity_ids
+from report_assets import asset_tags
+from precompressed import precompress_file
+from run_metrics import stage_metrics, record_input_rows, record_output
 
 class HTMLEmailGenerator:
     def __init__(self):
@@ -25,108 +31,67 @@ class HTMLEmailGenerator:
         """Extrai emails individuais do arquivo gerado"""
         emails = []
         
-        # Tenta diferentes encodings para ler o arquivo
-        content = None
-        encodings_to_try = ['utf-8', 'iso-8859-1', 'cp1252', 'latin1']
-        
-        for encoding in encodings_to_try:
-            try:
-                with open(file_path, 'r', encoding=encoding) as f:
-                    content = f.read()
-                print(f"Arquivo lido com sucesso usando encoding: {encoding}")
-                break
-            except UnicodeDecodeError:
-                continue
-        
-        if content is None:
-            # Última tentativa: lê como binário e tenta decodificar
-            try:
-                with open(file_path, 'rb') as f:
-                    raw_content = f.read()
-                content = raw_content.decode('utf-8', errors='ignore')
-                print("Arquivo lido com encoding UTF-8 ignorando erros")
-            except Exception as e:
-                raise Exception(f"Não foi possível ler o arquivo {file_path}: {e}")
-        
-        # Primeiro, normaliza o conteúdo para garantir que todos os emails tenham quebra de linha antes
-        content = re.sub(r'^EMAIL', r'\nEMAIL', content)  # Adiciona quebra no início se necessário
-        content = re.sub(r'([^\n])EMAIL', r'\1\nEMAIL', content)  # Garante quebra antes de EMAIL
-        
-        # Divide por "EMAIL X:" mas mantém o delimitador
-        email_sections = re.split(r'(\nEMAIL \d+:\n)', content)
-        
-        # Reconstrói as seções completas
-        complete_sections = []
-        for i in range(1, len(email_sections), 2):  # Pega delimitador + conteúdo
-            if i + 1 < len(email_sections):
-                complete_sections.append(email_sections[i] + email_sections[i + 1])
-        
-        # Se não encontrou seções com o padrão acima, tenta outros padrões
-        if not complete_sections:
-            # Tenta padrão sem quebra de linha antes
-            email_sections = re.split(r'(EMAIL \d+:\n)', content)
-            for i in range(1, len(email_sections), 2):
-                if i + 1 < len(email_sections):
-                    complete_sections.append(email_sections[i] + email_sections[i + 1])
-        
-        # Se ainda não encontrou, tenta padrão mais simples
-        if not complete_sections:
-            email_sections = re.split(r'(EMAIL \d+:)', content)
-            for i in range(1, len(email_sections), 2):
-                if i + 1 < len(email_sections):
-                    complete_sections.append(email_sections[i] + email_sections[i + 1])
-        
-
-        
-        for i, section in enumerate(complete_sections, 1):
-            if not section.strip():
-                continue
+        # Arquivo mapeado em memória; cada seção "EMAIL X:" (delimitador
+        # incluído) é decodificada apenas quando processada
+        with open_mapped_text(file_path, "arquivo de emails") as text:
+            # "EMAIL X:" é delimitador mesmo sem quebra de linha antes
+            delimiter = text.compile(r'EMAIL \d+:\n')
+            
+            # Se não encontrou seções com o padrão acima, tenta padrão mais simples
+            if not delimiter.search(text.buffer):
+                delimiter = text.compile(r'EMAIL \d+:')
+            
+            for i, section in enumerate(text.iter_sections(delimiter), 1):
+                # Garante quebra antes de EMAIL no meio do texto
+                section = re.sub(r'([^\n])EMAIL', r'\1\nEMAIL', section)
+                if not section.strip():
+                    continue
                 
-            # Extrai informações do email
-            lines = section.split('\n')
+                # Extrai informações do email
+                lines = section.split('\n')
             
-            email_data = {
-                'id': i,
-                'to_email': '',
-                'subject': '',
-                'contact_name': '',
-                'body': '',
-                'opportunities_count': 0
-            }
+                email_data = {
+                    'id': i,
+                    'to_email': '',
+                    'subject': '',
+                    'contact_name': '',
+                    'body': '',
+                    'opportunities_count': 0
+                }
             
-            # Processa linha por linha
-            body_lines = []
-            capturing_body = False
+                # Processa linha por linha
+                body_lines = []
+                capturing_body = False
             
-            for line in lines:
-                if line.startswith('Para: '):
-                    email_data['to_email'] = line.replace('Para: ', '').strip()
-                elif line.startswith('Assunto: '):
-                    email_data['subject'] = line.replace('Assunto: ', '').strip()
-                elif line.startswith('Olá '):
-                    # Extrai nome do contato
-                    contact_match = re.search(r'Olá (.+?),', line)
-                    if contact_match:
-                        email_data['contact_name'] = contact_match.group(1)
-                    capturing_body = True
-                    body_lines.append(line)
-                elif capturing_body:
-                    # Captura tudo até encontrar o próximo EMAIL ou final do arquivo
-                    if line.startswith('EMAIL ') and line.endswith(':'):
-                        break
-                    elif line.startswith('---') and 'Email gerado automaticamente' in line:
-                        break
-                    else:
+                for line in lines:
+                    if line.startswith('Para: '):
+                        email_data['to_email'] = line.replace('Para: ', '').strip()
+                    elif line.startswith('Assunto: '):
+                        email_data['subject'] = line.replace('Assunto: ', '').strip()
+                    elif line.startswith('Olá '):
+                        # Extrai nome do contato
+                        contact_match = re.search(r'Olá (.+?),', line)
+                        if contact_match:
+                            email_data['contact_name'] = contact_match.group(1)
+                        capturing_body = True
                         body_lines.append(line)
+                    elif capturing_body:
+                        # Captura tudo até encontrar o próximo EMAIL ou final do arquivo
+                        if line.startswith('EMAIL ') and line.endswith(':'):
+                            break
+                        elif line.startswith('---') and 'Email gerado automaticamente' in line:
+                            break
+                        else:
+                            body_lines.append(line)
             
-            email_data['body'] = '\n'.join(body_lines).strip()
+                email_data['body'] = '\n'.join(body_lines).strip()
             
-            # Conta oportunidades (novo formato)
-            email_data['opportunities_count'] = email_data['body'].count('Oportunidade ')
+                # Conta oportunidades (novo formato)
+                email_data['opportunities_count'] = email_data['body'].count('Oportunidade ')
             
-            # Valida se tem email válido
-            if email_data['to_email'] and '@' in email_data['to_email'] and email_data['to_email'] != 'nan':
-                emails.append(email_data)
+                # Valida se tem email válido
+                if email_data['to_email'] and '@' in email_data['to_email'] and email_data['to_email'] != 'nan':
+                    emails.append(email_data)
         
         return emails
     
@@ -134,87 +99,60 @@ class HTMLEmailGenerator:
         """Extracts individual emails from English file"""
         emails = []
         
-        # Tenta diferentes encodings para ler o arquivo
-        content = None
-        encodings_to_try = ['utf-8', 'iso-8859-1', 'cp1252', 'latin1']
-        
-        for encoding in encodings_to_try:
-            try:
-                with open(file_path, 'r', encoding=encoding) as f:
-                    content = f.read()
-                print(f"Arquivo inglês lido com sucesso usando encoding: {encoding}")
-                break
-            except UnicodeDecodeError:
-                continue
-        
-        if content is None:
-            # Última tentativa: lê como binário e tenta decodificar
-            try:
-                with open(file_path, 'rb') as f:
-                    raw_content = f.read()
-                content = raw_content.decode('utf-8', errors='ignore')
-                print("Arquivo inglês lido com encoding UTF-8 ignorando erros")
-            except Exception as e:
-                raise Exception(f"Não foi possível ler o arquivo inglês {file_path}: {e}")
-        
-        # Split by "EMAIL X:" but keep delimiter
-        email_sections = re.split(r'(\n\nEMAIL \d+:\n)', content)
-        
-        # Rebuild complete sections
-        complete_sections = []
-        for i in range(1, len(email_sections), 2):  # Get delimiter + content
-            if i + 1 < len(email_sections):
-                complete_sections.append(email_sections[i] + email_sections[i + 1])
-        
-        for i, section in enumerate(complete_sections, 1):
-            if not section.strip():
-                continue
+        # Memory-mapped file; each "EMAIL X:" section (delimiter included)
+        # is decoded only when processed
+        with open_mapped_text(file_path, "arquivo de emails em inglês") as text:
+            delimiter = text.compile(r'\n\nEMAIL \d+:\n')
+            
+            for i, section in enumerate(text.iter_sections(delimiter), 1):
+                if not section.strip():
+                    continue
                 
-            # Extract email information
-            lines = section.split('\n')
+                # Extract email information
+                lines = section.split('\n')
             
-            email_data = {
-                'id': i,
-                'to_email': '',
-                'subject': '',
-                'contact_name': '',
-                'body': '',
-                'opportunities_count': 0
-            }
+                email_data = {
+                    'id': i,
+                    'to_email': '',
+                    'subject': '',
+                    'contact_name': '',
+                    'body': '',
+                    'opportunities_count': 0
+                }
             
-            # Process line by line
-            body_lines = []
-            capturing_body = False
+                # Process line by line
+                body_lines = []
+                capturing_body = False
             
-            for line in lines:
-                if line.startswith('To: '):
-                    email_data['to_email'] = line.replace('To: ', '').strip()
-                elif line.startswith('Subject: '):
-                    email_data['subject'] = line.replace('Subject: ', '').strip()
-                elif line.startswith('Hello '):
-                    # Extract contact name
-                    contact_match = re.search(r'Hello (.+?),', line)
-                    if contact_match:
-                        email_data['contact_name'] = contact_match.group(1)
-                    capturing_body = True
-                    body_lines.append(line)
-                elif capturing_body:
-                    # Capture everything until next EMAIL or end of file
-                    if line.startswith('EMAIL ') and line.endswith(':'):
-                        break
-                    elif line.startswith('---') and 'Report automatically generated' in line:
-                        break
-                    else:
+                for line in lines:
+                    if line.startswith('To: '):
+                        email_data['to_email'] = line.replace('To: ', '').strip()
+                    elif line.startswith('Subject: '):
+                        email_data['subject'] = line.replace('Subject: ', '').strip()
+                    elif line.startswith('Hello '):
+                        # Extract contact name
+                        contact_match = re.search(r'Hello (.+?),', line)
+                        if contact_match:
+                            email_data['contact_name'] = contact_match.group(1)
+                        capturing_body = True
                         body_lines.append(line)
+                    elif capturing_body:
+                        # Capture everything until next EMAIL or end of file
+                        if line.startswith('EMAIL ') and line.endswith(':'):
+                            break
+                        elif line.startswith('---') and 'Report automatically generated' in line:
+                            break
+                        else:
+                            body_lines.append(line)
             
-            email_data['body'] = '\n'.join(body_lines).strip()
+                email_data['body'] = '\n'.join(body_lines).strip()
             
-            # Count opportunities (new format)
-            email_data['opportunities_count'] = email_data['body'].count('Opportunity ')
+                # Count opportunities (new format)
+                email_data['opportunities_count'] = email_data['body'].count('Opportunity ')
             
-            # Validate if has valid email
-            if email_data['to_email'] and '@' in email_data['to_email'] and email_data['to_email'] != 'nan':
-                emails.append(email_data)
+                # Validate if has valid email
+                if email_data['to_email'] and '@' in email_data['to_email'] and email_data['to_email'] != 'nan':
+                    emails.append(email_data)
         
         return emails
     
@@ -313,6 +251,7 @@ Content-Transfer-Encoding: 8bit
         # Salva arquivo .eml
         with open(eml_path, 'w', encoding='utf-8') as f:
             f.write(eml_content)
+        precompress_file(eml_path)
         
         # Retorna caminho relativo para uso no HTML (inclui subpasta)
         return os.path.join('consolidated', eml_filename)
@@ -457,6 +396,19 @@ Content-Transfer-Encoding: 8bit
         
         return opp_data
 
+    def get_search_fields(self, company: str, email_data: Dict) -> List[str]:
+        """Campos indexados para a busca: empresa, contato, email, IDs de oportunidade e tipos de regra"""
+        fields = [company, email_data['contact_name'], email_data['to_email']]
+        fields.extend(extract_opportunity_ids(email_data['body']))
+        
+        # Categorias de ação terminam com ":" (ex.: "Oportunidade parada (90 dias sem atualização):")
+        for opportunity in self.parse_individual_opportunities(email_data['body']):
+            for action in opportunity.get('actions', []):
+                if action.endswith(':'):
+                    fields.append(re.sub(r' \(.*\)', '', action[:-1]))
+        
+        return fields
+    
     def create_consolidated_email(self, company_emails: List[Dict]) -> Dict:
         """Cria um email consolidado para múltiplos destinatários da mesma empresa"""
         if not company_emails:
@@ -1039,13 +991,19 @@ Content-Transfer-Encoding: 8bit
         # Salva arquivo .eml
         with open(eml_path, 'w', encoding='utf-8') as f:
             f.write(eml_content)
+        precompress_file(eml_path)
         
         return eml_filename
 
-    def generate_html(self, emails: List[Dict], emails_english: List[Dict] = None) -> str:
+    def generate_html(self, emails: List[Dict], emails_english: List[Dict] = None, results_dir: str = None) -> str:
         """Gera HTML completo com interface de emails em português e inglês"""
         import os
         
+        # CSS/JS compartilhados em <resultados>/assets
+        results_dir = results_dir or get_dated_results_dir()
+        stylesheets = asset_tags(results_dir, 'reports.css', 'pipeline_hygiene_emails.css')
+        scripts = asset_tags(results_dir, 'reports.js', 'pipeline_hygiene_emails.js')
+        
         # Cria mapeamento de emails em português para inglês
         english_map = {}
         if emails_english:
@@ -1065,562 +1023,7 @@ Content-Transfer-Encoding: 8bit
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Pipeline Hygiene - Emails para Envio</title>
-    <style>
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-        
-        body {{
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            min-height: 100vh;
-            padding: 20px;
-        }}
-        
-        .container {{
-            max-width: 1200px;
-            margin: 0 auto;
-            background: white;
-            border-radius: 15px;
-            box-shadow: 0 20px 40px rgba(0,0,0,0.1);
-            overflow: hidden;
-        }}
-        
-        .header {{
-            background: linear-gradient(135deg, #232526 0%, #414345 100%);
-            color: white;
-            padding: 30px;
-            text-align: center;
-        }}
-        
-        .header h1 {{
-            font-size: 2.5em;
-            margin-bottom: 10px;
-            font-weight: 300;
-        }}
-        
-        .header p {{
-            font-size: 1.1em;
-            opacity: 0.9;
-        }}
-        
-        .stats {{
-            background: #f8f9fa;
-            padding: 20px 30px;
-            border-bottom: 1px solid #e9ecef;
-            display: flex;
-            justify-content: space-around;
-            flex-wrap: wrap;
-        }}
-        
-        .stat-item {{
-            text-align: center;
-            margin: 10px;
-        }}
-        
-        .stat-number {{
-            font-size: 2em;
-            font-weight: bold;
-            color: #667eea;
-        }}
-        
-        .stat-label {{
-            color: #6c757d;
-            font-size: 0.9em;
-        }}
-        
-        .content {{
-            padding: 30px;
-        }}
-        
-        .search-box {{
-            margin-bottom: 30px;
-            position: relative;
-        }}
-        
-        .search-input {{
-            width: 100%;
-            padding: 15px 20px;
-            border: 2px solid #e9ecef;
-            border-radius: 10px;
-            font-size: 1.1em;
-            transition: border-color 0.3s;
-        }}
-        
-        .search-input:focus {{
-            outline: none;
-            border-color: #667eea;
-        }}
-        
-        .company-section {{
-            margin-bottom: 40px;
-            border: 1px solid #e9ecef;
-            border-radius: 10px;
-            overflow: hidden;
-        }}
-        
-        .company-header {{
-            background: #667eea;
-            color: white;
-            padding: 15px 20px;
-            font-size: 1.2em;
-            font-weight: bold;
-            cursor: pointer;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-        }}
-        
-        .company-header:hover {{
-            background: #5a6fd8;
-        }}
-        
-        .company-count {{
-            background: rgba(255,255,255,0.2);
-            padding: 5px 10px;
-            border-radius: 15px;
-            font-size: 0.9em;
-        }}
-        
-        .emails-grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fill, minmax(400px, 1fr));
-            gap: 20px;
-            padding: 20px;
-            background: #f8f9fa;
-        }}
-        
-        .email-card {{
-            background: white;
-            border-radius: 10px;
-            padding: 20px;
-            box-shadow: 0 5px 15px rgba(0,0,0,0.08);
-            transition: transform 0.3s, box-shadow 0.3s;
-        }}
-        
-        .email-card:hover {{
-            transform: translateY(-5px);
-            box-shadow: 0 10px 25px rgba(0,0,0,0.15);
-        }}
-        
-        .email-header {{
-            margin-bottom: 15px;
-        }}
-        
-        .contact-name {{
-            font-size: 1.2em;
-            font-weight: bold;
-            color: #2c3e50;
-            margin-bottom: 5px;
-        }}
-        
-        .email-address {{
-            color: #667eea;
-            font-size: 0.95em;
-            word-break: break-all;
-        }}
-        
-        .email-info {{
-            margin-bottom: 20px;
-        }}
-        
-        .info-item {{
-            display: flex;
-            justify-content: space-between;
-            margin-bottom: 8px;
-            font-size: 0.9em;
-        }}
-        
-        .info-label {{
-            color: #6c757d;
-            font-weight: 500;
-        }}
-        
-        .info-value {{
-            color: #2c3e50;
-            font-weight: bold;
-        }}
-        
-        .button-group {{
-            display: flex;
-            flex-direction: column;
-            gap: 10px;
-        }}
-        
-        /* Estilos antigos removidos - usando apenas .btn */
-        
-        /* Novos estilos para o redesign - VERSÃO MELHORADA */
-        .email-actions-container {{
-            display: flex !important;
-            flex-direction: column !important;
-            gap: 20px !important;
-            padding: 24px !important;
-            background: linear-gradient(135deg, #ffffff 0%, #f8f9fa 100%) !important;
-            border-radius: 16px !important;
-            border: 2px solid #e9ecef !important;
-            box-shadow: 0 8px 24px rgba(0,0,0,0.08) !important;
-            margin: 16px 0 !important;
-        }}
-        
-        /* Seletores específicos para botões dentro dos cards */
-        .email-card .btn {{
-            padding: 14px 24px !important;
-            border-radius: 12px !important;
-            font-size: 15px !important;
-            font-weight: 700 !important;
-            cursor: pointer !important;
-            transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1) !important;
-            text-decoration: none !important;
-            display: inline-flex !important;
-            align-items: center !important;
-            justify-content: center !important;
-            text-align: center !important;
-            border: none !important;
-            min-width: 140px !important;
-            box-shadow: 0 4px 12px rgba(0,0,0,0.15) !important;
-            position: relative !important;
-            overflow: hidden !important;
-            margin: 0 !important;
-        }}
-        
-        .email-card .btn-copy {{
-            background: linear-gradient(135deg, #28a745 0%, #20c997 100%) !important;
-            color: white !important;
-        }}
-        
-        .email-card .btn-send {{
-            background: linear-gradient(135deg, #007bff 0%, #0056b3 100%) !important;
-            color: white !important;
-        }}
-        
-        .email-card .btn-outlook {{
-            background: linear-gradient(135deg, #fd7e14 0%, #e55a00 100%) !important;
-            color: white !important;
-        }}
-        
-        .language-group {{
-            display: flex;
-            flex-direction: column;
-            gap: 12px;
-        }}
-        
-        .language-header {{
-            background: linear-gradient(135deg, #f8f9fa 0%, #e9ecef 100%);
-            padding: 10px 16px;
-            border-radius: 10px;
-            border-left: 4px solid #007bff;
-            font-size: 14px;
-            font-weight: 800;
-            color: #495057;
-            text-transform: uppercase;
-            letter-spacing: 1px;
-            display: flex;
-            align-items: center;
-            gap: 8px;
-            box-shadow: 0 2px 8px rgba(0,0,0,0.05);
-        }}
-        
-        .buttons-row {{
-            display: flex;
-            gap: 12px;
-            flex-wrap: wrap;
-        }}
-        
-        .btn {{
-            padding: 14px 24px !important;
-            border-radius: 12px !important;
-            font-size: 15px !important;
-            font-weight: 700 !important;
-            cursor: pointer !important;
-            transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1) !important;
-            text-decoration: none !important;
-            display: inline-flex !important;
-            align-items: center !important;
-            justify-content: center !important;
-            text-align: center !important;
-            border: none !important;
-            min-width: 140px !important;
-            box-shadow: 0 4px 12px rgba(0,0,0,0.15) !important;
-            position: relative !important;
-            overflow: hidden !important;
-            margin: 0 !important;
-        }}
-        
-        .btn::before {{
-            content: '';
-            position: absolute;
-            top: 0;
-            left: -100%;
-            width: 100%;
-            height: 100%;
-            background: linear-gradient(90deg, transparent, rgba(255,255,255,0.2), transparent);
-            transition: left 0.5s;
-        }}
-        
-        .btn:hover::before {{
-            left: 100%;
-        }}
-        
-        .btn:hover {{
-            transform: translateY(-2px) !important;
-            box-shadow: 0 8px 20px rgba(0,0,0,0.2) !important;
-        }}
-        
-        .btn:active {{
-            transform: translateY(0) !important;
-            box-shadow: 0 2px 8px rgba(0,0,0,0.2) !important;
-        }}
-        
-        .btn-copy {{
-            background: linear-gradient(135deg, #28a745 0%, #20c997 100%) !important;
-            color: white !important;
-        }}
-        
-        .btn-copy:hover {{
-            background: linear-gradient(135deg, #20c997 0%, #17a2b8 100%) !important;
-            box-shadow: 0 8px 20px rgba(40,167,69,0.3) !important;
-        }}
-        
-        .btn-send {{
-            background: linear-gradient(135deg, #007bff 0%, #0056b3 100%) !important;
-            color: white !important;
-        }}
-        
-        .btn-send:hover {{
-            background: linear-gradient(135deg, #0056b3 0%, #004085 100%) !important;
-            box-shadow: 0 8px 20px rgba(0,123,255,0.3) !important;
-        }}
-        
-        .btn-outlook {{
-            background: linear-gradient(135deg, #fd7e14 0%, #e55a00 100%) !important;
-            color: white !important;
-        }}
-        
-        .btn-outlook:hover {{
-            background: linear-gradient(135deg, #e55a00 0%, #cc4900 100%) !important;
-            box-shadow: 0 8px 20px rgba(253,126,20,0.3) !important;
-            animation: pulse 0.5s;
-        }}
-        
-        @keyframes pulse {{
-            0% {{ transform: scale(1); }}
-            50% {{ transform: scale(1.05); }}
-            100% {{ transform: scale(1); }}
-        }}
-        
-        @keyframes shimmer {{
-            0% {{ background-position: -200px 0; }}
-            100% {{ background-position: calc(200px + 100%) 0; }}
-        }}
-        
-        .btn-loading {{
-            background: linear-gradient(90deg, #f0f0f0 25%, #e0e0e0 50%, #f0f0f0 75%);
-            background-size: 200px 100%;
-            animation: shimmer 1.5s infinite;
-            color: transparent !important;
-        }}
-        
-        .btn-success {{
-            background: linear-gradient(135deg, #28a745 0%, #20c997 100%) !important;
-            animation: pulse 0.6s ease-in-out;
-        }}
-        
-        .footer {{
-            background: #2c3e50;
-            color: white;
-            text-align: center;
-            padding: 20px;
-            font-size: 0.9em;
-        }}
-        
-        .hidden {{
-            display: none;
-        }}
-        
-        .consolidated-email-section {{
-            background: linear-gradient(135deg, #e8f4fd 0%, #f0f8ff 100%);
-            border-left: 4px solid #0078d4;
-            margin: 0;
-        }}
-        
-        .consolidated-email-section h3 {{
-            color: #0078d4;
-            margin: 0;
-            font-size: 1.1em;
-            display: flex;
-            align-items: center;
-            gap: 8px;
-        }}
-        
-        .consolidated-email-section .button-group {{
-            display: flex;
-            gap: 10px;
-            align-items: center;
-        }}
-        
-        .consolidated-button {{
-            background: linear-gradient(135deg, #28a745 0%, #20c997 100%);
-            color: white;
-            padding: 12px 20px;
-            border-radius: 8px;
-            text-decoration: none;
-            font-weight: bold;
-            font-size: 1em;
-            transition: all 0.3s;
-            border: none;
-            cursor: pointer;
-            display: inline-flex;
-            align-items: center;
-            gap: 8px;
-        }}
-        
-        .consolidated-button:hover {{
-            background: linear-gradient(135deg, #20c997 0%, #17a2b8 100%);
-            transform: translateY(-2px);
-            box-shadow: 0 5px 15px rgba(40,167,69,0.4);
-        }}
-        
-        .consolidated-button.copy {{
-            background: linear-gradient(135deg, #0078d4 0%, #106ebe 100%);
-        }}
-        
-        .consolidated-button.copy:hover {{
-            background: linear-gradient(135deg, #106ebe 0%, #005a9e 100%);
-            box-shadow: 0 5px 15px rgba(0,120,212,0.4);
-        }}
-        
-        /* Classes para formatação colorida dos emails - Amazon Ember 10 e azul marinho escuro */
-        .opportunity-title {{
-            color: #FF8C00;
-            font-weight: bold;
-            font-family: 'Amazon Ember', 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            font-size: 10pt;
-        }}
-        
-        .field-label {{
-            color: #003366;
-            font-weight: normal;
-            font-family: 'Amazon Ember', 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            font-size: 10pt;
-        }}
-        
-        .field-value {{
-            color: #003366;
-            font-weight: normal;
-            font-family: 'Amazon Ember', 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            font-size: 10pt;
-        }}
-        
-        .link-field {{
-            color: #003366;
-            text-decoration: underline;
-            font-family: 'Amazon Ember', 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            font-size: 10pt;
-        }}
-        
-        .link-field:hover {{
-            color: #002244;
-            text-decoration: underline;
-        }}
-        
-        .actions-header {{
-            color: #003366;
-            font-weight: bold;
-            font-family: 'Amazon Ember', 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            font-size: 10pt;
-        }}
-        
-        .action-category {{
-            color: #003366;
-            font-weight: normal;
-            font-family: 'Amazon Ember', 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            font-size: 10pt;
-        }}
-        
-        .action-detail {{
-            color: #003366;
-            font-weight: normal;
-            font-family: 'Amazon Ember', 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            font-size: 10pt;
-        }}
-        
-        .action-required {{
-            color: #003366;
-            font-weight: normal;
-            font-family: 'Amazon Ember', 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            font-size: 10pt;
-        }}
-        
-        .email-intro {{
-            color: #003366;
-            font-weight: normal;
-            font-family: 'Amazon Ember', 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            font-size: 10pt;
-        }}
-        
-        .opportunity-section-title {{
-            color: #003366;
-            font-weight: bold;
-            font-family: 'Amazon Ember', 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            font-size: 10pt;
-        }}
-        
-        @media (max-width: 768px) {{
-            .emails-grid {{
-                grid-template-columns: 1fr;
-            }}
-            
-            .stats {{
-                flex-direction: column;
-            }}
-            
-            .header h1 {{
-                font-size: 2em;
-            }}
-            
-            .consolidated-email-section {{
-                padding: 15px;
-            }}
-            
-            .consolidated-email-section > div:first-child {{
-                flex-direction: column;
-                align-items: flex-start !important;
-            }}
-            
-            /* Responsivo para novos botões */
-            .email-actions-container {{
-                padding: 20px 16px;
-                margin: 12px 0;
-            }}
-            
-            .buttons-row {{
-                flex-direction: column;
-                width: 100%;
-                gap: 10px;
-            }}
-            
-            .btn {{
-                width: 100%;
-                min-width: unset;
-                padding: 16px 20px;
-                font-size: 16px;
-                border-radius: 10px;
-                gap: 15px;
-            }}
-            
-            .consolidated-email-section .button-group {{
-                flex-direction: column;
-                width: 100%;
-            }}
-            
-            .consolidated-button {{
-                width: 100%;
-                justify-content: center;
-            }}
-        }}
-    </style>
+    {stylesheets}
 </head>
 <body>
     <div class="container">
@@ -1654,174 +1057,71 @@ Content-Transfer-Encoding: 8bit
         
         <div class="content">
             <div class="search-box">
-                <input type="text" class="search-input" placeholder="🔍 Buscar por nome, email ou empresa..." onkeyup="filterEmails()">
+                <input type="text" class="search-input" placeholder="🔍 Buscar por nome, email, empresa, ID ou regra..." onkeyup="filterEmails()">
             </div>
 """
         
-        # Gera seções por empresa
+        # Dados dos cards em uma ilha JSON; a página renderiza as empresas sob demanda
+        companies_data = []
+        search_index = SearchIndexBuilder()  # Um documento por email, na ordem dos cards
         for company, company_emails in sorted(companies.items()):
+            company_data = {
+                'name': company,
+                'consolidated': None,
+                'emails': []
+            }
+            
             # Cria email consolidado se há múltiplos emails para a empresa
             consolidated_email = None
             if len(company_emails) > 1:
                 consolidated_email = self.create_consolidated_email(company_emails)
             
-            html_content += f"""
-            <div class="company-section" data-company="{company.lower()}">
-                <div class="company-header" onclick="toggleCompany(this)">
-                    <span>{company}</span>
-                    <span class="company-count">{len(company_emails)} emails</span>
-                </div>"""
-            
-            # Adiciona botão de email consolidado se aplicável
             if consolidated_email:
-                # Cria URLs para ambas as versões
-                consolidated_mailto_url_text = self.create_mailto_url(consolidated_email)  # Versão texto
-                
                 # Cria arquivo .eml para versão HTML
                 company_safe = company.replace(' ', '_').replace('/', '_').replace('&', '_')
                 consolidated_eml_path = self.create_html_email_file(consolidated_email, f"consolidated_{company_safe}")
-                consolidated_eml_filename = consolidated_eml_path  # Usa o caminho completo incluindo subpasta
                 
-                # Usa a versão texto puro para o botão de cópia (compatibilidade)
-                consolidated_body_js = consolidated_email['body'].replace('"', '\\"').replace('\n', '\\n')
-                # Usa a versão HTML para visualização na interface
-                consolidated_body_display = consolidated_email.get('body_html', consolidated_email['body'])
-                
-                # Usa a versão HTML para o botão de cópia formatada
-                consolidated_body_html_js = consolidated_email.get('body_html', consolidated_email['body']).replace('"', '\\"').replace('\n', '\\n')
-                
-                html_content += f"""
-                <div class="consolidated-email-section" style="background: #e8f4fd; padding: 15px 20px; border-bottom: 2px solid #0078d4;">
-                    <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 10px;">
-                        <div>
-                            <h3 style="color: #0078d4; margin: 0; font-size: 1.1em;">📧 Email Consolidado</h3>
-                            <p style="margin: 5px 0 0 0; color: #666; font-size: 0.9em;">
-                                Envie um único email para todos os {len(company_emails)} destinatários desta empresa
-                            </p>
-                        </div>
-                        <div class="buttons-row" style="justify-content: flex-end; gap: 8px;">
-                            <button onclick="copyEmailData('{consolidated_email['to_email']}', '{consolidated_email['subject']}', `{consolidated_body_js}`)" 
-                                    class="btn btn-copy" style="min-width: 90px; padding: 10px 16px; font-size: 13px;">
-                                📋 Copiar
-                            </button>
-                            <a href="{consolidated_mailto_url_text}" 
-                               class="btn btn-send" style="min-width: 90px; padding: 10px 16px; font-size: 13px;">
-                                📧 Enviar
-                            </a>
-                            <button onclick="downloadAndOpenEmail('{consolidated_eml_filename}')" 
-                                    class="btn btn-outlook" style="min-width: 120px; padding: 10px 16px; font-size: 13px;">
-                                🎨 Outlook ({consolidated_email['opportunities_count']} opps)
-                            </button>
-                        </div>
-                    </div>
-                    <div style="font-size: 0.85em; color: #666; margin-bottom: 15px;">
-                        <strong>Para:</strong> {consolidated_email['to_email']}<br>
-                        <strong>Oportunidades:</strong> {consolidated_email['opportunities_count']} de {len(company_emails)} emails individuais
-                    </div>
-                    <div style="background: white; padding: 15px; border-radius: 8px; border: 1px solid #ddd; max-height: 300px; overflow-y: auto;">
-                        <h4 style="color: #0078d4; margin: 0 0 10px 0; font-size: 1em;">📋 Preview do Email:</h4>
-                        <div style="font-family: monospace; font-size: 0.85em; line-height: 1.4; white-space: pre-line;">
-{consolidated_body_display}
-                        </div>
-                    </div>
-                </div>"""
-            
-            html_content += """
-                <div class="emails-grid">
-"""
+                company_data['consolidated'] = {
+                    'to_email': consolidated_email['to_email'],
+                    'subject': consolidated_email['subject'],
+                    'body': consolidated_email['body'],  # Versão texto (cópia e mailto)
+                    'body_html': consolidated_email.get('body_html', consolidated_email['body']),  # Preview
+                    'opportunities_count': consolidated_email['opportunities_count'],
+                    'eml': consolidated_eml_path  # Usa o caminho completo incluindo subpasta
+                }
             
             for email in company_emails:
-                outlook_url = self.create_outlook_url(email)
-                mailto_url = self.create_mailto_url(email)
-                
-                # Cria versão texto sem HTML para cópia
-                import re
-                email_body_text = re.sub(r'<a href="[^"]*" target="_blank">([^<]*)</a>', r'\1', email['body'])
+                email_data = {
+                    'id': email['id'],
+                    'contact_name': email['contact_name'],
+                    'to_email': email['to_email'],
+                    'subject': email['subject'],
+                    'body': email['body'],
+                    'opportunities_count': email['opportunities_count'],
+                    'eml': self.create_individual_email_file(email, 'PT')
+                }
                 
-                # Escapa aspas para JavaScript (versão texto)
-                email_body_js = email_body_text.replace('"', '\\"').replace('\n', '\\n')
-                
-                # Versão do corpo com HTML renderizado para exibição na interface
-                email_body_display = email['body'].replace('\n', '<br>')
-                
-                html_content += f"""
-                    <div class="email-card" data-contact="{email['contact_name'].lower()}" data-email="{email['to_email'].lower()}">
-                        <div class="email-header">
-                            <div class="contact-name">{email['contact_name']}</div>
-                            <div class="email-address">{email['to_email']}</div>
-                        </div>
-                        <div class="email-info">
-                            <div class="info-item">
-                                <span class="info-label">Oportunidades:</span>
-                                <span class="info-value">{email['opportunities_count']}</span>
-                            </div>
-                            <div class="info-item">
-                                <span class="info-label">ID:</span>
-                                <span class="info-value">#{email['id']:03d}</span>
-                            </div>
-                        </div>
-                        <div class="email-actions-container">
-                            <!-- Seção Português -->
-                            <div class="language-group">
-                                <div class="language-header">🇧🇷 PORTUGUÊS</div>
-                                <div class="buttons-row">
-                                    <button onclick="copyEmailData('{email['to_email']}', '{email['subject']}', `{email_body_js}`)" class="btn btn-copy">
-                                        📋 Copiar
-                                    </button>
-                                    <a href="{mailto_url}" class="btn btn-send">
-                                        📧 Enviar
-                                    </a>"""
-                
-                # Gera arquivo .eml individual para português
-                eml_filename_pt = self.create_individual_email_file(email, 'PT')
-                html_content += f"""
-                                    <button onclick="downloadAndOpenEmail('{eml_filename_pt}')" class="btn btn-outlook">
-                                        🎨 Outlook Beta
-                                    </button>
-                                </div>
-                            </div>"""
-                
-                # Adiciona botões em inglês se disponível (DENTRO do loop)
+                # Versão em inglês se disponível
                 if email['to_email'] in english_map:
                     english_email = english_map[email['to_email']]
-                    # Remove HTML dos hyperlinks para versão texto
-                    english_body_text = re.sub(r'<a href="[^"]*" target="_blank">([^<]*)</a>', r'\1', english_email['body'])
-                    english_body_js = english_body_text.replace('`', '\\`').replace('\n', '\\n').replace('\r', '').replace("'", "\\'")
-                    english_mailto_url = self.create_mailto_url(english_email)
-                    
-                    html_content += f"""
-                            
-                            <!-- Seção English -->
-                            <div class="language-group">
-                                <div class="language-header">🇺🇸 ENGLISH</div>
-                                <div class="buttons-row">
-                                    <button onclick="copyEmailData('{english_email['to_email']}', '{english_email['subject']}', `{english_body_js}`)" class="btn btn-copy">
-                                        📋 Copy
-                                    </button>
-                                    <a href="{english_mailto_url}" class="btn btn-send">
-                                        📧 Send
-                                    </a>"""
-                    
-                    # Gera arquivo .eml individual para inglês usando o email em inglês
-                    eml_filename_en = self.create_individual_email_file(english_email, 'EN')
-                    html_content += f"""
-                                    <button onclick="downloadAndOpenEmail('{eml_filename_en}')" class="btn btn-outlook">
-                                        🎨 Outlook Beta
-                                    </button>
-                                </div>
-                            </div>"""
+                    email_data['english'] = {
+                        'to_email': english_email['to_email'],
+                        'subject': english_email['subject'],
+                        'body': english_email['body'],
+                        'eml': self.create_individual_email_file(english_email, 'EN')
+                    }
                 
-                html_content += """
-                        </div>
-                    </div>
-"""
+                company_data['emails'].append(email_data)
+                search_index.add(self.get_search_fields(company, email))
             
-            html_content += """
-                </div>
-            </div>
-"""
+            companies_data.append(company_data)
+        
+        search_data = search_index.build()
+        # Mesmo arquivo para a página e a aba do dashboard
+        data_tag = data_module_tag(results_dir, 'pipeline_hygiene_emails', {'companies': companies_data, 'search': search_data})
         
         html_content += f"""
+            <div id="companies"></div>
         </div>
         
         <div class="footer">
@@ -1829,177 +1129,8 @@ Content-Transfer-Encoding: 8bit
         </div>
     </div>
     
-    <script>
-        function toggleCompany(header) {{
-            const section = header.parentElement;
-            const grid = section.querySelector('.emails-grid');
-            
-            if (grid.style.display === 'none') {{
-                grid.style.display = 'grid';
-                header.style.background = '#667eea';
-            }} else {{
-                grid.style.display = 'none';
-                header.style.background = '#95a5a6';
-            }}
-        }}
-        
-        function filterEmails() {{
-            const searchTerm = document.querySelector('.search-input').value.toLowerCase();
-            const emailCards = document.querySelectorAll('.email-card');
-            const companySections = document.querySelectorAll('.company-section');
-            
-            emailCards.forEach(card => {{
-                const contact = card.dataset.contact;
-                const email = card.dataset.email;
-                const company = card.closest('.company-section').dataset.company;
-                
-                if (contact.includes(searchTerm) || email.includes(searchTerm) || company.includes(searchTerm)) {{
-                    card.style.display = 'block';
-                }} else {{
-                    card.style.display = 'none';
-                }}
-            }});
-            
-            // Esconde seções de empresa que não têm emails visíveis
-            companySections.forEach(section => {{
-                const visibleCards = section.querySelectorAll('.email-card[style*="block"], .email-card:not([style*="none"])');
-                if (visibleCards.length === 0 && searchTerm !== '') {{
-                    section.style.display = 'none';
-                }} else {{
-                    section.style.display = 'block';
-                }}
-            }});
-        }}
-        
-        // Função para copiar dados do email (texto puro)
-        function copyEmailData(to, subject, body) {{
-            const emailData = `Para: ${{to}}
-Assunto: ${{subject}}
-
-${{body}}`;
-            
-            // Tenta usar a API moderna de clipboard
-            if (navigator.clipboard && window.isSecureContext) {{
-                navigator.clipboard.writeText(emailData).then(() => {{
-                    showCopySuccess(event.target);
-                }}).catch(() => {{
-                    fallbackCopy(emailData, event.target);
-                }});
-            }} else {{
-                fallbackCopy(emailData, event.target);
-            }}
-        }}
-        
-
-        
-        // Função para baixar e abrir arquivo .eml no Outlook
-        function downloadAndOpenEmail(filename) {{
-            const button = event.target;
-            const originalText = button.innerHTML;
-            
-            // Feedback visual melhorado
-            button.classList.add('btn-loading');
-            button.innerHTML = '⏳ Preparando...';
-            button.disabled = true;
-            
-            // Cria link para download do arquivo .eml
-            const emlPath = `temp_emails/${{filename}}`;
-            const link = document.createElement('a');
-            link.href = emlPath;
-            link.download = filename;
-            link.style.display = 'none';
-            
-            document.body.appendChild(link);
-            link.click();
-            document.body.removeChild(link);
-            
-            // Feedback de sucesso
-            setTimeout(() => {{
-                button.classList.remove('btn-loading');
-                button.classList.add('btn-success');
-                button.innerHTML = '✅ Arquivo Criado!';
-            }}, 800);
-            
-            // Restaura botão após um tempo
-            setTimeout(() => {{
-                button.classList.remove('btn-success');
-                button.innerHTML = originalText;
-                button.disabled = false;
-            }}, 3000);
-            
-            // Mostra instruções
-            setTimeout(() => {{
-                alert('📧 Arquivo de email baixado!\\n\\n📋 Instruções:\\n1. Localize o arquivo baixado (.eml)\\n2. Clique duas vezes para abrir no Outlook\\n3. O email abrirá com formatação colorida\\n4. Revise e envie!');
-            }}, 500);
-        }}
-        
-        // Fallback para navegadores mais antigos
-        function fallbackCopy(text, button) {{
-            const textArea = document.createElement('textarea');
-            textArea.value = text;
-            textArea.style.position = 'fixed';
-            textArea.style.left = '-999999px';
-            textArea.style.top = '-999999px';
-            document.body.appendChild(textArea);
-            textArea.focus();
-            textArea.select();
-            
-            try {{
-                document.execCommand('copy');
-                showCopySuccess(button);
-            }} catch (err) {{
-                alert('Erro ao copiar. Tente manualmente.');
-            }}
-            
-            document.body.removeChild(textArea);
-        }}
-        
-        // Mostra feedback visual de cópia bem-sucedida
-        function showCopySuccess(button) {{
-            const originalText = button.innerHTML;
-            
-            // Feedback visual melhorado
-            button.classList.add('btn-success');
-            button.innerHTML = '✅ Copiado!';
-            
-            // Pequena animação de sucesso
-            button.style.transform = 'scale(1.05)';
-            
-            setTimeout(() => {{
-                button.style.transform = 'scale(1)';
-            }}, 200);
-            
-            setTimeout(() => {{
-                button.classList.remove('btn-success');
-                button.innerHTML = originalText;
-            }}, 2500);
-        }}
-        
-        // Função para destacar emails consolidados
-        function highlightConsolidatedEmails() {{
-            const consolidatedSections = document.querySelectorAll('.consolidated-email-section');
-            consolidatedSections.forEach(section => {{
-                section.style.animation = 'pulse 2s infinite';
-            }});
-        }}
-        
-        // Inicializa com todas as seções abertas
-        document.addEventListener('DOMContentLoaded', function() {{
-            console.log('Pipeline Hygiene HTML carregado com {len(emails)} emails');
-            
-            // Adiciona instruções para macOS
-            if (navigator.platform.indexOf('Mac') > -1) {{
-                const header = document.querySelector('.header p');
-                header.innerHTML += '<br><small>💡 Para macOS: Certifique-se de que o Microsoft Outlook está instalado</small>';
-            }}
-            
-            // Destaca seções com emails consolidados
-            const consolidatedCount = document.querySelectorAll('.consolidated-email-section').length;
-            if (consolidatedCount > 0) {{
-                console.log('📧 ' + consolidatedCount + ' empresas têm emails consolidados disponíveis');
-            }}
-        }});
-    </script>
+    {scripts}
+    {data_tag}
 </body>
 </html>"""
         
@@ -2012,6 +1143,7 @@ ${{body}}`;
         filepath = os.path.join(get_dated_results_dir(), filename)
         with open(filepath, 'w', encoding='utf-8') as f:
             f.write(html_content)
+        precompress_file(filepath)
         
         print(f"✅ Interface HTML salva em: {filepath}")
         return filepath
@@ -2048,6 +1180,7 @@ def main():
     print(f"📂 Processando arquivo: {emails_file}")
     emails = generator.parse_emails_file(emails_file)
     
+    record_input_rows(len(emails))
     print(f"📧 Emails em português encontrados: {len(emails)}")
     
     # Processa emails em inglês (se existir)
@@ -2057,6 +1190,7 @@ def main():
     if os.path.exists(emails_english_file):
         print(f"📂 Processando arquivo em inglês: {emails_english_file}")
         emails_english = generator.parse_emails_english_file(emails_english_file)
+        record_output('english_emails', len(emails_english))
         print(f"📧 Emails em inglês encontrados: {len(emails_english)}")
     else:
         print("ℹ️  Arquivo de emails em inglês não encontrado - apenas português será usado")
@@ -2092,4 +1226,5 @@ def main():
     print("="*60)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    with stage_metrics('HTML Email Generator'):
+        main()
\ No newline at end of file
@@ -12,11 +12,16 @@ import os
 import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'utils'))
 from results_dir import get_dated_results_dir
+from precompressed import precompress_file
+from action_list import build_action_rows, save_action_items
+from run_metrics import stage_metrics, record_input_rows, record_filter, record_issues
+from amounts import normalize_amounts, AMOUNT_VALUE_COLUMN
 
 class PipelineHygieneChecker:
     def __init__(self, file_path: str):
         self.file_path = file_path
         self.df = None
+        self._contacts = None
         self.today = datetime.now().date()
         
         # Mapeamento de estágios para comparação numérica
@@ -40,7 +45,10 @@ class PipelineHygieneChecker:
     def load_data(self):
         """Carrega os dados da planilha"""
         try:
-            self.df = pd.read_html(self.file_path)[0]
+            self.df = normalize_amounts(
+                pd.read_html(self.file_path)[0],
+                id_column='APN Opportunity Identifier'
+            )
             
             # Converte colunas de data
             if 'APN Target Launch Date' in self.df.columns:
@@ -52,6 +60,7 @@ class PipelineHygieneChecker:
                     self.df['APN Partner Last Modified Date'], errors='coerce'
                 )
             
+            record_input_rows(len(self.df))
             print(f"✅ Dados carregados: {len(self.df)} oportunidades")
         except Exception as e:
             print(f"❌ Erro ao carregar dados: {e}")
@@ -60,11 +69,16 @@ class PipelineHygieneChecker:
         """Encontra todas as issues agrupadas por contato"""
         if self.df is None:
             return {}
+        
+        # Emails, relatório, lista de ações e resumo usam o mesmo resultado: percorre o export uma vez só
+        if self._contacts is not None:
+            return self._contacts
             
         contacts = {}
+        rule_counts = {}
         
         # Para cada linha, verifica todas as regras
-        for _, row in self.df.iterrows():
+        for index, row in self.df.iterrows():
             contact_email = row.get('APN Opportunity Owner Email', 'N/A')
             contact_name = row.get('Partner Account', 'Parceiro')
             
@@ -149,7 +163,11 @@ class PipelineHygieneChecker:
             
             # Se tem alguma regra violada, adiciona à lista
             if violated_rules:
+                for rule in violated_rules:
+                    rule_counts[rule] = rule_counts.get(rule, 0) + 1
+                
                 opportunity_data = {
+                    'row_index': index,
                     'opportunity_id': row.get('APN Opportunity Identifier', 'N/A'),
                     'apn_opportunity_id': row.get('APN Opportunity ID', 'N/A'),
                     'opportunity_name': row.get('Opportunity: Opportunity Name', 'N/A'),
@@ -164,6 +182,12 @@ class PipelineHygieneChecker:
         # Remove contatos sem oportunidades
         contacts = {k: v for k, v in contacts.items() if v['opportunities']}
         
+        record_filter('opportunities_with_issues', sum(len(c['opportunities']) for c in contacts.values()))
+        record_filter('contacts_with_issues', len(contacts))
+        for rule, count in rule_counts.items():
+            record_issues(rule, count)
+        
+        self._contacts = contacts
         return contacts
         
     def format_currency(self, value):
@@ -187,14 +211,8 @@ class PipelineHygieneChecker:
             return str(date_value)
     
     def _get_total_amount(self, row):
-        """Converte Total Opportunity Amount para float, retorna 0 se inválido"""
-        amount = row.get('Total Opportunity Amount', 0)
-        if pd.isna(amount) or amount == 'N/A' or amount == '':
-            return 0
-        try:
-            return float(amount)
-        except (ValueError, TypeError):
-            return 0
+        """Total Opportunity Amount normalizado no carregamento (0 se ausente ou inválido)"""
+        return row.get(AMOUNT_VALUE_COLUMN, 0)
             
     def create_opportunity_link(self, opportunity_name: str, apn_opportunity_id: str) -> str:
         """Cria link para a oportunidade no Partner Central"""
@@ -714,6 +732,7 @@ Gerado em: {datetime.now().strftime('%d/%m/%Y às %H:%M')}
         
         with open(filepath, 'w', encoding='utf-8') as f:
             f.write(emails)
+        precompress_file(filepath)
                 
         print(f"✅ Emails salvos em {filepath}")
         
@@ -731,6 +750,7 @@ Gerado em: {datetime.now().strftime('%d/%m/%Y às %H:%M')}
         
         with open(filepath, 'w', encoding='utf-8') as f:
             f.write(emails)
+        precompress_file(filepath)
                 
         print(f"✅ English emails saved to {filepath}")
         
@@ -750,6 +770,24 @@ Gerado em: {datetime.now().strftime('%d/%m/%Y às %H:%M')}
             f.write(report)
                 
         print(f"✅ Relatório salvo em {filepath}")
+    
+    def save_action_items_to_file(self):
+        """Grava as oportunidades sinalizadas na lista de ações (uma linha por regra violada)"""
+        contacts = self.find_all_issues_by_contact()
+        
+        # Linhas de cada regra, na ordem em que aparecem no export
+        rule_rows = {}
+        for contact in contacts.values():
+            for opp in contact['opportunities']:
+                for rule in opp['violated_rules']:
+                    rule_rows.setdefault(rule, []).append(opp['row_index'])
+        
+        frames = [
+            build_action_rows(self.df, sorted(rows), 'Pipeline Hygiene Checker', rule)
+            for rule, rows in rule_rows.items()
+        ]
+        rows = save_action_items(get_dated_results_dir(), 'pipeline_hygiene_checker', frames)
+        print(f"✅ Lista de ações: {rows} linhas")
 
 if __name__ == "__main__":
     import sys
@@ -760,38 +798,42 @@ if __name__ == "__main__":
     else:
         data_file = "report1755695670497.xls"
     
-    checker = PipelineHygieneChecker(data_file)
+    with stage_metrics('Pipeline Hygiene Checker'):
+        checker = PipelineHygieneChecker(data_file)
     
-    # Gera e salva emails em português
-    checker.save_emails_to_file()
+        # Gera e salva emails em português
+        checker.save_emails_to_file()
     
-    # Gera e salva emails em inglês
-    checker.save_emails_english_to_file()
+        # Gera e salva emails em inglês
+        checker.save_emails_english_to_file()
     
-    # Gera e salva relatório
-    checker.save_report_to_file()
+        # Gera e salva relatório
+        checker.save_report_to_file()
     
-    # Gera interface HTML (se o gerador estiver disponível)
-    try:
-        import subprocess
-        import sys
-        result = subprocess.run([
-            sys.executable, "html_email_generator.py", f"results/{datetime.now().strftime('%Y-%m-%d')}/pipeline_hygiene_emails.txt"
-        ], capture_output=True, text=True, cwd=".")
-        if result.returncode == 0:
-            date_str = datetime.now().strftime('%Y-%m-%d')
-            print(f"✅ Interface HTML gerada: results/{date_str}/pipeline_hygiene_emails.html")
-    except:
-        pass  # Ignora se não conseguir gerar HTML
+        # Gera lista de ações (uma linha por oportunidade e regra)
+        checker.save_action_items_to_file()
     
-    # Estatísticas
-    contacts = checker.find_all_issues_by_contact()
-    total_opportunities = sum(len(contact['opportunities']) for contact in contacts.values())
+        # Gera interface HTML (se o gerador estiver disponível)
+        try:
+            import subprocess
+            import sys
+            result = subprocess.run([
+                sys.executable, "html_email_generator.py", f"results/{datetime.now().strftime('%Y-%m-%d')}/pipeline_hygiene_emails.txt"
+            ], capture_output=True, text=True, cwd=".")
+            if result.returncode == 0:
+                date_str = datetime.now().strftime('%Y-%m-%d')
+                print(f"✅ Interface HTML gerada: results/{date_str}/pipeline_hygiene_emails.html")
+        except:
+            pass  # Ignora se não conseguir gerar HTML
+    
+        # Estatísticas
+        contacts = checker.find_all_issues_by_contact()
+        total_opportunities = sum(len(contact['opportunities']) for contact in contacts.values())
     
-    print(f"\n📋 RESUMO:")
-    print(f"Total de contatos: {len(contacts)}")
-    print(f"Total de oportunidades com issues: {total_opportunities}")
-    date_str = datetime.now().strftime('%Y-%m-%d')
-    print(f"Emails em português salvos em: results/{date_str}/pipeline_hygiene_emails.txt")
-    print(f"Emails em inglês salvos em: results/{date_str}/pipeline_hygiene_emails_english.txt")
-    print(f"Relatório salvo em: results/{date_str}/pipeline_hygiene_report.txt")
\ No newline at end of file
+        print(f"\n📋 RESUMO:")
+        print(f"Total de contatos: {len(contacts)}")
+        print(f"Total de oportunidades com issues: {total_opportunities}")
+        date_str = datetime.now().strftime('%Y-%m-%d')
+        print(f"Emails em português salvos em: results/{date_str}/pipeline_hygiene_emails.txt")
+        print(f"Emails em inglês salvos em: results/{date_str}/pipeline_hygiene_emails_english.txt")
+        print(f"Relatório salvo em: results/{date_str}/pipeline_hygiene_report.txt")
\ No newline at end of file
@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+Pipeline Benchmark - Mede throughput dos checkers e geradores com exports sintéticos
+Gera exports do Salesforce (HTML salvo como .xls) em várias escalas, executa cada
+módulo e o pipeline completo, e compara com um baseline salvo para detectar regressões.
+
+Uso:
+    python3 pipeline_benchmark.py [--scales 1000,10000,100000] [--baseline arquivo.json]
+                                  [--save-baseline] [--threshold 0.2] [--keep-files]
+"""
+
+import argparse
+import html
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+# Importa função utilitária para diretório de resultados
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'utils'))
+from results_dir import get_dated_results_dir
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.append(ROOT_DIR)
+from run_pipeline_analysis import PIPELINE_STAGES
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+DEFAULT_SCALES = [1000, 10000, 100000]
+
+# Colunas reais do export "com parceiros" do Salesforce
+EXPORT_COLUMNS = [
+    'Opportunity: 18 Character Oppty ID',
+    'Opportunity: Opportunity Name',
+    'Opportunity: Account Name',
+    'Opportunity Owner Name',
+    'Partner Account',
+    'Partner Type From Account',
+    'ACE Opportunity Type',
+    'Opportunity: Stage',
+    'APN Partner Reported Stage',
+    'APN Partner Reported Status',
+    'Delivery Model',
+    'I Attest to Providing Co-Sell on Opp',
+    'Total Opportunity Amount',
+    'Estimated AWS Monthly Recurring Revenue',
+    'Opportunity: Close Date',
+    'APN Target Launch Date',
+    'APN Partner Last Modified Date',
+    'APN Opportunity Owner Email',
+    'APN Partner Sales Contact Name',
+    'APN Opportunity Identifier',
+    'APN Opportunity ID',
+    'Next Step',
+]
+
+# Colunas do export "sem parceiros"
+NO_PARTNER_COLUMNS = [
+    '18 Character Oppty ID',
+    'Opportunity Name',
+    'Account Name',
+    'Opportunity Owner',
+    'Stage',
+    'Close Date',
+    'Annualized Revenue (converted) Currency',
+    'Annualized Revenue (converted)',
+    'Age',
+]
+
+# Distribuições aproximadas observadas em exports reais
+STAGE_WEIGHTS = {
+    'Prospect': 0.18,
+    'Qualified': 0.20,
+    'Technical Validation': 0.16,
+    'Business Validation': 0.12,
+    'Committed': 0.09,
+    'Launched': 0.17,
+    'Closed Lost': 0.08,
+}
+
+ACE_TYPE_WEIGHTS = {
+    'Partner Sourced Opportunity': 0.40,
+    'Partner Sourced For Visibility Only': 0.15,  # FVO
+    'AWS Opportunity Shared with Partner': 0.30,
+    'Eligible to Share with Partner': 0.15,
+}
+
+PARTNER_STATUS_WEIGHTS = {
+    'Approved': 0.70,
+    'Pending Submission': 0.08,
+    'Submitted': 0.07,
+    'Action Required': 0.05,
+    'Rejected': 0.10,
+}
+
+# Fração de linhas que repetem um ID existente com status "Rejected"
+REJECTED_DUPLICATE_SHARE = 0.03
+
+# Módulos e ordem de execução do run_pipeline_analysis.py (inclui novos módulos automaticamente)
+STAGES = PIPELINE_STAGES
+
+
+class SyntheticExportGenerator:
+    """Gera exports sintéticos no mesmo formato HTML-.xls do Salesforce"""
+
+    def __init__(self, rows: int, seed: int = 42):
+        self.rows = rows
+        self.random = random.Random(seed)
+        self.today = datetime.now()
+        # Poucos owners/parceiros em relação ao volume, como em exports reais
+        self.owners = [f"Owner {i:04d}" for i in range(max(5, rows // 200))]
+        self.partners = [f"Partner {i:05d}" for i in range(max(10, rows // 40))]
+        self.accounts = [f"Account {i:06d}" for i in range(max(20, rows // 5))]
+
+    def _choice(self, weights: Dict[str, float]) -> str:
+        return self.random.choices(list(weights), weights=list(weights.values()))[0]
+
+    def _date(self, min_days: int, max_days: int) -> str:
+        return (self.today + timedelta(days=self.random.randint(min_days, max_days))).strftime('%m/%d/%Y')
+
+    def _oppty_id(self, index: int) -> str:
+        return f"006{index:015d}"
+
+    def _row(self, index: int, oppty_id: Optional[str] = None, status: Optional[str] = None) -> List[str]:
+        rnd = self.random
+        stage = self._choice(STAGE_WEIGHTS)
+        partner_stage = stage if rnd.random() < 0.6 else self._choice(STAGE_WEIGHTS)
+        ace_type = self._choice(ACE_TYPE_WEIGHTS)
+        partner_type = 'Technology Partner' if rnd.random() < 0.45 else 'Consulting Partner'
+        amount = '' if rnd.random() < 0.05 else f"{rnd.choice([0, 0, rnd.uniform(50, 500000)]):.2f}"
+        partner = rnd.choice(self.partners)
+        owner = rnd.choice(self.owners)
+        return [
+            oppty_id or self._oppty_id(index),
+            f"Opportunity {index} - Migração {rnd.randint(1, 99)}",
+            rnd.choice(self.accounts),
+            owner,
+            partner,
+            partner_type,
+            ace_type,
+            stage,
+            partner_stage,
+            status or self._choice(PARTNER_STATUS_WEIGHTS),
+            'SaaS or PaaS' if rnd.random() < 0.55 else rnd.choice(['Professional Services', 'Managed Services', '']),
+            '1' if rnd.random() < 0.5 else '0',
+            amount,
+            f"{rnd.uniform(0, 20000):.2f}",
+            self._date(-60, 180),
+            self._date(-90, 240),
+            self._date(-200, 0),
+            f"contact{rnd.randint(1, 5000)}@{partner.lower().replace(' ', '')}.com",
+            f"Contact {rnd.randint(1, 5000)}",
+            f"O{rnd.randint(1000000, 9999999)}",
+            f"a0X{rnd.randint(10**11, 10**12 - 1)}",
+            '' if rnd.random() < 0.3 else f"Follow up on {rnd.choice(['POC', 'pricing', 'architecture review'])}",
+        ]
+
+    def _no_partner_row(self, index: int) -> List[str]:
+        rnd = self.random
+        return [
+            f"006N{index:014d}",
+            f"No Partner Opportunity {index}",
+            rnd.choice(self.accounts),
+            rnd.choice(self.owners),
+            self._choice(STAGE_WEIGHTS),
+            self._date(-30, 120),
+            'USD',
+            f"{rnd.uniform(0, 300000):.2f}",
+            str(rnd.randint(1, 400)),
+        ]
+
+    @staticmethod
+    def _write_html(path: str, columns: List[str], rows):
+        """Escreve tabela HTML em streaming (mesmo formato do 'Export Details' do Salesforce)"""
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('<html><head><meta http-equiv="Content-Type" content="text/html; charset=UTF-8"></head><body>\n')
+            f.write('<table border="1">\n<tr>')
+            f.write(''.join(f"<th>{html.escape(col)}</th>" for col in columns))
+            f.write('</tr>\n')
+            for row in rows:
+                f.write('<tr>')
+                f.write(''.join(f"<td>{html.escape(value)}</td>" for value in row))
+                f.write('</tr>\n')
+            f.write('</table>\n</body></html>\n')
+
+    def write_export(self, path: str):
+        """Gera o export principal com duplicatas rejeitadas"""
+        def rows():
+            emitted_ids = []
+            for index in range(self.rows):
+                if emitted_ids and self.random.random() < REJECTED_DUPLICATE_SHARE:
+                    yield self._row(index, oppty_id=self.random.choice(emitted_ids), status='Rejected')
+                else:
+                    row = self._row(index)
+                    if len(emitted_ids) < 10000:
+                        emitted_ids.append(row[0])
+                    yield row
+        self._write_html(path, EXPORT_COLUMNS, rows())
+
+    def write_no_partner_export(self, path: str):
+        """Gera o export sem parceiros (~10% do volume principal)"""
+        count = max(10, self.rows // 10)
+        self._write_html(path, NO_PARTNER_COLUMNS, (self._no_partner_row(i) for i in range(count)))
+
+
+def run_stage(stage: Dict, data_file: str, no_partner_file: str, results_dir: str) -> Dict:
+    """Executa um módulo em subprocesso e mede tempo e pico de memória (RSS)"""
+    script_path = os.path.join(ROOT_DIR, stage['script'])
+    cmd_args = [sys.executable, script_path]
+    if stage['input'] == 'data':
+        cmd_args.append(data_file)
+    elif stage['input'] == 'data+no_partner':
+        cmd_args.extend([data_file, no_partner_file])
+    elif stage['input']:
+        cmd_args.append(os.path.join(results_dir, stage['input']))
+
+    env = os.environ.copy()
+    env['PYTHONIOENCODING'] = 'utf-8'
+    env['PIPELINE_RESULTS_DIR'] = results_dir
+    # Exports sintéticos não entram no histórico de execuções
+    env['PIPELINE_HISTORY_DB'] = '0'
+
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd_args, cwd=ROOT_DIR, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    peak_rss_mb = None
+    if resource is not None and hasattr(os, 'wait4'):
+        # wait4 retorna o rusage apenas deste filho (ru_maxrss em KB no Linux, bytes no macOS)
+        stderr_data = proc.stderr.read()
+        _, status, usage = os.wait4(proc.pid, 0)
+        proc.returncode = os.waitstatus_to_exitcode(status) if hasattr(os, 'waitstatus_to_exitcode') else status
+        divisor = 1024 * 1024 if platform.system() == 'Darwin' else 1024
+        peak_rss_mb = usage.ru_maxrss / divisor
+    else:
+        _, stderr_data = proc.communicate()
+    elapsed = time.perf_counter() - start
+
+    return {
+        'name': stage['name'],
+        'success': proc.returncode == 0,
+        'wall_time_s': round(elapsed, 3),
+        'peak_rss_mb': round(peak_rss_mb, 1) if peak_rss_mb is not None else None,
+        'error': stderr_data.decode('utf-8', errors='replace')[-2000:] if proc.returncode != 0 else '',
+    }
+
+
+def run_scale(rows: int, work_dir: str) -> Dict:
+    """Gera export na escala indicada e executa todos os módulos"""
+    scale_dir = os.path.join(work_dir, f"rows_{rows}")
+    results_dir = os.path.join(scale_dir, 'results')
+    os.makedirs(results_dir, exist_ok=True)
+
+    data_file = os.path.join(scale_dir, 'synthetic_partner.xls')
+    no_partner_file = os.path.join(scale_dir, 'synthetic_nopartner.xls')
+
+    print(f"📊 Gerando export sintético com {rows:,} linhas...")
+    generator = SyntheticExportGenerator(rows)
+    generator.write_export(data_file)
+    generator.write_no_partner_export(no_partner_file)
+    print(f"   Tamanho: {os.path.getsize(data_file):,} bytes")
+
+    stages = []
+    for stage in STAGES:
+        result = run_stage(stage, data_file, no_partner_file, results_dir)
+        result['rows_per_s'] = round(rows / result['wall_time_s'], 1) if result['wall_time_s'] else None
+        icon = "✅" if result['success'] else "❌"
+        rss = f"{result['peak_rss_mb']:.0f} MB" if result['peak_rss_mb'] is not None else "n/a"
+        print(f"   {icon} {stage['name']:<28} {result['wall_time_s']:>8.2f}s  {rss:>9}  {result['rows_per_s'] or 0:>10,.0f} rows/s")
+        stages.append(result)
+
+    total_time = sum(s['wall_time_s'] for s in stages)
+    peak_values = [s['peak_rss_mb'] for s in stages if s['peak_rss_mb'] is not None]
+    return {
+        'rows': rows,
+        'input_bytes': os.path.getsize(data_file),
+        'stages': stages,
+        'pipeline': {
+            'success': all(s['success'] for s in stages),
+            'wall_time_s': round(total_time, 3),
+            'peak_rss_mb': max(peak_values) if peak_values else None,
+            'rows_per_s': round(rows / total_time, 1) if total_time else None,
+        },
+    }
+
+
+def compare_with_baseline(report: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Compara tempos com o baseline e retorna lista de regressões"""
+    regressions = []
+    baseline_scales = {str(scale['rows']): scale for scale in baseline.get('scales', [])}
+
+    for scale in report['scales']:
+        base = baseline_scales.get(str(scale['rows']))
+        if not base:
+            continue
+        base_stages = {s['name']: s for s in base['stages']}
+        entries = [(s['name'], s, base_stages.get(s['name'])) for s in scale['stages']]
+        entries.append(('Pipeline completo', scale['pipeline'], base['pipeline']))
+        for name, current, previous in entries:
+            if not previous or not previous.get('wall_time_s'):
+                continue
+            ratio = current['wall_time_s'] / previous['wall_time_s']
+            if ratio > 1 + threshold:
+                regressions.append(
+                    f"{scale['rows']:,} linhas - {name}: {previous['wall_time_s']:.2f}s → "
+                    f"{current['wall_time_s']:.2f}s (+{(ratio - 1) * 100:.0f}%)"
+                )
+    return regressions
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description='Benchmark do pipeline com exports sintéticos')
+    parser.add_argument('--scales', default=','.join(str(s) for s in DEFAULT_SCALES),
+                        help='Escalas em linhas separadas por vírgula (ex: 1000,10000,100000,1000000)')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Arquivo JSON de baseline')
+    parser.add_argument('--save-baseline', action='store_true', help='Salva este resultado como novo baseline')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Aumento relativo de tempo considerado regressão (padrão: 0.2 = 20%%)')
+    parser.add_argument('--keep-files', action='store_true', help='Mantém exports e resultados sintéticos')
+    args = parser.parse_args()
+
+    scales = [int(s) for s in args.scales.split(',') if s.strip()]
+
+    print("="*80)
+    print("⏱️  PIPELINE BENCHMARK")
+    print("="*80)
+    print(f"Executado em: {datetime.now().strftime('%d/%m/%Y às %H:%M')}")
+    print(f"Escalas: {', '.join(f'{s:,}' for s in scales)}")
+    print()
+
+    work_dir = tempfile.mkdtemp(prefix='pipeline_benchmark_')
+    try:
+        report = {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'scales': [run_scale(rows, work_dir) for rows in scales],
+        }
+    finally:
+        if args.keep_files:
+            print(f"📁 Arquivos sintéticos mantidos em: {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    output_file = os.path.join(get_dated_results_dir(), 'benchmark_results.json')
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print()
+    print(f"✅ Resultados salvos em: {output_file}")
+
+    exit_code = 0
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(report, baseline, args.threshold)
+        if regressions:
+            print(f"⚠️  {len(regressions)} regressão(ões) acima de {args.threshold:.0%} em relação ao baseline:")
+            for regression in regressions:
+                print(f"   • {regression}")
+            exit_code = 1
+        else:
+            print(f"✅ Sem regressões em relação ao baseline ({baseline.get('timestamp', 'n/a')})")
+    else:
+        print("⚠️  Nenhum baseline encontrado - use --save-baseline para registrar este resultado")
+
+    if any(not scale['pipeline']['success'] for scale in report['scales']):
+        print("❌ Algum módulo falhou durante o benchmark")
+        exit_code = 1
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"📌 Baseline atualizado: {args.baseline}")
+
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,8 +5,11 @@ Analisa oportunidades e cria mensagens de Slack formatadas com ações necessár
 """
 
 import pandas as pd
+import numpy as np
+import copy
 import sys
 import os
+from io import StringIO
 from datetime import datetime
 from collections import defaultdict
 from typing import Dict, List, Tuple
@@ -15,8 +18,32 @@ from typing import Dict, List, Tuple
 import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'utils'))
 from results_dir import get_dated_results_dir
+from precompressed import precompress_file
+from action_list import build_action_rows, save_action_items, NO_PARTNER_EXPORT_COLUMNS
+from run_metrics import stage_metrics, record_input_rows, record_filter, record_issues, record_output
+from text_decoding import read_text_file
+from amounts import normalize_amounts, AMOUNT_VALUE_COLUMN, AMOUNT_VALID_COLUMN
+from sharding import get_shard_workers, build_shard_map, shard_positions, run_sharded, get_shared_state
 
 class SlackMessageGenerator:
+    # Colunas lidas pelas regras sobre as oportunidades ativas (o restante do
+    # export só é consultado no DataFrame base, que nunca é copiado)
+    RULE_COLUMNS = [
+        'Opportunity: 18 Character Oppty ID',
+        'Opportunity: Opportunity Name',
+        'Opportunity: Account Name',
+        'Opportunity: Stage',
+        'Opportunity: Close Date',
+        'Opportunity Owner Name',
+        'Partner Account',
+        'ACE Opportunity Type',
+        'APN Partner Reported Stage',
+        'APN Partner Reported Status',
+        'Total Opportunity Amount',
+        AMOUNT_VALUE_COLUMN,
+        AMOUNT_VALID_COLUMN,
+    ]
+    
     def __init__(self, excel_file: str, no_partner_file: str = None):
         self.excel_file = excel_file
         self.no_partner_file = no_partner_file
@@ -34,15 +61,11 @@ class SlackMessageGenerator:
                 try:
                     self.df = pd.read_excel(self.excel_file, engine='xlrd')
                 except:
-                    try:
-                        # Se for um arquivo HTML disfarçado de Excel
-                        with open(self.excel_file, 'r', encoding='utf-8') as f:
-                            self.df = pd.read_html(f)[0]
-                    except:
-                        # Última tentativa com encoding diferente
-                        with open(self.excel_file, 'r', encoding='iso-8859-1') as f:
-                            self.df = pd.read_html(f)[0]
+                    # Se for um arquivo HTML disfarçado de Excel (uma leitura, encoding detectado em memória)
+                    self.df = pd.read_html(StringIO(read_text_file(self.excel_file, "export")))[0]
             
+            self.df = normalize_amounts(self.df)
+            record_input_rows(len(self.df))
             print(f"Dados carregados: {len(self.df)} oportunidades")
             print(f"Colunas disponíveis: {len(self.df.columns)}")
             
@@ -58,6 +81,7 @@ class SlackMessageGenerator:
                             # Se for um arquivo HTML disfarçado de Excel
                             self.no_partner_df = pd.read_html(self.no_partner_file)[0]
                     
+                    record_filter('no_partner_input', len(self.no_partner_df))
                     print(f"Dados sem parceiro carregados: {len(self.no_partner_df)} oportunidades")
                 except Exception as e:
                     print(f"Aviso: Não foi possível carregar arquivo sem parceiro: {e}")
@@ -71,13 +95,20 @@ class SlackMessageGenerator:
         """Filtra apenas oportunidades ativas do lado AWS (não Launched/Closed-Lost)"""
         # Filtra oportunidades que não estão finalizadas pela AWS
         # IMPORTANTE: Não filtra por partner stage, pois queremos detectar quando partner finalizou mas AWS não
-        active_df = self.df[
+        active_index = self.df.index[
             ~self.df['Opportunity: Stage'].isin(['Launched', 'Closed Lost'])
-        ].copy()
+        ]
+        active_df = self.select_rule_rows(active_index)
         
+        record_filter('active_opportunities', len(active_df))
         print(f"Oportunidades ativas (AWS): {len(active_df)} de {len(self.df)} total")
         return active_df
     
+    def select_rule_rows(self, index: pd.Index) -> pd.DataFrame:
+        """Materializa apenas as linhas selecionadas e as colunas usadas pelas regras"""
+        columns = [column for column in self.RULE_COLUMNS if column in self.df.columns]
+        return self.df.loc[index, columns]
+    
     def check_co_sell_missing(self, df: pd.DataFrame) -> List[Dict]:
         """
         Regra 1: Technology Partners - Co-Sell Missing
@@ -98,36 +129,24 @@ class SlackMessageGenerator:
             (self.df['Partner Type From Account'] == 'Technology Partner') &
             (self.df['I Attest to Providing Co-Sell on Opp'] != 1) &
             ((self.df['Opportunity: Stage'] == 'Launched') | (self.df['APN Partner Reported Stage'] == 'Launched')) &
-            (self.df['ACE Opportunity Type'] != 'Partner Sourced For Visibility Only')
+            (self.df['ACE Opportunity Type'] != 'Partner Sourced For Visibility Only') &
+            # Threshold de $100 - apenas oportunidades com valor >= $100 (inválido/nulo = 0)
+            (self.df[AMOUNT_VALUE_COLUMN] >= 100)
         ]
         
-        # Aplicar threshold de $100 - apenas oportunidades com valor >= $100
-        for _, row in tech_partners.iterrows():
-            total_amount_value = row.get('Total Opportunity Amount', 0)
-            try:
-                # Converte para float, tratando valores nulos como 0
-                if pd.isna(total_amount_value) or total_amount_value == '' or total_amount_value is None:
-                    amount = 0
-                else:
-                    amount = float(total_amount_value)
-            except (ValueError, TypeError):
-                # Se não conseguir converter, trata como 0
-                amount = 0
-                print(f"Warning: Valor inválido para oportunidade {row.get('Opportunity: 18 Character Oppty ID', 'N/A')}: {total_amount_value}")
-            
-            # Só inclui se valor >= $100
-            if amount >= 100:
-                issues.append({
-                    'type': 'co_sell_missing',
-                    'opportunity_id': row['Opportunity: 18 Character Oppty ID'],
-                    'opportunity_name': row['Opportunity: Opportunity Name'],
-                    'account_name': row['Opportunity: Account Name'],
-                    'partner_name': row['Partner Account'],
-                    'aws_stage': row['Opportunity: Stage'],
-                    'partner_stage': row['APN Partner Reported Stage'],
-                    'owner': row['Opportunity Owner Name'],
-                    'link': f"https://aws-crm.lightning.force.com/lightning/r/Opportunity/{row['Opportunity: 18 Character Oppty ID']}/view"
-                })
+        for index, row in tech_partners.iterrows():
+            issues.append({
+                'type': 'co_sell_missing',
+                'row_index': index,
+                'opportunity_id': row['Opportunity: 18 Character Oppty ID'],
+                'opportunity_name': row['Opportunity: Opportunity Name'],
+                'account_name': row['Opportunity: Account Name'],
+                'partner_name': row['Partner Account'],
+                'aws_stage': row['Opportunity: Stage'],
+                'partner_stage': row['APN Partner Reported Stage'],
+                'owner': row['Opportunity Owner Name'],
+                'link': f"https://aws-crm.lightning.force.com/lightning/r/Opportunity/{row['Opportunity: 18 Character Oppty ID']}/view"
+            })
         
         return issues
     
@@ -149,7 +168,7 @@ class SlackMessageGenerator:
             'Closed Lost': 0
         }
         
-        for _, row in df.iterrows():
+        for index, row in df.iterrows():
             partner_stage = row['APN Partner Reported Stage']
             aws_stage = row['Opportunity: Stage']
             
@@ -163,6 +182,7 @@ class SlackMessageGenerator:
                 if stage_order[partner_stage] > stage_order[aws_stage]:
                     issues.append({
                         'type': 'partner_stage_ahead',
+                        'row_index': index,
                         'opportunity_id': row['Opportunity: 18 Character Oppty ID'],
                         'opportunity_name': row['Opportunity: Opportunity Name'],
                         'account_name': row['Opportunity: Account Name'],
@@ -187,9 +207,10 @@ class SlackMessageGenerator:
             (~df['Opportunity: Stage'].isin(['Closed Lost', 'Launched']))
         ]
         
-        for _, row in finalized_partners.iterrows():
+        for index, row in finalized_partners.iterrows():
             issues.append({
                 'type': 'partner_finalized',
+                'row_index': index,
                 'opportunity_id': row['Opportunity: 18 Character Oppty ID'],
                 'opportunity_name': row['Opportunity: Opportunity Name'],
                 'account_name': row['Opportunity: Account Name'],
@@ -222,9 +243,10 @@ class SlackMessageGenerator:
             (~df['Opportunity: 18 Character Oppty ID'].isin(shared_opportunities))
         ]
         
-        for _, row in eligible_opps.iterrows():
+        for index, row in eligible_opps.iterrows():
             issues.append({
                 'type': 'eligible_to_share',
+                'row_index': index,
                 'opportunity_id': row['Opportunity: 18 Character Oppty ID'],
                 'opportunity_name': row['Opportunity: Opportunity Name'],
                 'account_name': row['Opportunity: Account Name'],
@@ -250,7 +272,7 @@ class SlackMessageGenerator:
         today = datetime.now()
         thirty_days_ahead = today + timedelta(days=30)
         
-        for _, row in df.iterrows():
+        for index, row in df.iterrows():
             close_date_value = row['Opportunity: Close Date']
             
             # Pula se não há data de fechamento
@@ -278,6 +300,7 @@ class SlackMessageGenerator:
                     
                     issues.append({
                         'type': 'close_date_soon',
+                        'row_index': index,
                         'opportunity_id': row['Opportunity: 18 Character Oppty ID'],
                         'opportunity_name': row['Opportunity: Opportunity Name'],
                         'account_name': row['Opportunity: Account Name'],
@@ -312,7 +335,7 @@ class SlackMessageGenerator:
         today = datetime.now()
         sixty_days_ahead = today + timedelta(days=60)
         
-        for _, row in self.no_partner_df.iterrows():
+        for index, row in self.no_partner_df.iterrows():
             close_date_value = row['Close Date']
             
             # Pula se não há data de fechamento
@@ -344,6 +367,7 @@ class SlackMessageGenerator:
                     
                     issues.append({
                         'type': 'no_partner_opportunity',
+                        'row_index': index,
                         'opportunity_id': row['18 Character Oppty ID'],
                         'opportunity_name': row['Opportunity Name'],
                         'account_name': row['Account Name'],
@@ -373,7 +397,7 @@ class SlackMessageGenerator:
         """
         issues = []
         
-        for _, row in df.iterrows():
+        for index, row in df.iterrows():
             # Verifica se ACE Opportunity Type existe e não é nulo
             ace_opportunity_type = row.get('ACE Opportunity Type', '')
             if pd.isna(ace_opportunity_type):
@@ -383,18 +407,8 @@ class SlackMessageGenerator:
             if ace_opportunity_type == 'Partner Sourced For Visibility Only':
                 continue
             
-            # Filtro 2: Total Opportunity Amount = 0 (tratamento seguro de valores nulos e não numéricos)
-            total_amount_value = row.get('Total Opportunity Amount', 0)
-            try:
-                # Converte para float, tratando valores nulos como 0
-                if pd.isna(total_amount_value) or total_amount_value == '' or total_amount_value is None:
-                    amount = 0
-                else:
-                    amount = float(total_amount_value)
-            except (ValueError, TypeError):
-                # Se não conseguir converter, trata como 0
-                amount = 0
-                print(f"Warning: Valor inválido para oportunidade {row.get('Opportunity: 18 Character Oppty ID', 'N/A')}: {total_amount_value}")
+            # Filtro 2: Total Opportunity Amount = 0 (valores nulos e não numéricos contam como 0)
+            amount = row[AMOUNT_VALUE_COLUMN] if row[AMOUNT_VALID_COLUMN] else 0
             
             # Só continua se o valor for zero
             if amount != 0:
@@ -408,6 +422,7 @@ class SlackMessageGenerator:
             # Se chegou até aqui, a oportunidade atende todos os critérios
             issues.append({
                 'type': 'zero_amount_opportunity',
+                'row_index': index,
                 'opportunity_id': row.get('Opportunity: 18 Character Oppty ID', ''),
                 'opportunity_name': row.get('Opportunity: Opportunity Name', ''),
                 'account_name': row.get('Opportunity: Account Name', ''),
@@ -460,6 +475,7 @@ class SlackMessageGenerator:
             if should_apply_rule:
                 issues.append({
                     'type': 'shared_but_not_accepted',
+                    'row_index': index,
                     'opportunity_id': row.get('Opportunity: 18 Character Oppty ID', ''),
                     'opportunity_name': row.get('Opportunity: Opportunity Name', ''),
                     'account_name': row.get('Opportunity: Account Name', ''),
@@ -683,6 +699,72 @@ Dica: Use os links diretos para acessar cada oportunidade no Salesforce.
         
         return message
     
+    def evaluate_rules(self, active_df: pd.DataFrame, verbose: bool = True) -> Dict[str, List[Dict]]:
+        """Executa todas as verificações, na ordem em que os issues são combinados"""
+        checks = [
+            ('co_sell_missing', "Verificando Co-Sell missing...", lambda: self.check_co_sell_missing(active_df)),
+            ('partner_stage_ahead', "Verificando Partner Stage à frente...", lambda: self.check_partner_stage_ahead(active_df)),
+            ('partner_finalized', "Verificando Partner finalizou...", lambda: self.check_partner_finalized(active_df)),
+            ('eligible_to_share', "Verificando Eligible to Share...", lambda: self.check_eligible_to_share(active_df)),
+            ('close_date_soon', "Verificando Close Date próximo...", lambda: self.check_close_date_soon(active_df)),
+            ('no_partner_opportunity', "Verificando oportunidades sem parceiro...", self.check_no_partner_opportunities),
+            ('zero_amount_opportunity', "Verificando oportunidades com valor zero...", lambda: self.check_zero_amount_opportunities(active_df)),
+            ('shared_but_not_accepted', "Verificando oportunidades rejeitadas para re-compartilhamento...", lambda: self.check_shared_but_not_accepted(active_df)),
+        ]
+        
+        rule_issues = {}
+        for rule, description, check in checks:
+            if verbose:
+                print(description)
+            rule_issues[rule] = check()
+        
+        return rule_issues
+    
+    def evaluate_sharded(self, active_df: pd.DataFrame, workers: int) -> Tuple[Dict[str, List[Dict]], Dict[str, str]]:
+        """
+        Executa as verificações e gera as mensagens em paralelo, um shard de AMs por processo
+        
+        Linhas com o mesmo Oppty ID ficam sempre no mesmo shard (Eligible to Share e
+        Shared But Not Accepted comparam essas linhas) e o resultado é mesclado na
+        mesma ordem da execução sequencial.
+        """
+        print(f"Execução particionada por AM: {workers} processos")
+        
+        # row_index dos issues precisa ser a posição da linha (usado na mesclagem)
+        active_rows = np.flatnonzero(self.df.index.isin(active_df.index))
+        if not self.df.index.equals(pd.RangeIndex(len(self.df))):
+            self.df = self.df.reset_index(drop=True)
+        if self.no_partner_df is not None and not self.no_partner_df.index.equals(pd.RangeIndex(len(self.no_partner_df))):
+            self.no_partner_df = self.no_partner_df.reset_index(drop=True)
+        
+        owners = self.df['Opportunity Owner Name']
+        shard_map = build_shard_map(owners, workers, link_keys=self.df['Opportunity: 18 Character Oppty ID'])
+        row_shards = shard_positions(owners, shard_map, workers)
+        if self.no_partner_df is not None:
+            no_partner_shards = shard_positions(self.no_partner_df['Opportunity Owner'], shard_map, workers)
+        else:
+            no_partner_shards = [np.array([], dtype=int)] * workers
+        
+        tasks = [
+            (rows, np.intersect1d(rows, active_rows), no_partner_rows)
+            for rows, no_partner_rows in zip(row_shards, no_partner_shards)
+            if len(rows) or len(no_partner_rows)
+        ]
+        results = run_sharded(_evaluate_owner_shard, self, tasks, workers)
+        
+        rule_issues = {}
+        owner_messages = []
+        for shard_issues, shard_messages in results:
+            for rule, issues in shard_issues.items():
+                rule_issues.setdefault(rule, []).extend(issues)
+            owner_messages.extend(shard_messages)
+        
+        for issues in rule_issues.values():
+            issues.sort(key=lambda issue: issue['row_index'])
+        owner_messages.sort(key=lambda item: item[0])
+        
+        return rule_issues, {owner: message for _, owner, message in owner_messages}
+    
     def generate_all_messages(self) -> Dict[str, str]:
         """Gera todas as mensagens de Slack por AM"""
         print("Analisando oportunidades...")
@@ -694,30 +776,27 @@ Dica: Use os links diretos para acessar cada oportunidade no Salesforce.
             print("Nenhuma oportunidade ativa encontrada")
             return {}
         
-        # Executa todas as verificações
-        print("Verificando Co-Sell missing...")
-        co_sell_issues = self.check_co_sell_missing(active_df)
-        
-        print("Verificando Partner Stage à frente...")
-        stage_ahead_issues = self.check_partner_stage_ahead(active_df)
-        
-        print("Verificando Partner finalizou...")
-        finalized_issues = self.check_partner_finalized(active_df)
+        # Executa todas as verificações (particionado por AM em exports grandes)
+        messages = None
+        workers = get_shard_workers(len(self.df))
+        if workers:
+            rule_issues, messages = self.evaluate_sharded(active_df, workers)
+        else:
+            rule_issues = self.evaluate_rules(active_df)
         
-        print("Verificando Eligible to Share...")
-        share_issues = self.check_eligible_to_share(active_df)
+        for rule, issues in rule_issues.items():
+            record_issues(rule, len(issues))
         
-        print("Verificando Close Date próximo...")
-        close_date_issues = self.check_close_date_soon(active_df)
+        self.save_action_items_to_file(rule_issues)
         
-        print("Verificando oportunidades sem parceiro...")
-        no_partner_issues = self.check_no_partner_opportunities()
-        
-        print("Verificando oportunidades com valor zero...")
-        zero_amount_issues = self.check_zero_amount_opportunities(active_df)
-        
-        print("Verificando oportunidades rejeitadas para re-compartilhamento...")
-        shared_not_accepted_issues = self.check_shared_but_not_accepted(active_df)
+        co_sell_issues = rule_issues['co_sell_missing']
+        stage_ahead_issues = rule_issues['partner_stage_ahead']
+        finalized_issues = rule_issues['partner_finalized']
+        share_issues = rule_issues['eligible_to_share']
+        close_date_issues = rule_issues['close_date_soon']
+        no_partner_issues = rule_issues['no_partner_opportunity']
+        zero_amount_issues = rule_issues['zero_amount_opportunity']
+        shared_not_accepted_issues = rule_issues['shared_but_not_accepted']
         
         # Combina todos os issues
         all_issues = co_sell_issues + stage_ahead_issues + finalized_issues + share_issues + close_date_issues + no_partner_issues + zero_amount_issues + shared_not_accepted_issues
@@ -736,14 +815,16 @@ Dica: Use os links diretos para acessar cada oportunidade no Salesforce.
         print(f"   Oportunidades com valor zero: {len(zero_amount_issues)}")
         print(f"   Oportunidades rejeitadas: {len(shared_not_accepted_issues)}")
         
-        # Agrupa por owner
-        grouped_issues = self.group_issues_by_owner(all_issues)
-        
-        # Gera mensagens
-        messages = {}
-        for owner, owner_issues in grouped_issues.items():
-            messages[owner] = self.generate_slack_message(owner, owner_issues)
+        if messages is None:
+            # Agrupa por owner
+            grouped_issues = self.group_issues_by_owner(all_issues)
+            
+            # Gera mensagens
+            messages = {}
+            for owner, owner_issues in grouped_issues.items():
+                messages[owner] = self.generate_slack_message(owner, owner_issues)
         
+        record_output('slack_messages', len(messages))
         print(f"Mensagens geradas para {len(messages)} AMs")
         
         # Salva relatório detalhado das oportunidades onde partner finalizou
@@ -752,6 +833,21 @@ Dica: Use os links diretos para acessar cada oportunidade no Salesforce.
         
         return messages
     
+    def save_action_items_to_file(self, rule_issues: Dict[str, List[Dict]]):
+        """Grava as oportunidades sinalizadas na lista de ações (uma linha por oportunidade e regra)"""
+        frames = []
+        for rule, issues in rule_issues.items():
+            if not issues:
+                continue
+            rows = [issue['row_index'] for issue in issues]
+            if rule == 'no_partner_opportunity':
+                frames.append(build_action_rows(self.no_partner_df, rows, 'Slack Message Generator', rule, NO_PARTNER_EXPORT_COLUMNS))
+            else:
+                frames.append(build_action_rows(self.df, rows, 'Slack Message Generator', rule))
+        
+        rows = save_action_items(get_dated_results_dir(), 'slack_message_generator', frames)
+        print(f"Lista de ações: {rows} linhas")
+    
     def save_messages(self, messages: Dict[str, str], output_file: str = None):
         """Salva mensagens em arquivo"""
         if not messages:
@@ -772,6 +868,7 @@ Dica: Use os links diretos para acessar cada oportunidade no Salesforce.
                 f.write("="*60 + "\n")
                 f.write(message)
                 f.write("\n" + "="*60 + "\n\n")
+        precompress_file(output_file)
         
         print(f"Mensagens salvas em: {output_file}")
     
@@ -830,9 +927,36 @@ Dica: Use os links diretos para acessar cada oportunidade no Salesforce.
             
             for issue in sorted(finalized_issues, key=lambda x: (x['owner'], x['partner_stage'])):
                 f.write(f"{issue['opportunity_id']} | {issue['account_name'][:25]:<25} | {issue['partner_name'][:20]:<20} | {issue['aws_stage']:<15} | {issue['partner_stage']:<12} | {issue['owner']}\n")
+        precompress_file(output_file)
         
         print(f"Relatório detalhado 'Partner Finalizou' salvo em: {output_file}")
 
+def _evaluate_owner_shard(task):
+    """Worker da execução particionada: verificações e mensagens dos AMs de um shard"""
+    rows, active_rows, no_partner_rows = task
+    generator = get_shared_state()
+    
+    # Cópia rasa: os DataFrames do shard são fatias dos herdados do processo pai
+    shard = copy.copy(generator)
+    shard.df = generator.df.iloc[rows]
+    if generator.no_partner_df is not None:
+        shard.no_partner_df = generator.no_partner_df.iloc[no_partner_rows]
+    
+    rule_issues = shard.evaluate_rules(generator.select_rule_rows(active_rows), verbose=False)
+    
+    # Ordem do AM na execução sequencial: primeira regra e primeira linha em que aparece
+    first_seen = {}
+    for rule_position, issues in enumerate(rule_issues.values()):
+        for issue in issues:
+            first_seen.setdefault(issue['owner'], (rule_position, issue['row_index']))
+    
+    all_issues = [issue for issues in rule_issues.values() for issue in issues]
+    messages = [
+        (first_seen[owner], owner, shard.generate_slack_message(owner, owner_issues))
+        for owner, owner_issues in shard.group_issues_by_owner(all_issues).items()
+    ]
+    return rule_issues, messages
+
 def main():
     """Função principal"""
     print("="*60)
@@ -869,4 +993,5 @@ def main():
     print("="*60)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    with stage_metrics('Slack Message Generator'):
+        main()
\ No newline at end of file
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Lista tabular de ações (uma linha por oportunidade e regra)
+Cada checker grava as oportunidades sinalizadas em
+<resultados>/action_items/<módulo>.csv com as colunas de ACTION_COLUMNS
+(save_action_items). O Action List Exporter junta esses arquivos em
+action_list.csv e action_list.xlsx para atualização em massa no Salesforce.
+
+A exportação lê os CSVs em blocos de CHUNK_ROWS linhas e grava cada bloco
+direto nos dois formatos (CSV em append, xlsxwriter em constant_memory), então
+a memória não cresce com o tamanho do lote.
+"""
+
+import glob
+import os
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from precompressed import precompress_file
+
+ACTION_ITEMS_DIR_NAME = 'action_items'
+ACTION_LIST_NAME = 'action_list'
+ACTION_LIST_FORMATS = ('csv', 'xlsx')
+
+# Ordem dos módulos na lista consolidada (os demais vêm depois, por nome)
+ACTION_ITEM_MODULES = [
+    'delivery_model_checker',
+    'pipeline_hygiene_checker',
+    'slack_message_generator',
+]
+
+ACTION_COLUMNS = [
+    'Module',
+    'Rule',
+    'Opportunity ID',
+    'APN Opportunity Identifier',
+    'Opportunity Name',
+    'Account Name',
+    'Owner',
+    'Partner',
+    'Partner Contact Email',
+    'AWS Stage',
+    'Partner Stage',
+    'Total Opportunity Amount',
+    'Estimated MRR',
+    'Close Date',
+    'Target Launch Date',
+    'Partner Last Modified Date',
+    'Salesforce Link',
+    'Partner Central Link',
+]
+
+AMOUNT_COLUMNS = ['Total Opportunity Amount', 'Estimated MRR']
+DATE_COLUMNS = ['Close Date', 'Target Launch Date', 'Partner Last Modified Date']
+
+# Coluna da lista -> coluna do export com parceiros
+EXPORT_COLUMNS = {
+    'Opportunity ID': 'Opportunity: 18 Character Oppty ID',
+    'APN Opportunity Identifier': 'APN Opportunity Identifier',
+    'Opportunity Name': 'Opportunity: Opportunity Name',
+    'Account Name': 'Opportunity: Account Name',
+    'Owner': 'Opportunity Owner Name',
+    'Partner': 'Partner Account',
+    'Partner Contact Email': 'APN Opportunity Owner Email',
+    'AWS Stage': 'Opportunity: Stage',
+    'Partner Stage': 'APN Partner Reported Stage',
+    'Total Opportunity Amount': 'Total Opportunity Amount',
+    'Estimated MRR': 'Estimated AWS Monthly Recurring Revenue',
+    'Close Date': 'Opportunity: Close Date',
+    'Target Launch Date': 'APN Target Launch Date',
+    'Partner Last Modified Date': 'APN Partner Last Modified Date',
+    'Partner Central Link': 'APN Opportunity ID',
+}
+
+# Coluna da lista -> coluna do export sem parceiros
+NO_PARTNER_EXPORT_COLUMNS = {
+    'Opportunity ID': '18 Character Oppty ID',
+    'Opportunity Name': 'Opportunity Name',
+    'Account Name': 'Account Name',
+    'Owner': 'Opportunity Owner',
+    'AWS Stage': 'Stage',
+    'Total Opportunity Amount': 'Annualized Revenue (converted)',
+    'Close Date': 'Close Date',
+}
+
+SALESFORCE_URL = "https://aws-crm.lightning.force.com/lightning/r/Opportunity/"
+PARTNER_CENTRAL_URL = "https://partnercentral.awspartner.com/partnercentral2/s/editopportunity?id="
+
+# Datas do export (mm/dd/aaaa) e dos CSVs intermediários (ISO)
+EXPORT_DATE_FORMAT = '%m/%d/%Y'
+DATE_FORMAT = '%Y-%m-%d'
+
+# Linhas lidas e gravadas por vez na exportação
+CHUNK_ROWS = 50_000
+
+# Limite de linhas por planilha do Excel (incluindo o cabeçalho)
+EXCEL_MAX_ROWS = 1_048_576
+SHEET_TITLE = 'Ações'
+EXCEL_DATE_FORMAT = 'yyyy-mm-dd'
+
+
+def _parse_dates(values: pd.Series) -> pd.Series:
+    """Datas do export (texto mm/dd/aaaa ou já convertidas) como datetime64"""
+    if pd.api.types.is_datetime64_any_dtype(values.dtype):
+        return values
+    return pd.to_datetime(values, format=EXPORT_DATE_FORMAT, errors='coerce')
+
+
+def _link(prefix: str, ids: pd.Series, suffix: str = '') -> pd.Series:
+    """URL para cada ID preenchido (vazio quando não há ID)"""
+    text = ids.astype(object).where(ids.notna(), '').astype(str).str.strip()
+    return (prefix + text + suffix).where(text != '')
+
+
+def build_action_rows(df: pd.DataFrame, index, module: str, rule: str,
+                      columns: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+    """
+    Linhas da lista de ações para as oportunidades de uma regra
+
+    Args:
+        df: DataFrame do export
+        index: Rótulos das linhas sinalizadas pela regra
+        module: Nome do módulo (coluna Module)
+        rule: Nome da regra (coluna Rule)
+        columns: Mapeamento coluna da lista -> coluna do export (padrão: EXPORT_COLUMNS)
+
+    Returns:
+        DataFrame com ACTION_COLUMNS, uma linha por oportunidade
+    """
+    columns = EXPORT_COLUMNS if columns is None else columns
+    selected = df.loc[pd.Index(index), [column for column in dict.fromkeys(columns.values()) if column in df.columns]]
+    selected = selected.reset_index(drop=True)
+    empty = pd.Series(None, index=selected.index, dtype=object)
+
+    def source(name: str) -> pd.Series:
+        column = columns.get(name)
+        return selected[column] if column in selected.columns else empty
+
+    rows = {'Module': module, 'Rule': rule}
+    for name in ACTION_COLUMNS[2:-2]:
+        values = source(name)
+        if name in AMOUNT_COLUMNS:
+            values = pd.to_numeric(values, errors='coerce')
+        elif name in DATE_COLUMNS:
+            values = _parse_dates(values)
+        rows[name] = values
+    rows['Salesforce Link'] = _link(SALESFORCE_URL, rows['Opportunity ID'], '/view')
+    rows['Partner Central Link'] = _link(PARTNER_CENTRAL_URL, source('Partner Central Link'))
+
+    return pd.DataFrame(rows, index=selected.index, columns=ACTION_COLUMNS)
+
+
+def save_action_items(results_dir: str, name: str, frames: Iterable[pd.DataFrame]) -> int:
+    """
+    Grava <results_dir>/action_items/<name>.csv, um bloco por regra
+
+    O arquivo é sempre regravado (só com o cabeçalho quando nada foi
+    sinalizado), para não sobrar lista de uma execução anterior.
+
+    Returns:
+        Número de linhas gravadas
+    """
+    items_dir = os.path.join(results_dir, ACTION_ITEMS_DIR_NAME)
+    os.makedirs(items_dir, exist_ok=True)
+    file_path = os.path.join(items_dir, f"{name}.csv")
+
+    rows = 0
+    with open(file_path, 'w', encoding='utf-8', newline='') as f:
+        pd.DataFrame(columns=ACTION_COLUMNS).to_csv(f, index=False)
+        for frame in frames:
+            frame.to_csv(f, header=False, index=False, date_format=DATE_FORMAT)
+            rows += len(frame)
+    precompress_file(file_path)
+
+    return rows
+
+
+def find_action_items(results_dir: str) -> List[str]:
+    """CSVs de action_items de um diretório de resultados, na ordem de ACTION_ITEM_MODULES"""
+    items_dir = os.path.join(results_dir, ACTION_ITEMS_DIR_NAME)
+    found = {}
+    # Execução compactada pode ter só a variante .gz (lida direto pelo pandas)
+    for file_path in sorted(glob.glob(os.path.join(items_dir, '*.csv.gz'))) + sorted(glob.glob(os.path.join(items_dir, '*.csv'))):
+        name = os.path.basename(file_path).split('.', 1)[0]
+        found[name] = file_path
+
+    order = {name: position for position, name in enumerate(ACTION_ITEM_MODULES)}
+    return [found[name] for name in sorted(found, key=lambda name: (order.get(name, len(order)), name))]
+
+
+def iter_action_chunks(sources: Iterable[str], chunk_rows: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Blocos da lista de ações com valores e datas já tipados"""
+    for source in sources:
+        reader = pd.read_csv(source, dtype=str, keep_default_na=False, na_values=[''], chunksize=chunk_rows)
+        for chunk in reader:
+            chunk = chunk.reindex(columns=ACTION_COLUMNS)
+            for name in AMOUNT_COLUMNS:
+                chunk[name] = pd.to_numeric(chunk[name], errors='coerce')
+            for name in DATE_COLUMNS:
+                chunk[name] = pd.to_datetime(chunk[name], format=DATE_FORMAT, errors='coerce')
+            yield chunk
+
+
+def _excel_rows(chunk: pd.DataFrame) -> Iterator[Tuple]:
+    """Linhas do bloco como valores Python (None para vazios, date para datas)"""
+    values = []
+    for name in ACTION_COLUMNS:
+        column = chunk[name]
+        if name in DATE_COLUMNS:
+            column = column.dt.date
+        values.append(column.astype(object).where(column.notna(), None).tolist())
+    return zip(*values)
+
+
+class _ExcelWriter:
+    """
+    Planilha em memória constante (abre outra aba ao atingir o limite de linhas)
+
+    Usa o xlsxwriter em modo constant_memory (dependência obrigatória do
+    requirements.txt). O xlsxwriter é importado aqui, e não no topo do módulo,
+    para que os checkers que só gravam action_items não paguem o import.
+    """
+
+    def __init__(self, file_path: str):
+        import xlsxwriter
+
+        self.workbook = xlsxwriter.Workbook(file_path, {
+            'constant_memory': True,
+            'default_date_format': EXCEL_DATE_FORMAT,
+            # Links como texto: o Excel aceita no máximo 65.530 hyperlinks por aba
+            'strings_to_urls': False,
+        })
+        self.sheet = None
+        self.sheet_rows = 0
+        self.sheets = 0
+
+    def _new_sheet(self):
+        self.sheets += 1
+        title = SHEET_TITLE if self.sheets == 1 else f"{SHEET_TITLE} ({self.sheets})"
+        self.sheet = self.workbook.add_worksheet(title)
+        self.sheet.freeze_panes(1, 0)
+        self.sheet.write_row(0, 0, ACTION_COLUMNS)
+        self.sheet_rows = 1
+
+    def write(self, chunk: pd.DataFrame):
+        for row in _excel_rows(chunk):
+            if self.sheet is None or self.sheet_rows >= EXCEL_MAX_ROWS:
+                self._new_sheet()
+            self.sheet.write_row(self.sheet_rows, 0, row)
+            self.sheet_rows += 1
+
+    def close(self):
+        if self.sheet is None:
+            self._new_sheet()
+        self.workbook.close()
+
+
+def export_action_list(sources: List[str], output_dir: str,
+                       formats: Iterable[str] = ACTION_LIST_FORMATS) -> Tuple[int, Dict[str, str]]:
+    """
+    Junta os CSVs de action_items em action_list.<formato>
+
+    Args:
+        sources: CSVs gravados por save_action_items (na ordem desejada)
+        output_dir: Diretório onde os arquivos serão gravados
+        formats: Formatos a gerar (csv, xlsx)
+
+    Returns:
+        (número de linhas, {formato: caminho gravado})
+    """
+    formats = list(formats)
+    paths = {fmt: os.path.join(output_dir, f"{ACTION_LIST_NAME}.{fmt}") for fmt in formats}
+
+    writers = {}
+    if 'xlsx' in formats:
+        writers['xlsx'] = _ExcelWriter(paths['xlsx'])
+
+    rows = 0
+    csv_file = open(paths['csv'], 'w', encoding='utf-8-sig', newline='') if 'csv' in formats else None
+    try:
+        if csv_file is not None:
+            pd.DataFrame(columns=ACTION_COLUMNS).to_csv(csv_file, index=False)
+        for chunk in iter_action_chunks(sources):
+            if csv_file is not None:
+                chunk.to_csv(csv_file, header=False, index=False, date_format=DATE_FORMAT)
+            for writer in writers.values():
+                writer.write(chunk)
+            rows += len(chunk)
+    finally:
+        if csv_file is not None:
+            csv_file.close()
+        for writer in writers.values():
+            writer.close()
+
+    if 'csv' in paths:
+        precompress_file(paths['csv'])
+
+    return rows, paths
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Normalização do Total Opportunity Amount
+Converte a coluna uma única vez no carregamento (pd.to_numeric) e adiciona:
+    Amount Value -> valor numérico, 0 quando ausente ou inválido
+    Amount Valid -> True quando o valor original é numérico
+
+Regras e ordenações leem essas colunas em vez de converter linha a linha.
+Valores inválidos geram um único aviso resumido no carregamento.
+"""
+
+import pandas as pd
+
+from run_metrics import record_filter
+
+AMOUNT_COLUMN = 'Total Opportunity Amount'
+AMOUNT_VALUE_COLUMN = 'Amount Value'
+AMOUNT_VALID_COLUMN = 'Amount Valid'
+
+# Quantidade de exemplos listados no aviso de valores inválidos
+MAX_INVALID_EXAMPLES = 5
+
+
+def normalize_amounts(df: pd.DataFrame, id_column: str = 'Opportunity: 18 Character Oppty ID') -> pd.DataFrame:
+    """
+    Adiciona as colunas de valor numérico e validade ao DataFrame
+
+    Args:
+        df: DataFrame do export
+        id_column: Coluna usada para identificar oportunidades no aviso
+
+    Returns:
+        DataFrame com AMOUNT_VALUE_COLUMN e AMOUNT_VALID_COLUMN
+    """
+    if df is None:
+        return df
+
+    if AMOUNT_COLUMN in df.columns:
+        raw = df[AMOUNT_COLUMN]
+        values = pd.to_numeric(raw, errors='coerce')
+        missing = raw.isna() | (raw.astype(object) == '')
+    else:
+        values = pd.Series(float('nan'), index=df.index)
+        missing = pd.Series(True, index=df.index)
+
+    valid = values.notna()
+    invalid = ~valid & ~missing
+
+    if invalid.any():
+        examples = []
+        for index in df.index[invalid][:MAX_INVALID_EXAMPLES]:
+            opportunity_id = df.at[index, id_column] if id_column in df.columns else index
+            examples.append(f"{opportunity_id}: {df.at[index, AMOUNT_COLUMN]!r}")
+        record_filter('invalid_amounts', int(invalid.sum()))
+        print(f"⚠️  {int(invalid.sum())} valores inválidos em '{AMOUNT_COLUMN}' (tratados como 0). Exemplos: {'; '.join(examples)}")
+
+    return df.assign(**{
+        AMOUNT_VALUE_COLUMN: values.fillna(0).astype(float),
+        AMOUNT_VALID_COLUMN: valid,
+    })
@@ -0,0 +1,459 @@
+// Linhas/cards renderizados por lote conforme a aba rola
+const VIEW_BATCH_SIZE = 50;
+
+const PRIORITY_ORDER = {'🔥 CRÍTICA': 4, '🚨 ALTA': 3, '⚠️ MÉDIA': 2, '✅ BAIXA': 1};
+
+const SLACK_COUNTS = [
+    ['co_sell_missing', 'Co-Sell Missing'],
+    ['stage_ahead', 'Stage à Frente'],
+    ['partner_finalized', 'Partner Finalizou'],
+    ['eligible_share', 'Eligible to Share'],
+    ['close_date_soon', 'Close Date Próximo'],
+    ['no_partner_opportunities', 'Sem Parceiro'],
+    ['zero_amount_opportunities', 'Valor Zero'],
+    ['shared_not_accepted', 'Rejeitadas']
+];
+
+// Cabeçalho da tabela; as linhas vêm prontas do módulo do relatório
+const DELIVERY_HEADERS = ['ID Oportunidade', 'Nome da Oportunidade', 'Cliente', 'Parceiro', 'Stage',
+    'Delivery Model Atual', 'Contato', 'Email', 'Ação'];
+
+// Versão texto sem HTML dos hyperlinks para cópia
+function stripLinks(body) {
+    return body.replace(/<a href="[^"]*" target="_blank">([^<]*)<\/a>/g, '$1');
+}
+
+function cell(value) {
+    return value === null || value === undefined ? 'N/A' : escapeHtml(value);
+}
+
+// Como cada aba lista e renderiza seus itens; o índice do item é o documento do índice de busca
+const REPORT_VIEWS = {
+    delivery_model: {
+        placeholder: 'Buscar por oportunidade, cliente, parceiro ou contato...',
+        items: data => data.rows,
+        layout: () => `
+            <table class="view-table">
+                <thead><tr>${DELIVERY_HEADERS.map(label => `<th>${label}</th>`).join('')}</tr></thead>
+                <tbody class="view-list"></tbody>
+            </table>`,
+        render: row => row
+    },
+
+    pipeline_hygiene: {
+        placeholder: 'Buscar por nome, email, empresa, ID ou regra...',
+        // Um item por email, na ordem do gerador (empresa a empresa)
+        items: data => data.companies.flatMap(company => company.emails.map(email => ({company, email}))),
+        group: item => item.company,
+        renderGroup: (item, index) => {
+            const company = item.company;
+            const consolidated = company.consolidated;
+            const actions = consolidated ? `
+                    <button class="view-btn" data-action="copy" data-index="${index}" data-consolidated="1">📋 Copiar consolidado</button>
+                    <button class="view-btn" data-action="send" data-index="${index}" data-consolidated="1">📧 Enviar consolidado</button>
+                    <button class="view-btn" data-action="outlook" data-index="${index}" data-consolidated="1">🎨 Outlook (${consolidated.opportunities_count} opps)</button>` : '';
+            return `
+                <div class="view-group">
+                    <span>${escapeHtml(company.name)} <small>(${company.emails.length} emails)</small></span>
+                    <span>${actions}</span>
+                </div>`;
+        },
+        render: (item, index) => {
+            const email = item.email;
+            const english = email.english ? `
+                    <button class="view-btn" data-action="copy" data-index="${index}" data-lang="en">📋 Copy EN</button>
+                    <button class="view-btn" data-action="send" data-index="${index}" data-lang="en">📧 Send EN</button>
+                    <button class="view-btn" data-action="outlook" data-index="${index}" data-lang="en">🎨 Outlook EN</button>` : '';
+            return `
+                <div class="view-card">
+                    <div class="view-card-title">${escapeHtml(email.contact_name)}</div>
+                    <div class="view-card-subtitle">${escapeHtml(email.to_email)}</div>
+                    <div class="view-card-meta">Oportunidades: <strong>${email.opportunities_count}</strong> · ID #${String(email.id).padStart(3, '0')}</div>
+                    <div class="view-actions">
+                        <button class="view-btn" data-action="copy" data-index="${index}">📋 Copiar</button>
+                        <button class="view-btn" data-action="send" data-index="${index}">📧 Enviar</button>
+                        <button class="view-btn" data-action="outlook" data-index="${index}">🎨 Outlook</button>${english}
+                    </div>
+                </div>`;
+        },
+        action: (target, item) => {
+            let email = item.email;
+            if (target.dataset.consolidated) {
+                email = item.company.consolidated;
+            } else if (target.dataset.lang === 'en') {
+                email = email.english;
+            }
+            const body = target.dataset.consolidated ? email.body : stripLinks(email.body);
+            switch (target.dataset.action) {
+                case 'copy':
+                    copyText(`Para: ${email.to_email}\nAssunto: ${email.subject}\n\n${body}`, target);
+                    break;
+                case 'send':
+                    window.location.href = mailtoUrl(email.to_email, email.subject, email.body);
+                    break;
+                case 'outlook':
+                    downloadFile(`temp_emails/${email.eml}`, target);
+                    break;
+            }
+        }
+    },
+
+    slack_interface: {
+        placeholder: 'Buscar por AM, regra ou ID de oportunidade...',
+        items: data => data.messages,
+        // Prioridade crítica primeiro (ordenação estável)
+        order: items => items.map((item, index) => index)
+            .sort((a, b) => (PRIORITY_ORDER[items[b].priority] || 0) - (PRIORITY_ORDER[items[a].priority] || 0)),
+        render: (message, index) => {
+            const counts = SLACK_COUNTS.filter(([key]) => message[key] > 0)
+                .map(([key, label]) => `<span class="view-count-item">${label}: <strong>${message[key]}</strong></span>`);
+            return `
+                <div class="view-card">
+                    <div class="view-card-title">${escapeHtml(message.am_name)} <span class="view-badge">${escapeHtml(message.priority)}</span></div>
+                    <div class="view-card-subtitle">📧 ${escapeHtml(message.slack_id)}</div>
+                    <div class="view-card-meta">Total de ações: <strong>${message.total_actions}</strong> · Partners: <strong>${message.partners_count}</strong></div>
+                    <div class="view-card-meta">${counts.join(' ')}</div>
+                    <div class="view-actions">
+                        <button class="view-btn" data-action="copy" data-index="${index}">📋 Copiar mensagem</button>
+                    </div>
+                </div>`;
+        },
+        // Negrito do Markdown para o formato do Slack
+        action: (target, message) => copyText(message.body.replace(/\*\*(.+?)\*\*/g, '*$1*'), target)
+    },
+
+    followup_emails: {
+        placeholder: 'Buscar por parceiro, email, empresa, AM ou ID...',
+        items: data => data.emails,
+        render: (email, index) => `
+                <div class="view-card">
+                    <div class="view-card-title">${escapeHtml(email.partner_name)}</div>
+                    <div class="view-card-subtitle">${escapeHtml(email.to_email)}</div>
+                    <div class="view-card-meta">Oportunidades: <strong>${email.opportunities_count}</strong> · Urgentes: <strong>${email.urgent_count}</strong> · Alto valor: <strong>${email.high_value_count}</strong></div>
+                    <div class="view-actions">
+                        <button class="view-btn" data-action="copy" data-index="${index}">📋 Copiar</button>
+                        <button class="view-btn" data-action="send" data-index="${index}">✉️ Enviar follow-up</button>
+                    </div>
+                </div>`,
+        action: (target, email) => {
+            if (target.dataset.action === 'send') {
+                window.location.href = mailtoUrl(email.to_email, email.subject, email.body);
+            } else {
+                copyText(`Para: ${email.to_email}\nAssunto: ${email.subject}\n\n${email.body}`, target);
+            }
+        }
+    },
+
+    // Sem página própria: renderizada por createTrendView
+    history_trends: {
+        create: createTrendView
+    }
+};
+
+const TREND_DIMENSIONS = [
+    ['rule', 'Regra'],
+    ['owner', 'Account Manager'],
+    ['partner', 'Parceiro']
+];
+
+// Série como polyline de um SVG (escala pelo máximo da própria série ou `max`)
+function trendPoints(values, width, height, max) {
+    max = Math.max(1, max || 0, ...values);
+    const step = values.length > 1 ? width / (values.length - 1) : 0;
+    return values.map((value, index) => `${(index * step).toFixed(1)},${(height - value / max * (height - 2) - 1).toFixed(1)}`).join(' ');
+}
+
+function sparkline(values) {
+    return `<svg class="trend-spark" width="120" height="28" viewBox="0 0 120 28"><polyline points="${trendPoints(values, 120, 28)}"/></svg>`;
+}
+
+function days(value) {
+    return value === null || value === undefined ? 'N/A' : `${value} d`;
+}
+
+function trendTable(rows, data) {
+    return `
+        <table class="view-table">
+            <thead><tr><th>Valor</th><th>Tendência</th><th>Abertas</th><th>Oportunidades</th><th>Abertas há +${data.aged_days} dias</th><th>Idade média</th><th>Resolvidas</th><th>Tempo médio até resolver</th></tr></thead>
+            <tbody>${rows.map(row => `
+                <tr>
+                    <td>${row.value ? escapeHtml(row.value) : 'N/A'}</td>
+                    <td>${sparkline(row.findings)}</td>
+                    <td><strong>${row.open}</strong></td>
+                    <td>${row.opportunities}</td>
+                    <td class="${row.aged ? 'trend-aged' : ''}">${row.aged}</td>
+                    <td>${days(row.avg_age_days)}</td>
+                    <td>${row.resolved}</td>
+                    <td>${days(row.avg_resolution_days)}</td>
+                </tr>`).join('')}
+            </tbody>
+        </table>`;
+}
+
+function findingsTable(rows, columns) {
+    return `
+        <table class="view-table">
+            <thead><tr><th>Oportunidade</th><th>Regra</th><th>Owner</th><th>Parceiro</th>${columns.map(([, label]) => `<th>${label}</th>`).join('')}</tr></thead>
+            <tbody>${rows.map(row => `
+                <tr>
+                    <td>${cell(row.opportunity_name || row.opportunity_id)}<br><small>${cell(row.opportunity_id)}</small></td>
+                    <td>${cell(row.rule)}</td>
+                    <td>${cell(row.owner)}</td>
+                    <td>${cell(row.partner)}</td>
+                    ${columns.map(([key]) => `<td>${cell(row[key])}</td>`).join('')}
+                </tr>`).join('')}
+            </tbody>
+        </table>`;
+}
+
+// Tendências e aging: os dados já vêm agregados pelos rollups do histórico
+function createTrendView(body, spec, data) {
+    const total = data.total;
+    const max = Math.max(...total.findings, ...total.new_findings, ...total.resolved);
+    const last = data.dates.length - 1;
+
+    body.innerHTML = `
+        <div class="trend-section">
+            <h3>Sinalizações abertas por execução (${data.dates.length} datas)</h3>
+            <svg class="trend-chart" viewBox="0 0 800 160" preserveAspectRatio="none">
+                <polyline points="${trendPoints(total.findings, 800, 160, max)}"/>
+                <polyline class="trend-new" points="${trendPoints(total.new_findings, 800, 160, max)}"/>
+                <polyline class="trend-resolved" points="${trendPoints(total.resolved, 800, 160, max)}"/>
+            </svg>
+            <div class="trend-legend">
+                <span>${escapeHtml(data.dates[0])}</span>
+                <span>Abertas: <strong>${total.findings[last]}</strong> · <span class="trend-new">Novas: ${total.new_findings[last]}</span> · <span class="trend-resolved">Resolvidas: ${total.resolved[last]}</span></span>
+                <span>${escapeHtml(data.dates[last])}</span>
+            </div>
+        </div>
+        <div class="trend-section">
+            <div class="trend-tabs">${TREND_DIMENSIONS.map(([key, label], index) =>
+                `<button class="view-btn ${index ? '' : 'active'}" data-dimension="${key}">${label}</button>`).join('')}</div>
+            <div class="trend-dimension"></div>
+        </div>
+        <div class="trend-section">
+            <h3>Abertas há mais tempo</h3>
+            ${findingsTable(data.open, [['first_seen', 'Desde'], ['days_open', 'Dias aberta']])}
+        </div>
+        <div class="trend-section">
+            <h3>Resolvidas recentemente</h3>
+            ${findingsTable(data.resolved, [['first_seen', 'Desde'], ['resolved_on', 'Resolvida em'], ['days_to_resolve', 'Dias até resolver']])}
+        </div>`;
+
+    const dimension = body.querySelector('.trend-dimension');
+    const show = key => {
+        dimension.innerHTML = trendTable(data.dimensions[key] || [], data);
+        body.querySelectorAll('[data-dimension]').forEach(button => button.classList.toggle('active', button.dataset.dimension === key));
+    };
+    body.querySelector('.trend-tabs').addEventListener('click', event => {
+        const button = event.target.closest('[data-dimension]');
+        if (button) {
+            show(button.dataset.dimension);
+        }
+    });
+    show(TREND_DIMENSIONS[0][0]);
+}
+
+// Lista com busca pelo índice pré-calculado e renderização por lotes
+function createListView(body, spec, data) {
+    const items = spec.items(data);
+    const order = spec.order ? spec.order(items) : items.map((item, index) => index);
+    let visible = order;
+    let rendered = 0;
+    let lastGroup = null;
+    let filterTimer = null;
+
+    body.innerHTML = `
+        <div class="view-toolbar">
+            <input type="text" class="view-search" placeholder="🔍 ${spec.placeholder}">
+            <span class="view-total"></span>
+        </div>
+        ${spec.layout ? spec.layout(data) : '<div class="view-list view-grid"></div>'}
+        <div class="view-sentinel"></div>`;
+
+    const list = body.querySelector('.view-list');
+    const sentinel = body.querySelector('.view-sentinel');
+    const total = body.querySelector('.view-total');
+
+    function appendBatch() {
+        const html = [];
+        visible.slice(rendered, rendered + VIEW_BATCH_SIZE).forEach(index => {
+            const item = items[index];
+            if (spec.group && spec.group(item) !== lastGroup) {
+                lastGroup = spec.group(item);
+                html.push(spec.renderGroup(item, index));
+            }
+            html.push(spec.render(item, index, data));
+        });
+        list.insertAdjacentHTML('beforeend', html.join(''));
+        rendered = Math.min(rendered + VIEW_BATCH_SIZE, visible.length);
+
+        const remaining = visible.length - rendered;
+        sentinel.textContent = remaining > 0 ? `⏳ Carregando mais ${remaining}...` : '';
+        if (observer) {
+            // Observar de novo reavalia o sentinela, mesmo se ele continuar visível
+            observer.unobserve(sentinel);
+            if (remaining > 0) {
+                observer.observe(sentinel);
+            }
+        }
+    }
+
+    function reset() {
+        list.innerHTML = '';
+        rendered = 0;
+        lastGroup = null;
+        total.textContent = `${visible.length} de ${items.length}`;
+        appendBatch();
+        if (!observer) {
+            while (rendered < visible.length) {
+                appendBatch();
+            }
+        }
+    }
+
+    const observer = 'IntersectionObserver' in window ? new IntersectionObserver(entries => {
+        if (entries.some(entry => entry.isIntersecting)) {
+            appendBatch();
+        }
+    }, { rootMargin: '600px 0px' }) : null;
+
+    body.querySelector('.view-search').addEventListener('input', event => {
+        clearTimeout(filterTimer);
+        filterTimer = setTimeout(() => {
+            const matches = searchIndex(data.search, event.target.value);
+            visible = matches === null ? order : order.filter(index => matches.has(index));
+            reset();
+        }, 150);
+    });
+
+    list.addEventListener('click', event => {
+        const target = event.target.closest('[data-action]');
+        if (target && spec.action) {
+            event.preventDefault();
+            spec.action(target, items[target.dataset.index], data);
+        }
+    });
+
+    reset();
+}
+
+// Página completa em iframe (relatório sem módulo de dados)
+function showPage(body, page) {
+    body.innerHTML = `<iframe class="iframe-content" src="${escapeHtml(page)}"></iframe>`;
+}
+
+function initView(view) {
+    const body = view.querySelector('.report-body');
+    if (!view.dataset.module) {
+        showPage(body, view.dataset.page);
+        return;
+    }
+
+    body.innerHTML = '<div class="view-sentinel">⏳ Carregando dados...</div>';
+    loadReportData(view.dataset.name, view.dataset.module).then(data => {
+        const spec = REPORT_VIEWS[view.dataset.report];
+        (spec.create || createListView)(body, spec, data);
+    }).catch(() => {
+        if (view.dataset.page) {
+            showPage(body, view.dataset.page);
+        } else {
+            body.innerHTML = '<div class="view-sentinel">⚠️ Dados indisponíveis</div>';
+        }
+    });
+}
+
+function openReport(reportId) {
+    const view = document.getElementById(`view-${reportId}`);
+    if (!view) {
+        return;
+    }
+
+    // Abas já abertas ficam renderizadas: trocar de aba só alterna a visibilidade
+    document.querySelectorAll('.report-view').forEach(other => other.classList.toggle('active', other === view));
+    document.querySelectorAll('.nav-card').forEach(card => card.classList.toggle('selected', card.dataset.report === reportId));
+
+    if (!view.dataset.initialized) {
+        view.dataset.initialized = '1';
+        initView(view);
+    }
+    view.scrollIntoView({ behavior: 'smooth' });
+}
+
+function closeReport(reportId) {
+    const view = document.getElementById(`view-${reportId}`);
+    if (view) {
+        view.classList.remove('active');
+        document.querySelectorAll('.nav-card').forEach(card => card.classList.remove('selected'));
+
+        // Scroll de volta para o topo
+        document.querySelector('.navigation').scrollIntoView({ behavior: 'smooth' });
+    }
+}
+
+function copyText(text, button) {
+    const done = () => {
+        const originalText = button.innerHTML;
+        button.innerHTML = '✅ Copiado!';
+        setTimeout(() => {
+            button.innerHTML = originalText;
+        }, 2000);
+    };
+
+    if (navigator.clipboard && window.isSecureContext) {
+        navigator.clipboard.writeText(text).then(done).catch(() => fallbackCopy(text, done));
+    } else {
+        fallbackCopy(text, done);
+    }
+}
+
+function fallbackCopy(text, done) {
+    const textArea = document.createElement('textarea');
+    textArea.value = text;
+    textArea.style.position = 'fixed';
+    textArea.style.left = '-999999px';
+    document.body.appendChild(textArea);
+    textArea.select();
+
+    try {
+        document.execCommand('copy');
+        done();
+    } catch (err) {
+        alert('Erro ao copiar. Tente manualmente.');
+    }
+
+    document.body.removeChild(textArea);
+}
+
+// Baixa o .eml para abrir no Outlook
+function downloadFile(path, button) {
+    const link = document.createElement('a');
+    link.href = path;
+    link.download = path.split('/').pop();
+    document.body.appendChild(link);
+    link.click();
+    document.body.removeChild(link);
+
+    const originalText = button.innerHTML;
+    button.innerHTML = '✅ Arquivo baixado!';
+    setTimeout(() => {
+        button.innerHTML = originalText;
+    }, 2500);
+}
+
+// Inicialização
+document.addEventListener('DOMContentLoaded', function() {
+    document.querySelector('.navigation').addEventListener('click', event => {
+        const card = event.target.closest('.nav-card[data-report]');
+        if (card) {
+            event.preventDefault();
+            openReport(card.dataset.report);
+        }
+    });
+
+    document.querySelectorAll('[data-close]').forEach(button => {
+        button.addEventListener('click', () => closeReport(button.dataset.close));
+    });
+
+    console.log('Dashboard carregado com ' + document.querySelectorAll('.report-view').length + ' relatórios disponíveis');
+});
@@ -0,0 +1,103 @@
+// Tabela paginada: só as linhas da página atual ficam no DOM
+let tableData = null;
+let visibleRows = [];
+let currentPage = 0;
+let sortColumn = null;
+let sortDescending = false;
+let filterTimer = null;
+
+const FILTER_KEYS = ['partner', 'stage', 'delivery_model'];
+
+function applyFilters() {
+    const query = document.getElementById('filter-search').value;
+    const matches = searchIndex(tableData.search, query);
+    const selected = FILTER_KEYS
+        .map(key => [tableData.filters[key].codes, document.getElementById(`filter-${key}`).value])
+        .filter(([, value]) => value !== '')
+        .map(([codes, value]) => [codes, Number(value)]);
+
+    let order = sortColumn === null ? tableData.rows.map((row, index) => index) : tableData.sort[sortColumn];
+    if (sortDescending) {
+        order = order.slice().reverse();
+    }
+
+    visibleRows = order.filter(row =>
+        (matches === null || matches.has(row)) && selected.every(([codes, code]) => codes[row] === code)
+    );
+    currentPage = 0;
+    renderPage();
+}
+
+function renderPage() {
+    const pageSize = tableData.page_size;
+    const pageCount = Math.max(1, Math.ceil(visibleRows.length / pageSize));
+    const start = currentPage * pageSize;
+
+    document.getElementById('report-rows').innerHTML = visibleRows
+        .slice(start, start + pageSize)
+        .map(row => tableData.rows[row])
+        .join('');
+
+    document.getElementById('page-info').textContent = visibleRows.length === 0
+        ? 'Nenhuma oportunidade encontrada'
+        : `Página ${currentPage + 1} de ${pageCount} · ${visibleRows.length} de ${tableData.rows.length} oportunidades`;
+    document.getElementById('page-prev').disabled = currentPage === 0;
+    document.getElementById('page-next').disabled = currentPage >= pageCount - 1;
+}
+
+function changePage(step) {
+    currentPage += step;
+    renderPage();
+    document.querySelector('table').scrollIntoView({ behavior: 'smooth' });
+}
+
+// Clique no cabeçalho: crescente, decrescente, ordem original
+function toggleSort(header) {
+    const column = Number(header.dataset.sort);
+    if (sortColumn !== column) {
+        sortColumn = column;
+        sortDescending = false;
+    } else if (!sortDescending) {
+        sortDescending = true;
+    } else {
+        sortColumn = null;
+    }
+
+    document.querySelectorAll('th[data-sort]').forEach(th => {
+        th.classList.toggle('sorted-asc', sortColumn === Number(th.dataset.sort) && !sortDescending);
+        th.classList.toggle('sorted-desc', sortColumn === Number(th.dataset.sort) && sortDescending);
+    });
+    applyFilters();
+}
+
+function fillFilter(key) {
+    const filter = tableData.filters[key];
+    const counts = new Array(filter.labels.length).fill(0);
+    filter.codes.forEach(code => counts[code]++);
+
+    const select = document.getElementById(`filter-${key}`);
+    select.insertAdjacentHTML('beforeend', filter.labels
+        .map((label, code) => `<option value="${code}">${escapeHtml(label)} (${counts[code]})</option>`)
+        .join(''));
+    select.addEventListener('change', applyFilters);
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+    pageData('delivery_model_report').then(data => {
+        tableData = data;
+        FILTER_KEYS.forEach(fillFilter);
+
+        document.getElementById('filter-search').addEventListener('input', () => {
+            clearTimeout(filterTimer);
+            filterTimer = setTimeout(applyFilters, 150);
+        });
+        document.querySelectorAll('th[data-sort]').forEach(th => {
+            th.addEventListener('click', () => toggleSort(th));
+        });
+        document.getElementById('page-prev').addEventListener('click', () => changePage(-1));
+        document.getElementById('page-next').addEventListener('click', () => changePage(1));
+
+        applyFilters();
+        console.log('Delivery Model Report carregado com ' + tableData.rows.length + ' oportunidades');
+    });
+});
@@ -0,0 +1,117 @@
+let emailsData = [];
+let emailCards = [];
+let searchIndexData = null;
+let filterTimer = null;
+
+function renderEmailCard(email, index) {
+    const contacts = email.to_emails_list.length;
+    const contactCount = contacts > 1 ? `<div class="email-count">📧 ${contacts} contatos</div>` : '';
+    return `
+                <div class="email-card">
+                    <div class="email-header">
+                        <div class="partner-name">${escapeHtml(email.partner_name)}</div>
+                        <div class="email-address">${escapeHtml(email.to_email)}</div>
+                        ${contactCount}
+                    </div>
+
+                    <div class="email-stats">
+                        <div class="stat-badge">
+                            <div class="number">${email.opportunities_count}</div>
+                            <div class="label">Oportunidades</div>
+                        </div>
+                        <div class="stat-badge">
+                            <div class="number ${email.urgent_count > 0 ? 'urgent' : ''}">${email.urgent_count}</div>
+                            <div class="label">Urgentes</div>
+                        </div>
+                        <div class="stat-badge">
+                            <div class="number ${email.high_value_count > 0 ? 'high-value' : ''}">${email.high_value_count}</div>
+                            <div class="label">Alto Valor</div>
+                        </div>
+                    </div>
+
+                    <div class="button-group">
+                        <button onclick="copyEmailData(${index}, this)" class="copy-button">
+                            📋 Copiar Dados do Email
+                        </button>
+                        <a href="${escapeHtml(mailtoUrl(email.to_email, email.subject, email.body))}" class="email-button">
+                            ✉️ Enviar Follow-up (${email.opportunities_count} oportunidades)
+                        </a>
+                    </div>
+                </div>`;
+}
+
+function showCopySuccess(button) {
+    button.textContent = '✅ Copiado!';
+    button.classList.add('copy-success');
+
+    setTimeout(() => {
+        button.textContent = '📋 Copiar Dados do Email';
+        button.classList.remove('copy-success');
+    }, 2000);
+}
+
+function copyEmailData(index, button) {
+    const email = emailsData[index];
+    const emailData = `Para: ${email.to_email}\nAssunto: ${email.subject}\n\n${email.body}`;
+
+    if (navigator.clipboard) {
+        navigator.clipboard.writeText(emailData).then(function() {
+            showCopySuccess(button);
+        }).catch(function() {
+            fallbackCopy(emailData, button);
+        });
+    } else {
+        fallbackCopy(emailData, button);
+    }
+}
+
+function fallbackCopy(text, button) {
+    const textArea = document.createElement('textarea');
+    textArea.value = text;
+    document.body.appendChild(textArea);
+    textArea.select();
+
+    try {
+        document.execCommand('copy');
+        showCopySuccess(button);
+    } catch (err) {
+        alert('Erro ao copiar. Use Ctrl+C manualmente.');
+    }
+
+    document.body.removeChild(textArea);
+}
+
+function filterEmails() {
+    clearTimeout(filterTimer);
+    filterTimer = setTimeout(() => {
+        if (!searchIndexData) {
+            return;
+        }
+        const searchInput = document.querySelector('.search-input');
+        const matches = searchIndex(searchIndexData, searchInput.value);
+
+        // Uma passada pelos cards, na ordem dos documentos do índice
+        emailCards.forEach((card, doc) => {
+            card.style.display = matches === null || matches.has(doc) ? 'block' : 'none';
+        });
+
+        // Contador de emails visíveis
+        if (matches !== null) {
+            searchInput.placeholder = `🔍 Mostrando ${matches.size} de ${emailCards.length} parceiros...`;
+        } else {
+            searchInput.placeholder = '🔍 Buscar por parceiro, email, empresa, AM ou ID...';
+        }
+    }, 150);
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+    pageData('followup_emails').then(data => {
+        emailsData = data.emails;
+        searchIndexData = data.search;
+
+        // Um card por email (na ordem dos documentos do índice)
+        const grid = document.querySelector('.emails-grid');
+        grid.innerHTML = emailsData.map(renderEmailCard).join('');
+        emailCards = Array.from(grid.children);
+    });
+});
@@ -0,0 +1,448 @@
+// Cards renderizados por lote quando a empresa se aproxima da área visível
+const CARD_BATCH_SIZE = 24;
+
+let companiesData = [];
+let searchIndexData = null;
+let searchMatches = null;  // Documentos encontrados (null = sem filtro)
+let filterTimer = null;
+let sectionObserver = null;
+let sentinelObserver = null;
+
+function createMailtoUrl(email) {
+    return 'mailto:' + quote(email.to_email) + '?subject=' + quote(email.subject) + '&body=' + quote(email.body);
+}
+
+// Versão texto sem HTML dos hyperlinks para cópia
+function stripLinks(body) {
+    return body.replace(/<a href="[^"]*" target="_blank">([^<]*)<\/a>/g, '$1');
+}
+
+function matchingEmails(company) {
+    const indexes = company.emails.map((email, index) => index);
+    if (searchMatches === null) {
+        return indexes;
+    }
+    return indexes.filter(index => searchMatches.has(company.emails[index].doc));
+}
+
+function renderCompanies() {
+    const container = document.getElementById('companies');
+    if (sectionObserver) {
+        sectionObserver.disconnect();
+        sentinelObserver.disconnect();
+    }
+    container.innerHTML = '';
+
+    const fragment = document.createDocumentFragment();
+    companiesData.forEach((company, companyIndex) => {
+        const emailIndexes = matchingEmails(company);
+        // Esconde empresas que não têm emails visíveis
+        if (searchMatches !== null && emailIndexes.length === 0) {
+            return;
+        }
+
+        const section = document.createElement('div');
+        section.className = 'company-section';
+        section.dataset.company = companyIndex;
+        section.innerHTML = `
+            <div class="company-header" onclick="toggleCompany(this)">
+                <span>${escapeHtml(company.name)}</span>
+                <span class="company-count">${company.emails.length} emails</span>
+            </div>
+            <div class="consolidated-slot"></div>
+            <div class="emails-grid"></div>
+            <div class="grid-sentinel"></div>`;
+        section.emailIndexes = emailIndexes;
+        section.renderedCount = 0;
+        fragment.appendChild(section);
+
+        if (sectionObserver) {
+            sectionObserver.observe(section);
+        }
+    });
+    container.appendChild(fragment);
+
+    // Sem IntersectionObserver renderiza tudo de uma vez
+    if (!sectionObserver) {
+        container.querySelectorAll('.company-section').forEach(section => {
+            fillSection(section);
+            while (section.renderedCount < section.emailIndexes.length) {
+                appendCards(section);
+            }
+        });
+    }
+}
+
+function fillSection(section) {
+    if (section.filled) {
+        return;
+    }
+    section.filled = true;
+
+    const companyIndex = section.dataset.company;
+    const company = companiesData[companyIndex];
+    if (company.consolidated) {
+        section.querySelector('.consolidated-slot').outerHTML = consolidatedHtml(company, companyIndex);
+    }
+    appendCards(section);
+}
+
+function appendCards(section) {
+    const companyIndex = section.dataset.company;
+    const company = companiesData[companyIndex];
+    const batch = section.emailIndexes.slice(section.renderedCount, section.renderedCount + CARD_BATCH_SIZE);
+
+    section.querySelector('.emails-grid').insertAdjacentHTML(
+        'beforeend',
+        batch.map(emailIndex => cardHtml(company.emails[emailIndex], companyIndex, emailIndex)).join('')
+    );
+    section.renderedCount += batch.length;
+
+    const sentinel = section.querySelector('.grid-sentinel');
+    const remaining = section.emailIndexes.length - section.renderedCount;
+    if (remaining > 0) {
+        sentinel.textContent = `⏳ Carregando mais ${remaining} emails...`;
+        if (sentinelObserver) {
+            // Observar de novo reavalia o sentinela, mesmo se ele continuar visível
+            sentinelObserver.unobserve(sentinel);
+            sentinelObserver.observe(sentinel);
+        }
+    } else {
+        sentinel.textContent = '';
+        if (sentinelObserver) {
+            sentinelObserver.unobserve(sentinel);
+        }
+    }
+}
+
+function consolidatedHtml(company, companyIndex) {
+    const email = company.consolidated;
+    const ref = `data-company="${companyIndex}"`;
+    return `
+        <div class="consolidated-email-section" style="background: #e8f4fd; padding: 15px 20px; border-bottom: 2px solid #0078d4;">
+            <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 10px;">
+                <div>
+                    <h3 style="color: #0078d4; margin: 0; font-size: 1.1em;">📧 Email Consolidado</h3>
+                    <p style="margin: 5px 0 0 0; color: #666; font-size: 0.9em;">
+                        Envie um único email para todos os ${company.emails.length} destinatários desta empresa
+                    </p>
+                </div>
+                <div class="buttons-row" style="justify-content: flex-end; gap: 8px;">
+                    <button data-action="copy" ${ref}
+                            class="btn btn-copy" style="min-width: 90px; padding: 10px 16px; font-size: 13px;">
+                        📋 Copiar
+                    </button>
+                    <a href="#" data-action="send" ${ref}
+                       class="btn btn-send" style="min-width: 90px; padding: 10px 16px; font-size: 13px;">
+                        📧 Enviar
+                    </a>
+                    <button data-action="outlook" ${ref}
+                            class="btn btn-outlook" style="min-width: 120px; padding: 10px 16px; font-size: 13px;">
+                        🎨 Outlook (${email.opportunities_count} opps)
+                    </button>
+                </div>
+            </div>
+            <div style="font-size: 0.85em; color: #666; margin-bottom: 15px;">
+                <strong>Para:</strong> ${escapeHtml(email.to_email)}<br>
+                <strong>Oportunidades:</strong> ${email.opportunities_count} de ${company.emails.length} emails individuais
+            </div>
+            <div style="background: white; padding: 15px; border-radius: 8px; border: 1px solid #ddd; max-height: 300px; overflow-y: auto;">
+                <h4 class="preview-toggle" data-action="preview" ${ref} style="color: #0078d4; margin: 0; font-size: 1em; cursor: pointer;">
+                    📋 Preview do Email <span class="preview-arrow">▸</span>
+                </h4>
+                <div class="preview-body" style="display: none; margin-top: 10px; font-family: monospace; font-size: 0.85em; line-height: 1.4; white-space: pre-line;"></div>
+            </div>
+        </div>`;
+}
+
+function cardHtml(email, companyIndex, emailIndex) {
+    const ref = `data-company="${companyIndex}" data-email="${emailIndex}"`;
+    let html = `
+            <div class="email-card">
+                <div class="email-header">
+                    <div class="contact-name">${escapeHtml(email.contact_name)}</div>
+                    <div class="email-address">${escapeHtml(email.to_email)}</div>
+                </div>
+                <div class="email-info">
+                    <div class="info-item">
+                        <span class="info-label">Oportunidades:</span>
+                        <span class="info-value">${email.opportunities_count}</span>
+                    </div>
+                    <div class="info-item">
+                        <span class="info-label">ID:</span>
+                        <span class="info-value">#${String(email.id).padStart(3, '0')}</span>
+                    </div>
+                </div>
+                <div class="email-actions-container">
+                    <!-- Seção Português -->
+                    <div class="language-group">
+                        <div class="language-header">🇧🇷 PORTUGUÊS</div>
+                        <div class="buttons-row">
+                            <button data-action="copy" ${ref} class="btn btn-copy">
+                                📋 Copiar
+                            </button>
+                            <a href="#" data-action="send" ${ref} class="btn btn-send">
+                                📧 Enviar
+                            </a>
+                            <button data-action="outlook" ${ref} class="btn btn-outlook">
+                                🎨 Outlook Beta
+                            </button>
+                        </div>
+                    </div>`;
+
+    if (email.english) {
+        html += `
+
+                    <!-- Seção English -->
+                    <div class="language-group">
+                        <div class="language-header">🇺🇸 ENGLISH</div>
+                        <div class="buttons-row">
+                            <button data-action="copy" data-lang="en" ${ref} class="btn btn-copy">
+                                📋 Copy
+                            </button>
+                            <a href="#" data-action="send" data-lang="en" ${ref} class="btn btn-send">
+                                📧 Send
+                            </a>
+                            <button data-action="outlook" data-lang="en" ${ref} class="btn btn-outlook">
+                                🎨 Outlook Beta
+                            </button>
+                        </div>
+                    </div>`;
+    }
+
+    return html + `
+                </div>
+            </div>`;
+}
+
+// Email referenciado por um botão (consolidado, português ou inglês)
+function getEmailForElement(element) {
+    const company = companiesData[element.dataset.company];
+    if (element.dataset.email === undefined) {
+        return company.consolidated;
+    }
+    const email = company.emails[element.dataset.email];
+    return element.dataset.lang === 'en' ? email.english : email;
+}
+
+// Corpos dos emails só são materializados em cópia, envio ou preview
+function handleAction(event) {
+    const target = event.target.closest('[data-action]');
+    if (!target) {
+        return;
+    }
+    event.preventDefault();
+
+    const email = getEmailForElement(target);
+    const isConsolidated = target.dataset.email === undefined;
+
+    switch (target.dataset.action) {
+        case 'copy':
+            copyEmailData(email.to_email, email.subject, isConsolidated ? email.body : stripLinks(email.body), target);
+            break;
+        case 'send':
+            window.location.href = createMailtoUrl(email);
+            break;
+        case 'outlook':
+            downloadAndOpenEmail(email.eml, target);
+            break;
+        case 'preview':
+            togglePreview(target, email);
+            break;
+    }
+}
+
+function togglePreview(toggle, email) {
+    const preview = toggle.parentElement.querySelector('.preview-body');
+    if (!preview.dataset.loaded) {
+        preview.innerHTML = email.body_html;
+        preview.dataset.loaded = '1';
+    }
+    const opening = preview.style.display === 'none';
+    preview.style.display = opening ? 'block' : 'none';
+    toggle.querySelector('.preview-arrow').textContent = opening ? '▾' : '▸';
+}
+
+function toggleCompany(header) {
+    const section = header.parentElement;
+    const grid = section.querySelector('.emails-grid');
+    const sentinel = section.querySelector('.grid-sentinel');
+
+    if (grid.style.display === 'none') {
+        grid.style.display = 'grid';
+        sentinel.style.display = 'block';
+        header.style.background = '#667eea';
+    } else {
+        grid.style.display = 'none';
+        sentinel.style.display = 'none';
+        header.style.background = '#95a5a6';
+    }
+}
+
+function filterEmails() {
+    clearTimeout(filterTimer);
+    filterTimer = setTimeout(() => {
+        if (searchIndexData) {
+            searchMatches = searchIndex(searchIndexData, document.querySelector('.search-input').value);
+            renderCompanies();
+        }
+    }, 150);
+}
+
+// Função para copiar dados do email (texto puro)
+function copyEmailData(to, subject, body, button) {
+    const emailData = `Para: ${to}
+Assunto: ${subject}
+
+${body}`;
+
+    // Tenta usar a API moderna de clipboard
+    if (navigator.clipboard && window.isSecureContext) {
+        navigator.clipboard.writeText(emailData).then(() => {
+            showCopySuccess(button);
+        }).catch(() => {
+            fallbackCopy(emailData, button);
+        });
+    } else {
+        fallbackCopy(emailData, button);
+    }
+}
+
+// Função para baixar e abrir arquivo .eml no Outlook
+function downloadAndOpenEmail(filename, button) {
+    const originalText = button.innerHTML;
+
+    // Feedback visual melhorado
+    button.classList.add('btn-loading');
+    button.innerHTML = '⏳ Preparando...';
+    button.disabled = true;
+
+    // Cria link para download do arquivo .eml
+    const emlPath = `temp_emails/${filename}`;
+    const link = document.createElement('a');
+    link.href = emlPath;
+    link.download = filename;
+    link.style.display = 'none';
+
+    document.body.appendChild(link);
+    link.click();
+    document.body.removeChild(link);
+
+    // Feedback de sucesso
+    setTimeout(() => {
+        button.classList.remove('btn-loading');
+        button.classList.add('btn-success');
+        button.innerHTML = '✅ Arquivo Criado!';
+    }, 800);
+
+    // Restaura botão após um tempo
+    setTimeout(() => {
+        button.classList.remove('btn-success');
+        button.innerHTML = originalText;
+        button.disabled = false;
+    }, 3000);
+
+    // Mostra instruções
+    setTimeout(() => {
+        alert('📧 Arquivo de email baixado!\n\n📋 Instruções:\n1. Localize o arquivo baixado (.eml)\n2. Clique duas vezes para abrir no Outlook\n3. O email abrirá com formatação colorida\n4. Revise e envie!');
+    }, 500);
+}
+
+// Fallback para navegadores mais antigos
+function fallbackCopy(text, button) {
+    const textArea = document.createElement('textarea');
+    textArea.value = text;
+    textArea.style.position = 'fixed';
+    textArea.style.left = '-999999px';
+    textArea.style.top = '-999999px';
+    document.body.appendChild(textArea);
+    textArea.focus();
+    textArea.select();
+
+    try {
+        document.execCommand('copy');
+        showCopySuccess(button);
+    } catch (err) {
+        alert('Erro ao copiar. Tente manualmente.');
+    }
+
+    document.body.removeChild(textArea);
+}
+
+// Mostra feedback visual de cópia bem-sucedida
+function showCopySuccess(button) {
+    const originalText = button.innerHTML;
+
+    // Feedback visual melhorado
+    button.classList.add('btn-success');
+    button.innerHTML = '✅ Copiado!';
+
+    // Pequena animação de sucesso
+    button.style.transform = 'scale(1.05)';
+
+    setTimeout(() => {
+        button.style.transform = 'scale(1)';
+    }, 200);
+
+    setTimeout(() => {
+        button.classList.remove('btn-success');
+        button.innerHTML = originalText;
+    }, 2500);
+}
+
+// Função para destacar emails consolidados
+function highlightConsolidatedEmails() {
+    const consolidatedSections = document.querySelectorAll('.consolidated-email-section');
+    consolidatedSections.forEach(section => {
+        section.style.animation = 'pulse 2s infinite';
+    });
+}
+
+// Inicializa com todas as seções abertas
+document.addEventListener('DOMContentLoaded', function() {
+    // Adiciona instruções para macOS
+    if (navigator.platform.indexOf('Mac') > -1) {
+        const header = document.querySelector('.header p');
+        header.innerHTML += '<br><small>💡 Para macOS: Certifique-se de que o Microsoft Outlook está instalado</small>';
+    }
+
+    document.getElementById('companies').addEventListener('click', handleAction);
+
+    if ('IntersectionObserver' in window) {
+        sectionObserver = new IntersectionObserver(entries => {
+            entries.forEach(entry => {
+                if (entry.isIntersecting) {
+                    sectionObserver.unobserve(entry.target);
+                    fillSection(entry.target);
+                }
+            });
+        }, { rootMargin: '800px 0px' });
+
+        sentinelObserver = new IntersectionObserver(entries => {
+            entries.forEach(entry => {
+                if (entry.isIntersecting) {
+                    appendCards(entry.target.parentElement);
+                }
+            });
+        }, { rootMargin: '800px 0px' });
+    }
+
+    pageData('pipeline_hygiene_emails').then(data => {
+        companiesData = data.companies;
+        searchIndexData = data.search;
+
+        // Documento do índice de busca de cada email (mesma ordem do gerador)
+        let doc = 0;
+        companiesData.forEach(company => company.emails.forEach(email => {
+            email.doc = doc++;
+        }));
+        console.log('Pipeline Hygiene HTML carregado com ' + doc + ' emails');
+        renderCompanies();
+
+        // Destaca seções com emails consolidados
+        const consolidatedCount = companiesData.filter(company => company.consolidated).length;
+        if (consolidatedCount > 0) {
+            console.log('📧 ' + consolidatedCount + ' empresas têm emails consolidados disponíveis');
+        }
+    });
+});
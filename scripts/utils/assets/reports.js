@@ -0,0 +1,86 @@
+// Dados de cada relatório, registrados pelos módulos data/<relatorio>.js
+const reportData = {};
+const reportLoads = {};
+
+// Com encoding 'gzip+base64' o módulo traz o JSON compactado (PIPELINE_HTML_GZIP_DATA)
+function registerReportData(name, data, encoding) {
+    if (encoding !== 'gzip+base64') {
+        reportData[name] = Promise.resolve(data);
+        return;
+    }
+    const bytes = Uint8Array.from(atob(data), c => c.charCodeAt(0));
+    const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+    reportData[name] = new Response(stream).text().then(JSON.parse);
+}
+
+// Injeta o módulo de dados uma única vez (funciona também em file://)
+function loadReportData(name, src) {
+    if (!reportLoads[name]) {
+        reportLoads[name] = new Promise((resolve, reject) => {
+            const script = document.createElement('script');
+            script.src = src;
+            script.onload = () => (name in reportData ? resolve(reportData[name]) : reject(new Error(src)));
+            script.onerror = () => reject(new Error(src));
+            document.head.appendChild(script);
+        });
+    }
+    return reportLoads[name];
+}
+
+// Dados da própria página (o <script> do módulo roda antes de DOMContentLoaded)
+function pageData(name) {
+    return reportData[name] || Promise.reject(new Error(name));
+}
+
+function escapeHtml(value) {
+    return String(value).replace(/[&<>"']/g, c => ({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'})[c]);
+}
+
+// Mesmo resultado de urllib.parse.quote
+function quote(value) {
+    return encodeURIComponent(value)
+        .replace(/[!'()*]/g, c => '%' + c.charCodeAt(0).toString(16).toUpperCase())
+        .replace(/%2F/g, '/');
+}
+
+function mailtoUrl(to, subject, body) {
+    return 'mailto:' + quote(to) + '?subject=' + quote(subject) + '&body=' + quote(body);
+}
+
+function normalizeSearchText(text) {
+    return text.toLowerCase().normalize('NFD').replace(/[\u0300-\u036f]/g, '');
+}
+
+// Documentos que casam com todos os termos da consulta (null = consulta vazia)
+function searchIndex(index, query) {
+    const terms = normalizeSearchText(query).split(/[^\p{L}\p{N}_]+/u).filter(Boolean);
+    if (terms.length === 0) {
+        return null;
+    }
+
+    let result = null;
+    for (const term of terms) {
+        // Primeiro termo do índice >= termo digitado
+        let low = 0;
+        let high = index.terms.length;
+        while (low < high) {
+            const middle = (low + high) >> 1;
+            if (index.terms[middle] < term) {
+                low = middle + 1;
+            } else {
+                high = middle;
+            }
+        }
+
+        const matches = new Set();
+        for (let position = low; position < index.terms.length && index.terms[position].startsWith(term); position++) {
+            index.postings[position].forEach(doc => matches.add(doc));
+        }
+
+        result = result === null ? matches : new Set([...result].filter(doc => matches.has(doc)));
+        if (result.size === 0) {
+            break;
+        }
+    }
+    return result;
+}
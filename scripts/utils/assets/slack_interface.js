@@ -0,0 +1,146 @@
+let messagesData = [];
+let messageCards = [];
+let searchIndexData = null;
+let filterTimer = null;
+
+const PRIORITY_ORDER = {'🔥 CRÍTICA': 4, '🚨 ALTA': 3, '⚠️ MÉDIA': 2, '✅ BAIXA': 1};
+
+// Contadores exibidos em cada card: campo da mensagem e rótulo
+const ACTION_COUNTS = [
+    ['co_sell_missing', 'Co-Sell Missing'],
+    ['stage_ahead', 'Stage à Frente'],
+    ['partner_finalized', 'Partner Finalizou'],
+    ['eligible_share', 'Eligible to Share'],
+    ['close_date_soon', 'Close Date Próximo'],
+    ['no_partner_opportunities', 'Sem Parceiro'],
+    ['zero_amount_opportunities', 'Valor Zero'],
+    ['shared_not_accepted', 'Rejeitadas']
+];
+
+function filterMessages() {
+    clearTimeout(filterTimer);
+    filterTimer = setTimeout(() => {
+        if (!searchIndexData) {
+            return;
+        }
+        const matches = searchIndex(searchIndexData, document.querySelector('.search-input').value);
+
+        // Uma passada pelos cards, na ordem dos documentos do índice
+        messageCards.forEach((card, doc) => {
+            card.style.display = matches === null || matches.has(doc) ? 'block' : 'none';
+        });
+    }, 150);
+}
+
+function renderMessageCard(message, index) {
+    const priorityClass = message.priority.toLowerCase().replace(/^\S+ /, '');
+    const counts = ACTION_COUNTS.map(([key, label]) => `
+                        <div class="action-item">
+                            <span class="action-label">${label}:</span>
+                            <span class="action-count ${message[key] === 0 ? 'zero' : ''}">${message[key]}</span>
+                        </div>`).join('');
+    return `
+                <div class="message-card">
+                    <div class="message-header">
+                        <div class="am-name">${escapeHtml(message.am_name)}</div>
+                        <div class="slack-id">📧 ${escapeHtml(message.slack_id)}</div>
+                        <div class="priority-badge priority-${priorityClass}">${escapeHtml(message.priority)}</div>
+                    </div>
+
+                    <div class="actions-summary">${counts}
+                        <div class="action-item">
+                            <span class="action-label">Total de Ações:</span>
+                            <span class="action-count">${message.total_actions}</span>
+                        </div>
+                        <div class="action-item">
+                            <span class="action-label">Partners:</span>
+                            <span class="action-count">${message.partners_count}</span>
+                        </div>
+                    </div>
+
+                    <div class="button-group">
+                        <button onclick="copySlackMessage(${index}, this)" class="copy-button" style="width: 100%;">
+                            📋 Clique para copiar o Email
+                        </button>
+                        <div class="slack-info">
+                            <small>📧 Enviar para: <strong>${escapeHtml(message.slack_id)}</strong></small>
+                        </div>
+                    </div>
+                </div>`;
+}
+
+function copySlackMessage(index, button) {
+    // Bold: **texto** → *texto* (formato do Slack)
+    const slackMessage = messagesData[index].body
+        .replace(/\*\*(.+?)\*\*/g, '*$1*')
+        .replace(/\r/g, '');
+
+    // Tenta usar a API moderna de clipboard
+    if (navigator.clipboard && window.isSecureContext) {
+        navigator.clipboard.writeText(slackMessage).then(() => {
+            showCopySuccess(button);
+
+            // Mostra instruções para o usuário
+            setTimeout(() => {
+                alert('✅ Mensagem copiada para clipboard!\n\n📱 Próximos passos:\n1. Abra o Slack manualmente\n2. Procure pelo AM ou abra o DM\n3. Cole a mensagem (Cmd+V / Ctrl+V)\n4. Revise e envie!');
+            }, 300);
+        }).catch((err) => {
+            console.error('Erro ao copiar:', err);
+            fallbackCopy(slackMessage, button);
+        });
+    } else {
+        fallbackCopy(slackMessage, button);
+    }
+}
+
+function fallbackCopy(text, button) {
+    const textArea = document.createElement('textarea');
+    textArea.value = text;
+    textArea.style.position = 'fixed';
+    textArea.style.left = '-999999px';
+    textArea.style.top = '-999999px';
+    document.body.appendChild(textArea);
+    textArea.focus();
+    textArea.select();
+
+    try {
+        document.execCommand('copy');
+        showCopySuccess(button);
+    } catch (err) {
+        alert('Erro ao copiar. Tente manualmente.');
+    }
+
+    document.body.removeChild(textArea);
+}
+
+function showCopySuccess(button) {
+    const originalText = button.innerHTML;
+    button.innerHTML = '✅ Copiado!';
+    button.classList.add('copy-success');
+
+    setTimeout(() => {
+        button.innerHTML = originalText;
+        button.classList.remove('copy-success');
+    }, 2000);
+}
+
+// Inicialização
+document.addEventListener('DOMContentLoaded', function() {
+    pageData('slack_interface').then(data => {
+        messagesData = data.messages;
+        searchIndexData = data.search;
+
+        // Um card por mensagem (na ordem dos documentos do índice)
+        const grid = document.querySelector('.messages-grid');
+        grid.innerHTML = messagesData.map(renderMessageCard).join('');
+        messageCards = Array.from(grid.children);
+
+        // Ordena cards por prioridade (crítica primeiro)
+        messageCards
+            .map((card, index) => index)
+            .sort((a, b) => (PRIORITY_ORDER[messagesData[b].priority] || 0) - (PRIORITY_ORDER[messagesData[a].priority] || 0))
+            .forEach(index => grid.appendChild(messageCards[index]));
+
+        console.log('Slack Interface carregada com ' + messagesData.length + ' mensagens');
+    });
+});
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Módulos de dados das interfaces HTML
+Em vez de repetir o conteúdo dos emails em atributos onclick e no HTML de
+cada card, o gerador grava os dados uma única vez em <resultados>/data/
+(write_data_module) e a página renderiza os cards sob demanda.
+
+A página inclui o arquivo com <script src> (data_module_tag) e a aba do
+dashboard carrega o mesmo arquivo só quando é aberta (loadReportData() em
+assets/reports.js); <script src> funciona também em file://, onde fetch() de
+JSON é bloqueado. Com PIPELINE_INLINE_ASSETS=1 o módulo é embutido na página,
+como os assets, para enviar o relatório isolado.
+
+PIPELINE_HTML_GZIP_DATA=1 grava o JSON compactado (gzip + base64); o
+navegador descompacta com DecompressionStream (Chrome 80+, Firefox 113+,
+Safari 16.4+).
+"""
+
+import base64
+import gzip
+import json
+import os
+from typing import Optional
+
+from precompressed import precompress_file
+from report_assets import inline_assets_enabled
+
+HTML_GZIP_DATA_ENV_VAR = 'PIPELINE_HTML_GZIP_DATA'
+
+DATA_DIR_NAME = 'data'
+
+
+def gzip_data_enabled() -> bool:
+    value = os.environ.get(HTML_GZIP_DATA_ENV_VAR, '').strip().lower()
+    return value in ('1', 'true', 'yes', 'on')
+
+
+def data_module_path(results_dir: str, name: str) -> str:
+    """Caminho do módulo de dados de um relatório (data/<name>.js)"""
+    return os.path.join(results_dir, DATA_DIR_NAME, f"{name}.js")
+
+
+def _module_script(name: str, data, compress: Optional[bool]) -> str:
+    """Chamada registerReportData(name, dados[, encoding]) definida em assets/reports.js"""
+    payload = json.dumps(data, ensure_ascii=False, separators=(',', ':'), default=str)
+    if compress is None:
+        compress = gzip_data_enabled()
+    if compress:
+        encoded = base64.b64encode(gzip.compress(payload.encode('utf-8'), mtime=0)).decode('ascii')
+        payload = f'"{encoded}", "gzip+base64"'
+    else:
+        # "</script>" ou "<!--" dentro do JSON encerrariam o script embutido
+        payload = payload.replace('</', '<\\/').replace('<!--', '\\u003c!--')
+    return f"registerReportData({json.dumps(name)}, {payload});\n"
+
+
+def _write_module(results_dir: str, name: str, script: str) -> str:
+    target = data_module_path(results_dir, name)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+
+    temp_path = f"{target}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(script)
+    os.replace(temp_path, target)
+    precompress_file(target)
+
+    return f"{DATA_DIR_NAME}/{name}.js"
+
+
+def write_data_module(results_dir: str, name: str, data, compress: Optional[bool] = None) -> str:
+    """
+    Grava os dados do relatório em data/<name>.js
+
+    Args:
+        results_dir: Diretório de resultados
+        name: Nome do relatório
+        data: Estrutura serializável em JSON
+        compress: Força (ou desativa) gzip + base64; None usa PIPELINE_HTML_GZIP_DATA
+
+    Returns:
+        Caminho relativo ao diretório de resultados
+    """
+    return _write_module(results_dir, name, _module_script(name, data, compress))
+
+
+def data_module_tag(results_dir: str, name: str, data) -> str:
+    """
+    Grava o módulo de dados e retorna a tag <script> que o carrega na página
+
+    Com PIPELINE_INLINE_ASSETS=1 o conteúdo vai embutido na tag.
+    """
+    script = _module_script(name, data, None)
+    path = _write_module(results_dir, name, script)
+    if inline_assets_enabled():
+        return f"<script>\n{script}</script>"
+    return f'<script src="{path}"></script>'
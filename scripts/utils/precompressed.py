@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Variantes pré-comprimidas (.gz) das saídas do pipeline
+Cada relatório HTML/TXT e cada .eml é gravado também como <arquivo>.gz
+(gzip de um único membro, sem nome nem data no cabeçalho). O ZIP de
+download copia o stream deflate desses arquivos direto para as entradas
+(utils/results_archive.py), sem comprimir os resultados de novo a cada
+download.
+
+Só o app Streamlit monta o ZIP de download, e ele liga as variantes com
+PIPELINE_PRECOMPRESS=1. Nas execuções pela linha de comando, em lote ou em
+modo watch, elas ficam desligadas por padrão: sem ZIP, gravá-las seria só
+custo a mais por execução.
+"""
+
+import gzip
+import os
+import shutil
+from typing import Optional
+
+PRECOMPRESS_ENV_VAR = 'PIPELINE_PRECOMPRESS'
+
+GZIP_SUFFIX = '.gz'
+
+# Mesmo nível padrão do ZIP_DEFLATED (zlib)
+GZIP_LEVEL = 6
+
+# Arquivos menores que isso não compensam compressão (ficam só em texto)
+MIN_PRECOMPRESS_SIZE = 512
+
+
+def precompress_enabled() -> bool:
+    value = os.environ.get(PRECOMPRESS_ENV_VAR, '').strip().lower()
+    return value in ('1', 'true', 'yes', 'on')
+
+
+def precompress_file(file_path: str) -> Optional[str]:
+    """
+    Grava <file_path>.gz ao lado do arquivo já salvo
+
+    Args:
+        file_path: Saída recém-gravada pelo gerador
+
+    Returns:
+        Caminho do .gz, ou None se desativado ou o arquivo for pequeno demais
+    """
+    gz_path = file_path + GZIP_SUFFIX
+
+    if not precompress_enabled() or os.path.getsize(file_path) < MIN_PRECOMPRESS_SIZE:
+        # Variante de uma execução anterior não corresponde mais ao arquivo
+        if os.path.exists(gz_path):
+            os.remove(gz_path)
+        return None
+
+    temp_path = f"{gz_path}.{os.getpid()}.tmp"
+    with open(file_path, 'rb') as source, open(temp_path, 'wb') as raw:
+        with gzip.GzipFile(filename='', mode='wb', fileobj=raw, compresslevel=GZIP_LEVEL, mtime=0) as target:
+            shutil.copyfileobj(source, target, 1024 * 1024)
+    os.replace(temp_path, gz_path)
+    return gz_path
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+CSS/JS compartilhados pelos relatórios HTML
+Os estilos e scripts ficam em scripts/utils/assets/ e são copiados uma vez
+para <resultados>/assets/ com o hash do conteúdo no nome
+(ex.: reports.3f2a9c1b7d4e.css). Todos os relatórios da execução referenciam
+os mesmos arquivos, então o navegador (e os iframes do dashboard) reaproveita
+o cache e cada HTML carrega só os seus dados.
+
+PIPELINE_INLINE_ASSETS=1 embute o conteúdo no próprio HTML (arquivo único,
+para enviar o relatório isolado).
+"""
+
+import hashlib
+import os
+from typing import Dict, Tuple
+
+from precompressed import precompress_file
+
+INLINE_ASSETS_ENV_VAR = 'PIPELINE_INLINE_ASSETS'
+
+ASSETS_SOURCE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'assets')
+ASSETS_DIR_NAME = 'assets'
+
+# Tamanho do hash no nome do arquivo
+HASH_LENGTH = 12
+
+# Conteúdo e nome publicado de cada asset já lido neste processo
+_assets: Dict[str, Tuple[str, str]] = {}
+
+
+def inline_assets_enabled() -> bool:
+    value = os.environ.get(INLINE_ASSETS_ENV_VAR, '').strip().lower()
+    return value in ('1', 'true', 'yes', 'on')
+
+
+def _load_asset(name: str) -> Tuple[str, str]:
+    """Conteúdo do asset e nome com hash (ex.: reports.3f2a9c1b7d4e.css)"""
+    if name not in _assets:
+        with open(os.path.join(ASSETS_SOURCE_DIR, name), 'r', encoding='utf-8') as f:
+            content = f.read()
+        digest = hashlib.sha256(content.encode('utf-8')).hexdigest()[:HASH_LENGTH]
+        stem, extension = os.path.splitext(name)
+        _assets[name] = (content, f"{stem}.{digest}{extension}")
+    return _assets[name]
+
+
+def publish_asset(results_dir: str, name: str) -> str:
+    """
+    Grava o asset em <results_dir>/assets/ (se ainda não existir)
+
+    Returns:
+        Caminho relativo ao diretório de resultados, para usar no HTML
+    """
+    content, hashed_name = _load_asset(name)
+    assets_dir = os.path.join(results_dir, ASSETS_DIR_NAME)
+    target = os.path.join(assets_dir, hashed_name)
+
+    # Mesmo hash = mesmo conteúdo: nada a fazer
+    if not os.path.exists(target):
+        os.makedirs(assets_dir, exist_ok=True)
+        temp_path = f"{target}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(temp_path, target)
+        precompress_file(target)
+
+    return f"{ASSETS_DIR_NAME}/{hashed_name}"
+
+
+def asset_tags(results_dir: str, *names: str) -> str:
+    """
+    Tags <link>/<script> para os assets informados (na ordem dada)
+
+    Args:
+        results_dir: Diretório onde o relatório HTML será salvo
+        names: Arquivos de scripts/utils/assets (.css ou .js)
+
+    Returns:
+        HTML das tags (ou o conteúdo embutido com PIPELINE_INLINE_ASSETS=1)
+    """
+    inline = inline_assets_enabled()
+    tags = []
+    for name in names:
+        is_css = name.endswith('.css')
+        if inline:
+            content = _load_asset(name)[0]
+            tags.append(f"<style>\n{content}</style>" if is_css else f"<script>\n{content}</script>")
+        else:
+            path = publish_asset(results_dir, name)
+            tags.append(f'<link rel="stylesheet" href="{path}">' if is_css else f'<script src="{path}"></script>')
+    return '\n    '.join(tags)
@@ -0,0 +1,769 @@
+#!/usr/bin/env python3
+"""
+Histórico das execuções em SQLite (results/history.sqlite3)
+O Action List Exporter grava no banco as oportunidades sinalizadas (uma
+linha por oportunidade e regra, lidas de action_items/) e as métricas dos
+módulos (run_metrics.json); ao final do pipeline update_run_stages completa
+as métricas com os módulos que rodaram depois dele. O banco fica fora das
+pastas de execução, então sobrevive à limpeza de results/.
+
+Consultas por oportunidade, AM, parceiro ou data usam os índices de
+findings em vez de reler os arquivos de results/.
+
+Na mesma transação são atualizados os rollups (update_rollups): períodos
+contínuos de cada (oportunidade, regra) em finding_spans e contagens por
+data, regra, AM e parceiro em rollup_daily. Tendências e tempo até a
+resolução são lidos desses rollups, sem agregar findings a cada consulta.
+
+Cada execução pertence ao escopo do seu export (PIPELINE_EXPORT_KEY, por
+padrão o nome do arquivo principal; no modo batch/watch, o nome sem os
+tokens de parceiro) e os rollups são consolidados por escopo: uma
+sinalização só é resolvida por uma execução do mesmo export, então exports
+de AMs ou territórios diferentes no mesmo dia não resolvem as sinalizações
+uns dos outros. Downloads do Salesforce (report<timestamp>.xls) mudam de
+nome a cada download e ficam no escopo compartilhado ('').
+
+PIPELINE_HISTORY_DB muda o caminho do banco (PIPELINE_HISTORY_DB=0 desativa).
+"""
+
+import json
+import os
+import re
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from run_metrics import load_run_metrics
+
+HISTORY_ENV_VAR = 'PIPELINE_HISTORY_DB'
+EXPORT_KEY_ENV_VAR = 'PIPELINE_EXPORT_KEY'
+HISTORY_FILENAME = 'history.sqlite3'
+
+# Nome gerado pelo Salesforce a cada download do relatório (report1755695670497.xls)
+SALESFORCE_DOWNLOAD_NAME = re.compile(r'^report\d+$')
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_HISTORY_PATH = os.path.join(ROOT_DIR, 'results', HISTORY_FILENAME)
+
+# Módulo cujo input_rows representa o tamanho do export (mesmo critério do modo batch)
+INPUT_ROWS_STAGE = 'Delivery Model Checker'
+
+# Execuções em paralelo (modo batch) esperam a vez de gravar
+BUSY_TIMEOUT_MS = 60_000
+
+# Sinalizações abertas há mais que isso contam como envelhecidas
+AGED_DAYS = 30
+
+# Janela e número de séries das tendências
+TREND_DAYS = 365
+TREND_TOP = 10
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    results_dir TEXT NOT NULL UNIQUE,
+    run_date TEXT NOT NULL,
+    recorded_at TEXT NOT NULL,
+    input_rows INTEGER,
+    total_findings INTEGER NOT NULL DEFAULT 0,
+    scope TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_runs_date ON runs (run_date);
+CREATE INDEX IF NOT EXISTS idx_runs_scope ON runs (scope, run_date);
+
+CREATE TABLE IF NOT EXISTS run_stages (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+    stage TEXT NOT NULL,
+    status TEXT,
+    wall_time_s REAL,
+    cpu_time_s REAL,
+    peak_memory_mb REAL,
+    input_rows INTEGER,
+    total_issues INTEGER,
+    metrics TEXT,
+    PRIMARY KEY (run_id, stage)
+);
+
+-- Dados descritivos ficam uma vez por oportunidade (os mais recentes)
+CREATE TABLE IF NOT EXISTS opportunities (
+    opportunity_id TEXT PRIMARY KEY,
+    apn_opportunity_identifier TEXT,
+    opportunity_name TEXT,
+    account_name TEXT
+);
+
+CREATE TABLE IF NOT EXISTS findings (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+    run_date TEXT NOT NULL,
+    module TEXT NOT NULL,
+    rule TEXT NOT NULL,
+    opportunity_id TEXT,
+    owner TEXT,
+    partner TEXT,
+    aws_stage TEXT,
+    partner_stage TEXT,
+    amount REAL
+);
+CREATE INDEX IF NOT EXISTS idx_findings_run ON findings (run_id);
+CREATE INDEX IF NOT EXISTS idx_findings_run_date ON findings (run_date);
+CREATE INDEX IF NOT EXISTS idx_findings_opportunity ON findings (opportunity_id, run_date);
+CREATE INDEX IF NOT EXISTS idx_findings_owner ON findings (owner, run_date);
+CREATE INDEX IF NOT EXISTS idx_findings_partner ON findings (partner, run_date);
+
+-- Rollups (update_rollups): datas já consolidadas de cada escopo
+CREATE TABLE IF NOT EXISTS rollup_scopes (
+    scope TEXT NOT NULL,
+    run_date TEXT NOT NULL,
+    runs INTEGER NOT NULL,
+    PRIMARY KEY (scope, run_date)
+);
+
+-- Períodos em que (oportunidade, regra) apareceu em todas as datas consecutivas
+-- do escopo; resolved_on é a primeira data seguinte do escopo sem a sinalização
+CREATE TABLE IF NOT EXISTS finding_spans (
+    scope TEXT NOT NULL,
+    opportunity_id TEXT NOT NULL,
+    rule TEXT NOT NULL,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    resolved_on TEXT,
+    run_dates INTEGER NOT NULL,
+    module TEXT,
+    owner TEXT,
+    partner TEXT,
+    PRIMARY KEY (scope, opportunity_id, rule, first_seen)
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_spans_open ON finding_spans (scope, opportunity_id, rule) WHERE resolved_on IS NULL;
+CREATE INDEX IF NOT EXISTS idx_spans_first_seen ON finding_spans (scope, first_seen);
+CREATE INDEX IF NOT EXISTS idx_spans_resolved ON finding_spans (scope, resolved_on);
+
+-- Contagens por escopo, data e valor da dimensão (total, rule, owner, partner)
+CREATE TABLE IF NOT EXISTS rollup_daily (
+    scope TEXT NOT NULL,
+    dimension TEXT NOT NULL,
+    value TEXT NOT NULL,
+    run_date TEXT NOT NULL,
+    findings INTEGER NOT NULL DEFAULT 0,
+    opportunities INTEGER NOT NULL DEFAULT 0,
+    new_findings INTEGER NOT NULL DEFAULT 0,
+    resolved INTEGER NOT NULL DEFAULT 0,
+    resolution_days INTEGER NOT NULL DEFAULT 0,
+    age_days INTEGER NOT NULL DEFAULT 0,
+    aged_findings INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (scope, dimension, value, run_date)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_rollup_date ON rollup_daily (scope, dimension, run_date);
+"""
+
+# Coluna de findings -> coluna da lista de ações
+FINDING_COLUMNS = {
+    'module': 'Module',
+    'rule': 'Rule',
+    'opportunity_id': 'Opportunity ID',
+    'owner': 'Owner',
+    'partner': 'Partner',
+    'aws_stage': 'AWS Stage',
+    'partner_stage': 'Partner Stage',
+    'amount': 'Total Opportunity Amount',
+}
+
+# Coluna de opportunities -> coluna da lista de ações
+OPPORTUNITY_COLUMNS = {
+    'opportunity_id': 'Opportunity ID',
+    'apn_opportunity_identifier': 'APN Opportunity Identifier',
+    'opportunity_name': 'Opportunity Name',
+    'account_name': 'Account Name',
+}
+
+# Campos aceitos como filtro nas consultas
+FILTER_FIELDS = ('opportunity_id', 'owner', 'partner', 'rule')
+
+# Dimensão do rollup -> expressão sobre finding_spans
+ROLLUP_DIMENSIONS = {
+    'total': "''",
+    'rule': 'rule',
+    'owner': "COALESCE(owner, '')",
+    'partner': "COALESCE(partner, '')",
+}
+
+
+def get_history_path() -> Optional[str]:
+    """Caminho do banco de histórico (None se desativado)"""
+    value = os.environ.get(HISTORY_ENV_VAR, '').strip()
+    if value.lower() in ('0', 'false', 'no', 'off'):
+        return None
+    return value or DEFAULT_HISTORY_PATH
+
+
+def stable_export_key(name: str) -> str:
+    """Escopo a partir do nome do export (sem extensão): '' para nomes gerados a cada download"""
+    name = name.strip().lower()
+    return '' if SALESFORCE_DOWNLOAD_NAME.match(name) else name
+
+
+def export_key(file_path: str) -> str:
+    """Escopo de um export: nome do arquivo principal sem extensão, em minúsculas"""
+    return stable_export_key(os.path.splitext(os.path.basename(file_path))[0])
+
+
+def get_export_key() -> str:
+    """Escopo da execução atual (PIPELINE_EXPORT_KEY; vazio se não definido)"""
+    return os.environ.get(EXPORT_KEY_ENV_VAR, '').strip()
+
+
+def _table_columns(conn: sqlite3.Connection, table: str) -> List[str]:
+    return [row[1] for row in conn.execute(f'PRAGMA table_info({table})')]
+
+
+def _migrate(conn: sqlite3.Connection) -> bool:
+    """
+    Atualiza bancos anteriores aos escopos por export
+
+    runs ganha a coluna scope (execuções antigas ficam no escopo vazio) e os
+    rollups sem escopo são descartados para serem recalculados.
+
+    Returns:
+        True se os rollups precisam ser recalculados
+    """
+    run_columns = _table_columns(conn, 'runs')
+    if run_columns and 'scope' not in run_columns:
+        conn.execute("ALTER TABLE runs ADD COLUMN scope TEXT NOT NULL DEFAULT ''")
+
+    span_columns = _table_columns(conn, 'finding_spans')
+    if span_columns and 'scope' not in span_columns:
+        conn.executescript('DROP TABLE finding_spans; DROP TABLE IF EXISTS rollup_daily; DROP TABLE IF EXISTS rollup_dates;')
+        return True
+    return False
+
+
+def connect(path: Optional[str] = None) -> sqlite3.Connection:
+    """Abre o banco (criando tabelas e índices se necessário)"""
+    path = path or get_history_path() or DEFAULT_HISTORY_PATH
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_MS / 1000)
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.execute('PRAGMA foreign_keys = ON')
+    stale_rollups = _migrate(conn)
+    conn.executescript(SCHEMA)
+    if stale_rollups:
+        with conn:
+            rebuild_rollups(conn)
+    return conn
+
+
+def _column_values(chunk, columns: Dict[str, str]) -> List[List]:
+    """Valores Python (None para vazios) das colunas da lista de ações"""
+    values = []
+    for source in columns.values():
+        column = chunk[source]
+        values.append(column.astype(object).where(column.notna(), None).tolist())
+    return values
+
+
+def _history_chunks(run_id: int, run_date: str, sources: Iterable[str]):
+    """Linhas de findings e de opportunities a partir dos CSVs de action_items, em blocos"""
+    # Import tardio: action_list carrega o pandas, que os leitores do histórico
+    # (dashboard, app) não precisam
+    from action_list import iter_action_chunks
+
+    for chunk in iter_action_chunks(sources):
+        findings = [(run_id, run_date, *values) for values in zip(*_column_values(chunk, FINDING_COLUMNS))]
+        opportunities = chunk[list(OPPORTUNITY_COLUMNS.values())].dropna(subset=['Opportunity ID'])
+        opportunities = opportunities.drop_duplicates('Opportunity ID', keep='last')
+        yield findings, list(zip(*_column_values(opportunities, OPPORTUNITY_COLUMNS)))
+
+
+def _insert_run_stages(conn: sqlite3.Connection, run_id: int, stages: Dict[str, Dict]):
+    conn.executemany(
+        'INSERT INTO run_stages VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+        [(run_id, name, stage.get('status'), stage.get('wall_time_s'), stage.get('cpu_time_s'),
+          stage.get('peak_memory_mb'), stage.get('input_rows'), stage.get('total_issues'),
+          json.dumps(stage, ensure_ascii=False))
+         for name, stage in stages.items()]
+    )
+
+
+def record_run(results_dir: str, sources: List[str], run_date: Optional[str] = None,
+               conn: Optional[sqlite3.Connection] = None, scope: Optional[str] = None) -> Optional[Dict]:
+    """
+    Grava as oportunidades sinalizadas e as métricas de uma execução
+
+    Gravar de novo o mesmo diretório substitui a execução anterior
+    (ex.: pipeline executado duas vezes no mesmo dia pela linha de comando).
+
+    Args:
+        results_dir: Diretório da execução
+        sources: CSVs de action_items da execução
+        run_date: Data da execução (YYYY-MM-DD, padrão: hoje)
+        conn: Conexão aberta (padrão: abre o banco de get_history_path())
+        scope: Escopo do export (padrão: get_export_key())
+
+    Returns:
+        {'run_id', 'findings'} ou None se o histórico estiver desativado
+    """
+    if conn is None:
+        if get_history_path() is None:
+            return None
+        with closing(connect()) as conn:
+            return record_run(results_dir, sources, run_date, conn, scope)
+
+    results_dir = os.path.abspath(results_dir)
+    run_date = run_date or datetime.now().strftime('%Y-%m-%d')
+    scope = get_export_key() if scope is None else scope
+    stages = (load_run_metrics(results_dir) or {}).get('stages', {})
+
+    placeholders = ', '.join('?' * (len(FINDING_COLUMNS) + 2))
+    insert_finding = f"INSERT INTO findings (run_id, run_date, {', '.join(FINDING_COLUMNS)}) VALUES ({placeholders})"
+    upsert_opportunity = f"""
+        INSERT INTO opportunities ({', '.join(OPPORTUNITY_COLUMNS)}) VALUES ({', '.join('?' * len(OPPORTUNITY_COLUMNS))})
+        ON CONFLICT (opportunity_id) DO UPDATE SET
+            {', '.join(f"{column} = excluded.{column}" for column in list(OPPORTUNITY_COLUMNS)[1:])}
+    """
+
+    with conn:
+        previous = conn.execute('SELECT scope, run_date FROM runs WHERE results_dir = ?', (results_dir,)).fetchone()
+        conn.execute('DELETE FROM runs WHERE results_dir = ?', (results_dir,))
+        run_id = conn.execute(
+            'INSERT INTO runs (results_dir, run_date, recorded_at, input_rows, scope) VALUES (?, ?, ?, ?, ?)',
+            (results_dir, run_date, datetime.now().isoformat(timespec='seconds'),
+             stages.get(INPUT_ROWS_STAGE, {}).get('input_rows'), scope)
+        ).lastrowid
+
+        _insert_run_stages(conn, run_id, stages)
+
+        findings = 0
+        for finding_rows, opportunity_rows in _history_chunks(run_id, run_date, sources):
+            conn.executemany(insert_finding, finding_rows)
+            conn.executemany(upsert_opportunity, opportunity_rows)
+            findings += len(finding_rows)
+
+        conn.execute('UPDATE runs SET total_findings = ? WHERE run_id = ?', (findings, run_id))
+
+        stale_scope = None
+        if previous is not None and (previous['scope'], previous['run_date']) != (scope, run_date):
+            # A data antiga pode ter ficado sem execuções
+            stale_scope = previous['scope']
+            rebuild_rollups(conn, stale_scope)
+        if stale_scope != scope:
+            update_rollups(conn, scope, run_date)
+
+    return {'run_id': run_id, 'findings': findings}
+
+
+def update_run_stages(results_dir: str, conn: Optional[sqlite3.Connection] = None) -> bool:
+    """
+    Regrava as métricas dos módulos de uma execução já gravada (run_metrics.json)
+
+    record_run roda dentro do Action List Exporter, antes do fim do pipeline;
+    chamada depois do último módulo, inclui o próprio exportador e o Dashboard
+    Generator em run_stages.
+
+    Returns:
+        True se a execução estava no histórico
+    """
+    if conn is None:
+        history_path = get_history_path()
+        if history_path is None or not os.path.exists(history_path):
+            return False
+        with closing(connect()) as conn:
+            return update_run_stages(results_dir, conn)
+
+    results_dir = os.path.abspath(results_dir)
+    stages = (load_run_metrics(results_dir) or {}).get('stages', {})
+
+    with conn:
+        row = conn.execute('SELECT run_id FROM runs WHERE results_dir = ?', (results_dir,)).fetchone()
+        if row is None:
+            return False
+        conn.execute('DELETE FROM run_stages WHERE run_id = ?', (row['run_id'],))
+        _insert_run_stages(conn, row['run_id'], stages)
+    return True
+
+
+def _latest_rolled_date(conn: sqlite3.Connection, scope: str, before: Optional[str] = None) -> Optional[str]:
+    if before is None:
+        return conn.execute('SELECT MAX(run_date) FROM rollup_scopes WHERE scope = ?', (scope,)).fetchone()[0]
+    return conn.execute('SELECT MAX(run_date) FROM rollup_scopes WHERE scope = ? AND run_date < ?',
+                        (scope, before)).fetchone()[0]
+
+
+def _undo_rollup_date(conn: sqlite3.Connection, scope: str, run_date: str, previous: Optional[str]):
+    """Desfaz a data mais recente do escopo (os períodos são contínuos, então basta recuar um passo)"""
+    conn.execute('DELETE FROM finding_spans WHERE scope = ? AND first_seen = ?', (scope, run_date))
+    conn.execute('UPDATE finding_spans SET last_seen = ?, run_dates = run_dates - 1 WHERE scope = ? AND resolved_on IS NULL',
+                 (previous, scope))
+    conn.execute('UPDATE finding_spans SET resolved_on = NULL WHERE scope = ? AND resolved_on = ?', (scope, run_date))
+    conn.execute('DELETE FROM rollup_daily WHERE scope = ? AND run_date = ?', (scope, run_date))
+    conn.execute('DELETE FROM rollup_scopes WHERE scope = ? AND run_date = ?', (scope, run_date))
+
+
+def _roll_date(conn: sqlite3.Connection, scope: str, run_date: str):
+    """Consolida uma data do escopo posterior (ou igual) à última já consolidada nele"""
+    if _latest_rolled_date(conn, scope) == run_date:
+        _undo_rollup_date(conn, scope, run_date, _latest_rolled_date(conn, scope, before=run_date))
+    previous = _latest_rolled_date(conn, scope)
+    params = {'scope': scope, 'date': run_date}
+
+    # Sinalizações do escopo na data (execuções do mesmo dia se somam, ex.: reexecução)
+    conn.execute("""
+        CREATE TEMP TABLE IF NOT EXISTS rollup_snapshot (
+            opportunity_id TEXT NOT NULL,
+            rule TEXT NOT NULL,
+            module TEXT,
+            owner TEXT,
+            partner TEXT,
+            PRIMARY KEY (opportunity_id, rule)
+        )
+    """)
+    conn.execute('DELETE FROM rollup_snapshot')
+    conn.execute("""
+        INSERT INTO rollup_snapshot
+        SELECT opportunity_id, rule, MAX(module), MAX(owner), MAX(partner)
+        FROM findings
+        WHERE run_id IN (SELECT run_id FROM runs WHERE scope = :scope AND run_date = :date)
+              AND opportunity_id IS NOT NULL
+        GROUP BY opportunity_id, rule
+    """, params)
+
+    in_snapshot = """
+        SELECT {columns} FROM rollup_snapshot AS s
+        WHERE s.opportunity_id = finding_spans.opportunity_id AND s.rule = finding_spans.rule
+    """
+    if previous is not None:
+        # Abertos do escopo que não aparecem mais foram resolvidos; os demais continuam
+        conn.execute(f"""
+            UPDATE finding_spans SET resolved_on = :date
+            WHERE scope = :scope AND resolved_on IS NULL AND NOT EXISTS ({in_snapshot.format(columns='1')})
+        """, params)
+        conn.execute(f"""
+            UPDATE finding_spans
+            SET last_seen = :date, run_dates = run_dates + 1,
+                (module, owner, partner) = ({in_snapshot.format(columns='module, owner, partner')})
+            WHERE scope = :scope AND resolved_on IS NULL
+        """, params)
+
+    conn.execute("""
+        INSERT INTO finding_spans (scope, opportunity_id, rule, first_seen, last_seen, run_dates, module, owner, partner)
+        SELECT :scope, opportunity_id, rule, :date, :date, 1, module, owner, partner
+        FROM rollup_snapshot AS s
+        WHERE NOT EXISTS (
+            SELECT 1 FROM finding_spans AS f
+            WHERE f.scope = :scope AND f.resolved_on IS NULL
+                  AND f.opportunity_id = s.opportunity_id AND f.rule = s.rule
+        )
+    """, params)
+
+    for dimension, expression in ROLLUP_DIMENSIONS.items():
+        conn.execute(f"""
+            INSERT INTO rollup_daily
+            SELECT :scope, :dimension, value, :date,
+                   SUM(resolved_on IS NULL),
+                   COUNT(DISTINCT CASE WHEN resolved_on IS NULL THEN opportunity_id END),
+                   SUM(first_seen = :date),
+                   SUM(resolved_on IS NOT NULL),
+                   TOTAL(CASE WHEN resolved_on IS NOT NULL THEN days END),
+                   TOTAL(CASE WHEN resolved_on IS NULL THEN days END),
+                   SUM(resolved_on IS NULL AND days > :aged_days)
+            FROM (
+                SELECT {expression} AS value, opportunity_id, first_seen, resolved_on,
+                       CAST(julianday(:date) - julianday(first_seen) AS INTEGER) AS days
+                FROM finding_spans
+                WHERE scope = :scope AND (resolved_on IS NULL OR resolved_on = :date)
+            )
+            GROUP BY value
+        """, dict(params, dimension=dimension, aged_days=AGED_DAYS))
+
+    conn.execute('INSERT INTO rollup_scopes VALUES (:scope, :date, (SELECT COUNT(*) FROM runs WHERE scope = :scope AND run_date = :date))',
+                 params)
+
+
+def rebuild_rollups(conn: sqlite3.Connection, scope: Optional[str] = None):
+    """Recalcula os rollups de todas as datas do escopo (padrão: de todos os escopos)"""
+    scopes = [scope] if scope is not None else [row['scope'] for row in conn.execute('SELECT DISTINCT scope FROM runs')]
+    if scope is None:
+        for table in ('finding_spans', 'rollup_daily', 'rollup_scopes'):
+            conn.execute(f'DELETE FROM {table}')
+    else:
+        for table in ('finding_spans', 'rollup_daily', 'rollup_scopes'):
+            conn.execute(f'DELETE FROM {table} WHERE scope = ?', (scope,))
+
+    for name in scopes:
+        for row in conn.execute('SELECT DISTINCT run_date FROM runs WHERE scope = ? ORDER BY run_date', (name,)).fetchall():
+            _roll_date(conn, name, row['run_date'])
+
+
+def update_rollups(conn: sqlite3.Connection, scope: str, run_date: str):
+    """
+    Atualiza os rollups depois de gravar uma execução
+
+    Incremental quando a data é a mais recente do escopo (nova ou regravada);
+    datas anteriores à última consolidada recalculam o escopo. Datas gravadas
+    antes da existência dos rollups entram na primeira atualização.
+    """
+    pending = {(scope, run_date)}
+    pending.update((row['scope'], row['run_date']) for row in conn.execute("""
+        SELECT DISTINCT scope, run_date FROM runs AS r
+        WHERE NOT EXISTS (SELECT 1 FROM rollup_scopes AS s WHERE s.scope = r.scope AND s.run_date = r.run_date)
+    """))
+
+    for name in sorted({key for key, _ in pending}):
+        dates = sorted(date for key, date in pending if key == name)
+        latest = _latest_rolled_date(conn, name)
+        if latest is not None and dates[0] < latest:
+            rebuild_rollups(conn, name)
+            continue
+        for date in dates:
+            _roll_date(conn, name, date)
+
+
+def _where(filters: Dict[str, Optional[str]], scope: Optional[str] = None, owners: Optional[List[str]] = None):
+    clauses, params = [], []
+    for field, value in filters.items():
+        if field not in FILTER_FIELDS:
+            raise ValueError(f"Filtro inválido: {field}")
+        if value:
+            clauses.append(f"{field} = ?")
+            params.append(value)
+    if scope is not None:
+        clauses.append('run_id IN (SELECT run_id FROM runs WHERE scope = ?)')
+        params.append(scope)
+    if owners is not None:
+        clauses.append(f"owner IN ({', '.join('?' * len(owners))})")
+        params.extend(owners)
+    return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+
+def finding_history(conn: sqlite3.Connection, limit: int = 1000, scope: Optional[str] = None,
+                    owners: Optional[List[str]] = None, **filters) -> List[Dict]:
+    """
+    Períodos em que cada (oportunidade, regra) apareceu nos relatórios
+
+    Args:
+        conn: Conexão do histórico
+        limit: Máximo de linhas retornadas
+        scope: Só execuções deste export (padrão: todos)
+        owners: Só sinalizações destes AMs (padrão: todos)
+        filters: opportunity_id, owner, partner e/ou rule (igualdade)
+
+    Returns:
+        Uma linha por (oportunidade, regra) com first_seen, last_seen, runs
+        e days_flagged, as sinalizadas há mais tempo primeiro
+    """
+    where, params = _where(filters, scope, owners)
+    query = f"""
+        SELECT spans.*, opportunities.opportunity_name, opportunities.account_name
+        FROM (
+            SELECT opportunity_id, rule,
+                   MAX(owner) AS owner,
+                   MAX(partner) AS partner,
+                   MIN(run_date) AS first_seen,
+                   MAX(run_date) AS last_seen,
+                   COUNT(DISTINCT run_id) AS runs,
+                   CAST(julianday(MAX(run_date)) - julianday(MIN(run_date)) AS INTEGER) + 1 AS days_flagged
+            FROM findings{where}
+            GROUP BY opportunity_id, rule
+            ORDER BY first_seen, opportunity_id, rule
+            LIMIT ?
+        ) AS spans
+        LEFT JOIN opportunities USING (opportunity_id)
+        ORDER BY first_seen, opportunity_id, rule
+    """
+    return [dict(row) for row in conn.execute(query, params + [limit])]
+
+
+def opportunity_findings(conn: sqlite3.Connection, opportunity_id: str) -> List[Dict]:
+    """Todas as sinalizações de uma oportunidade, da mais recente para a mais antiga"""
+    query = """
+        SELECT run_date, module, rule, aws_stage, partner_stage, amount, owner, partner
+        FROM findings
+        WHERE opportunity_id = ?
+        ORDER BY run_date DESC, module, rule
+    """
+    return [dict(row) for row in conn.execute(query, (opportunity_id,))]
+
+
+def recent_runs(conn: sqlite3.Connection, limit: int = 30) -> List[Dict]:
+    """Últimas execuções gravadas (mais recente primeiro)"""
+    query = """
+        SELECT run_id, run_date, recorded_at, results_dir, input_rows, total_findings
+        FROM runs
+        ORDER BY recorded_at DESC, run_id DESC
+        LIMIT ?
+    """
+    return [dict(row) for row in conn.execute(query, (limit,))]
+
+
+def recorded_run(conn: sqlite3.Connection, results_dir: str) -> Optional[Dict]:
+    """
+    Execução gravada para o diretório, com o escopo e os AMs das suas sinalizações
+
+    Usado para limitar o que uma execução mostra do histórico ao seu próprio
+    export e aos seus AMs (o banco é compartilhado por todas as sessões).
+
+    Returns:
+        {'run_id', 'run_date', 'scope', 'owners'} ou None se não gravada
+    """
+    row = conn.execute('SELECT run_id, run_date, scope FROM runs WHERE results_dir = ?',
+                       (os.path.abspath(results_dir),)).fetchone()
+    if row is None:
+        return None
+    owners = [owner['owner'] for owner in conn.execute(
+        'SELECT DISTINCT owner FROM findings WHERE run_id = ? AND owner IS NOT NULL ORDER BY owner', (row['run_id'],))]
+    return dict(row, owners=owners)
+
+
+def _in_clause(column: str, values: Optional[List[str]], params: Dict, prefix: str) -> str:
+    """Condição `column IN (...)` com parâmetros nomeados (vazia sem valores)"""
+    if values is None:
+        return ''
+    names = [f'{prefix}_{index}' for index in range(len(values))]
+    params.update(zip(names, values))
+    return f" AND {column} IN ({', '.join(':' + name for name in names)})"
+
+
+def trend_dates(conn: sqlite3.Connection, days: int = TREND_DAYS, scope: str = '') -> List[str]:
+    """Datas consolidadas do escopo nos últimos `days` dias (até a mais recente)"""
+    latest = _latest_rolled_date(conn, scope)
+    if latest is None:
+        return []
+    rows = conn.execute('SELECT run_date FROM rollup_scopes WHERE scope = ? AND run_date > date(?, ?) ORDER BY run_date',
+                        (scope, latest, f'-{days} days'))
+    return [row['run_date'] for row in rows]
+
+
+def top_values(conn: sqlite3.Connection, dimension: str, limit: int = TREND_TOP, scope: str = '',
+               among: Optional[List[str]] = None) -> List[str]:
+    """Valores da dimensão (opcionalmente entre `among`) com mais sinalizações abertas na data mais recente do escopo"""
+    params = {'scope': scope, 'dimension': dimension, 'limit': limit}
+    query = f"""
+        SELECT value FROM rollup_daily
+        WHERE scope = :scope AND dimension = :dimension AND findings > 0
+              AND run_date = (SELECT MAX(run_date) FROM rollup_scopes WHERE scope = :scope){_in_clause('value', among, params, 'among')}
+        ORDER BY findings DESC, value
+        LIMIT :limit
+    """
+    return [row['value'] for row in conn.execute(query, params)]
+
+
+def _rollup_filter(conn: sqlite3.Connection, dimension: str, values: Optional[List[str]], days: int, scope: str):
+    """Datas da janela, condição e parâmetros (nomeados) das consultas em rollup_daily"""
+    if dimension not in ROLLUP_DIMENSIONS:
+        raise ValueError(f"Dimensão inválida: {dimension}")
+    dates = trend_dates(conn, days, scope)
+    where = 'scope = :scope AND dimension = :dimension AND run_date >= :start'
+    params = {'scope': scope, 'dimension': dimension,
+              'start': dates[0] if dates else '', 'latest': dates[-1] if dates else ''}
+    where += _in_clause('value', values, params, 'value')
+    return dates, where, params
+
+
+def trend_series(conn: sqlite3.Connection, dimension: str, values: Optional[List[str]] = None,
+                 days: int = TREND_DAYS, limit: int = TREND_TOP, scope: str = '') -> Dict:
+    """
+    Sinalizações abertas, novas e resolvidas por data para cada valor da dimensão
+
+    Args:
+        conn: Conexão do histórico
+        dimension: total, rule, owner ou partner
+        values: Valores desejados (padrão: os `limit` com mais sinalizações abertas hoje)
+        days: Janela em dias até a data mais recente
+        scope: Escopo do export
+
+    Returns:
+        {'dates': [...], 'series': {valor: {'findings': [...], 'new_findings': [...],
+        'resolved': [...]}}}, listas alinhadas com dates
+    """
+    if values is None:
+        values = [''] if dimension == 'total' else top_values(conn, dimension, limit, scope)
+    dates, where, params = _rollup_filter(conn, dimension, values, days, scope)
+    positions = {date: index for index, date in enumerate(dates)}
+
+    series = {value: {key: [0] * len(dates) for key in ('findings', 'new_findings', 'resolved')}
+              for value in values}
+    query = f"SELECT value, run_date, findings, new_findings, resolved FROM rollup_daily WHERE {where}"
+    for row in conn.execute(query, params):
+        position = positions.get(row['run_date'])
+        if position is not None:
+            for key in ('findings', 'new_findings', 'resolved'):
+                series[row['value']][key][position] = row[key]
+
+    return {'dates': dates, 'series': series}
+
+
+def aging_summary(conn: sqlite3.Connection, dimension: str, values: Optional[List[str]] = None,
+                  days: int = TREND_DAYS, scope: str = '') -> List[Dict]:
+    """
+    Idade das sinalizações abertas (data mais recente) e tempo até a resolução (janela)
+
+    Returns:
+        Uma linha por valor com open, opportunities, aged (abertas há mais de
+        AGED_DAYS dias), avg_age_days, resolved e avg_resolution_days, mais
+        sinalizações abertas primeiro
+    """
+    dates, where, params = _rollup_filter(conn, dimension, values, days, scope)
+    if not dates:
+        return []
+
+    query = f"""
+        SELECT value,
+               TOTAL(CASE WHEN run_date = :latest THEN findings END) AS open,
+               TOTAL(CASE WHEN run_date = :latest THEN opportunities END) AS opportunities,
+               TOTAL(CASE WHEN run_date = :latest THEN aged_findings END) AS aged,
+               TOTAL(CASE WHEN run_date = :latest THEN age_days END) AS age_days,
+               TOTAL(resolved) AS resolved,
+               TOTAL(resolution_days) AS resolution_days
+        FROM rollup_daily
+        WHERE {where}
+        GROUP BY value
+        ORDER BY open DESC, resolved DESC, value
+    """
+    summary = []
+    for row in conn.execute(query, params):
+        open_count, resolved = int(row['open']), int(row['resolved'])
+        summary.append({
+            'value': row['value'],
+            'open': open_count,
+            'opportunities': int(row['opportunities']),
+            'aged': int(row['aged']),
+            'avg_age_days': round(row['age_days'] / open_count, 1) if open_count else None,
+            'resolved': resolved,
+            'avg_resolution_days': round(row['resolution_days'] / resolved, 1) if resolved else None,
+        })
+    return summary
+
+
+def open_findings(conn: sqlite3.Connection, limit: int = 500, scope: str = '',
+                  owners: Optional[List[str]] = None) -> List[Dict]:
+    """Sinalizações do escopo (opcionalmente só dos AMs em `owners`) ainda abertas, as mais antigas primeiro"""
+    params = {'scope': scope, 'limit': limit}
+    query = f"""
+        SELECT spans.opportunity_id, opportunities.opportunity_name, opportunities.account_name,
+               spans.rule, spans.owner, spans.partner, spans.first_seen, spans.run_dates,
+               CAST(julianday(spans.last_seen) - julianday(spans.first_seen) AS INTEGER) AS days_open
+        FROM finding_spans AS spans
+        LEFT JOIN opportunities USING (opportunity_id)
+        WHERE spans.scope = :scope AND spans.resolved_on IS NULL{_in_clause('spans.owner', owners, params, 'owner')}
+        ORDER BY spans.first_seen, spans.opportunity_id, spans.rule
+        LIMIT :limit
+    """
+    return [dict(row) for row in conn.execute(query, params)]
+
+
+def resolved_findings(conn: sqlite3.Connection, limit: int = 500, scope: str = '',
+                      owners: Optional[List[str]] = None) -> List[Dict]:
+    """Sinalizações do escopo (opcionalmente só dos AMs em `owners`) resolvidas, as mais recentes primeiro"""
+    params = {'scope': scope, 'limit': limit}
+    query = f"""
+        SELECT spans.opportunity_id, opportunities.opportunity_name, opportunities.account_name,
+               spans.rule, spans.owner, spans.partner, spans.first_seen, spans.resolved_on,
+               CAST(julianday(spans.resolved_on) - julianday(spans.first_seen) AS INTEGER) AS days_to_resolve
+        FROM finding_spans AS spans
+        LEFT JOIN opportunities USING (opportunity_id)
+        WHERE spans.scope = :scope AND spans.resolved_on IS NOT NULL{_in_clause('spans.owner', owners, params, 'owner')}
+        ORDER BY spans.resolved_on DESC, spans.opportunity_id, spans.rule
+        LIMIT :limit
+    """
+    return [dict(row) for row in conn.execute(query, params)]
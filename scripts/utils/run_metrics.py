@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Instrumentação dos módulos do pipeline
+Registra tempo (wall e CPU), pico de memória, linhas de entrada, linhas após cada
+filtro e issues por regra, gravando tudo em run_metrics.json no diretório de resultados.
+
+Uso nos módulos:
+    with stage_metrics('Slack Message Generator'):
+        main()
+
+    # Dentro das classes (sem efeito se não houver estágio ativo)
+    record_input_rows(len(self.df))
+    record_filter('active_opportunities', len(active_df))
+    record_issues('co_sell_missing', len(co_sell_issues))
+"""
+
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+from results_dir import get_dated_results_dir
+from stage_profiler import StageProfiler, get_profile_mode
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+METRICS_FILENAME = 'run_metrics.json'
+
+_current_stage = None
+
+
+def _peak_rss_mb():
+    """Pico de memória residente do processo em MB (None se indisponível)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss é em bytes no macOS e em KB no Linux
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return round(peak / divisor, 1)
+
+
+class StageMetrics:
+    """Context manager que mede um módulo do pipeline e grava o resultado em run_metrics.json"""
+
+    def __init__(self, stage_name: str):
+        self.stage_name = stage_name
+        self.input_rows = None
+        self.filters = {}
+        self.issues = {}
+        self.outputs = {}
+        self._tracemalloc = None
+        self._profiler = None
+
+    def __enter__(self):
+        global _current_stage
+        _current_stage = self
+        self.started_at = datetime.now()
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+        if resource is None:
+            # Sem resource (Windows): usa tracemalloc para o pico de alocações Python
+            import tracemalloc
+            self._tracemalloc = tracemalloc
+            tracemalloc.start()
+        
+        # Profiling opcional (PIPELINE_PROFILE)
+        profile_mode = get_profile_mode()
+        if profile_mode:
+            self._profiler = StageProfiler(self.stage_name, profile_mode)
+            self._profiler.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        global _current_stage
+        _current_stage = None
+
+        wall_time = time.perf_counter() - self._wall_start
+        cpu_time = time.process_time() - self._cpu_start
+        
+        profile_files = []
+        if self._profiler is not None:
+            try:
+                profile_files = self._profiler.stop(get_dated_results_dir())
+                for profile_file in profile_files:
+                    print(f"🔬 Profile salvo em: {profile_file}")
+            except Exception as e:
+                print(f"⚠️  Não foi possível salvar profile: {e}")
+
+        if exc_type is None:
+            status = 'success'
+        elif exc_type is SystemExit and not exc_value.code:
+            status = 'success'
+        else:
+            status = 'error'
+
+        if self._tracemalloc is not None:
+            _, peak = self._tracemalloc.get_traced_memory()
+            self._tracemalloc.stop()
+            peak_memory_mb = round(peak / (1024 * 1024), 1)
+        else:
+            peak_memory_mb = _peak_rss_mb()
+
+        stage = {
+            'status': status,
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'wall_time_s': round(wall_time, 3),
+            'cpu_time_s': round(cpu_time, 3),
+            'peak_memory_mb': peak_memory_mb,
+            'input_rows': self.input_rows,
+            'filters': self.filters,
+            'issues': self.issues,
+            'total_issues': sum(self.issues.values()),
+            'outputs': self.outputs,
+            'profiles': [os.path.basename(p) for p in profile_files],
+        }
+
+        try:
+            self._save(stage)
+        except Exception as e:
+            # Métricas nunca devem derrubar o módulo
+            print(f"⚠️  Não foi possível salvar métricas: {e}")
+
+        # Não suprime exceções do módulo
+        return False
+
+    def _save(self, stage: dict):
+        """Mescla as métricas deste módulo no run_metrics.json do diretório de resultados"""
+        metrics_file = os.path.join(get_dated_results_dir(), METRICS_FILENAME)
+        report = load_run_metrics(os.path.dirname(metrics_file)) or {'stages': {}}
+        report['stages'][self.stage_name] = stage
+        report['updated_at'] = datetime.now().isoformat(timespec='seconds')
+
+        tmp_file = metrics_file + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_file, metrics_file)
+
+
+def stage_metrics(stage_name: str) -> StageMetrics:
+    """Cria o medidor de um módulo (usar com 'with')"""
+    return StageMetrics(stage_name)
+
+
+def load_run_metrics(results_dir: str):
+    """Lê run_metrics.json de um diretório de resultados (None se não existir)"""
+    metrics_file = os.path.join(results_dir, METRICS_FILENAME)
+    if not os.path.exists(metrics_file):
+        return None
+    try:
+        with open(metrics_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def record_input_rows(rows: int):
+    """Registra o número de linhas de entrada do módulo ativo"""
+    if _current_stage is not None:
+        _current_stage.input_rows = int(rows)
+
+
+def record_filter(name: str, rows: int):
+    """Registra quantas linhas sobreviveram a um filtro"""
+    if _current_stage is not None:
+        _current_stage.filters[name] = int(rows)
+
+
+def record_issues(rule: str, count: int):
+    """Registra o número de issues emitidas por uma regra"""
+    if _current_stage is not None:
+        _current_stage.issues[rule] = int(count)
+
+
+def record_output(name: str, count: int):
+    """Registra quantidade de itens gerados (mensagens, emails, arquivos...)"""
+    if _current_stage is not None:
+        _current_stage.outputs[name] = int(count)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Índice de busca pré-calculado para as interfaces HTML
+O gerador indexa cada card (contato, email, empresa, AM, IDs de oportunidade,
+tipos de regra) e grava o índice invertido em uma ilha de dados. A página
+busca por prefixo nos termos ordenados (busca binária) em vez de percorrer
+os atributos data-* de todos os cards a cada tecla.
+
+Termos: texto em minúsculas, sem acentos, separado em letras/dígitos.
+Consulta: todos os termos digitados precisam casar com o início de algum
+termo do card ("joao@ac" encontra "João <joao@acme.com>").
+
+A busca no navegador (searchIndex em assets/reports.js) usa a mesma
+normalização de normalize_search_text().
+"""
+
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Set
+
+# IDs de oportunidade nos textos gerados: "ID: O123", links do Partner Central e do Salesforce
+# (um padrão por forma: a alternância em um só padrão testa as três em cada posição do texto)
+OPPORTUNITY_ID_PATTERNS = (
+    re.compile(r'^ID: (\S+)$', re.MULTILINE),
+    re.compile(r'editopportunity\?id=(\w+)'),
+    re.compile(r'/Opportunity/(\w+)/view'),
+)
+
+_TERM_SEPARATOR = re.compile(r'[^\w]+')
+
+_COMBINING_MARKS = re.compile('[\u0300-\u036f]+')
+
+
+def normalize_search_text(text: str) -> str:
+    """Minúsculas sem acentos (NFD sem os diacríticos combinantes)"""
+    text = text.lower()
+    if text.isascii():
+        return text
+    return _COMBINING_MARKS.sub('', unicodedata.normalize('NFD', text))
+
+
+def index_terms(values: Iterable[str]) -> Set[str]:
+    """Termos indexados para um conjunto de campos"""
+    terms = set()
+    for value in values:
+        if value:
+            terms.update(term for term in _TERM_SEPARATOR.split(normalize_search_text(str(value))) if term)
+    return terms
+
+
+def extract_opportunity_ids(text: str) -> List[str]:
+    """IDs de oportunidade encontrados no corpo de um email/mensagem, na ordem do texto"""
+    matches = [(match.start(), match.group(1)) for pattern in OPPORTUNITY_ID_PATTERNS for match in pattern.finditer(text)]
+    return [opportunity_id for _, opportunity_id in sorted(matches)]
+
+
+class SearchIndexBuilder:
+    """Monta o índice invertido; cada chamada a add() cria um documento (0, 1, 2...)"""
+
+    def __init__(self):
+        self.postings = {}
+        self.size = 0
+
+    def add(self, values: Iterable[str]) -> int:
+        doc = self.size
+        for term in index_terms(values):
+            self.postings.setdefault(term, []).append(doc)
+        self.size += 1
+        return doc
+
+    def build(self) -> Dict:
+        """Índice serializável: termos ordenados como no JavaScript (UTF-16) e documentos de cada termo"""
+        terms = sorted(self.postings, key=lambda term: term.encode('utf-16-be'))
+        return {
+            'terms': terms,
+            'postings': [self.postings[term] for term in terms],
+            'size': self.size
+        }
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Execução particionada (shards) para exports muito grandes
+Divide o DataFrame carregado por uma chave (AM ou parceiro) e avalia cada
+shard em um pool de processos. Ativado pela variável de ambiente
+PIPELINE_SHARD_WORKERS (ou --shard-workers no run_pipeline_analysis.py):
+    PIPELINE_SHARD_WORKERS=4    -> 4 processos
+    PIPELINE_SHARD_WORKERS=auto -> um processo por CPU
+
+Os dados não são serializados para os workers: o estado (gerador com os
+DataFrames já carregados) fica em uma variável do módulo e os processos são
+criados com fork, herdando essa memória (copy-on-write). Cada worker recebe
+apenas o array de posições das linhas do seu shard. Sem fork disponível
+(Windows/macOS com spawn) a execução continua sequencial.
+"""
+
+import multiprocessing
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+SHARD_WORKERS_ENV_VAR = 'PIPELINE_SHARD_WORKERS'
+
+# Abaixo disso o custo de criar os processos supera o ganho
+SHARD_MIN_ROWS = 5000
+
+# Estado compartilhado com os workers (herdado via fork)
+_shared_state = None
+
+
+def get_shard_workers(total_rows: int) -> int:
+    """
+    Número de processos para a execução particionada (0 = sequencial)
+
+    Retorna 0 se PIPELINE_SHARD_WORKERS não estiver definido, se o export for
+    pequeno ou se a plataforma não suportar fork.
+    """
+    value = os.environ.get(SHARD_WORKERS_ENV_VAR, '').strip().lower()
+    if not value or value in ('0', '1', 'false', 'no', 'off'):
+        return 0
+    if value == 'auto':
+        workers = os.cpu_count() or 1
+    else:
+        try:
+            workers = int(value)
+        except ValueError:
+            print(f"⚠️  {SHARD_WORKERS_ENV_VAR} inválido ({value}) - execução sequencial")
+            return 0
+
+    if workers < 2 or total_rows < SHARD_MIN_ROWS:
+        return 0
+    if 'fork' not in multiprocessing.get_all_start_methods():
+        print("⚠️  Plataforma sem fork - execução sequencial")
+        return 0
+    return workers
+
+
+def _merge_units(keys: pd.Series, link_keys: pd.Series) -> Dict[str, str]:
+    """
+    Une chaves que compartilham linhas relacionadas (union-find)
+
+    Ex.: linhas com o mesmo Oppty ID mas AMs diferentes precisam cair no mesmo
+    shard, senão regras que comparam linhas do mesmo ID veriam dados parciais.
+    """
+    frame = pd.DataFrame({'key': keys.values, 'link': link_keys.values}).dropna(subset=['link']).drop_duplicates()
+    shared_links = frame[frame.duplicated(subset=['link'], keep=False)]
+
+    parent = {}
+
+    def find(key):
+        root = key
+        while parent.get(root, root) != root:
+            root = parent[root]
+        parent[key] = root
+        return root
+
+    for _, group in shared_links.groupby('link', sort=False)['key']:
+        first = find(group.iloc[0])
+        for key in group.iloc[1:]:
+            root = find(key)
+            if root != first:
+                parent[root] = first
+
+    return {key: find(key) for key in list(parent)}
+
+
+def build_shard_map(keys: pd.Series, n_shards: int, link_keys: Optional[pd.Series] = None) -> Dict[str, int]:
+    """
+    Distribui as chaves em até n_shards shards balanceados por número de linhas
+
+    Todas as linhas de uma mesma chave ficam no mesmo shard. A distribuição é
+    determinística (maiores grupos primeiro, sempre no shard menos carregado).
+
+    Args:
+        keys: Chave de particionamento por linha (ex.: Opportunity Owner Name)
+        n_shards: Número de shards
+        link_keys: Chave opcional que obriga linhas relacionadas a ficarem juntas
+
+    Returns:
+        Dicionário chave -> número do shard
+    """
+    keys = keys.astype(object).fillna('').astype(str)
+    units = keys
+    merged = {}
+    if link_keys is not None:
+        merged = _merge_units(keys, link_keys)
+        if merged:
+            units = keys.map(lambda key: merged.get(key, key))
+
+    loads = [0] * n_shards
+    shard_of_unit = {}
+    for unit, size in sorted(units.value_counts().items(), key=lambda item: (-item[1], item[0])):
+        shard = loads.index(min(loads))
+        shard_of_unit[unit] = shard
+        loads[shard] += size
+
+    return {key: shard_of_unit[merged.get(key, key)] for key in keys.unique()}
+
+
+def shard_positions(keys: pd.Series, shard_map: Dict[str, int], n_shards: int) -> List[np.ndarray]:
+    """
+    Posições (ordenadas) das linhas de cada shard
+
+    Chaves ausentes do mapa (ex.: AM que só aparece no export sem parceiro)
+    são distribuídas por hash estável do nome.
+    """
+    keys = keys.astype(object).fillna('').astype(str)
+    shard_ids = keys.map(
+        lambda key: shard_map[key] if key in shard_map else zlib.crc32(key.encode('utf-8')) % n_shards
+    ).to_numpy()
+    return [np.flatnonzero(shard_ids == shard) for shard in range(n_shards)]
+
+
+def get_shared_state():
+    """Estado compartilhado pelo processo pai (usar dentro dos workers)"""
+    return _shared_state
+
+
+def run_sharded(worker: Callable, state, tasks: Iterable, workers: int) -> list:
+    """
+    Executa worker(task) para cada shard em um pool de processos (fork)
+
+    Args:
+        worker: Função de nível de módulo; acessa os dados via get_shared_state()
+        state: Objeto compartilhado com os workers (ex.: o próprio gerador)
+        tasks: Argumentos leves de cada shard (posições das linhas)
+        workers: Número máximo de processos
+
+    Returns:
+        Resultados na mesma ordem das tasks
+    """
+    global _shared_state
+    tasks = list(tasks)
+    _shared_state = state
+    try:
+        context = multiprocessing.get_context('fork')
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), mp_context=context) as executor:
+            return list(executor.map(worker, tasks))
+    finally:
+        _shared_state = None
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Profiling opcional dos módulos do pipeline
+Ativado pela variável de ambiente PIPELINE_PROFILE (ou --profile no run_pipeline_analysis.py):
+    PIPELINE_PROFILE=1 / sample -> profiles/<modulo>.collapsed (amostragem de stacks, baixo overhead)
+    PIPELINE_PROFILE=cprofile   -> profiles/<modulo>.pstats (cProfile determinístico)
+    PIPELINE_PROFILE=all        -> ambos
+
+Atenção: com cProfile ativo o CPython desliga a otimização de concatenação
+in-place de strings, então geradores que montam HTML com "html += ..." ficam
+muito mais lentos (e o profile exagera o peso dessas funções). O sampler não
+tem esse efeito, por isso é o modo padrão.
+
+Os arquivos .collapsed seguem o formato do flamegraph.pl / speedscope ("a;b;c contagem").
+Os .pstats podem ser lidos com: python -m pstats profiles/<modulo>.pstats
+"""
+
+import os
+import re
+import sys
+import threading
+from collections import Counter
+
+PROFILE_ENV_VAR = 'PIPELINE_PROFILE'
+PROFILES_DIRNAME = 'profiles'
+
+# Intervalo de amostragem do sampler (segundos)
+SAMPLE_INTERVAL = 0.005
+
+
+def get_profile_mode():
+    """Retorna o modo de profiling configurado ('cprofile', 'sample', 'all') ou None"""
+    value = os.environ.get(PROFILE_ENV_VAR, '').strip().lower()
+    if not value or value in ('0', 'false', 'no', 'off'):
+        return None
+    if value in ('cprofile', 'sample', 'all'):
+        return value
+    return 'sample'
+
+
+def _slugify(name: str) -> str:
+    return re.sub(r'[^a-z0-9]+', '_', name.lower()).strip('_')
+
+
+class _StackSampler:
+    """Sampler em thread separada: coleta a stack da thread principal a cada intervalo"""
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        self.interval = interval
+        self.samples = Counter()
+        self._target_thread_id = threading.get_ident()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stage-sampler', daemon=True)
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self._target_thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.samples[';'.join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._thread.join()
+
+
+class StageProfiler:
+    """Liga cProfile e/ou o sampler durante a execução de um módulo"""
+
+    def __init__(self, stage_name: str, mode: str):
+        self.stage_name = stage_name
+        self.mode = mode
+        self._profile = None
+        self._sampler = None
+
+    def start(self):
+        if self.mode in ('cprofile', 'all'):
+            import cProfile
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        if self.mode in ('sample', 'all'):
+            self._sampler = _StackSampler()
+            self._sampler.start()
+
+    def stop(self, results_dir: str):
+        """Para o profiling e grava os arquivos em <results_dir>/profiles/"""
+        if self._profile is not None:
+            self._profile.disable()
+        if self._sampler is not None:
+            self._sampler.stop()
+
+        profiles_dir = os.path.join(results_dir, PROFILES_DIRNAME)
+        os.makedirs(profiles_dir, exist_ok=True)
+        slug = _slugify(self.stage_name)
+        written = []
+
+        if self._profile is not None:
+            pstats_file = os.path.join(profiles_dir, f"{slug}.pstats")
+            self._profile.dump_stats(pstats_file)
+            written.append(pstats_file)
+
+        if self._sampler is not None:
+            collapsed_file = os.path.join(profiles_dir, f"{slug}.collapsed")
+            with open(collapsed_file, 'w', encoding='utf-8') as f:
+                for stack, count in self._sampler.samples.most_common():
+                    f.write(f"{stack} {count}\n")
+            written.append(collapsed_file)
+
+        return written
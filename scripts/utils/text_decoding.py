@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Leitura de arquivos de texto com detecção de encoding
+O arquivo é lido uma única vez em binário e decodificado em memória:
+    1. BOM (UTF-8, UTF-16, UTF-32) ou padrão de bytes (ASCII puro, UTF-16 sem BOM)
+    2. Tentativas na ordem de ENCODINGS_TO_TRY
+    3. UTF-8 ignorando caracteres inválidos
+
+Para saídas grandes (dumps de email/Slack de execuções em lote) há também
+open_mapped_text(): o arquivo é mapeado com mmap e os parsers aplicam regex
+de bytes diretamente sobre o mapeamento, decodificando só os trechos usados.
+
+Mensagens de diagnóstico vão para o logger 'pipeline.decoding' (apenas
+avisos aparecem sem configuração de logging).
+"""
+
+import codecs
+import logging
+import mmap
+import re
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+logger = logging.getLogger('pipeline.decoding')
+
+# Ordem de preferência (iso-8859-1 aceita qualquer sequência de bytes)
+ENCODINGS_TO_TRY = ('utf-8', 'iso-8859-1', 'cp1252', 'latin1')
+
+# UTF-32 antes de UTF-16: o BOM UTF-32-LE começa com o BOM UTF-16-LE
+_BOMS = (
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+# Amostra usada para reconhecer UTF-16 sem BOM
+_SAMPLE_SIZE = 4096
+
+# Bloco usado para validar o encoding de um arquivo mapeado sem decodificá-lo inteiro
+_VALIDATION_CHUNK_SIZE = 1024 * 1024
+
+
+def detect_encoding(raw: bytes) -> Optional[str]:
+    """Encoding indicado por BOM ou padrão de bytes (None se inconclusivo)"""
+    for bom, encoding in _BOMS:
+        if raw.startswith(bom):
+            return encoding
+
+    if raw.isascii():
+        return 'ascii'
+
+    # Texto latino em UTF-16 sem BOM: metade dos bytes é zero, sempre na mesma posição
+    sample = raw[:_SAMPLE_SIZE]
+    if len(sample) >= 4 and sample.count(0) >= len(sample) // 3:
+        even_zeros = sample[0::2].count(0)
+        odd_zeros = sample[1::2].count(0)
+        if odd_zeros > even_zeros * 4:
+            return 'utf-16-le'
+        if even_zeros > odd_zeros * 4:
+            return 'utf-16-be'
+    return None
+
+
+def decode_bytes(raw: bytes, encodings: Iterable[str] = ENCODINGS_TO_TRY) -> Tuple[str, str]:
+    """
+    Decodifica bytes em memória
+
+    Args:
+        raw: Conteúdo binário
+        encodings: Encodings a tentar, em ordem, se o fast path não resolver
+
+    Returns:
+        Tupla (texto, encoding utilizado)
+    """
+    detected = detect_encoding(raw)
+    if detected:
+        try:
+            return raw.decode(detected), detected
+        except UnicodeDecodeError as e:
+            logger.debug("Encoding detectado %s falhou: %s", detected, e)
+
+    for encoding in encodings:
+        try:
+            return raw.decode(encoding), encoding
+        except UnicodeDecodeError as e:
+            logger.debug("Falha ao decodificar com %s: %s", encoding, e)
+
+    logger.warning("Nenhum encoding funcionou; usando UTF-8 ignorando caracteres inválidos")
+    return raw.decode('utf-8', errors='ignore'), 'utf-8 (com erros ignorados)'
+
+
+def normalize_newlines(content: str) -> str:
+    """Mesmo comportamento de open(..., 'r'): quebras de linha universais"""
+    if '\r' in content:
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+    return content
+
+
+def read_text_file(file_path: str, description: str = "arquivo",
+                   encodings: Iterable[str] = ENCODINGS_TO_TRY) -> str:
+    """
+    Lê um arquivo de texto com uma única leitura binária
+
+    Substitui o padrão "open() com cada encoding até um funcionar", que relia
+    o arquivo inteiro a cada tentativa.
+
+    Raises:
+        OSError: Se o arquivo não puder ser aberto
+    """
+    with open(file_path, 'rb') as f:
+        raw = f.read()
+
+    content, encoding = decode_bytes(raw, encodings)
+    content = normalize_newlines(content)
+    logger.info("%s lido com encoding %s (%s bytes)", description.capitalize(), encoding, f"{len(raw):,}")
+    return content
+
+
+def decode_attempts(raw: bytes, encodings: Iterable[str]) -> Dict[str, Dict]:
+    """Resultado da decodificação em memória para cada encoding (sem reler o arquivo)"""
+    results = {}
+    for encoding in encodings:
+        try:
+            content = raw.decode(encoding)
+            results[encoding] = {"valid": True, "content_length": len(content), "error": None}
+        except UnicodeDecodeError as e:
+            results[encoding] = {"valid": False, "content_length": 0, "error": str(e)}
+        except LookupError as e:
+            results[encoding] = {"valid": False, "content_length": 0, "error": f"Erro inesperado: {str(e)}"}
+    return results
+
+
+class MappedText:
+    """
+    Texto de um arquivo acessado como bytes (mmap)
+
+    Regex devem ser compiladas com compile() para usar o encoding do arquivo;
+    as posições retornadas por elas são convertidas em texto com decode().
+    """
+
+    def __init__(self, buffer, encoding: str, errors: str = 'strict'):
+        self.buffer = buffer
+        self.encoding = encoding
+        self.errors = errors
+
+    def __len__(self) -> int:
+        return len(self.buffer)
+
+    def compile(self, pattern: str, flags: int = 0) -> 're.Pattern':
+        """Compila uma regex de texto como regex de bytes no encoding do arquivo"""
+        return re.compile(pattern.encode(self.encoding), flags)
+
+    def decode(self, start: int = 0, end: Optional[int] = None) -> str:
+        """Decodifica apenas o trecho [start:end]"""
+        if start == 0 and end is None:
+            return str(self.buffer, self.encoding, self.errors)
+        return str(self.buffer[start:end], self.encoding, self.errors)
+
+    def iter_sections(self, delimiter: 're.Pattern') -> Iterator[str]:
+        """
+        Seções que começam em cada ocorrência do delimitador (incluído na seção)
+
+        Equivale a reconstruir delimitador + conteúdo após re.split(), mas cada
+        seção é decodificada apenas quando consumida. O texto antes do primeiro
+        delimitador é ignorado.
+        """
+        start = None
+        for match in delimiter.finditer(self.buffer):
+            if start is not None:
+                yield self.decode(start, match.start())
+            start = match.start()
+        if start is not None:
+            yield self.decode(start, len(self.buffer))
+
+
+def _validate_encoding(buffer, encoding: str) -> bool:
+    """Decodifica o buffer em blocos (descartando o texto) para validar o encoding"""
+    decoder = codecs.getincrementaldecoder(encoding)()
+    try:
+        for start in range(0, len(buffer), _VALIDATION_CHUNK_SIZE):
+            decoder.decode(buffer[start:start + _VALIDATION_CHUNK_SIZE])
+        decoder.decode(b'', final=True)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+@contextmanager
+def open_mapped_text(file_path: str, description: str = "arquivo",
+                     encodings: Iterable[str] = ENCODINGS_TO_TRY) -> Iterator[MappedText]:
+    """
+    Abre um arquivo de texto como MappedText sem carregá-lo em memória
+
+    O mapeamento é usado quando o arquivo tem encoding compatível com ASCII e
+    quebras de linha LF (caso dos arquivos gerados pelo pipeline). Com BOM,
+    UTF-16/32 ou CRLF o arquivo é lido com read_text_file() e reencodado em
+    UTF-8, mantendo o mesmo resultado dos parsers.
+
+    Raises:
+        OSError: Se o arquivo não puder ser aberto
+    """
+    with open(file_path, 'rb') as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Arquivo vazio não pode ser mapeado
+            yield MappedText(b'', 'utf-8')
+            return
+
+        with mapped:
+            if detect_encoding(mapped[:_SAMPLE_SIZE]) in (None, 'ascii') and mapped.find(b'\r') == -1:
+                encodings = tuple(encodings)
+                encoding = next((enc for enc in encodings if _validate_encoding(mapped, enc)), None)
+                if encoding:
+                    logger.info("%s mapeado com encoding %s (%s bytes)", description.capitalize(), encoding, f"{len(mapped):,}")
+                    yield MappedText(mapped, encoding)
+                else:
+                    logger.warning("Nenhum encoding funcionou; usando UTF-8 ignorando caracteres inválidos")
+                    yield MappedText(mapped, 'utf-8', errors='ignore')
+                return
+
+    content = read_text_file(file_path, description, encodings)
+    yield MappedText(content.encode('utf-8'), 'utf-8')
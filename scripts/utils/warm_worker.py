@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Worker pré-aquecido para os módulos do pipeline
+O processo de longa duração (run_watch_folder.py) importa uma vez pandas,
+os leitores de Excel/HTML e os utilitários do pipeline (preload). Cada módulo
+roda em um processo filho criado com fork a partir dele, executando o script
+como __main__ (runpy): o filho herda os imports já feitos e não paga de novo
+a inicialização do interpretador, mas continua isolado como em subprocess.run
+(estado global, memória e run_metrics.json por módulo).
+
+Sem fork (Windows/macOS com spawn) run_script usa subprocess normalmente.
+"""
+
+import gc
+import importlib
+import os
+import runpy
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+from typing import Callable, Dict, List, Optional, Sequence
+
+# Dependências pesadas usadas pelos módulos (ausentes são ignoradas)
+PRELOAD_MODULES = (
+    'pandas',
+    'numpy',
+    'openpyxl',
+    'xlrd',
+    'lxml.html',
+    'html5lib',
+    'bs4',
+    'xlsxwriter',
+)
+
+# Utilitários compartilhados (scripts/utils)
+PRELOAD_UTILS = (
+    'results_dir',
+    'run_metrics',
+    'text_decoding',
+    'amounts',
+    'html_data',
+    'report_assets',
+    'precompressed',
+    'search_index',
+    'sharding',
+    'action_list',
+    'run_history',
+)
+
+
+def fork_available() -> bool:
+    return hasattr(os, 'fork')
+
+
+def preload(modules: Sequence[str] = PRELOAD_MODULES + PRELOAD_UTILS) -> List[str]:
+    """
+    Importa os módulos no processo atual (herdados pelos filhos do fork)
+
+    Returns:
+        Módulos carregados
+    """
+    utils_dir = os.path.dirname(os.path.abspath(__file__))
+    if utils_dir not in sys.path:
+        sys.path.append(utils_dir)
+
+    loaded = []
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            continue
+        loaded.append(name)
+
+    # Objetos dos imports saem do GC: coletas nos filhos não percorrem (nem
+    # copiam, via copy-on-write) o heap herdado
+    gc.freeze()
+    return loaded
+
+
+def _exit_code(error: SystemExit) -> int:
+    """Código de saída equivalente ao do interpretador para sys.exit(x)"""
+    if error.code is None:
+        return 0
+    if isinstance(error.code, int):
+        return error.code
+    print(error.code, file=sys.stderr)
+    return 1
+
+
+def run_in_fork(target: Callable[[], None], argv: List[str], cwd: Optional[str] = None,
+                env: Optional[Dict[str, str]] = None) -> subprocess.CompletedProcess:
+    """
+    Executa target() em um processo filho (fork) com stdout/stderr capturados
+
+    Args:
+        target: Função executada no filho (sys.exit vira o código de saída)
+        argv: sys.argv do filho
+        cwd: Diretório de trabalho do filho
+        env: Ambiente do filho (padrão: o do processo atual)
+
+    Returns:
+        CompletedProcess com returncode, stdout e stderr (texto UTF-8)
+    """
+    # Buffers pendentes seriam duplicados no filho
+    sys.stdout.flush()
+    sys.stderr.flush()
+
+    with tempfile.TemporaryFile() as stdout_file, tempfile.TemporaryFile() as stderr_file:
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                signal.signal(signal.SIGINT, signal.SIG_DFL)
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                os.dup2(stdout_file.fileno(), 1)
+                os.dup2(stderr_file.fileno(), 2)
+                sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+                sys.stderr.reconfigure(encoding='utf-8', errors='replace')
+                if cwd:
+                    os.chdir(cwd)
+                if env is not None:
+                    os.environ.clear()
+                    os.environ.update(env)
+                sys.argv = list(argv)
+
+                try:
+                    target()
+                    code = 0
+                except SystemExit as e:
+                    code = _exit_code(e)
+                except BaseException:
+                    traceback.print_exc()
+                    code = 1
+            finally:
+                try:
+                    sys.stdout.flush()
+                    sys.stderr.flush()
+                finally:
+                    os._exit(code)
+
+        _, status = os.waitpid(pid, 0)
+        returncode = os.waitstatus_to_exitcode(status)
+
+        stdout_file.seek(0)
+        stderr_file.seek(0)
+        stdout = stdout_file.read().decode('utf-8', errors='replace')
+        stderr = stderr_file.read().decode('utf-8', errors='replace')
+
+    return subprocess.CompletedProcess(argv, returncode, stdout, stderr)
+
+
+def run_script(script_path: str, args: List[str], cwd: Optional[str] = None,
+               env: Optional[Dict[str, str]] = None) -> subprocess.CompletedProcess:
+    """
+    Executa um script do pipeline como __main__ (equivalente a python3 script args)
+
+    Com fork o script roda em um filho do processo pré-aquecido; sem fork,
+    em um subprocess comum.
+    """
+    if not fork_available():
+        return subprocess.run([sys.executable, script_path, *args], capture_output=True, text=True,
+                              encoding='utf-8', errors='replace', cwd=cwd, env=env)
+
+    def target():
+        # Como no interpretador: o diretório do script vem primeiro no sys.path
+        sys.path.insert(0, os.path.dirname(os.path.abspath(script_path)))
+        runpy.run_path(script_path, run_name='__main__')
+
+    return run_in_fork(target, [script_path, *args], cwd=cwd, env=env)
+
+
+def warm_up() -> float:
+    """Pré-carrega os módulos e retorna o tempo gasto (s)"""
+    start = time.perf_counter()
+    loaded = preload()
+    elapsed = time.perf_counter() - start
+    print(f"🔥 Worker pré-aquecido: {len(loaded)} módulos em {elapsed:.1f}s")
+    return elapsed
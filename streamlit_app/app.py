@@ -8,15 +8,16 @@ import streamlit as st
 import pandas as pd
 import os
 import sys
+import json
 import subprocess
 import tempfile
 import zipfile
-import io
-from datetime import datetime, timedelta
+from datetime import datetime
 from pathlib import Path
-import shutil
 import uuid
 import hashlib
+import sqlite3
+from contextlib import closing
 
 # Configuração da página
 st.set_page_config(
@@ -30,6 +31,29 @@ st.set_page_config(
 root_dir = Path(__file__).parent.parent
 sys.path.append(str(root_dir))
 
+from utils.preview_reader import read_export_preview
+from utils.results_retention import get_retention_manager, start_background_cleanup
+from utils.run_cache import compute_run_key, find_cached_run, record_run, link_run
+from utils.results_archive import (compact_enabled, compact_run_dir, original_path, stored_file_size,
+                                   write_results_zip, archive_manifest, load_archive_manifest,
+                                   save_archive_manifest, manifest_path, GZIP_SUFFIX)
+
+# Histórico de sinalizações compartilhado com os scripts do pipeline
+sys.path.append(str(root_dir / "scripts" / "utils"))
+from run_history import (get_history_path, export_key, EXPORT_KEY_ENV_VAR, connect as connect_history, recorded_run,
+                         finding_history, trend_dates, trend_series, top_values, aging_summary, open_findings,
+                         resolved_findings, update_run_stages, AGED_DAYS)
+from precompressed import PRECOMPRESS_ENV_VAR
+
+# Número de linhas lidas no modo preview
+PREVIEW_ROWS = 5
+
+# Extensões já comprimidas: armazenadas no ZIP sem recompressão
+ZIP_STORED_EXTENSIONS = {'.zip', '.gz', '.bz2', '.xz', '.xlsx', '.png', '.jpg', '.jpeg', '.gif', '.pdf'}
+
+# Arquivos menores que isso (bytes) não compensam compressão
+ZIP_STORED_MAX_SIZE = 512
+
 def get_session_id():
     """Gera ou recupera ID único da sessão para isolamento entre usuários"""
     if 'session_id' not in st.session_state:
@@ -55,28 +79,6 @@ def get_dated_results_dir(create_execution_subdir=False):
         base_results_dir.mkdir(parents=True, exist_ok=True)
         return base_results_dir
 
-def cleanup_old_results(days_to_keep=7):
-    """Remove resultados antigos para economizar espaço"""
-    try:
-        results_base = root_dir / "results"
-        if not results_base.exists():
-            return
-        
-        cutoff_date = datetime.now() - timedelta(days=days_to_keep)
-        
-        for date_dir in results_base.iterdir():
-            if date_dir.is_dir() and date_dir.name.count('-') == 2:  # formato YYYY-MM-DD
-                try:
-                    dir_date = datetime.strptime(date_dir.name, '%Y-%m-%d')
-                    if dir_date < cutoff_date:
-                        shutil.rmtree(date_dir)
-                except (ValueError, OSError):
-                    # Ignora diretórios com nomes inválidos ou erros de remoção
-                    continue
-    except Exception:
-        # Falha silenciosa na limpeza para não afetar funcionalidade principal
-        pass
-
 def save_uploaded_file(uploaded_file, temp_dir):
     """Salva arquivo enviado em diretório temporário"""
     if uploaded_file is not None:
@@ -212,14 +214,23 @@ def preview_file_data(uploaded_file):
                 else:
                     st.write("Format not identified")
         
-        # Usa função robusta para ler o arquivo
-        df = read_excel_robust(uploaded_file)
+        # Modo preview: lê só cabeçalho + primeiras linhas (sem carregar o arquivo inteiro)
+        try:
+            df, estimated_rows = read_export_preview(uploaded_file, n_rows=PREVIEW_ROWS)
+        except Exception:
+            # Formato não suportado pelo preview incremental: usa leitura completa
+            df = read_excel_robust(uploaded_file)
+            estimated_rows = len(df)
+        uploaded_file.seek(0)
         
-        st.success(f"File loaded: {len(df):,} rows, {len(df.columns)} columns")
+        if estimated_rows is not None:
+            st.success(f"File loaded: ~{estimated_rows:,} rows, {len(df.columns)} columns")
+        else:
+            st.success(f"File loaded: {len(df.columns)} columns")
         
         # Mostra preview
-        with st.expander("Data Preview (first 5 rows)"):
-            st.dataframe(df.head(), use_container_width=True)
+        with st.expander(f"Data Preview (first {PREVIEW_ROWS} rows)"):
+            st.dataframe(df.head(PREVIEW_ROWS), use_container_width=True)
         
         # Verifica colunas importantes
         required_columns = [
@@ -284,6 +295,9 @@ def run_pipeline_module(module_name, script_path, main_file_path, no_partner_fil
             if not slack_file.exists():
                 return False, "Arquivo slack_messages.txt não encontrado. Execute Slack Message Generator primeiro."
             cmd_args = [sys.executable, str(script_path), str(slack_file)]
+        elif script_path.name == "action_list_exporter.py":
+            # Action List Exporter lê as listas gravadas pelos checkers no diretório da execução
+            cmd_args = [sys.executable, str(script_path)]
         else:
             # Módulos normais
             cmd_args = [sys.executable, str(script_path), str(main_file_path)]
@@ -298,6 +312,12 @@ def run_pipeline_module(module_name, script_path, main_file_path, no_partner_fil
         if execution_results_dir:
             env['PIPELINE_RESULTS_DIR'] = str(execution_results_dir)
         
+        # Escopo do export no histórico (sinalizações só são resolvidas pelo mesmo export)
+        env[EXPORT_KEY_ENV_VAR] = export_key(str(main_file_path))
+        
+        # Variantes .gz para o ZIP de download (respeita PIPELINE_PRECOMPRESS=0 explícito)
+        env.setdefault(PRECOMPRESS_ENV_VAR, '1')
+        
         result = subprocess.run(
             cmd_args,
             cwd=str(root_dir),
@@ -338,11 +358,37 @@ def run_complete_analysis(main_file_path, no_partner_file_path=None):
     # Armazena informações da execução no session state
     st.session_state.execution_id = execution_id
     st.session_state.execution_results_dir = str(execution_results_dir)
+    # Histórico mostrado na sessão: só o export e os AMs desta execução
+    st.session_state.history_run_dir = str(execution_results_dir)
     st.session_state.generated_files_list = []
     
+    # Registra a execução no índice de retenção (protegida enquanto estiver em uso)
+    retention = get_retention_manager(root_dir / "results")
+    retention.register_run(execution_results_dir)
+    
     st.info(f"📁 Execução: {execution_id}")
     st.info(f"📂 Diretório: {execution_results_dir}")
     
+    # Mesmos arquivos + mesmas regras + mesma data: reaproveita execução existente
+    date_dir = execution_results_dir.parent
+    run_key = compute_run_key([main_file_path, no_partner_file_path], root_dir / "scripts", date_dir.name)
+    cached_run_dir = find_cached_run(date_dir, run_key)
+    if cached_run_dir is not None:
+        link_run(cached_run_dir, execution_results_dir)
+        st.session_state.history_run_dir = str(cached_run_dir)
+        # Execução compactada tem só as variantes .gz das saídas
+        st.session_state.generated_files_list = sorted({
+            original_path(p).name if p.name.endswith(GZIP_SUFFIX) else p.name
+            for p in execution_results_dir.iterdir() if p.is_file()
+        })
+        retention.register_run(execution_results_dir)
+        st.success(f"Identical analysis already available ({cached_run_dir.name}) - results reused")
+        return True, [{
+            'name': 'Cached Run',
+            'success': True,
+            'output': f"Resultados reaproveitados de {cached_run_dir.name}"
+        }]
+    
     # Módulos a serem executados
     modules = [
         {
@@ -377,6 +423,11 @@ def run_complete_analysis(main_file_path, no_partner_file_path=None):
             'description': 'Criando interface Slack...',
             'depends_on': 'Slack Message Generator'
         },
+        {
+            'name': 'Action List Exporter',
+            'script': 'scripts/action list exporter/action_list_exporter.py',
+            'description': 'Exportando lista de ações...'
+        },
         {
             'name': 'Dashboard Generator',
             'script': 'scripts/dashboard generator/dashboard_generator.py',
@@ -422,6 +473,7 @@ def run_complete_analysis(main_file_path, no_partner_file_path=None):
             'Follow-up Generator': ['followup_emails.txt'],
             'HTML Email Generator': ['pipeline_hygiene_emails.html'],
             'Slack Interface Generator': ['slack_interface.html'],
+            'Action List Exporter': ['action_list.xlsx', 'action_list.csv'],
             'Dashboard Generator': ['dashboard.html']
         }
         
@@ -456,8 +508,28 @@ def run_complete_analysis(main_file_path, no_partner_file_path=None):
                     # Continua execução mesmo com erro de dependência
                 else:
                     st.error(f"Error in {module['name']}: {output}")
+                    retention.register_run(execution_results_dir)
                     return False, results
     
+    # Métricas do exportador e do dashboard no histórico (o exportador grava a execução antes deles)
+    try:
+        update_run_stages(str(execution_results_dir))
+    except sqlite3.Error as e:
+        with status_container:
+            st.warning(f"Could not update run metrics in history: {str(e)}")
+    
+    # PIPELINE_RESULTS_COMPACT: mantém em disco só as variantes .gz das saídas
+    if compact_enabled():
+        freed = compact_run_dir(execution_results_dir)
+        with status_container:
+            st.info(f"Results stored compressed ({freed / (1024 * 1024):.1f} MB freed)")
+    
+    # Atualiza tamanho final da execução no índice de retenção
+    retention.register_run(execution_results_dir)
+    
+    # Registra a chave para que submissões idênticas reaproveitem esta execução
+    record_run(date_dir, run_key, execution_results_dir)
+    
     # Finaliza
     progress_bar.progress(1.0)
     with status_container:
@@ -514,6 +586,16 @@ def get_generated_files():
             'description': 'Web interface for follow-up emails',
             'mime': 'text/html'
         },
+        'action_list.xlsx': {
+            'title': 'Action List (XLSX)',
+            'description': 'Flagged opportunities, one row per opportunity and rule',
+            'mime': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        },
+        'action_list.csv': {
+            'title': 'Action List (CSV)',
+            'description': 'Flagged opportunities for Salesforce bulk updates',
+            'mime': 'text/csv'
+        },
         'dashboard.html': {
             'title': 'Unified Dashboard',
             'description': 'Consolidated dashboard with all reports',
@@ -533,8 +615,8 @@ def get_generated_files():
     for filename in files_to_check:
         if filename in file_mappings:
             file_path = results_dir / filename
-            if file_path.exists():
-                size = file_path.stat().st_size
+            size = stored_file_size(file_path)
+            if size is not None:
                 info = file_mappings[filename]
                 generated_files.append({
                     'filename': filename,
@@ -547,8 +629,130 @@ def get_generated_files():
     
     return generated_files
 
+def get_run_metrics():
+    """Carrega run_metrics.json da execução atual como tabela de tempos por módulo"""
+    if not getattr(st.session_state, 'execution_results_dir', None):
+        return None
+    
+    metrics_file = Path(st.session_state.execution_results_dir) / "run_metrics.json"
+    if not metrics_file.exists():
+        return None
+    
+    try:
+        with open(metrics_file, 'r', encoding='utf-8') as f:
+            report = json.load(f)
+    except (OSError, ValueError):
+        return None
+    
+    rows = []
+    for stage_name, stage in report.get('stages', {}).items():
+        rows.append({
+            'Module': stage_name,
+            'Status': '✅' if stage.get('status') == 'success' else '❌',
+            'Wall (s)': stage.get('wall_time_s'),
+            'CPU (s)': stage.get('cpu_time_s'),
+            'Peak Memory (MB)': stage.get('peak_memory_mb'),
+            'Input Rows': stage.get('input_rows'),
+            'Issues': stage.get('total_issues'),
+        })
+    
+    return pd.DataFrame(rows) if rows else None
+
+# Campos de busca do histórico -> rótulo exibido
+HISTORY_SEARCH_FIELDS = {
+    'opportunity_id': 'Opportunity ID (18 characters)',
+    'owner': 'Account Manager',
+    'partner': 'Partner',
+}
+
+def get_issue_history(field, value, run_dir):
+    """
+    Períodos em que cada oportunidade/regra foi sinalizada (results/history.sqlite3)
+    
+    O banco é compartilhado por todas as sessões: a busca fica restrita ao
+    export e aos AMs da execução da sessão (run_dir).
+    """
+    history_path = get_history_path()
+    if history_path is None or not os.path.exists(history_path) or not run_dir:
+        return None
+    
+    with closing(connect_history(history_path)) as conn:
+        run = recorded_run(conn, run_dir)
+        if run is None:
+            return None
+        rows = finding_history(conn, scope=run['scope'], owners=run['owners'], **{field: value})
+    
+    return pd.DataFrame([{
+        'Opportunity ID': row['opportunity_id'],
+        'Opportunity': row['opportunity_name'],
+        'Rule': row['rule'],
+        'Owner': row['owner'],
+        'Partner': row['partner'],
+        'First Seen': row['first_seen'],
+        'Last Seen': row['last_seen'],
+        'Runs': row['runs'],
+        'Days Flagged': row['days_flagged'],
+    } for row in rows])
+
+# Dimensões das tendências -> rótulo exibido
+TREND_DIMENSIONS = {
+    'rule': 'Rule',
+    'owner': 'Account Manager',
+    'partner': 'Partner',
+}
+
+# Linhas das listas de sinalizações abertas/resolvidas
+TREND_LIST_LIMIT = 200
+
+def get_issue_trends(dimension, run_dir):
+    """Séries, aging e listas de sinalizações do export e dos AMs da execução (run_dir) a partir dos rollups"""
+    history_path = get_history_path()
+    if history_path is None or not os.path.exists(history_path) or not run_dir:
+        return None
+    
+    with closing(connect_history(history_path)) as conn:
+        run = recorded_run(conn, run_dir)
+        if run is None or not trend_dates(conn, scope=run['scope']):
+            return None
+        scope, owners = run['scope'], run['owners']
+        values = top_values(conn, dimension, scope=scope, among=owners) if dimension == 'owner' else None
+        trend = trend_series(conn, dimension, values, scope=scope)
+        aging = aging_summary(conn, dimension, list(trend['series']), scope=scope)
+        open_rows = open_findings(conn, TREND_LIST_LIMIT, scope, owners)
+        resolved_rows = resolved_findings(conn, TREND_LIST_LIMIT, scope, owners)
+    
+    chart_df = pd.DataFrame({value or 'N/A': values['findings'] for value, values in trend['series'].items()},
+                            index=pd.to_datetime(trend['dates']))
+    aging_df = pd.DataFrame([{
+        TREND_DIMENSIONS[dimension]: row['value'] or 'N/A',
+        'Open': row['open'],
+        'Opportunities': row['opportunities'],
+        f'Open > {AGED_DAYS} days': row['aged'],
+        'Avg Age (days)': row['avg_age_days'],
+        'Resolved': row['resolved'],
+        'Avg Days to Resolve': row['avg_resolution_days'],
+    } for row in aging])
+    
+    return {
+        'chart': chart_df,
+        'aging': aging_df,
+        'open': pd.DataFrame(open_rows),
+        'resolved': pd.DataFrame(resolved_rows),
+    }
+
+def get_zip_compress_type(file_path):
+    """Define compressão da entrada: arquivos já comprimidos ou pequenos são apenas armazenados"""
+    if file_path.suffix.lower() in ZIP_STORED_EXTENSIONS:
+        return zipfile.ZIP_STORED
+    if file_path.stat().st_size < ZIP_STORED_MAX_SIZE:
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
 def create_results_zip():
-    """Cria arquivo ZIP com todos os resultados da execução atual - APENAS da sessão atual"""
+    """Cria (ou reaproveita) o ZIP com os resultados da execução atual - APENAS da sessão atual
+    
+    Retorna o caminho do arquivo ZIP em disco.
+    """
     # SEMPRE usa diretório específico da execução - NUNCA faz fallback para pasta geral
     if hasattr(st.session_state, 'execution_results_dir') and st.session_state.execution_results_dir:
         results_dir = Path(st.session_state.execution_results_dir)
@@ -560,27 +764,44 @@ def create_results_zip():
         # Se não há execução ativa, não permite download
         raise ValueError("Nenhuma execução ativa encontrada. Execute uma análise primeiro.")
     
-    # Cria ZIP em memória
-    zip_buffer = io.BytesIO()
+    # Archive fica ao lado do diretório da execução (results/DATA/run_xxx.zip),
+    # fora da árvore compactada e removido junto com a pasta do dia
+    archive_path = results_dir.parent / f"{results_dir.name}.zip"
+    
+    files = [p for p in sorted(results_dir.rglob('*')) if p.is_file()]
+    manifest = archive_manifest(results_dir)
+    
+    # Reaproveita ZIP já gerado se a execução ainda tem as mesmas entradas (nomes e
+    # tamanhos do manifesto) e nenhum arquivo mudou depois dele
+    if archive_path.exists() and load_archive_manifest(archive_path) == manifest:
+        archive_mtime = archive_path.stat().st_mtime
+        if all(p.stat().st_mtime <= archive_mtime for p in files):
+            get_retention_manager(root_dir / "results").touch(results_dir)
+            return archive_path
+    
+    # Escreve o ZIP incrementalmente em arquivo temporário (sem buffer em memória);
+    # saídas com variante .gz entram com o stream deflate já pronto, sem recompressão
+    tmp_path = archive_path.with_suffix('.zip.tmp')
+    try:
+        write_results_zip(results_dir, tmp_path, get_zip_compress_type)
+        # Manifesto antigo não pode validar o ZIP novo se a gravação parar no meio
+        manifest_path(archive_path).unlink(missing_ok=True)
+        os.replace(tmp_path, archive_path)
+        save_archive_manifest(archive_path, manifest)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
     
-    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-        # Inclui todos os arquivos recursivamente APENAS do diretório específico
-        for file_path in results_dir.rglob('*'):
-            if file_path.is_file():
-                # Mantém estrutura de pastas no ZIP
-                relative_path = file_path.relative_to(results_dir)
-                zip_file.write(file_path, str(relative_path))
+    # Contabiliza o ZIP no orçamento de disco da execução
+    get_retention_manager(root_dir / "results").register_run(results_dir)
     
-    zip_buffer.seek(0)
-    return zip_buffer.getvalue()
+    return archive_path
 
 def main():
     """Função principal da aplicação Streamlit"""
     
-    # Limpeza automática de arquivos antigos (executa uma vez por sessão)
-    if 'cleanup_done' not in st.session_state:
-        cleanup_old_results()
-        st.session_state.cleanup_done = True
+    # Limpeza de resultados antigos em thread de fundo (uma por processo, fora do caminho da requisição)
+    start_background_cleanup(root_dir / "results")
     
     # Header
     st.title("AWS Partner Pipeline Analysis")
@@ -773,6 +994,69 @@ def main():
                             size_str = f"{file_info['size']} bytes"
                         st.write(size_str)
             
+            # Tempos e volumes por módulo (run_metrics.json)
+            metrics_df = get_run_metrics()
+            if metrics_df is not None:
+                st.divider()
+                st.subheader("Execution Metrics")
+                st.dataframe(metrics_df, use_container_width=True, hide_index=True)
+                st.caption(f"Total time: {metrics_df['Wall (s)'].sum():.2f}s")
+                
+                # Profiles por módulo quando o servidor roda com PIPELINE_PROFILE (herdado pelos subprocessos)
+                profiles_dir = Path(st.session_state.execution_results_dir) / "profiles"
+                if profiles_dir.exists():
+                    profile_count = len(list(profiles_dir.iterdir()))
+                    st.caption(f"🔬 {profile_count} profile files in profiles/ (included in the ZIP)")
+            
+            # Histórico das sinalizações em execuções anteriores
+            if get_history_path() is not None:
+                st.divider()
+                st.subheader("Issue History")
+                st.caption("Previous runs of this export, limited to the account managers in your results")
+                col1, col2 = st.columns([1, 2])
+                with col1:
+                    history_field = st.selectbox("Search by", list(HISTORY_SEARCH_FIELDS),
+                                                 format_func=HISTORY_SEARCH_FIELDS.get, key='history_field')
+                with col2:
+                    history_value = st.text_input("Value", key='history_value').strip()
+                
+                if history_value:
+                    try:
+                        history_df = get_issue_history(history_field, history_value,
+                                                       st.session_state.get('history_run_dir'))
+                    except sqlite3.Error as e:
+                        st.warning(f"Could not read history: {str(e)}")
+                        history_df = None
+                    
+                    if history_df is None:
+                        st.info("No history recorded for this run")
+                    elif history_df.empty:
+                        st.info("No findings recorded for this value")
+                    else:
+                        st.dataframe(history_df, use_container_width=True, hide_index=True)
+                        st.caption(f"{len(history_df)} opportunity/rule pairs - flagged longest first")
+                
+                # Tendências e aging (rollups gravados ao final de cada execução)
+                st.subheader("Trends & Aging")
+                trend_dimension = st.radio("Group by", list(TREND_DIMENSIONS), format_func=TREND_DIMENSIONS.get,
+                                           horizontal=True, key='trend_dimension')
+                try:
+                    trends = get_issue_trends(trend_dimension, st.session_state.get('history_run_dir'))
+                except sqlite3.Error as e:
+                    st.warning(f"Could not read history: {str(e)}")
+                    trends = None
+                
+                if trends is None:
+                    st.info("No history recorded for this run")
+                else:
+                    st.line_chart(trends['chart'])
+                    st.dataframe(trends['aging'], use_container_width=True, hide_index=True)
+                    
+                    with st.expander(f"🕰️ Oldest open findings ({len(trends['open'])})"):
+                        st.dataframe(trends['open'], use_container_width=True, hide_index=True)
+                    with st.expander(f"✅ Recently resolved ({len(trends['resolved'])})"):
+                        st.dataframe(trends['resolved'], use_container_width=True, hide_index=True)
+            
             # Download completo (ZIP) - Destaque principal
             st.divider()
             st.subheader("Download Results")
@@ -780,21 +1064,22 @@ def main():
             col1, col2, col3 = st.columns([1, 2, 1])
             with col2:
                 try:
-                    zip_data = create_results_zip()
+                    zip_path = create_results_zip()
                     # Usa execution_id se disponível, senão usa timestamp atual
                     if hasattr(st.session_state, 'execution_id'):
                         filename_suffix = st.session_state.execution_id
                     else:
                         filename_suffix = datetime.now().strftime('%Y%m%d_%H%M')
                     
-                    st.download_button(
-                        "Download Complete Package (ZIP)",
-                        data=zip_data,
-                        file_name=f"pipeline_analysis_{filename_suffix}.zip",
-                        mime="application/zip",
-                        use_container_width=True,
-                        type="primary"
-                    )
+                    with open(zip_path, 'rb') as zip_file:
+                        st.download_button(
+                            "Download Complete Package (ZIP)",
+                            data=zip_file,
+                            file_name=f"pipeline_analysis_{filename_suffix}.zip",
+                            mime="application/zip",
+                            use_container_width=True,
+                            type="primary"
+                        )
                     st.caption("Contains all generated reports and HTML interfaces from this execution only")
                     
                     # Mostra informações de segurança
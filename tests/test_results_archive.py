@@ -0,0 +1,91 @@
+"""ZIP dos resultados a partir das variantes .gz (utils/results_archive.py)"""
+
+import gzip
+import io
+import os
+import sys
+import zipfile
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from utils import results_archive  # noqa: E402
+from utils.results_archive import (archive_manifest, compact_run_dir, load_archive_manifest,  # noqa: E402
+                                   save_archive_manifest, write_results_zip)
+
+REPORT = ''.join(f'<tr><td>Opportunity {i}</td><td>Partner {i % 7}</td></tr>\n' for i in range(5000)).encode()
+SUMMARY = b'Resumo da execucao\n'
+
+
+@pytest.fixture
+def run_dir(tmp_path):
+    run_dir = tmp_path / 'run_10h00m00s'
+    (run_dir / 'data').mkdir(parents=True)
+    (run_dir / 'report.html').write_bytes(REPORT)
+    (run_dir / 'report.html.gz').write_bytes(gzip.compress(REPORT, mtime=0))
+    (run_dir / 'data' / 'report.js').write_bytes(REPORT)
+    (run_dir / 'data' / 'report.js.gz').write_bytes(gzip.compress(REPORT, mtime=0))
+    (run_dir / 'summary.txt').write_bytes(SUMMARY)
+    return run_dir
+
+
+def assert_round_trip(archive_path):
+    with zipfile.ZipFile(archive_path) as zip_file:
+        assert zip_file.testzip() is None
+        assert sorted(zip_file.namelist()) == ['data/report.js', 'report.html', 'summary.txt']
+        assert zip_file.read('report.html') == REPORT
+        assert zip_file.read('data/report.js') == REPORT
+        assert zip_file.read('summary.txt') == SUMMARY
+
+
+def compress_type(path):
+    return zipfile.ZIP_DEFLATED
+
+
+@pytest.mark.skipif(not results_archive.raw_copy_supported(zipfile.ZipFile(io.BytesIO(), 'w')),
+                    reason='cópia direta indisponível nesta versão do Python')
+def test_raw_copy_round_trip(run_dir, tmp_path):
+    archive_path = tmp_path / 'raw.zip'
+    counts = write_results_zip(run_dir, archive_path, compress_type)
+
+    assert counts == {'precompressed': 2, 'compressed': 1}
+    assert_round_trip(archive_path)
+
+
+def test_public_api_fallback_round_trip(run_dir, tmp_path, monkeypatch):
+    monkeypatch.setattr(results_archive, 'raw_copy_supported', lambda zip_file: False)
+    archive_path = tmp_path / 'fallback.zip'
+    counts = write_results_zip(run_dir, archive_path, compress_type)
+
+    assert counts == {'precompressed': 0, 'compressed': 3}
+    assert_round_trip(archive_path)
+
+
+def test_compacted_run_keeps_original_names(run_dir, tmp_path):
+    compact_run_dir(run_dir)
+    assert not (run_dir / 'report.html').exists()
+
+    archive_path = tmp_path / 'compact.zip'
+    write_results_zip(run_dir, archive_path, compress_type)
+    assert_round_trip(archive_path)
+
+
+def test_manifest_tracks_deleted_outputs(run_dir, tmp_path):
+    archive_path = tmp_path / 'run.zip'
+    write_results_zip(run_dir, archive_path, compress_type)
+    save_archive_manifest(archive_path, archive_manifest(run_dir))
+    assert load_archive_manifest(archive_path) == {'data/report.js': len(REPORT), 'report.html': len(REPORT),
+                                                   'summary.txt': len(SUMMARY)}
+
+    # Compactação não muda as entradas do ZIP: o manifesto continua valendo
+    compact_run_dir(run_dir)
+    assert archive_manifest(run_dir) == load_archive_manifest(archive_path)
+
+    # Saída removida depois do ZIP invalida o manifesto
+    (run_dir / 'summary.txt').unlink()
+    assert archive_manifest(run_dir) != load_archive_manifest(archive_path)
+
+
+def test_missing_manifest_is_none(tmp_path):
+    assert load_archive_manifest(tmp_path / 'run.zip') is None
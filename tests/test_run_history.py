@@ -0,0 +1,111 @@
+"""Rollups do histórico de execuções (scripts/utils/run_history.py)"""
+
+import json
+import os
+import sys
+from contextlib import closing
+
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts', 'utils'))
+
+from run_history import (connect, export_key, open_findings, record_run, resolved_findings,  # noqa: E402
+                         trend_series, update_run_stages)
+
+
+def write_action_items(path, findings):
+    """CSV de action_items com uma linha por (oportunidade, regra, AM)"""
+    pd.DataFrame([('Pipeline Hygiene', rule, opportunity_id, owner) for opportunity_id, rule, owner in findings],
+                 columns=['Module', 'Rule', 'Opportunity ID', 'Owner']).to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.fixture
+def history(tmp_path):
+    with closing(connect(str(tmp_path / 'history.sqlite3'))) as conn:
+        yield conn
+
+
+def record(conn, tmp_path, name, run_date, scope, findings):
+    run_dir = tmp_path / name
+    run_dir.mkdir()
+    source = write_action_items(run_dir / 'action_items.csv', findings)
+    return record_run(str(run_dir), [source], run_date, conn, scope)
+
+
+def open_pairs(conn, scope):
+    return {(row['opportunity_id'], row['first_seen']) for row in open_findings(conn, scope=scope)}
+
+
+def test_export_of_another_am_does_not_resolve_findings(history, tmp_path):
+    x_findings = [('o1', 'R1', 'X'), ('o2', 'R1', 'X')]
+    record(history, tmp_path, 'x1', '2025-10-01', 'am-x', x_findings)
+    record(history, tmp_path, 'y2', '2025-10-02', 'am-y', [('o9', 'R1', 'Y')])
+    record(history, tmp_path, 'x3', '2025-10-03', 'am-x', x_findings)
+
+    # Continuam abertas desde a primeira execução de X, sem resoluções
+    assert open_pairs(history, 'am-x') == {('o1', '2025-10-01'), ('o2', '2025-10-01')}
+    assert resolved_findings(history, scope='am-x') == []
+    assert open_pairs(history, 'am-y') == {('o9', '2025-10-02')}
+
+    total = trend_series(history, 'total', scope='am-x')
+    assert total['dates'] == ['2025-10-01', '2025-10-03']
+    assert total['series']['']['new_findings'] == [2, 0]
+    assert total['series']['']['resolved'] == [0, 0]
+
+
+def test_next_run_of_same_export_resolves_missing_findings(history, tmp_path):
+    record(history, tmp_path, 'x1', '2025-10-01', 'am-x', [('o1', 'R1', 'X'), ('o2', 'R1', 'X')])
+    record(history, tmp_path, 'y2', '2025-10-02', 'am-y', [('o9', 'R1', 'Y')])
+    record(history, tmp_path, 'x3', '2025-10-03', 'am-x', [('o1', 'R1', 'X')])
+
+    assert open_pairs(history, 'am-x') == {('o1', '2025-10-01')}
+    assert [(row['opportunity_id'], row['resolved_on'], row['days_to_resolve'])
+            for row in resolved_findings(history, scope='am-x')] == [('o2', '2025-10-03', 2)]
+    assert open_pairs(history, 'am-y') == {('o9', '2025-10-02')}
+
+
+def test_out_of_order_run_rebuilds_only_its_export(history, tmp_path):
+    record(history, tmp_path, 'x1', '2025-10-01', 'am-x', [('o1', 'R1', 'X')])
+    record(history, tmp_path, 'x3', '2025-10-03', 'am-x', [('o1', 'R1', 'X')])
+    record(history, tmp_path, 'y3', '2025-10-03', 'am-y', [('o9', 'R1', 'Y')])
+    record(history, tmp_path, 'x2', '2025-10-02', 'am-x', [])
+
+    assert [(row['opportunity_id'], row['first_seen'], row['resolved_on'])
+            for row in resolved_findings(history, scope='am-x')] == [('o1', '2025-10-01', '2025-10-02')]
+    assert open_pairs(history, 'am-x') == {('o1', '2025-10-03')}
+    assert open_pairs(history, 'am-y') == {('o9', '2025-10-03')}
+
+
+def test_new_salesforce_download_resolves_findings(history, tmp_path):
+    # Cada download do mesmo relatório recebe outro nome (report<timestamp>.xls)
+    first, second = export_key('report1755695670497.xls'), export_key('/tmp/report1758543270930.xls')
+    assert first == second
+
+    record(history, tmp_path, 'd1', '2025-10-01', first, [('o1', 'R1', 'X'), ('o2', 'R1', 'X')])
+    record(history, tmp_path, 'd2', '2025-10-02', second, [('o1', 'R1', 'X')])
+
+    assert [(row['opportunity_id'], row['resolved_on']) for row in resolved_findings(history, scope=second)] == \
+        [('o2', '2025-10-02')]
+    assert trend_series(history, 'total', scope=second)['dates'] == ['2025-10-01', '2025-10-02']
+
+
+def test_update_run_stages_adds_later_stages(history, tmp_path):
+    run_dir = tmp_path / 'x1'
+    run_dir.mkdir()
+    (run_dir / 'run_metrics.json').write_text(json.dumps({'stages': {
+        'Delivery Model Checker': {'status': 'success', 'wall_time_s': 1.0}}}))
+    record_run(str(run_dir), [write_action_items(run_dir / 'action_items.csv', [('o1', 'R1', 'X')])],
+               '2025-10-01', history, 'am-x')
+
+    # Exportador e dashboard terminam depois da gravação da execução
+    (run_dir / 'run_metrics.json').write_text(json.dumps({'stages': {
+        'Delivery Model Checker': {'status': 'success', 'wall_time_s': 1.0},
+        'Action List Exporter': {'status': 'success', 'wall_time_s': 2.0},
+        'Dashboard Generator': {'status': 'success', 'wall_time_s': 0.5}}}))
+    assert update_run_stages(str(run_dir), history)
+
+    stages = {row['stage']: row['wall_time_s'] for row in history.execute('SELECT stage, wall_time_s FROM run_stages')}
+    assert stages == {'Delivery Model Checker': 1.0, 'Action List Exporter': 2.0, 'Dashboard Generator': 0.5}
+    assert not update_run_stages(str(tmp_path / 'not-recorded'), history)
@@ -4,12 +4,27 @@ Utilitários para manipulação de arquivos
 Inclui funções robustas para leitura de arquivos com diferentes encodings
 """
 
+import logging
 import os
+import sys
 from typing import Optional
 
+# Decodificação compartilhada com os scripts do pipeline
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts', 'utils'))
+from text_decoding import decode_attempts, open_mapped_text
+
+logger = logging.getLogger('pipeline.decoding')
+
+# Ordem de preferência original (utf-16/ascii como alternativas extras)
+READ_ENCODINGS = ('utf-8', 'iso-8859-1', 'cp1252', 'latin1', 'utf-16', 'ascii')
+
 def read_file_robust(file_path: str, description: str = "arquivo") -> str:
     """
-    Lê arquivo tentando diferentes encodings de forma robusta
+    Lê arquivo detectando o encoding de forma robusta
+    
+    O arquivo é mapeado em memória (mmap) e decodificado direto do mapeamento,
+    sem manter uma cópia dos bytes ao lado do texto; BOM/padrão de bytes e os
+    encodings alternativos seguem scripts/utils/text_decoding.py.
     
     Args:
         file_path: Caminho para o arquivo
@@ -19,66 +34,26 @@ def read_file_robust(file_path: str, description: str = "arquivo") -> str:
         Conteúdo do arquivo como string
         
     Raises:
-        Exception: Se não conseguir ler o arquivo com nenhum encoding
+        Exception: Se não conseguir ler o arquivo
     """
     
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
     
-    # Lista de encodings para tentar, em ordem de preferência
-    encodings_to_try = [
-        'utf-8',           # Padrão moderno
-        'iso-8859-1',      # Latin-1, comum em sistemas antigos
-        'cp1252',          # Windows-1252, comum no Windows
-        'latin1',          # Alias para iso-8859-1
-        'utf-16',          # Unicode 16-bit
-        'ascii'            # ASCII puro
-    ]
-    
-    content = None
-    successful_encoding = None
-    
-    # Tenta cada encoding
-    for encoding in encodings_to_try:
-        try:
-            with open(file_path, 'r', encoding=encoding) as f:
-                content = f.read()
-            successful_encoding = encoding
-            print(f"✅ {description.capitalize()} lido com sucesso usando encoding: {encoding}")
-            break
-        except UnicodeDecodeError as e:
-            print(f"⚠️  Falha ao ler {description} com encoding {encoding}: {e}")
-            continue
-        except Exception as e:
-            print(f"❌ Erro inesperado ao ler {description} com encoding {encoding}: {e}")
-            continue
-    
-    # Se nenhum encoding funcionou, tenta leitura binária com fallback
-    if content is None:
-        try:
-            print(f"🔄 Tentando leitura binária para {description}...")
-            with open(file_path, 'rb') as f:
-                raw_content = f.read()
-            
-            # Tenta decodificar como UTF-8 ignorando erros
-            content = raw_content.decode('utf-8', errors='ignore')
-            successful_encoding = 'utf-8 (com erros ignorados)'
-            print(f"⚠️  {description.capitalize()} lido com UTF-8 ignorando caracteres inválidos")
-            
-        except Exception as e:
-            raise Exception(f"❌ Não foi possível ler o {description} {file_path} com nenhum método: {e}")
-    
-    if content is None:
-        raise Exception(f"❌ Falha completa na leitura do {description} {file_path}")
-    
-    # Log de sucesso com estatísticas
-    file_size = os.path.getsize(file_path)
-    content_length = len(content)
-    print(f"📊 {description.capitalize()} processado:")
-    print(f"   📁 Arquivo: {os.path.basename(file_path)}")
-    print(f"   📏 Tamanho: {file_size:,} bytes")
-    print(f"   📝 Conteúdo: {content_length:,} caracteres")
-    print(f"   🔤 Encoding: {successful_encoding}")
+    try:
+        with open_mapped_text(file_path, description, READ_ENCODINGS) as text:
+            content = text.decode()
+            size = len(text)
+            successful_encoding = text.encoding
+    except OSError as e:
+        raise Exception(f"❌ Não foi possível ler o {description} {file_path}: {e}")
+    
+    # Log com estatísticas
+    logger.info(
+        "%s processado: %s | %s bytes | %s caracteres | encoding %s",
+        description.capitalize(), os.path.basename(file_path),
+        f"{size:,}", f"{len(content):,}", successful_encoding
+    )
     
     return content
 
@@ -162,29 +137,15 @@ def validate_file_encoding(file_path: str) -> dict:
         return {"valid": False, "error": "Arquivo não encontrado"}
     
     encodings_to_test = ['utf-8', 'iso-8859-1', 'cp1252', 'latin1']
-    results = {}
-    
-    for encoding in encodings_to_test:
-        try:
-            with open(file_path, 'r', encoding=encoding) as f:
-                content = f.read()
-            results[encoding] = {
-                "valid": True,
-                "content_length": len(content),
-                "error": None
-            }
-        except UnicodeDecodeError as e:
-            results[encoding] = {
-                "valid": False,
-                "content_length": 0,
-                "error": str(e)
-            }
-        except Exception as e:
-            results[encoding] = {
-                "valid": False,
-                "content_length": 0,
-                "error": f"Erro inesperado: {str(e)}"
-            }
+    
+    # Uma leitura; cada encoding é testado em memória
+    try:
+        with open(file_path, 'rb') as f:
+            raw_content = f.read()
+    except Exception as e:
+        return {"valid": False, "error": f"Erro inesperado: {str(e)}"}
+    
+    results = decode_attempts(raw_content, encodings_to_test)
     
     # Determina o melhor encoding
     valid_encodings = [enc for enc, result in results.items() if result["valid"]]
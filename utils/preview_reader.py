@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Leitura parcial (preview) de exports do Salesforce
+Lê apenas o cabeçalho e as primeiras N linhas do relatório, sem carregar o arquivo inteiro
+"""
+
+import codecs
+from html.parser import HTMLParser
+from typing import List, Optional, Tuple
+
+import pandas as pd
+
+# Tamanho dos blocos lidos do arquivo (64 KB)
+CHUNK_SIZE = 64 * 1024
+
+# Encodings tentados para exports HTML, em ordem de preferência
+HTML_ENCODINGS = ['utf-8', 'iso-8859-1']
+
+
+class _TablePreviewParser(HTMLParser):
+    """Parser incremental que coleta as primeiras linhas da primeira tabela do HTML"""
+
+    def __init__(self, max_rows: int):
+        super().__init__(convert_charrefs=True)
+        self.max_rows = max_rows
+        self.rows: List[List[str]] = []
+        self.header: Optional[List[str]] = None
+        self.done = False
+        self._table_depth = 0
+        self._finished_table = False
+        self._current_row: Optional[List[str]] = None
+        self._current_cell: Optional[List[str]] = None
+        self._row_has_th = False
+
+    def handle_starttag(self, tag, attrs):
+        if self.done or self._finished_table:
+            return
+        if tag == 'table':
+            self._table_depth += 1
+        elif self._table_depth == 1:
+            if tag == 'tr':
+                self._current_row = []
+                self._row_has_th = False
+            elif tag in ('td', 'th') and self._current_row is not None:
+                self._current_cell = []
+                if tag == 'th':
+                    self._row_has_th = True
+            elif tag == 'br' and self._current_cell is not None:
+                self._current_cell.append(' ')
+
+    def handle_endtag(self, tag):
+        if self.done or self._finished_table:
+            return
+        if tag == 'table':
+            self._table_depth -= 1
+            if self._table_depth == 0:
+                # Só interessa a primeira tabela (mesmo comportamento de pd.read_html(...)[0])
+                self._finished_table = True
+                self.done = True
+        elif self._table_depth == 1:
+            if tag in ('td', 'th'):
+                self._close_cell()
+            elif tag == 'tr':
+                self._close_row()
+
+    def handle_data(self, data):
+        if self._current_cell is not None:
+            self._current_cell.append(data)
+
+    def _close_cell(self):
+        if self._current_cell is not None and self._current_row is not None:
+            self._current_row.append(' '.join(''.join(self._current_cell).split()))
+        self._current_cell = None
+
+    def _close_row(self):
+        self._close_cell()
+        row = self._current_row
+        self._current_row = None
+        if not row:
+            return
+        if self.header is None:
+            self.header = row
+        else:
+            self.rows.append(row)
+            if len(self.rows) >= self.max_rows:
+                self.done = True
+
+
+def _open_binary(source):
+    """Retorna (arquivo binário, deve_fechar) para caminho ou buffer"""
+    if hasattr(source, 'read'):
+        source.seek(0)
+        return source, False
+    return open(source, 'rb'), True
+
+
+def _iter_chunks(source):
+    """Itera blocos binários do arquivo a partir do início"""
+    f, should_close = _open_binary(source)
+    try:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        if should_close:
+            f.close()
+        else:
+            source.seek(0)
+
+
+def estimate_html_rows(source) -> int:
+    """
+    Estima o número de linhas de dados de um export HTML contando tags <tr>
+
+    Faz apenas uma varredura de bytes em blocos (sem parse), portanto é
+    barata mesmo para arquivos grandes. Desconta a linha de cabeçalho.
+    """
+    count = 0
+    tail = b''
+    for chunk in _iter_chunks(source):
+        # Os 2 bytes finais do bloco anterior cobrem tags quebradas entre blocos
+        # (não cabem um '<tr' inteiro, então não há contagem duplicada)
+        count += (tail + chunk).lower().count(b'<tr')
+        tail = chunk[-2:]
+    return max(count - 1, 0)
+
+
+def _read_html_preview(source, n_rows: int) -> pd.DataFrame:
+    """Lê cabeçalho + primeiras N linhas de um export HTML de forma incremental"""
+    last_error = None
+    for encoding in HTML_ENCODINGS:
+        parser = _TablePreviewParser(n_rows)
+        decoder = codecs.getincrementaldecoder(encoding)()
+        try:
+            for chunk in _iter_chunks(source):
+                parser.feed(decoder.decode(chunk))
+                if parser.done:
+                    break
+            else:
+                parser.feed(decoder.decode(b'', final=True))
+                parser.close()
+        except UnicodeDecodeError as e:
+            last_error = e
+            continue
+
+        if parser.header is None:
+            raise ValueError("Nenhuma tabela encontrada no arquivo HTML")
+
+        header = parser.header
+        rows = [row[:len(header)] + [None] * (len(header) - len(row)) for row in parser.rows]
+        return pd.DataFrame(rows, columns=header)
+
+    raise ValueError(f"Não foi possível decodificar o arquivo HTML: {last_error}")
+
+
+def _read_xlsx_preview(source, n_rows: int) -> Tuple[pd.DataFrame, Optional[int]]:
+    """Lê cabeçalho + primeiras N linhas de um XLSX em modo read-only"""
+    from openpyxl import load_workbook
+
+    f, should_close = _open_binary(source)
+    try:
+        wb = load_workbook(f, read_only=True, data_only=True)
+        try:
+            ws = wb.worksheets[0]
+            # max_row vem da dimensão gravada no arquivo, sem percorrer a planilha
+            estimated_rows = ws.max_row - 1 if ws.max_row else None
+            rows_iter = ws.iter_rows(max_row=n_rows + 1, values_only=True)
+            header = next(rows_iter, None)
+            if header is None:
+                return pd.DataFrame(), 0
+            data = [list(row) for row in rows_iter]
+            return pd.DataFrame(data, columns=list(header)), estimated_rows
+        finally:
+            wb.close()
+    finally:
+        if should_close:
+            f.close()
+        else:
+            source.seek(0)
+
+
+def read_export_preview(source, n_rows: int = 5) -> Tuple[pd.DataFrame, Optional[int]]:
+    """
+    Lê apenas o cabeçalho e as primeiras N linhas de um export (HTML ou Excel)
+
+    Args:
+        source: Caminho do arquivo ou buffer binário (ex: arquivo do Streamlit)
+        n_rows: Número de linhas de dados a ler
+
+    Returns:
+        Tupla (DataFrame com até N linhas, estimativa do total de linhas ou None)
+
+    Raises:
+        Exception: Se o formato não for suportado pelo modo preview
+    """
+    f, should_close = _open_binary(source)
+    try:
+        first_bytes = f.read(1024)
+    finally:
+        if should_close:
+            f.close()
+        else:
+            source.seek(0)
+
+    lowered = first_bytes.lower()
+    if b'<html' in lowered or b'<!doctype' in lowered or b'<table' in lowered:
+        return _read_html_preview(source, n_rows), estimate_html_rows(source)
+
+    if first_bytes.startswith(b'PK'):
+        return _read_xlsx_preview(source, n_rows)
+
+    if first_bytes.startswith(b'\xd0\xcf\x11\xe0'):
+        # XLS antigo: xlrd carrega o workbook inteiro, mas ao menos evita montar o DataFrame completo
+        df = pd.read_excel(source, engine='xlrd', nrows=n_rows)
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        return df, None
+
+    raise ValueError("Formato não suportado pelo modo preview")
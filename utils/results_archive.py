@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+ZIP dos resultados reaproveitando as variantes pré-comprimidas
+Os geradores gravam <arquivo>.gz ao lado das saídas grandes
+(scripts/utils/precompressed.py). Um .gz de membro único contém o mesmo
+stream deflate de uma entrada ZIP_DEFLATED, então a entrada <arquivo> do ZIP
+é montada copiando esses bytes (com CRC e tamanho do trailer gzip), sem
+comprimir de novo. Arquivos sem variante válida são comprimidos normalmente.
+
+A cópia direta depende de atributos internos do zipfile, então só é usada
+nas versões do Python em que eles foram verificados (RAW_COPY_PYTHON); nas
+demais o .gz é descomprimido e gravado pela API pública (ZipFile.open).
+
+Com PIPELINE_RESULTS_COMPACT=1 a execução concluída mantém só os .gz das
+saídas em disco (compact_run_dir); o ZIP continua com os nomes originais.
+
+Ao lado do ZIP fica o manifesto <arquivo>.zip.json com as entradas e seus
+tamanhos: o ZIP só é reaproveitado se a execução ainda gera as mesmas
+entradas (arquivos removidos depois dele invalidam o ZIP).
+"""
+
+import gzip
+import json
+import os
+import shutil
+import struct
+import sys
+import time
+import zipfile
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+COMPACT_ENV_VAR = 'PIPELINE_RESULTS_COMPACT'
+
+GZIP_SUFFIX = '.gz'
+
+MANIFEST_SUFFIX = '.json'
+
+# Cabeçalho gzip: magic, método (8 = deflate), flags, mtime, xfl, os
+_GZIP_HEADER = struct.Struct('<2sBBIBB')
+_GZIP_TRAILER = struct.Struct('<II')
+_FEXTRA, _FNAME, _FCOMMENT, _FHCRC = 4, 8, 16, 2
+
+_COPY_CHUNK_SIZE = 1024 * 1024
+
+# Versões do Python com os internos do ZipFile usados na cópia direta
+RAW_COPY_PYTHON = ((3, 8), (3, 13))
+_RAW_COPY_ATTRIBUTES = ('_lock', '_seekable', '_writecheck', '_didModify', 'start_dir', 'fp', 'filelist', 'NameToInfo')
+
+
+class GzipMember(NamedTuple):
+    """Posição do stream deflate dentro do .gz e dados do trailer"""
+    data_offset: int
+    data_size: int
+    crc: int
+    size: int
+
+
+def compact_enabled() -> bool:
+    value = os.environ.get(COMPACT_ENV_VAR, '').strip().lower()
+    return value in ('1', 'true', 'yes', 'on')
+
+
+def _skip_zero_terminated(f):
+    while True:
+        byte = f.read(1)
+        if not byte or byte == b'\x00':
+            return
+
+
+def read_gzip_member(gz_path: Path) -> Optional[GzipMember]:
+    """Lê cabeçalho e trailer do .gz (None se não for gzip/deflate)"""
+    try:
+        total_size = gz_path.stat().st_size
+        with open(gz_path, 'rb') as f:
+            header = f.read(_GZIP_HEADER.size)
+            if len(header) < _GZIP_HEADER.size:
+                return None
+            magic, method, flags, _, _, _ = _GZIP_HEADER.unpack(header)
+            if magic != b'\x1f\x8b' or method != 8:
+                return None
+            if flags & _FEXTRA:
+                extra_size, = struct.unpack('<H', f.read(2))
+                f.seek(extra_size, os.SEEK_CUR)
+            if flags & _FNAME:
+                _skip_zero_terminated(f)
+            if flags & _FCOMMENT:
+                _skip_zero_terminated(f)
+            if flags & _FHCRC:
+                f.seek(2, os.SEEK_CUR)
+            data_offset = f.tell()
+
+            data_size = total_size - data_offset - _GZIP_TRAILER.size
+            if data_size < 0:
+                return None
+            f.seek(total_size - _GZIP_TRAILER.size)
+            crc, size = _GZIP_TRAILER.unpack(f.read(_GZIP_TRAILER.size))
+    except (OSError, struct.error):
+        return None
+    return GzipMember(data_offset, data_size, crc, size)
+
+
+def original_path(file_path: Path) -> Path:
+    """Caminho da saída original de uma variante .gz"""
+    return file_path.with_name(file_path.name[:-len(GZIP_SUFFIX)])
+
+
+def stored_file_size(file_path: Path) -> Optional[int]:
+    """Tamanho da saída, mesmo quando só a variante .gz está em disco"""
+    if file_path.exists():
+        return file_path.stat().st_size
+    member = read_gzip_member(file_path.with_name(file_path.name + GZIP_SUFFIX))
+    return member.size if member else None
+
+
+def _matching_member(file_path: Path) -> Optional[GzipMember]:
+    """Variante .gz válida para o arquivo (gravada depois dele e com o mesmo tamanho)"""
+    gz_path = file_path.with_name(file_path.name + GZIP_SUFFIX)
+    if not gz_path.exists():
+        return None
+    member = read_gzip_member(gz_path)
+    if member is None:
+        return None
+    if file_path.exists():
+        stat = file_path.stat()
+        if gz_path.stat().st_mtime < stat.st_mtime or member.size != stat.st_size & 0xFFFFFFFF:
+            return None
+        # Trailer guarda o tamanho módulo 2^32
+        member = member._replace(size=stat.st_size)
+    return member
+
+
+def plan_archive(results_dir: Path) -> List[Tuple[Path, str, Optional[GzipMember]]]:
+    """
+    Entradas do ZIP: (arquivo em disco, nome no ZIP, variante .gz reaproveitada)
+
+    Variantes .gz não aparecem no ZIP com o próprio nome: viram a entrada da
+    saída original (que pode já ter sido removida pela compactação).
+    """
+    results_dir = Path(results_dir)
+    entries: Dict[str, Tuple[Path, str, Optional[GzipMember]]] = {}
+
+    for file_path in sorted(results_dir.rglob('*')):
+        if not file_path.is_file():
+            continue
+
+        if file_path.name.endswith(GZIP_SUFFIX):
+            target = original_path(file_path)
+            if target.exists():
+                # Tratada junto com a saída original
+                continue
+            member = read_gzip_member(file_path)
+            if member is None:
+                target = file_path
+        else:
+            target = file_path
+            member = _matching_member(file_path)
+
+        arcname = target.relative_to(results_dir).as_posix()
+        source = target.with_name(target.name + GZIP_SUFFIX) if member else target
+        entries[arcname] = (source, arcname, member)
+
+    return [entries[name] for name in sorted(entries)]
+
+
+def archive_manifest(results_dir: Path) -> Dict[str, int]:
+    """Entradas que o ZIP da execução teria agora e o tamanho (descomprimido) de cada uma"""
+    return {arcname: member.size if member is not None else source.stat().st_size
+            for source, arcname, member in plan_archive(results_dir)}
+
+
+def manifest_path(archive_path: Path) -> Path:
+    """Manifesto gravado ao lado do ZIP"""
+    archive_path = Path(archive_path)
+    return archive_path.with_name(archive_path.name + MANIFEST_SUFFIX)
+
+
+def load_archive_manifest(archive_path: Path) -> Optional[Dict[str, int]]:
+    """Manifesto do ZIP, ou None se ausente ou ilegível"""
+    try:
+        with open(manifest_path(archive_path), encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if isinstance(manifest, dict) else None
+
+
+def save_archive_manifest(archive_path: Path, manifest: Dict[str, int]):
+    """Grava o manifesto do ZIP (escrita atômica)"""
+    path = manifest_path(archive_path)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def raw_copy_supported(zip_file: zipfile.ZipFile) -> bool:
+    """Se o stream deflate do .gz pode ser copiado direto para o ZIP nesta versão do Python"""
+    oldest, newest = RAW_COPY_PYTHON
+    return (oldest <= sys.version_info[:2] <= newest
+            and all(hasattr(zip_file, name) for name in _RAW_COPY_ATTRIBUTES))
+
+
+def _copy_deflated_member(zip_file: zipfile.ZipFile, gz_path: Path, zinfo: zipfile.ZipInfo,
+                          member: GzipMember):
+    """Copia o stream deflate do .gz como entrada ZIP_DEFLATED (sem recompressão)"""
+    zinfo.CRC = member.crc
+    zinfo.compress_size = member.data_size
+
+    # Mesmo protocolo de ZipFile.write() para diretórios: cabeçalho local + dados
+    with zip_file._lock:
+        if zip_file._seekable:
+            zip_file.fp.seek(zip_file.start_dir)
+        zinfo.header_offset = zip_file.fp.tell()
+        zip_file._writecheck(zinfo)
+        zip_file._didModify = True
+        zip_file.fp.write(zinfo.FileHeader())
+        with open(gz_path, 'rb') as source:
+            source.seek(member.data_offset)
+            remaining = member.data_size
+            while remaining:
+                chunk = source.read(min(_COPY_CHUNK_SIZE, remaining))
+                if not chunk:
+                    raise OSError(f"{gz_path} truncado")
+                zip_file.fp.write(chunk)
+                remaining -= len(chunk)
+        zip_file.filelist.append(zinfo)
+        zip_file.NameToInfo[zinfo.filename] = zinfo
+        zip_file.start_dir = zip_file.fp.tell()
+
+
+def _write_deflated_member(zip_file: zipfile.ZipFile, gz_path: Path, arcname: str,
+                           member: GzipMember, date_time: Tuple[int, ...]) -> bool:
+    """
+    Grava a entrada da saída a partir da variante .gz
+
+    Returns:
+        True se o stream deflate foi copiado sem recompressão
+    """
+    zinfo = zipfile.ZipInfo(arcname, date_time)
+    zinfo.compress_type = zipfile.ZIP_DEFLATED
+    zinfo.external_attr = 0o644 << 16
+    zinfo.file_size = member.size
+
+    if raw_copy_supported(zip_file):
+        _copy_deflated_member(zip_file, gz_path, zinfo, member)
+        return True
+
+    # API pública: descomprime o .gz e o ZipFile comprime de novo
+    with gzip.open(gz_path, 'rb') as source, zip_file.open(zinfo, 'w') as target:
+        shutil.copyfileobj(source, target, _COPY_CHUNK_SIZE)
+    return False
+
+
+def write_results_zip(results_dir: Path, archive_path: Path,
+                      compress_type: Callable[[Path], int]) -> Dict[str, int]:
+    """
+    Grava o ZIP da execução
+
+    Args:
+        results_dir: Diretório da execução
+        archive_path: Arquivo ZIP a gravar
+        compress_type: Compressão das entradas sem variante .gz (recebe o caminho)
+
+    Returns:
+        Contagem de entradas reaproveitadas ('precompressed') e comprimidas ('compressed')
+    """
+    counts = {'precompressed': 0, 'compressed': 0}
+    with zipfile.ZipFile(archive_path, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+        for source, arcname, member in plan_archive(results_dir):
+            if member is not None:
+                original = original_path(source)
+                mtime = (original if original.exists() else source).stat().st_mtime
+                date_time = time.localtime(mtime)[:6]
+                if _write_deflated_member(zip_file, source, arcname, member, date_time):
+                    counts['precompressed'] += 1
+                else:
+                    counts['compressed'] += 1
+            else:
+                zip_file.write(source, arcname, compress_type=compress_type(source))
+                counts['compressed'] += 1
+    return counts
+
+
+def compact_run_dir(results_dir: Path) -> int:
+    """
+    Remove as saídas que têm variante .gz válida (PIPELINE_RESULTS_COMPACT)
+
+    Returns:
+        Bytes liberados
+    """
+    results_dir = Path(results_dir)
+    freed = 0
+    for gz_path in list(results_dir.rglob('*' + GZIP_SUFFIX)):
+        target = original_path(gz_path)
+        if not target.exists():
+            continue
+        if _matching_member(target) is None:
+            continue
+        freed += target.stat().st_size
+        target.unlink()
+    return freed
+
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Gerenciador de retenção da pasta results/
+Mantém o uso de disco dentro de orçamentos (global e por dia) removendo
+execuções inteiras menos usadas recentemente, em thread de fundo.
+
+Execuções: results/DATA/run_* (app), results/DATA/batch_* (modo batch, o
+lote inteiro) e results/DATA/watch/* (modo watch). Execuções publicadas em
+results/latest/ não são removidas.
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+# Orçamentos padrão (podem ser sobrescritos por variáveis de ambiente)
+DEFAULT_MAX_TOTAL_BYTES = 2 * 1024 * 1024 * 1024   # 2 GB
+DEFAULT_MAX_DAY_BYTES = 500 * 1024 * 1024          # 500 MB
+DEFAULT_DAYS_TO_KEEP = 7
+
+# Execuções acessadas há menos que isso nunca são removidas (análise/download em andamento)
+DEFAULT_MIN_IDLE_SECONDS = 10 * 60
+
+# Intervalo entre limpezas da thread de fundo
+DEFAULT_CLEANUP_INTERVAL = 15 * 60
+
+INDEX_FILENAME = '.retention_index.json'
+
+# Prefixos das execuções dentro da pasta do dia e subpasta do modo watch
+EXECUTION_PREFIXES = ('run_', 'batch_')
+WATCH_DIRNAME = 'watch'
+
+# Links simbólicos para as execuções publicadas pelo modo watch
+LATEST_DIRNAME = 'latest'
+
+
+def _dir_size(path: Path) -> int:
+    """
+    Soma o tamanho dos arquivos do diretório
+
+    Cada inode conta uma vez, e arquivos com hard links (execuções
+    reaproveitadas) contam só a sua fração (tamanho / número de links):
+    somando as execuções que compartilham o arquivo chega-se ao espaço
+    realmente ocupado.
+    """
+    total = 0
+    seen = set()
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                stat = os.lstat(os.path.join(root, name))
+            except OSError:
+                continue
+            inode = (stat.st_dev, stat.st_ino)
+            if inode in seen:
+                continue
+            seen.add(inode)
+            total += stat.st_size // max(stat.st_nlink, 1)
+    return total
+
+
+def _is_date_dir(path: Path) -> bool:
+    """Verifica se o diretório segue o formato YYYY-MM-DD"""
+    try:
+        datetime.strptime(path.name, '%Y-%m-%d')
+        return path.is_dir()
+    except ValueError:
+        return False
+
+
+def _execution_dirs(date_dir: Path) -> Iterable[Path]:
+    """Diretórios de execução da pasta do dia (run_*, batch_* e watch/*)"""
+    for path in date_dir.iterdir():
+        if not path.is_dir() or path.is_symlink():
+            continue
+        if path.name.startswith(EXECUTION_PREFIXES):
+            yield path
+        elif path.name == WATCH_DIRNAME:
+            for watch_run in path.iterdir():
+                if watch_run.is_dir() and not watch_run.is_symlink():
+                    yield watch_run
+
+
+class ResultsRetentionManager:
+    """Aplica política de retenção sobre as execuções de results/ usando um índice em disco"""
+
+    def __init__(self, results_base: Path,
+                 max_total_bytes: int = DEFAULT_MAX_TOTAL_BYTES,
+                 max_day_bytes: int = DEFAULT_MAX_DAY_BYTES,
+                 days_to_keep: int = DEFAULT_DAYS_TO_KEEP,
+                 min_idle_seconds: int = DEFAULT_MIN_IDLE_SECONDS):
+        self.results_base = Path(results_base)
+        self.max_total_bytes = max_total_bytes
+        self.max_day_bytes = max_day_bytes
+        self.days_to_keep = days_to_keep
+        self.min_idle_seconds = min_idle_seconds
+        self.index_path = self.results_base / INDEX_FILENAME
+        self._lock = threading.Lock()
+        self._runs: Optional[Dict[str, dict]] = None
+
+    # ------------------------------------------------------------------
+    # Índice
+    # ------------------------------------------------------------------
+
+    def _key(self, run_dir: Path) -> str:
+        """Chave da execução no índice: caminho relativo a results/ ('YYYY-MM-DD/run_xxx', 'YYYY-MM-DD/watch/xxx')"""
+        return Path(os.path.relpath(os.path.realpath(run_dir), os.path.realpath(self.results_base))).as_posix()
+
+    def _archive_path(self, key: str) -> Path:
+        """ZIP gerado para download fica ao lado do diretório da execução"""
+        return self.results_base / f"{key}.zip"
+
+    def _manifest_path(self, key: str) -> Path:
+        """Manifesto do ZIP (entradas e tamanhos, ver utils/results_archive.py)"""
+        return self.results_base / f"{key}.zip.json"
+
+    def _run_size(self, key: str) -> int:
+        """Tamanho da execução incluindo o ZIP de download, se existir"""
+        size = _dir_size(self.results_base / key)
+        archive = self._archive_path(key)
+        if archive.exists():
+            size += archive.stat().st_size
+        return size
+
+    def _load_index(self) -> Dict[str, dict]:
+        """Carrega o índice do disco ou reconstrói com uma varredura única"""
+        if self._runs is not None:
+            return self._runs
+
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                self._runs = json.load(f).get('runs', {})
+            return self._runs
+        except (OSError, ValueError):
+            pass
+
+        # Índice ausente ou corrompido: varre a árvore uma única vez
+        self._runs = {}
+        self._discover_runs()
+        self._save_index()
+        return self._runs
+
+    def _discover_runs(self):
+        """Inclui no índice execuções criadas fora do app (modos batch e watch, linha de comando)"""
+        if not self.results_base.exists():
+            return
+        for date_dir in self.results_base.iterdir():
+            if not _is_date_dir(date_dir):
+                continue
+            for run_dir in _execution_dirs(date_dir):
+                key = self._key(run_dir)
+                if key in self._runs:
+                    continue
+                mtime = run_dir.stat().st_mtime
+                self._runs[key] = {
+                    'size': self._run_size(key),
+                    'created': mtime,
+                    'last_access': mtime,
+                }
+
+    def _pinned_runs(self) -> set:
+        """Execuções publicadas em results/latest (links simbólicos do modo watch)"""
+        latest_dir = self.results_base / LATEST_DIRNAME
+        pinned = set()
+        if latest_dir.is_dir():
+            for link in latest_dir.iterdir():
+                if link.is_symlink() and link.is_dir():
+                    pinned.add(self._key(link))
+        return pinned
+
+    def _save_index(self):
+        """Grava o índice de forma atômica"""
+        if self._runs is None:
+            return
+        self.results_base.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'runs': self._runs}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.index_path)
+
+    # ------------------------------------------------------------------
+    # API pública
+    # ------------------------------------------------------------------
+
+    def register_run(self, run_dir: Path):
+        """Registra (ou atualiza o tamanho de) uma execução no índice"""
+        with self._lock:
+            runs = self._load_index()
+            key = self._key(run_dir)
+            now = time.time()
+            entry = runs.setdefault(key, {'created': now})
+            entry['size'] = self._run_size(key)
+            entry['last_access'] = now
+            self._save_index()
+
+    def touch(self, run_dir: Path):
+        """Marca a execução como usada agora (ex: visualização ou download)"""
+        with self._lock:
+            runs = self._load_index()
+            key = self._key(run_dir)
+            if key in runs:
+                runs[key]['last_access'] = time.time()
+                self._save_index()
+
+    def total_bytes(self) -> int:
+        """Uso total de disco registrado no índice"""
+        with self._lock:
+            return sum(entry.get('size', 0) for entry in self._load_index().values())
+
+    def _remove_run(self, key: str):
+        """Remove diretório da execução, o ZIP associado e o manifesto do ZIP"""
+        shutil.rmtree(self.results_base / key, ignore_errors=True)
+        for path in (self._archive_path(key), self._manifest_path(key)):
+            if path.exists():
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+        self._runs.pop(key, None)
+
+    def _evict_lru(self, keys: Iterable[str], budget: int, protected: set) -> int:
+        """Remove execuções menos usadas recentemente até caber no orçamento"""
+        keys = list(keys)
+        used = sum(self._runs[k].get('size', 0) for k in keys)
+        removed = 0
+        for key in sorted(keys, key=lambda k: self._runs[k].get('last_access', 0)):
+            if used <= budget:
+                break
+            if key in protected:
+                continue
+            used -= self._runs[key].get('size', 0)
+            self._remove_run(key)
+            removed += 1
+        return removed
+
+    def enforce(self) -> int:
+        """
+        Aplica a política de retenção
+
+        1. Remove pastas de dia mais antigas que days_to_keep
+        2. Mantém cada dia dentro de max_day_bytes (LRU de execuções)
+        3. Mantém o total dentro de max_total_bytes (LRU de execuções)
+
+        Returns:
+            Número de execuções removidas
+        """
+        with self._lock:
+            runs = self._load_index()
+            removed = 0
+
+            # Remove entradas cujo diretório já não existe e inclui as que faltam
+            for key in [k for k in runs if not (self.results_base / k).exists()]:
+                runs.pop(key)
+            self._discover_runs()
+
+            now = time.time()
+            pinned = self._pinned_runs()
+            protected = pinned | {k for k, entry in runs.items()
+                                  if now - entry.get('last_access', 0) < self.min_idle_seconds}
+
+            # 1. Pastas de dia expiradas (execuções publicadas ficam até serem substituídas)
+            cutoff_date = datetime.now() - timedelta(days=self.days_to_keep)
+            if self.results_base.exists():
+                for date_dir in self.results_base.iterdir():
+                    if not _is_date_dir(date_dir):
+                        continue
+                    if datetime.strptime(date_dir.name, '%Y-%m-%d') >= cutoff_date:
+                        continue
+                    day_keys = [k for k in runs if k.startswith(f"{date_dir.name}/")]
+                    if any(key in pinned for key in day_keys):
+                        for key in day_keys:
+                            if key not in pinned:
+                                self._remove_run(key)
+                                removed += 1
+                        continue
+                    shutil.rmtree(date_dir, ignore_errors=True)
+                    for key in day_keys:
+                        runs.pop(key)
+                        removed += 1
+
+            # 2. Orçamento por dia
+            days: Dict[str, list] = {}
+            for key in runs:
+                days.setdefault(key.split('/', 1)[0], []).append(key)
+            for day_keys in days.values():
+                removed += self._evict_lru(day_keys, self.max_day_bytes, protected)
+
+            # 3. Orçamento global
+            removed += self._evict_lru(list(runs), self.max_total_bytes, protected)
+
+            self._save_index()
+            return removed
+
+
+# ----------------------------------------------------------------------
+# Instância única por processo + thread de fundo
+# ----------------------------------------------------------------------
+
+_manager: Optional[ResultsRetentionManager] = None
+_cleanup_thread: Optional[threading.Thread] = None
+_singleton_lock = threading.Lock()
+
+
+def get_retention_manager(results_base: Path) -> ResultsRetentionManager:
+    """Retorna o gerenciador de retenção do processo (configurável por variáveis de ambiente)"""
+    global _manager
+    with _singleton_lock:
+        if _manager is None:
+            _manager = ResultsRetentionManager(
+                results_base,
+                max_total_bytes=int(os.environ.get('PIPELINE_RESULTS_MAX_BYTES', DEFAULT_MAX_TOTAL_BYTES)),
+                max_day_bytes=int(os.environ.get('PIPELINE_RESULTS_DAY_MAX_BYTES', DEFAULT_MAX_DAY_BYTES)),
+                days_to_keep=int(os.environ.get('PIPELINE_RESULTS_DAYS_TO_KEEP', DEFAULT_DAYS_TO_KEEP)),
+            )
+        return _manager
+
+
+def start_background_cleanup(results_base: Path, interval: int = DEFAULT_CLEANUP_INTERVAL) -> ResultsRetentionManager:
+    """Inicia (uma única vez por processo) a thread de limpeza periódica"""
+    global _cleanup_thread
+    manager = get_retention_manager(results_base)
+
+    with _singleton_lock:
+        if _cleanup_thread is not None and _cleanup_thread.is_alive():
+            return manager
+
+        def _loop():
+            while True:
+                try:
+                    manager.enforce()
+                except Exception:
+                    # Falha silenciosa na limpeza para não afetar funcionalidade principal
+                    pass
+                time.sleep(interval)
+
+        _cleanup_thread = threading.Thread(target=_loop, name='results-retention', daemon=True)
+        _cleanup_thread.start()
+
+    return manager
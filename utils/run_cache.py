@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Deduplicação de execuções por conteúdo
+Execuções com os mesmos arquivos de entrada, mesmas regras e mesma data
+reaproveitam os resultados já gerados em vez de recalcular tudo.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Iterable, Optional
+
+INDEX_FILENAME = '.run_index.json'
+
+# Arquivo que indica execução completa (último módulo do pipeline)
+COMPLETION_MARKER = 'dashboard.html'
+
+_rules_fingerprint: Optional[str] = None
+
+
+def _hash_file(hasher, file_path: Path):
+    """Alimenta o hash com o conteúdo do arquivo em blocos"""
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            hasher.update(chunk)
+
+
+def get_rules_fingerprint(scripts_dir: Path) -> str:
+    """
+    Hash da configuração de regras
+
+    As regras ficam no código dos módulos em scripts/, então o fingerprint é o
+    hash de todos os .py desse diretório (calculado uma vez por processo).
+    """
+    global _rules_fingerprint
+    if _rules_fingerprint is None:
+        hasher = hashlib.sha256()
+        for script in sorted(Path(scripts_dir).rglob('*.py')):
+            hasher.update(str(script.relative_to(scripts_dir)).encode('utf-8'))
+            _hash_file(hasher, script)
+        _rules_fingerprint = hasher.hexdigest()
+    return _rules_fingerprint
+
+
+def compute_run_key(input_files: Iterable[Optional[Path]], scripts_dir: Path, date_str: str) -> str:
+    """
+    Chave da execução: sha256 dos arquivos de entrada + regras + data
+
+    Args:
+        input_files: Arquivos de entrada, na ordem (None para arquivo opcional ausente)
+        scripts_dir: Diretório scripts/ com as regras
+        date_str: Data da execução (YYYY-MM-DD)
+
+    Returns:
+        Hash hexadecimal da execução
+    """
+    hasher = hashlib.sha256()
+    hasher.update(date_str.encode('utf-8'))
+    hasher.update(get_rules_fingerprint(scripts_dir).encode('utf-8'))
+    for input_file in input_files:
+        # Separador garante que (A, None) e (None, A) gerem chaves diferentes
+        hasher.update(b'\x00')
+        if input_file is not None:
+            _hash_file(hasher, Path(input_file))
+    return hasher.hexdigest()
+
+
+def _load_index(date_dir: Path) -> dict:
+    try:
+        with open(date_dir / INDEX_FILENAME, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def find_cached_run(date_dir: Path, run_key: str) -> Optional[Path]:
+    """Retorna o diretório de uma execução completa com a mesma chave, se existir"""
+    run_name = _load_index(date_dir).get(run_key)
+    if not run_name:
+        return None
+    run_dir = date_dir / run_name
+    # Execução compactada (PIPELINE_RESULTS_COMPACT) mantém só o dashboard.html.gz
+    if not (run_dir / COMPLETION_MARKER).exists() and not (run_dir / f"{COMPLETION_MARKER}.gz").exists():
+        # Execução removida pela retenção ou incompleta
+        return None
+    return run_dir
+
+
+def record_run(date_dir: Path, run_key: str, run_dir: Path):
+    """Associa a chave ao diretório da execução no índice do dia"""
+    index = _load_index(date_dir)
+    index[run_key] = Path(run_dir).name
+    tmp_path = date_dir / f"{INDEX_FILENAME}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, indent=1)
+    os.replace(tmp_path, date_dir / INDEX_FILENAME)
+
+
+def link_run(source_dir: Path, target_dir: Path):
+    """
+    Replica os resultados de source_dir em target_dir usando hard links
+
+    Mantém um diretório próprio por execução (isolamento entre sessões) sem
+    duplicar os bytes em disco. Se o sistema de arquivos não suportar hard
+    links, copia o arquivo.
+    """
+    source_dir = Path(source_dir)
+    target_dir = Path(target_dir)
+    for file_path in source_dir.rglob('*'):
+        if not file_path.is_file():
+            continue
+        destination = target_dir / file_path.relative_to(source_dir)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(file_path, destination)
+        except OSError:
+            shutil.copy2(file_path, destination)